@@ -0,0 +1,396 @@
+"""
+内容寻址磁盘 LRU 缓存
+
+ImageCache、TTSCache 共用的机制：以内容哈希作为键，把条目保存在本地磁盘，
+按 LRU 顺序和总容量上限淘汰。子类只负责键的计算和条目内容的读写。
+
+设计说明：
+- 条目是单个文件或一个目录，位于 <root>/<key[:2]>/<key><ENTRY_SUFFIX>
+- 写入先生成同目录下的临时条目再 os.replace，并发读取不会看到写了一半的条目
+- 本地层按 LRU 顺序和总容量上限淘汰（命中时刷新 mtime，重启后按 mtime 恢复顺序）
+- 共享层（可选）：如 NFS/共享存储目录，本地未命中时查询，命中后回填本地层
+- 线程安全；多个进程共享同一目录时，写入是原子的，但容量统计以本进程为准
+
+配置（环境变量，<PREFIX> 由子类的单例决定，如 IMAGE_CACHE、TTS_CACHE）：
+- <PREFIX>_ENABLED: 是否启用缓存（默认 true）
+- <PREFIX>_DIR: 本地缓存目录（默认 <base_dir>/cache/<子目录>）
+- <PREFIX>_MAX_BYTES: 本地缓存容量上限
+- <PREFIX>_SHARED_DIR: 共享层目录（默认不启用）
+"""
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, TypeVar, Union
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.cache.disk_cache")
+
+TIER_LOCAL = "local"
+TIER_SHARED = "shared"
+
+T = TypeVar("T")
+C = TypeVar("C", bound="ContentAddressedDiskCache")
+
+
+@dataclass
+class DiskCacheStats:
+    """缓存统计快照"""
+    entries: int
+    size_bytes: int
+    max_bytes: int
+    local_hits: int
+    shared_hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hits(self) -> int:
+        """命中次数（含共享层）"""
+        return self.local_hits + self.shared_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率（含共享层）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于日志和监控）"""
+        return {
+            "entries": self.entries,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def _path_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+    return path.stat().st_size
+
+
+def _remove_path(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _copy_path(src: Path, dest: Path) -> None:
+    if src.is_dir():
+        shutil.copytree(src, dest)
+    else:
+        shutil.copyfile(src, dest)
+
+
+class ContentAddressedDiskCache:
+    """内容寻址磁盘 LRU 缓存基类
+
+    子类设置 ENTRY_SUFFIX（文件条目的后缀）或 STAMP_FILE（目录条目中最后写入、
+    用于记录访问时间的文件），并通过 lookup / store 读写条目内容。
+    """
+
+    cache_name = "Disk"
+    ENTRY_SUFFIX = ""
+    STAMP_FILE: Optional[str] = None
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_bytes: int,
+        shared_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 本地缓存目录
+            max_bytes: 本地缓存容量上限（字节）
+            shared_dir: 共享层目录，None 表示不启用
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.shared_dir = Path(shared_dir) if shared_dir else None
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size_bytes = 0
+        self._local_hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if self.shared_dir:
+            self.shared_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # 索引
+    # ------------------------------------------------------------------
+
+    def entry_path(self, root: Path, key: str) -> Path:
+        """条目在指定层中的路径"""
+        return root / key[:2] / f"{key}{self.ENTRY_SUFFIX}"
+
+    def _stamp_path(self, entry: Path) -> Path:
+        return entry / self.STAMP_FILE if self.STAMP_FILE else entry
+
+    def _load_index(self) -> None:
+        """扫描本地目录，按 mtime 恢复 LRU 顺序"""
+        pattern = f"*/*/{self.STAMP_FILE}" if self.STAMP_FILE else f"*/*{self.ENTRY_SUFFIX}"
+        found = []
+        for stamp in self.cache_dir.glob(pattern):
+            entry = stamp.parent if self.STAMP_FILE else stamp
+            if entry.name.startswith("."):
+                continue  # 写入中断遗留的临时条目
+            key = entry.name[:len(entry.name) - len(self.ENTRY_SUFFIX)]
+            try:
+                found.append((stamp.stat().st_mtime, key, _path_size(entry)))
+            except OSError:
+                continue
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size_bytes += size
+
+        if found:
+            logger.info(
+                f"{self.cache_name} cache loaded: {len(found)} entries, "
+                f"{self._size_bytes / 1024 / 1024:.1f}MB in {self.cache_dir}"
+            )
+        self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """淘汰最久未使用的条目直到不超过容量上限"""
+        while self._size_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size_bytes -= size
+            self._evictions += 1
+            try:
+                _remove_path(self.entry_path(self.cache_dir, key))
+            except OSError as e:
+                logger.warning(f"Failed to evict {self.cache_name} cache entry {key}: {e}")
+
+    def contains(self, key: str) -> bool:
+        """检查本地层是否存在缓存条目（不影响 LRU 顺序和统计）"""
+        with self._lock:
+            return key in self._entries
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+
+    def lookup(
+        self,
+        key: str,
+        reader: Callable[[Path], Optional[T]],
+    ) -> Tuple[Optional[str], Optional[T]]:
+        """
+        查询缓存，依次尝试本地层和共享层
+
+        Args:
+            key: 缓存键
+            reader: 读取条目内容的函数，条目不存在或不可用时返回 None
+
+        Returns:
+            (命中的层级 "local" / "shared"，reader 的结果)；未命中返回 (None, None)
+        """
+        local_entry = self.entry_path(self.cache_dir, key)
+
+        with self._lock:
+            in_index = key in self._entries
+            if in_index:
+                self._entries.move_to_end(key)
+
+        if in_index:
+            result = reader(local_entry)
+            if result is not None:
+                try:
+                    os.utime(self._stamp_path(local_entry))
+                except OSError:
+                    pass
+                self._record(TIER_LOCAL)
+                return TIER_LOCAL, result
+            if not self._stamp_path(local_entry).exists():
+                # 条目已被外部删除，同步索引
+                with self._lock:
+                    size = self._entries.pop(key, None)
+                    if size is not None:
+                        self._size_bytes -= size
+
+        if self.shared_dir:
+            shared_entry = self.entry_path(self.shared_dir, key)
+            result = reader(shared_entry)
+            if result is not None:
+                # 回填本地层，后续命中不再访问共享存储
+                self.store(key, lambda tmp: _copy_path(shared_entry, tmp))
+                self._record(TIER_SHARED)
+                return TIER_SHARED, result
+
+        self._record(None)
+        return None, None
+
+    def store(self, key: str, writer: Callable[[Path], None]) -> bool:
+        """
+        写入缓存（本地层，以及已配置且尚无该条目的共享层）
+
+        Args:
+            key: 缓存键
+            writer: 在给定的临时路径上生成条目（文件或目录）的函数
+
+        Returns:
+            bool: 是否写入成功
+        """
+        entry = self.entry_path(self.cache_dir, key)
+        tmp_path = self._temp_path(entry)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            writer(tmp_path)
+            size = _path_size(tmp_path)
+
+            if self.shared_dir:
+                shared_entry = self.entry_path(self.shared_dir, key)
+                if not shared_entry.exists():
+                    self._atomic_copy(tmp_path, shared_entry)
+
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._size_bytes -= previous
+                if tmp_path.is_dir():
+                    _remove_path(entry)
+                os.replace(tmp_path, entry)
+                self._entries[key] = size
+                self._size_bytes += size
+                self._evict_locked()
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to write {self.cache_name} cache entry {key}: {e}")
+            _remove_path(tmp_path)
+            return False
+
+    @staticmethod
+    def _temp_path(dest: Path) -> Path:
+        return dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+
+    def _atomic_copy(self, src: Path, dest: Path) -> bool:
+        """复制到临时条目后原子替换目标条目"""
+        tmp_path = self._temp_path(dest)
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            _copy_path(src, tmp_path)
+            if tmp_path.is_dir():
+                _remove_path(dest)
+            os.replace(tmp_path, dest)
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to write {self.cache_name} cache entry {dest}: {e}")
+            _remove_path(tmp_path)
+            return False
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+
+    def _record(self, tier: Optional[str]) -> None:
+        with self._lock:
+            if tier == TIER_LOCAL:
+                self._local_hits += 1
+            elif tier == TIER_SHARED:
+                self._shared_hits += 1
+            else:
+                self._misses += 1
+            size_bytes = self._size_bytes
+        self._track_metrics(tier, size_bytes)
+
+    def _track_metrics(self, tier: Optional[str], size_bytes: int) -> None:
+        """同步命中/未命中到监控指标（子类按需实现）"""
+
+    def get_stats(self) -> DiskCacheStats:
+        """获取缓存统计快照"""
+        with self._lock:
+            return DiskCacheStats(
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+                local_hits=self._local_hits,
+                shared_hits=self._shared_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+class DiskCacheSingleton(Generic[C]):
+    """按环境变量配置、首次访问时创建的进程级缓存单例"""
+
+    def __init__(
+        self,
+        cache_class: Callable[..., C],
+        env_prefix: str,
+        default_subdir: str,
+        default_max_bytes: int,
+    ):
+        """
+        Args:
+            cache_class: 缓存类（以 cache_dir, max_bytes, shared_dir 构造）
+            env_prefix: 环境变量前缀（如 "IMAGE_CACHE"）
+            default_subdir: 未配置目录时使用的 <base_dir>/cache 下的子目录
+            default_max_bytes: 未配置容量时的默认上限（字节）
+        """
+        self.cache_class = cache_class
+        self.env_prefix = env_prefix
+        self.default_subdir = default_subdir
+        self.default_max_bytes = default_max_bytes
+        self._instance: Optional[C] = None
+        self._lock = threading.Lock()
+
+    def enabled(self) -> bool:
+        """是否启用缓存（环境变量 <PREFIX>_ENABLED，默认启用）"""
+        return os.getenv(f"{self.env_prefix}_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    def get(self) -> C:
+        """获取单例"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    cache_dir = os.getenv(f"{self.env_prefix}_DIR")
+                    if not cache_dir:
+                        from core.config.paths import get_path_manager
+                        cache_dir = get_path_manager().cache_dir / self.default_subdir
+
+                    max_bytes_env = os.getenv(f"{self.env_prefix}_MAX_BYTES", "")
+                    max_bytes = int(max_bytes_env) if max_bytes_env.isdigit() else self.default_max_bytes
+
+                    self._instance = self.cache_class(
+                        cache_dir=cache_dir,
+                        max_bytes=max_bytes,
+                        shared_dir=os.getenv(f"{self.env_prefix}_SHARED_DIR") or None,
+                    )
+                    logger.info(
+                        f"{self._instance.cache_name} cache initialized (dir={cache_dir}, "
+                        f"max_bytes={max_bytes}, shared_dir={self._instance.shared_dir})"
+                    )
+        return self._instance
+
+
+__all__ = [
+    "ContentAddressedDiskCache",
+    "DiskCacheSingleton",
+    "DiskCacheStats",
+    "TIER_LOCAL",
+    "TIER_SHARED",
+]
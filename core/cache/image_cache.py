@@ -0,0 +1,175 @@
+"""
+图像生成内容寻址缓存
+
+以生成参数（提示词、话题前缀、LoRA 名称/权重、宽高、推理步数）的哈希作为键，
+将生成的图像保存在本地磁盘，避免任务重跑、Celery 重试或不同任务共享相同
+分镜时重复占用 GPU。
+
+LRU 淘汰、原子写入和共享层见 core.cache.disk_cache；命中/未命中统计同步到
+Prometheus 指标（如已启用）。
+
+配置（环境变量）：
+- IMAGE_CACHE_ENABLED: 是否启用缓存（默认 true）
+- IMAGE_CACHE_DIR: 本地缓存目录（默认 <base_dir>/cache/images）
+- IMAGE_CACHE_MAX_BYTES: 本地缓存容量上限（默认 5GB）
+- IMAGE_CACHE_SHARED_DIR: 共享层目录（默认不启用）
+"""
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from core.cache.disk_cache import ContentAddressedDiskCache, DiskCacheSingleton
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.cache.image_cache")
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024 * 1024  # 默认本地缓存容量（5GB）
+CACHE_FILE_SUFFIX = ".png"
+
+
+def make_image_cache_key(
+    prompt: str,
+    topic_prefix: str = "",
+    lora_name: Optional[str] = None,
+    lora_weight: float = 1.2,
+    width: int = 0,
+    height: int = 0,
+    num_inference_steps: int = 30,
+) -> str:
+    """计算图像生成参数的内容哈希
+
+    Args:
+        prompt: 提示词
+        topic_prefix: 话题前缀
+        lora_name: LoRA 名称
+        lora_weight: LoRA 权重（未使用 LoRA 时不参与哈希）
+        width: 图像宽度
+        height: 图像高度
+        num_inference_steps: 推理步数
+
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    payload = {
+        "prompt": prompt or "",
+        "topic_prefix": topic_prefix or "",
+        "lora_name": lora_name or None,
+        "lora_weight": round(float(lora_weight), 4) if lora_name else None,
+        "width": int(width),
+        "height": int(height),
+        "num_inference_steps": int(num_inference_steps),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def image_cache_key_from_params(params: Dict[str, Any]) -> str:
+    """根据 generate_batch 的单条参数字典计算缓存键
+
+    Args:
+        params: 生成参数（prompt, topic_prefix, lora_name, lora_weight, width, height, num_inference_steps）
+
+    Returns:
+        str: 缓存键
+    """
+    return make_image_cache_key(
+        prompt=params.get("prompt", ""),
+        topic_prefix=params.get("topic_prefix", ""),
+        lora_name=params.get("lora_name"),
+        lora_weight=params.get("lora_weight", 1.2),
+        width=params.get("width", 0),
+        height=params.get("height", 0),
+        num_inference_steps=params.get("num_inference_steps", 30),
+    )
+
+
+class ImageCache(ContentAddressedDiskCache):
+    """图像生成磁盘缓存（每个条目是一个 PNG 文件）"""
+
+    cache_name = "Image"
+    ENTRY_SUFFIX = CACHE_FILE_SUFFIX
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        shared_dir: Optional[Union[str, Path]] = None,
+    ):
+        super().__init__(cache_dir, max_bytes, shared_dir)
+
+    def get(self, key: str, dest_path: Union[str, Path]) -> Optional[str]:
+        """
+        查询缓存，命中时将图像复制到目标路径
+
+        Args:
+            key: 缓存键
+            dest_path: 目标文件路径
+
+        Returns:
+            Optional[str]: 命中的层级（"local" / "shared"），未命中返回 None
+        """
+        tier, _ = self.lookup(key, lambda entry: self._copy_out(entry, dest_path))
+        return tier
+
+    def put(self, key: str, src_path: Union[str, Path]) -> bool:
+        """
+        写入缓存（本地层，以及已配置的共享层）
+
+        Args:
+            key: 缓存键
+            src_path: 已生成的图像文件路径
+
+        Returns:
+            bool: 是否写入成功
+        """
+        src = Path(src_path)
+        if not src.is_file() or src.stat().st_size == 0:
+            return False
+        return self.store(key, lambda tmp_path: shutil.copyfile(src, tmp_path))
+
+    @staticmethod
+    def _copy_out(src: Path, dest_path: Union[str, Path]) -> Optional[bool]:
+        try:
+            Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, dest_path)
+            return True
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read image cache entry {src}: {e}")
+            return None
+
+    def _track_metrics(self, tier: Optional[str], size_bytes: int) -> None:
+        try:
+            from core.monitoring.metrics import track_image_cache
+        except ImportError:
+            return
+        track_image_cache(tier or "miss", size_bytes)
+
+
+# ============================================================================
+# 全局实例
+# ============================================================================
+
+_image_cache = DiskCacheSingleton(ImageCache, "IMAGE_CACHE", "images", DEFAULT_MAX_BYTES)
+
+
+def is_image_cache_enabled() -> bool:
+    """是否启用图像缓存（环境变量 IMAGE_CACHE_ENABLED，默认启用）"""
+    return _image_cache.enabled()
+
+
+def get_image_cache() -> ImageCache:
+    """获取进程级图像缓存单例"""
+    return _image_cache.get()
+
+
+__all__ = [
+    "ImageCache",
+    "get_image_cache",
+    "image_cache_key_from_params",
+    "is_image_cache_enabled",
+    "make_image_cache_key",
+]
@@ -0,0 +1,230 @@
+"""
+TTS 合成结果内容寻址缓存
+
+以规范化文本、语言、音色、语速、音调、音量和 TTS 服务类型的哈希作为键，
+在本地磁盘保存音频、字幕和音频时长。相同文案的任务重跑（例如只更换了
+Logo 或图像 LoRA）时直接复用，跳过语音合成和时长探测。
+
+每个条目是一个目录：audio<后缀>、subtitle.srt（可选）、meta.json（最后写入，
+其 mtime 记录访问顺序）。LRU 淘汰、原子写入和共享层见 core.cache.disk_cache；
+命中/未命中统计同步到 Prometheus 指标（如已启用）。
+
+配置（环境变量）：
+- TTS_CACHE_ENABLED: 是否启用缓存（默认 true）
+- TTS_CACHE_DIR: 缓存目录（默认 <base_dir>/cache/tts）
+- TTS_CACHE_MAX_BYTES: 缓存容量上限（默认 2GB）
+- TTS_CACHE_SHARED_DIR: 共享层目录（默认不启用）
+"""
+import hashlib
+import json
+import re
+import shutil
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from core.cache.disk_cache import ContentAddressedDiskCache, DiskCacheSingleton
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.cache.tts_cache")
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 默认缓存容量（2GB）
+META_FILE_NAME = "meta.json"
+SRT_FILE_NAME = "subtitle.srt"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_tts_text(text: str) -> str:
+    """规范化待合成文本（Unicode NFKC、合并空白、去除首尾空白）
+
+    只做不改变朗读结果的规范化，避免空白或全半角差异导致缓存未命中。
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_tts_cache_key(
+    text: str,
+    language: str = "",
+    voice: Optional[str] = None,
+    speech_rate: float = 1.0,
+    pitch: Any = None,
+    volume: int = 50,
+    server_type: str = "",
+) -> str:
+    """计算 TTS 合成参数的内容哈希
+
+    Args:
+        text: 待合成文本（会先规范化）
+        language: 语言
+        voice: 音色
+        speech_rate: 语速
+        pitch: 音调
+        volume: 音量
+        server_type: TTS 服务类型（不同服务的合成结果不可互换）
+
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    payload = {
+        "text": normalize_tts_text(text),
+        "language": language or "",
+        "voice": voice or None,
+        "speech_rate": round(float(speech_rate), 4),
+        "pitch": pitch,
+        "volume": int(volume),
+        "server_type": server_type or "",
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class TTSCacheHit:
+    """缓存命中结果"""
+    audio_path: str
+    srt_path: Optional[str]
+    duration: float
+
+
+class TTSCache(ContentAddressedDiskCache):
+    """TTS 合成结果磁盘缓存（每个条目是一个目录）"""
+
+    cache_name = "TTS"
+    STAMP_FILE = META_FILE_NAME
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        shared_dir: Optional[Union[str, Path]] = None,
+    ):
+        super().__init__(cache_dir, max_bytes, shared_dir)
+
+    def get(
+        self,
+        key: str,
+        audio_dest: Union[str, Path],
+        srt_dest: Optional[Union[str, Path]] = None,
+    ) -> Optional[TTSCacheHit]:
+        """
+        查询缓存，命中时将音频（和字幕）复制到目标路径
+
+        Args:
+            key: 缓存键
+            audio_dest: 音频目标路径
+            srt_dest: 字幕目标路径（None 表示不需要字幕）
+
+        Returns:
+            Optional[TTSCacheHit]: 命中结果；未命中或条目缺少所需字幕时返回 None
+        """
+        _, hit = self.lookup(key, lambda entry: self._copy_out(entry, audio_dest, srt_dest))
+        return hit
+
+    def put(
+        self,
+        key: str,
+        audio_path: Union[str, Path],
+        srt_path: Optional[Union[str, Path]],
+        duration: float,
+    ) -> bool:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            audio_path: 已合成的音频文件
+            srt_path: 已生成的字幕文件（可选）
+            duration: 音频时长（秒）
+
+        Returns:
+            bool: 是否写入成功
+        """
+        audio = Path(audio_path)
+        srt = Path(srt_path) if srt_path else None
+        if not audio.is_file() or audio.stat().st_size == 0 or duration <= 0:
+            return False
+        if srt is not None and not srt.is_file():
+            srt = None
+
+        def write_entry(entry_dir: Path) -> None:
+            entry_dir.mkdir()
+            audio_name = f"audio{audio.suffix or '.wav'}"
+            shutil.copyfile(audio, entry_dir / audio_name)
+            if srt is not None:
+                shutil.copyfile(srt, entry_dir / SRT_FILE_NAME)
+            # meta.json 最后写入，作为条目完整的标志
+            meta = {"audio_file": audio_name, "has_srt": srt is not None, "duration": float(duration)}
+            (entry_dir / META_FILE_NAME).write_text(json.dumps(meta), encoding="utf-8")
+
+        return self.store(key, write_entry)
+
+    @staticmethod
+    def _copy_out(
+        entry_dir: Path,
+        audio_dest: Union[str, Path],
+        srt_dest: Optional[Union[str, Path]],
+    ) -> Optional[TTSCacheHit]:
+        try:
+            meta = json.loads((entry_dir / META_FILE_NAME).read_text(encoding="utf-8"))
+            if srt_dest and not meta.get("has_srt"):
+                return None
+
+            Path(audio_dest).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry_dir / meta["audio_file"], audio_dest)
+            if srt_dest:
+                Path(srt_dest).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(entry_dir / SRT_FILE_NAME, srt_dest)
+
+            return TTSCacheHit(
+                audio_path=str(audio_dest),
+                srt_path=str(srt_dest) if srt_dest else None,
+                duration=float(meta["duration"]),
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read TTS cache entry {entry_dir}: {e}")
+            return None
+
+    def _track_metrics(self, tier: Optional[str], size_bytes: int) -> None:
+        try:
+            from core.monitoring.metrics import track_tts_cache
+        except ImportError:
+            return
+        track_tts_cache("hit" if tier else "miss", size_bytes)
+
+
+# ============================================================================
+# 全局实例
+# ============================================================================
+
+_tts_cache = DiskCacheSingleton(TTSCache, "TTS_CACHE", "tts", DEFAULT_MAX_BYTES)
+
+
+def is_tts_cache_enabled() -> bool:
+    """是否启用 TTS 缓存（环境变量 TTS_CACHE_ENABLED，默认启用）"""
+    return _tts_cache.enabled()
+
+
+def get_tts_cache() -> TTSCache:
+    """获取进程级 TTS 缓存单例"""
+    return _tts_cache.get()
+
+
+__all__ = [
+    "TTSCache",
+    "TTSCacheHit",
+    "get_tts_cache",
+    "is_tts_cache_enabled",
+    "make_tts_cache_key",
+    "normalize_tts_text",
+]
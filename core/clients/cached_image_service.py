@@ -0,0 +1,151 @@
+"""带缓存的图像生成服务
+
+装饰器模式包装任意 IImageGenerationService：生成前先查询内容寻址缓存，
+只把未命中的条目交给底层服务，生成成功后写回缓存。
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from core.cache.image_cache import (
+    ImageCache,
+    get_image_cache,
+    image_cache_key_from_params,
+    make_image_cache_key,
+)
+from core.interfaces.service_interfaces import IImageGenerationService, ImageGenerationResult
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.clients.cached_image_service")
+
+
+class CachedImageGenerationService(IImageGenerationService):
+    """带缓存的图像生成服务
+
+    对调用方透明：返回结果的顺序和 output_path 与底层服务一致，
+    命中缓存的条目 generation_time 为复制耗时。
+    """
+
+    def __init__(
+        self,
+        inner: IImageGenerationService,
+        cache: Optional[ImageCache] = None,
+    ):
+        """
+        Args:
+            inner: 实际执行生成的服务
+            cache: 图像缓存，None 表示使用进程级单例
+        """
+        self.inner = inner
+        self.cache = cache or get_image_cache()
+
+    def generate_single_image(
+        self,
+        prompt: str,
+        output_path: str,
+        width: int,
+        height: int,
+        num_inference_steps: int = 30,
+        lora_name: Optional[str] = None,
+        lora_weight: float = 1.2,
+        **kwargs,
+    ) -> ImageGenerationResult:
+        """生成单张图像（优先从缓存读取）
+
+        Args:
+            prompt: 图像生成提示词
+            output_path: 输出文件路径
+            width: 图像宽度
+            height: 图像高度
+            num_inference_steps: 推理步数
+            lora_name: LoRA 模型名称
+            lora_weight: LoRA 权重
+            **kwargs: 其他参数（支持 topic_prefix）
+
+        Returns:
+            ImageGenerationResult: 生成结果
+        """
+        key = make_image_cache_key(
+            prompt=prompt,
+            topic_prefix=kwargs.get("topic_prefix", ""),
+            lora_name=lora_name,
+            lora_weight=lora_weight,
+            width=width,
+            height=height,
+            num_inference_steps=num_inference_steps,
+        )
+        cached = self._lookup(key, output_path)
+        if cached is not None:
+            return cached
+
+        result = self.inner.generate_single_image(
+            prompt=prompt,
+            output_path=output_path,
+            width=width,
+            height=height,
+            num_inference_steps=num_inference_steps,
+            lora_name=lora_name,
+            lora_weight=lora_weight,
+            **kwargs,
+        )
+        self._store(key, result)
+        return result
+
+    def generate_batch(
+        self,
+        generation_params: List[Dict[str, Any]],
+        job_id: int,
+    ) -> List[ImageGenerationResult]:
+        """批量生成图像，仅对缓存未命中的条目调用底层服务
+
+        Args:
+            generation_params: 生成参数列表
+            job_id: 任务 ID
+
+        Returns:
+            List[ImageGenerationResult]: 生成结果列表（与输入顺序一致）
+        """
+        results: List[Optional[ImageGenerationResult]] = [None] * len(generation_params)
+        keys = [image_cache_key_from_params(params) for params in generation_params]
+        pending: List[int] = []
+
+        for i, params in enumerate(generation_params):
+            cached = self._lookup(keys[i], params.get("output_path", ""))
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        logger.info(
+            f"[CachedImageGenerationService] 缓存查询完成 "
+            f"(job_id={job_id}, 命中={len(generation_params) - len(pending)}/{len(generation_params)})"
+        )
+
+        if pending:
+            generated = self.inner.generate_batch(
+                generation_params=[generation_params[i] for i in pending],
+                job_id=job_id,
+            )
+            for i, result in zip(pending, generated):
+                self._store(keys[i], result)
+                results[i] = result
+
+        return results
+
+    def _lookup(self, key: str, output_path: str) -> Optional[ImageGenerationResult]:
+        if not output_path:
+            return None
+        start_time = time.time()
+        tier = self.cache.get(key, output_path)
+        if tier is None:
+            return None
+        logger.debug(f"[CachedImageGenerationService] 缓存命中 ({tier}): {output_path}")
+        return ImageGenerationResult(
+            output_path=output_path,
+            status="success",
+            generation_time=time.time() - start_time,
+        )
+
+    def _store(self, key: str, result: ImageGenerationResult) -> None:
+        if result.status != "success" or not result.output_path:
+            return
+        self.cache.put(key, result.output_path)
@@ -0,0 +1,156 @@
+"""带缓存的 TTS 服务
+
+装饰器模式包装任意 ITTSService：合成前先查询内容寻址缓存，命中时直接复制
+音频和字幕并返回缓存的时长；未命中时调用底层服务，成功后写回缓存。
+"""
+from typing import Any, Dict, Optional
+
+from core.cache.tts_cache import TTSCache, get_tts_cache, make_tts_cache_key
+from core.interfaces.service_interfaces import ITTSService, TTSResult
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.clients.cached_tts_service")
+
+
+class CachedTTSService(ITTSService):
+    """带缓存的 TTS 服务
+
+    对调用方透明：返回的 audio_path / srt_path 与底层服务一致。
+    """
+
+    def __init__(
+        self,
+        inner: ITTSService,
+        cache: Optional[TTSCache] = None,
+        server_type: Optional[str] = None,
+    ):
+        """
+        Args:
+            inner: 实际执行合成的服务
+            cache: TTS 缓存，None 表示使用进程级单例
+            server_type: TTS 服务类型标识，参与缓存键；
+                         默认使用底层服务的类名和 base_url
+        """
+        self.inner = inner
+        self.cache = cache or get_tts_cache()
+        if server_type is None:
+            server_type = f"{type(inner).__name__}@{getattr(inner, 'base_url', '')}"
+        self.server_type = server_type
+
+    def synthesize(
+        self,
+        text: str,
+        language: str,
+        output_path: str,
+        voice: Optional[str] = None,
+        volume: int = 50,
+        speech_rate: float = 1.0,
+        **kwargs,
+    ) -> TTSResult:
+        """同步合成语音（优先从缓存读取）
+
+        Args:
+            text: 要合成的文本
+            language: 语言代码
+            output_path: 输出音频文件路径
+            voice: 音色名称
+            volume: 音量 (0-100)
+            speech_rate: 语速
+            **kwargs: 其他参数（支持 subtitle_output_path、pitch_rate、tts_type）
+
+        Returns:
+            TTSResult: 合成结果
+        """
+        key = self._make_key(text, language, voice, volume, speech_rate, kwargs)
+        cached = self._lookup(key, output_path, kwargs.get("subtitle_output_path"))
+        if cached is not None:
+            return cached
+
+        result = self.inner.synthesize(
+            text=text,
+            language=language,
+            output_path=output_path,
+            voice=voice,
+            volume=volume,
+            speech_rate=speech_rate,
+            **kwargs,
+        )
+        self._store(key, result)
+        return result
+
+    async def synthesize_async(
+        self,
+        text: str,
+        language: str,
+        output_path: str,
+        voice: Optional[str] = None,
+        volume: int = 50,
+        speech_rate: float = 1.0,
+        **kwargs,
+    ) -> TTSResult:
+        """异步合成语音（优先从缓存读取）
+
+        Args:
+            text: 要合成的文本
+            language: 语言代码
+            output_path: 输出音频文件路径
+            voice: 音色名称
+            volume: 音量 (0-100)
+            speech_rate: 语速
+            **kwargs: 其他参数（支持 subtitle_output_path、pitch_rate、tts_type）
+
+        Returns:
+            TTSResult: 合成结果
+        """
+        key = self._make_key(text, language, voice, volume, speech_rate, kwargs)
+        cached = self._lookup(key, output_path, kwargs.get("subtitle_output_path"))
+        if cached is not None:
+            return cached
+
+        result = await self.inner.synthesize_async(
+            text=text,
+            language=language,
+            output_path=output_path,
+            voice=voice,
+            volume=volume,
+            speech_rate=speech_rate,
+            **kwargs,
+        )
+        self._store(key, result)
+        return result
+
+    def _make_key(
+        self,
+        text: str,
+        language: str,
+        voice: Optional[str],
+        volume: int,
+        speech_rate: float,
+        kwargs: Dict[str, Any],
+    ) -> str:
+        return make_tts_cache_key(
+            text=text,
+            language=language,
+            voice=voice,
+            speech_rate=speech_rate,
+            pitch=kwargs.get("pitch_rate", kwargs.get("pitch")),
+            volume=volume,
+            server_type=kwargs.get("tts_type") or self.server_type,
+        )
+
+    def _lookup(self, key: str, output_path: str, srt_path: Optional[str]) -> Optional[TTSResult]:
+        hit = self.cache.get(key, output_path, srt_path)
+        if hit is None:
+            return None
+        logger.info(f"[CachedTTSService] 缓存命中: {output_path} (时长 {hit.duration:.2f}s)")
+        return TTSResult(
+            success=True,
+            audio_path=hit.audio_path,
+            srt_path=hit.srt_path,
+            duration=hit.duration,
+        )
+
+    def _store(self, key: str, result: TTSResult) -> None:
+        if not result.success or not result.audio_path:
+            return
+        self.cache.put(key, result.audio_path, result.srt_path, result.duration)
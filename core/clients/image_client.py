@@ -6,11 +6,16 @@
 - 使用 core.config.video_config 中的统一 VideoResolution
 - 替换硬编码的 1360x768 默认分辨率
 - 使用共享事件循环优化性能
+- 批量生成使用 asyncio 并发请求，通过 max_in_flight 限制同时在途的请求数
 """
+import asyncio
+import math
+import os
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
+from core.config.constants import ImageGenConfig
 from core.exceptions import ServiceTimeoutException
 from core.interfaces.service_interfaces import IImageGenerationService, ImageGenerationResult
 from core.logging_config import setup_logging
@@ -27,6 +32,14 @@ logger = setup_logging("core.clients.image_client")
 DEFAULT_WIDTH, DEFAULT_HEIGHT = get_dimensions(is_horizontal=True)
 
 
+def _default_max_in_flight() -> int:
+    """读取批量生成的默认最大在途请求数（环境变量 IMAGE_GEN_MAX_IN_FLIGHT 可覆盖）"""
+    env_value = os.getenv("IMAGE_GEN_MAX_IN_FLIGHT", "")
+    if env_value.isdigit() and int(env_value) > 0:
+        return int(env_value)
+    return ImageGenConfig.DEFAULT_MAX_IN_FLIGHT_REQUESTS
+
+
 class ImageClient(BaseServiceClient, IImageGenerationService):
     """图像生成服务客户端
 
@@ -39,6 +52,23 @@ class ImageClient(BaseServiceClient, IImageGenerationService):
     推荐使用同步 HTTP 模式，更简单高效。
     """
 
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = ImageGenConfig.DEFAULT_IMAGE_GENERATION_TIMEOUT_SECONDS,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        """
+        初始化客户端
+
+        Args:
+            base_url: 服务基础URL
+            timeout: 单个请求超时时间(秒)
+            max_in_flight: 批量生成时最大在途请求数，None 表示使用默认配置
+        """
+        super().__init__(base_url=base_url, timeout=timeout)
+        self.max_in_flight = max(1, max_in_flight or _default_max_in_flight())
+
     # ========================================================================
     # IImageGenerationService 接口实现
     # ========================================================================
@@ -127,6 +157,8 @@ class ImageClient(BaseServiceClient, IImageGenerationService):
     ) -> List[ImageGenerationResult]:
         """批量生成图像（实现 IImageGenerationService 接口）
 
+        在共享事件循环上并发执行 generate_batch_async，结果顺序与输入一致。
+
         Args:
             generation_params: 生成参数列表，每个参数包含:
                 - prompt: 提示词
@@ -141,21 +173,124 @@ class ImageClient(BaseServiceClient, IImageGenerationService):
         Returns:
             List[ImageGenerationResult]: 生成结果列表
         """
-        results = []
+        if not generation_params:
+            return []
+
+        # 总超时按并发轮数放大，避免大批量被单请求超时截断
+        rounds = math.ceil(len(generation_params) / self.max_in_flight)
+        return run_async(
+            self.generate_batch_async,
+            generation_params,
+            job_id,
+            timeout=self.timeout * rounds,
+        )
+
+    async def generate_batch_async(
+        self,
+        generation_params: List[Dict[str, Any]],
+        job_id: int,
+        max_in_flight: Optional[int] = None,
+    ) -> List[ImageGenerationResult]:
+        """并发批量生成图像（asyncio 原生）
+
+        同时在途的请求数不超过 max_in_flight；每张图像完成后立即写入磁盘，
+        并在结果中记录单张图像的生成耗时。
+
+        Args:
+            generation_params: 生成参数列表，格式同 generate_batch
+            job_id: 任务 ID
+            max_in_flight: 最大在途请求数，None 表示使用实例配置
+
+        Returns:
+            List[ImageGenerationResult]: 生成结果列表（与输入顺序一致）
+        """
+        limit = max(1, max_in_flight or self.max_in_flight)
+        semaphore = asyncio.Semaphore(limit)
+        batch_start = time.time()
 
-        for params in generation_params:
-            result = self.generate_single_image(
+        logger.info(
+            f"[generate_batch] 开始批量生成: job_id={job_id}, "
+            f"数量={len(generation_params)}, 最大并发={limit}"
+        )
+
+        async def _run(params: Dict[str, Any]) -> ImageGenerationResult:
+            async with semaphore:
+                return await self._generate_and_save(params)
+
+        results = await asyncio.gather(*(_run(params) for params in generation_params))
+
+        success_count = sum(1 for r in results if r.status == "success")
+        logger.info(
+            f"[generate_batch] 批量生成完成: job_id={job_id}, "
+            f"成功={success_count}/{len(results)}, "
+            f"总耗时={time.time() - batch_start:.2f}秒"
+        )
+        return list(results)
+
+    async def _generate_and_save(self, params: Dict[str, Any]) -> ImageGenerationResult:
+        """生成单张图像并写入磁盘（批量生成的单元任务，不抛出异常）
+
+        Args:
+            params: 单张图像的生成参数
+
+        Returns:
+            ImageGenerationResult: 生成结果
+        """
+        output_path = params.get("output_path", "")
+        lora_name = params.get("lora_name")
+        lora_weight = params.get("lora_weight", 1.2)
+        start_time = time.time()
+
+        try:
+            image_bytes = await self.generate_image(
                 prompt=params.get("prompt", ""),
-                output_path=params.get("output_path", ""),
                 width=params.get("width", DEFAULT_WIDTH),
                 height=params.get("height", DEFAULT_HEIGHT),
                 num_inference_steps=params.get("num_inference_steps", 30),
-                lora_name=params.get("lora_name"),
-                lora_weight=params.get("lora_weight", 1.2),
+                lora_name=lora_name,
+                lora_step=int(lora_weight * 100) if lora_name else 120,
+            )
+
+            if not isinstance(image_bytes, bytes):
+                return ImageGenerationResult(
+                    output_path=output_path,
+                    status="failed",
+                    error_message=f"不支持的响应类型: {type(image_bytes)}",
+                    generation_time=time.time() - start_time,
+                )
+
+            # 完成即落盘，文件写入放到线程池避免阻塞事件循环
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_image, output_path, image_bytes)
+
+            generation_time = time.time() - start_time
+            logger.info(
+                f"[generate_batch] 图像生成成功: {output_path}, "
+                f"耗时={generation_time:.2f}秒"
+            )
+            return ImageGenerationResult(
+                output_path=output_path,
+                status="success",
+                generation_time=generation_time,
+            )
+
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            logger.error(f"[generate_batch] 图像生成失败: {output_path}, 错误: {e}")
+            return ImageGenerationResult(
+                output_path=output_path,
+                status="failed",
+                error_message=str(e),
+                generation_time=time.time() - start_time,
             )
-            results.append(result)
 
-        return results
+    @staticmethod
+    def _write_image(output_path: str, image_bytes: bytes) -> None:
+        """将图像数据写入文件（自动创建父目录）"""
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(image_bytes)
 
     # ========================================================================
     # 原有方法（向后兼容）
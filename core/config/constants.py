@@ -108,6 +108,7 @@ class ImageGenConfig:
     DEFAULT_MAX_CONNECTIONS = 10  # 默认最大连接数
     DEFAULT_HTTP_TIMEOUT_SECONDS = 30  # 默认HTTP超时（秒）
     DEFAULT_IMAGE_GENERATION_TIMEOUT_SECONDS = 300  # 默认图像生成超时（秒，5分钟）
+    DEFAULT_MAX_IN_FLIGHT_REQUESTS = 4  # 批量生成时默认最大在途请求数
 
 
 class APIConfig:
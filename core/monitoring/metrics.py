@@ -114,6 +114,79 @@ ACTIVE_JOBS = Gauge(
 )
 
 
+# ============= FFmpeg 调度指标 =============
+FFMPEG_QUEUE_DEPTH = Gauge(
+    'ffmpeg_queue_depth',
+    'FFmpeg invocations waiting for a scheduler slot',
+    registry=None
+)
+
+FFMPEG_RUNNING = Gauge(
+    'ffmpeg_processes_running',
+    'FFmpeg processes currently running',
+    registry=None
+)
+
+FFMPEG_WAIT_DURATION = Histogram(
+    'ffmpeg_scheduler_wait_seconds',
+    'Time spent waiting for an FFmpeg scheduler slot',
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+    registry=None
+)
+
+
+# ============= 图像缓存指标 =============
+IMAGE_CACHE_REQUESTS = Counter(
+    'image_cache_requests_total',
+    'Image generation cache lookups',
+    ['result'],  # local, shared, miss
+    registry=None
+)
+
+IMAGE_CACHE_SIZE = Gauge(
+    'image_cache_size_bytes',
+    'Local image generation cache size',
+    registry=None
+)
+
+
+# ============= TTS 缓存指标 =============
+TTS_CACHE_REQUESTS = Counter(
+    'tts_cache_requests_total',
+    'TTS synthesis cache lookups',
+    ['result'],  # hit, miss
+    registry=None
+)
+
+TTS_CACHE_SIZE = Gauge(
+    'tts_cache_size_bytes',
+    'TTS synthesis cache size',
+    registry=None
+)
+
+
+# ============= LoRA 驻留指标 =============
+LORA_SWAPS = Counter(
+    'lora_swaps_total',
+    'LoRA adapter residency changes',
+    ['action'],  # load, evict
+    registry=None
+)
+
+LORA_SWAP_DURATION = Histogram(
+    'lora_swap_seconds',
+    'Time spent loading LoRA adapter weights',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+    registry=None
+)
+
+LORA_RESIDENT = Gauge(
+    'lora_resident_adapters',
+    'LoRA adapters currently resident on the pipeline',
+    registry=None
+)
+
+
 # ============= 系统指标 =============
 SYSTEM_MEMORY_USAGE = Gauge(
     'system_memory_usage_bytes',
@@ -140,6 +213,16 @@ _ALL_METRICS = [
     JOB_COUNT,
     JOB_DURATION,
     ACTIVE_JOBS,
+    FFMPEG_QUEUE_DEPTH,
+    FFMPEG_RUNNING,
+    FFMPEG_WAIT_DURATION,
+    IMAGE_CACHE_REQUESTS,
+    IMAGE_CACHE_SIZE,
+    TTS_CACHE_REQUESTS,
+    TTS_CACHE_SIZE,
+    LORA_SWAPS,
+    LORA_SWAP_DURATION,
+    LORA_RESIDENT,
     SYSTEM_MEMORY_USAGE,
     SYSTEM_CPU_USAGE,
 ]
@@ -345,6 +428,72 @@ def set_active_jobs(count: int) -> None:
     ACTIVE_JOBS.set(count)
 
 
+def track_ffmpeg_scheduler(
+    queue_depth: int,
+    running: int,
+    wait_seconds: Optional[float] = None
+) -> None:
+    """跟踪 FFmpeg 调度器状态
+
+    Args:
+        queue_depth: 等待槽位的调用数
+        running: 正在运行的 FFmpeg 进程数
+        wait_seconds: 本次获取槽位的等待时间（秒），释放时为 None
+    """
+    if not _metrics_enabled:
+        return
+
+    FFMPEG_QUEUE_DEPTH.set(queue_depth)
+    FFMPEG_RUNNING.set(running)
+    if wait_seconds is not None:
+        FFMPEG_WAIT_DURATION.observe(wait_seconds)
+
+
+def track_image_cache(result: str, size_bytes: int) -> None:
+    """跟踪图像缓存查询结果
+
+    Args:
+        result: 查询结果 (local, shared, miss)
+        size_bytes: 当前本地缓存大小（字节）
+    """
+    if not _metrics_enabled:
+        return
+
+    IMAGE_CACHE_REQUESTS.labels(result=result).inc()
+    IMAGE_CACHE_SIZE.set(size_bytes)
+
+
+def track_tts_cache(result: str, size_bytes: int) -> None:
+    """跟踪 TTS 缓存查询结果
+
+    Args:
+        result: 查询结果 (hit, miss)
+        size_bytes: 当前缓存大小（字节）
+    """
+    if not _metrics_enabled:
+        return
+
+    TTS_CACHE_REQUESTS.labels(result=result).inc()
+    TTS_CACHE_SIZE.set(size_bytes)
+
+
+def track_lora_swap(action: str, resident: int, duration: Optional[float] = None) -> None:
+    """跟踪 LoRA 适配器的加载和淘汰
+
+    Args:
+        action: 操作类型 (load, evict)
+        resident: 当前驻留的适配器数量
+        duration: 加载耗时（秒），仅 load 时提供
+    """
+    if not _metrics_enabled:
+        return
+
+    LORA_SWAPS.labels(action=action).inc()
+    LORA_RESIDENT.set(resident)
+    if duration is not None:
+        LORA_SWAP_DURATION.observe(duration)
+
+
 def get_metrics_text() -> bytes:
     """获取 Prometheus 指标文本格式
 
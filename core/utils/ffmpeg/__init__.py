@@ -5,6 +5,7 @@ FFmpeg工具模块
 代码重构说明：
 - 添加了 FFmpegCommandBuilder 用于流式构建 FFmpeg 命令
 - 提供便捷函数用于常见操作（添加字幕、Logo 等）
+- run_ffmpeg / run_ffmpeg_async 统一经过 FFmpegScheduler 限制进程级并发
 """
 import subprocess
 from pathlib import Path
@@ -21,6 +22,11 @@ from .builder import (
 )
 from .composite_operations import CompositeOperations
 from .core import FFmpegCore, FFmpegError
+from .scheduler import (
+    FFmpegScheduler,
+    ffmpeg_job_scope,
+    get_ffmpeg_scheduler,
+)
 from .video_operations import VideoOperations
 
 # 创建全局核心实例
@@ -40,6 +46,8 @@ def run_ffmpeg(
     """
     便捷函数：执行FFmpeg命令
 
+    通过进程级调度器获取执行槽位，避免多个任务同时运行时 CPU 过载。
+
     Args:
         command: FFmpeg命令参数列表
         timeout: 超时时间（秒），None使用默认值300
@@ -51,7 +59,8 @@ def run_ffmpeg(
     Raises:
         FFmpegError: 执行失败
     """
-    return _ffmpeg_core.run_command(command, timeout, capture_output)
+    with get_ffmpeg_scheduler().slot():
+        return _ffmpeg_core.run_command(command, timeout, capture_output)
 
 
 async def run_ffmpeg_async(
@@ -62,6 +71,8 @@ async def run_ffmpeg_async(
     """
     便捷函数：异步执行FFmpeg命令
 
+    等待调度器槽位时不会阻塞事件循环。
+
     Args:
         command: FFmpeg命令参数列表
         timeout: 超时时间（秒），None使用默认值300
@@ -73,7 +84,8 @@ async def run_ffmpeg_async(
     Raises:
         FFmpegError: 执行失败
     """
-    return await _ffmpeg_core.run_command_async(command, timeout, capture_output)
+    async with get_ffmpeg_scheduler().slot_async():
+        return await _ffmpeg_core.run_command_async(command, timeout, capture_output)
 
 
 def validate_path(
@@ -135,6 +147,10 @@ __all__ = [
     'CompositeOperations',
     # 构建器类
     'FFmpegCommandBuilder',
+    # 调度器
+    'FFmpegScheduler',
+    'ffmpeg_job_scope',
+    'get_ffmpeg_scheduler',
     # 实例
     'video_ops',
     'audio_ops',
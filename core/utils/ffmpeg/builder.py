@@ -296,9 +296,34 @@ class FFmpegCommandBuilder:
             FFmpegCommandBuilder: 返回自身
         """
         if file_index is not None:
-            self.maps.extend(["-map", f"{file_index}:{stream_spec}"])
+            self.maps.append(f"{file_index}:{stream_spec}")
         else:
-            self.maps.extend(["-map", stream_spec])
+            self.maps.append(stream_spec)
+        return self
+
+    def add_filter(
+        self,
+        filter_string: str,
+        input_label: Optional[str] = None,
+        output_label: Optional[str] = None
+    ) -> "FFmpegCommandBuilder":
+        """添加任意滤镜到 filter_complex
+
+        用于组合多个滤镜为单一滤镜图（如字幕 + Logo 一次编码）。
+
+        Args:
+            filter_string: 滤镜字符串（如 "scale=100:-1"）
+            input_label: 输入标签（如 "[0:v]" 或 "[a][b]"）
+            output_label: 输出标签（如 "[out]"）
+
+        Returns:
+            FFmpegCommandBuilder: 返回自身
+        """
+        self.filters.append(FFmpegFilter(
+            filter_string=filter_string,
+            input_label=input_label,
+            output_label=output_label
+        ))
         return self
 
     def set_video_codec(self, codec: str) -> "FFmpegCommandBuilder":
@@ -446,9 +471,11 @@ class FFmpegCommandBuilder:
         if self.audio_bitrate:
             args.extend(["-b:a", self.audio_bitrate])
 
-        # 添加自定义选项
+        # 添加自定义选项（空值表示无参数的开关选项，如 -shortest）
         for key, value in self.output_options.items():
-            args.extend([f"-{key}", value])
+            args.append(f"-{key}")
+            if value:
+                args.append(value)
 
         # 添加输出路径
         args.append(str(self.output_path))
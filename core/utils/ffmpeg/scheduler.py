@@ -0,0 +1,440 @@
+"""
+FFmpeg进程调度器
+为进程内所有 FFmpeg 调用提供统一的并发预算
+
+设计说明：
+- 全局并发上限根据 CPU 核心数推导（可通过环境变量 FFMPEG_MAX_CONCURRENCY 覆盖）
+- 每个任务（job）按公平份额获取执行槽位：ceil(全局上限 / 活跃任务数)
+- 任务标识通过 ContextVar 传递，使用 ffmpeg_job_scope() 设置
+- 统计排队深度、运行数量和等待时间，并同步到 Prometheus 指标（如已启用）
+- ffmpeg_usage_scope() 可按调用上下文累计 FFmpeg 调用次数、执行和等待时间（用于步骤级性能分析）
+
+使用示例:
+    from core.utils.ffmpeg.scheduler import ffmpeg_job_scope, get_ffmpeg_scheduler
+
+    with ffmpeg_job_scope(job_id):
+        run_ffmpeg(command)  # 内部自动通过调度器获取槽位
+
+    stats = get_ffmpeg_scheduler().get_stats()
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Set, Tuple
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.utils.ffmpeg.scheduler")
+
+# 当前执行上下文所属的任务标识（未设置时归入默认分组）
+_current_job_ctx: ContextVar[Optional[str]] = ContextVar('ffmpeg_job', default=None)
+
+# 当前执行上下文的 FFmpeg 用量累计器（未设置时不统计）
+_current_usage_ctx: ContextVar[Optional["FFmpegUsage"]] = ContextVar('ffmpeg_usage', default=None)
+
+DEFAULT_JOB_KEY = "__default__"
+
+
+def _default_max_concurrency() -> int:
+    """根据环境变量或 CPU 核心数计算全局并发上限"""
+    env_value = os.getenv("FFMPEG_MAX_CONCURRENCY", "")
+    if env_value.isdigit() and int(env_value) > 0:
+        return int(env_value)
+    return max(1, os.cpu_count() or 1)
+
+
+@dataclass
+class FFmpegSchedulerStats:
+    """调度器统计快照"""
+    max_concurrency: int
+    running: int
+    queue_depth: int
+    active_jobs: int
+    total_acquired: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        """平均等待时间（秒）"""
+        if self.total_acquired == 0:
+            return 0.0
+        return self.total_wait_seconds / self.total_acquired
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于日志和监控）"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "active_jobs": self.active_jobs,
+            "total_acquired": self.total_acquired,
+            "avg_wait_seconds": self.avg_wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+class FFmpegUsage:
+    """一段调用上下文内的 FFmpeg 用量（线程安全，可被多个工作线程共享）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def add(self, wall_seconds: float, wait_seconds: float) -> None:
+        """累计一次 FFmpeg 调用"""
+        with self._lock:
+            self.calls += 1
+            self.wall_seconds += wall_seconds
+            self.wait_seconds += wait_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        with self._lock:
+            return {
+                "ffmpeg_calls": self.calls,
+                "ffmpeg_wall_seconds": self.wall_seconds,
+                "ffmpeg_wait_seconds": self.wait_seconds,
+            }
+
+
+class FFmpegScheduler:
+    """FFmpeg 进程调度器
+
+    限制进程内同时运行的 FFmpeg 进程总数，并在多个任务之间公平分配。
+    线程安全；同步代码使用 slot()，异步代码使用 slot_async()（等待时挂起协程，
+    不占用线程）。
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """
+        初始化调度器
+
+        Args:
+            max_concurrency: 全局并发上限，None 表示根据 CPU 核心数推导
+        """
+        self.max_concurrency = max_concurrency or _default_max_concurrency()
+        self._cond = threading.Condition()
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        # 等待槽位的协程：状态变化时通过 call_soon_threadsafe 唤醒后重新检查
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = set()
+        self._total_running = 0
+        self._total_acquired = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # 公平份额
+    # ------------------------------------------------------------------
+
+    def _active_jobs(self) -> int:
+        """当前持有或等待槽位的任务数"""
+        keys = {k for k, v in self._running.items() if v > 0}
+        keys.update(k for k, v in self._waiting.items() if v > 0)
+        return max(1, len(keys))
+
+    def fair_share(self) -> int:
+        """每个任务当前可占用的最大槽位数"""
+        with self._cond:
+            return self._fair_share_locked()
+
+    def _fair_share_locked(self) -> int:
+        return max(1, math.ceil(self.max_concurrency / self._active_jobs()))
+
+    def _can_acquire_locked(self, job_key: str) -> bool:
+        if self._total_running >= self.max_concurrency:
+            return False
+        return self._running.get(job_key, 0) < self._fair_share_locked()
+
+    # ------------------------------------------------------------------
+    # 获取 / 释放
+    # ------------------------------------------------------------------
+
+    def acquire(self, job_key: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """
+        阻塞获取一个执行槽位
+
+        Args:
+            job_key: 任务标识，None 时使用当前上下文的任务
+            timeout: 最长等待时间（秒），None 表示无限等待
+
+        Returns:
+            float: 实际等待时间（秒）
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        key = job_key or current_ffmpeg_job()
+        start = time.monotonic()
+
+        with self._cond:
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            try:
+                acquired = self._cond.wait_for(
+                    lambda: self._can_acquire_locked(key), timeout=timeout
+                )
+            finally:
+                self._leave_waiting_locked(key)
+
+            if not acquired:
+                self._notify_locked()
+                raise TimeoutError(
+                    f"Timed out waiting for FFmpeg slot after {timeout} seconds (job={key})"
+                )
+
+            granted = self._grant_locked(key, start)
+
+        return self._report_acquired(key, *granted)
+
+    async def acquire_async(self, job_key: Optional[str] = None) -> float:
+        """
+        异步获取一个执行槽位（挂起协程等待，不占用线程）
+
+        Args:
+            job_key: 任务标识，None 时使用当前上下文的任务
+
+        Returns:
+            float: 实际等待时间（秒）
+        """
+        key = job_key or current_ffmpeg_job()
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        waiter = None
+
+        with self._cond:
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            while True:
+                with self._cond:
+                    self._async_waiters.discard(waiter)
+                    if self._can_acquire_locked(key):
+                        self._leave_waiting_locked(key)
+                        granted = self._grant_locked(key, start)
+                        break
+                    waiter = (loop, loop.create_future())
+                    self._async_waiters.add(waiter)
+                await waiter[1]
+        except BaseException:
+            # 取消或异常：退出等待队列，其他等待者的公平份额随之变化
+            with self._cond:
+                self._async_waiters.discard(waiter)
+                self._leave_waiting_locked(key)
+                self._notify_locked()
+            raise
+        return self._report_acquired(key, *granted)
+
+    def _leave_waiting_locked(self, key: str) -> None:
+        self._waiting[key] -= 1
+        if self._waiting[key] <= 0:
+            del self._waiting[key]
+
+    def _grant_locked(self, key: str, start: float) -> Tuple[float, int, int]:
+        """分配槽位并记录等待统计，返回 (等待时间, 排队数, 运行数)"""
+        self._running[key] = self._running.get(key, 0) + 1
+        self._total_running += 1
+
+        waited = time.monotonic() - start
+        self._total_acquired += 1
+        self._total_wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        return waited, sum(self._waiting.values()), self._total_running
+
+    def _report_acquired(self, key: str, waited: float, queue_depth: int, running: int) -> float:
+        if waited > 1.0:
+            logger.debug(
+                f"FFmpeg slot acquired after {waited:.2f}s "
+                f"(job={key}, running={running}, queued={queue_depth})"
+            )
+        self._report_metrics(queue_depth, running, waited)
+        return waited
+
+    def _notify_locked(self) -> None:
+        """唤醒所有等待槽位的线程和协程，由它们重新检查能否获取"""
+        self._cond.notify_all()
+        for loop, future in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_future, future)
+            except RuntimeError:
+                # 事件循环已关闭，等待者不会再被调度
+                pass
+
+    def release(self, job_key: Optional[str] = None) -> None:
+        """
+        释放一个执行槽位
+
+        Args:
+            job_key: 任务标识，必须与 acquire 时一致
+        """
+        key = job_key or current_ffmpeg_job()
+        with self._cond:
+            if self._running.get(key, 0) <= 0:
+                logger.warning(f"FFmpeg slot released without acquire (job={key})")
+                return
+            self._running[key] -= 1
+            if self._running[key] == 0:
+                del self._running[key]
+            self._total_running -= 1
+            queue_depth = sum(self._waiting.values())
+            running = self._total_running
+            self._notify_locked()
+
+        self._report_metrics(queue_depth, running)
+
+    @contextmanager
+    def slot(self, job_key: Optional[str] = None) -> Iterator[float]:
+        """
+        同步上下文管理器：在槽位内执行 FFmpeg
+
+        Args:
+            job_key: 任务标识
+
+        Yields:
+            float: 等待时间（秒）
+        """
+        key = job_key or current_ffmpeg_job()
+        waited = self.acquire(key)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(key)
+            _record_usage(time.monotonic() - start, waited)
+
+    @asynccontextmanager
+    async def slot_async(self, job_key: Optional[str] = None) -> AsyncIterator[float]:
+        """
+        异步上下文管理器：等待槽位时不阻塞事件循环
+
+        Args:
+            job_key: 任务标识
+
+        Yields:
+            float: 等待时间（秒）
+        """
+        key = job_key or current_ffmpeg_job()
+        waited = await self.acquire_async(key)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(key)
+            _record_usage(time.monotonic() - start, waited)
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> FFmpegSchedulerStats:
+        """获取调度器统计快照"""
+        with self._cond:
+            return FFmpegSchedulerStats(
+                max_concurrency=self.max_concurrency,
+                running=self._total_running,
+                queue_depth=sum(self._waiting.values()),
+                active_jobs=len(set(self._running) | set(self._waiting)),
+                total_acquired=self._total_acquired,
+                total_wait_seconds=self._total_wait_seconds,
+                max_wait_seconds=self._max_wait_seconds,
+            )
+
+    @staticmethod
+    def _report_metrics(queue_depth: int, running: int, waited: Optional[float] = None) -> None:
+        """同步 Prometheus 指标（监控模块不可用时忽略）"""
+        try:
+            from core.monitoring.metrics import track_ffmpeg_scheduler
+        except ImportError:
+            return
+        track_ffmpeg_scheduler(queue_depth, running, waited)
+
+
+# ============================================================================
+# 任务上下文
+# ============================================================================
+
+def current_ffmpeg_job() -> str:
+    """获取当前上下文的任务标识"""
+    return _current_job_ctx.get() or DEFAULT_JOB_KEY
+
+
+@contextmanager
+def ffmpeg_job_scope(job_id: Any) -> Iterator[None]:
+    """
+    将当前上下文中的 FFmpeg 调用归属到指定任务
+
+    Args:
+        job_id: 任务ID
+    """
+    token = _current_job_ctx.set(str(job_id))
+    try:
+        yield
+    finally:
+        _current_job_ctx.reset(token)
+
+
+def _wake_future(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _record_usage(wall_seconds: float, wait_seconds: float) -> None:
+    usage = _current_usage_ctx.get()
+    if usage is not None:
+        usage.add(wall_seconds, wait_seconds)
+
+
+@contextmanager
+def ffmpeg_usage_scope() -> Iterator[FFmpegUsage]:
+    """
+    统计当前上下文中经过调度器的 FFmpeg 调用
+
+    工作线程需要通过 contextvars.copy_context() 继承上下文才会被计入。
+
+    Yields:
+        FFmpegUsage: 用量累计器
+    """
+    usage = FFmpegUsage()
+    token = _current_usage_ctx.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage_ctx.reset(token)
+
+
+# ============================================================================
+# 全局实例
+# ============================================================================
+
+_scheduler: Optional[FFmpegScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_ffmpeg_scheduler() -> FFmpegScheduler:
+    """获取进程级 FFmpeg 调度器单例"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = FFmpegScheduler()
+                logger.info(
+                    f"FFmpeg scheduler initialized (max_concurrency={_scheduler.max_concurrency})"
+                )
+    return _scheduler
+
+
+__all__ = [
+    "FFmpegScheduler",
+    "FFmpegSchedulerStats",
+    "FFmpegUsage",
+    "current_ffmpeg_job",
+    "ffmpeg_job_scope",
+    "ffmpeg_usage_scope",
+    "get_ffmpeg_scheduler",
+]
@@ -0,0 +1,234 @@
+"""任务完成通知
+
+生产者（如 ai_image_gen 消费者）在任务结束时发布通知，等待方阻塞等待，
+取代固定间隔的状态轮询：
+- RedisTaskNotifier: 基于 Redis 阻塞列表（LPUSH + BLPOP），通知在等待方开始
+  等待之前到达也不会丢失，可跨进程、跨主机使用
+- InMemoryTaskNotifier: 进程内实现，用于测试及未配置 Redis 的单机环境；
+  只能唤醒同一进程中正在等待的调用方
+"""
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Optional
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("core.utils.task_notifier")
+
+
+@dataclass
+class TaskCompletion:
+    """任务完成通知"""
+    task_id: str
+    status: str  # completed / failed
+    error_message: Optional[str] = None
+
+
+class TaskNotifier(ABC):
+    """任务完成通知接口"""
+
+    # 是否能接收其他进程发布的通知；为 False 时等待方应缩短状态轮询间隔
+    distributed = False
+
+    @abstractmethod
+    def publish(self, completion: TaskCompletion) -> None:
+        """
+        发布任务完成通知
+
+        Args:
+            completion: 任务完成信息
+        """
+
+    @abstractmethod
+    def wait_many(self, task_ids: Iterable[str], timeout: float) -> Dict[str, TaskCompletion]:
+        """
+        等待一组任务完成，任一任务完成即返回
+
+        Args:
+            task_ids: 任务ID列表
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            已完成任务的通知（task_id -> TaskCompletion），超时返回空字典
+        """
+
+    def wait(self, task_id: str, timeout: float) -> Optional[TaskCompletion]:
+        """
+        等待单个任务完成
+
+        Args:
+            task_id: 任务ID
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            任务完成通知，超时返回 None
+        """
+        return self.wait_many([task_id], timeout).get(task_id)
+
+
+class InMemoryTaskNotifier(TaskNotifier):
+    """
+    进程内任务完成通知（线程安全）
+
+    只保留正在被 wait_many 等待的任务的通知：无人等待时发布的通知直接丢弃，
+    等待结束时未取走的通知随之清除（等待方通过状态查询兜底），
+    避免长期运行的发布方（如消费者进程）中通知无限累积。
+    """
+
+    # 保留的通知数上限（超出时丢弃最早的通知）
+    MAX_COMPLETED = 1024
+
+    def __init__(self, max_completed: Optional[int] = None):
+        """
+        Args:
+            max_completed: 保留的通知数上限，默认 MAX_COMPLETED
+        """
+        self.max_completed = max_completed or self.MAX_COMPLETED
+        self._cond = threading.Condition()
+        self._completed: Dict[str, TaskCompletion] = {}
+        self._watching: Dict[str, int] = {}  # task_id -> 正在等待的调用数
+
+    def __len__(self) -> int:
+        """当前保留的通知数"""
+        with self._cond:
+            return len(self._completed)
+
+    def publish(self, completion: TaskCompletion) -> None:
+        with self._cond:
+            if completion.task_id not in self._watching:
+                return
+            self._completed.pop(completion.task_id, None)
+            self._completed[completion.task_id] = completion
+            while len(self._completed) > self.max_completed:
+                self._completed.pop(next(iter(self._completed)))
+            self._cond.notify_all()
+
+    def wait_many(self, task_ids: Iterable[str], timeout: float) -> Dict[str, TaskCompletion]:
+        task_ids = list(dict.fromkeys(task_ids))
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            for task_id in task_ids:
+                self._watching[task_id] = self._watching.get(task_id, 0) + 1
+            try:
+                while True:
+                    done = {
+                        task_id: self._completed.pop(task_id)
+                        for task_id in task_ids
+                        if task_id in self._completed
+                    }
+                    remaining = deadline - time.monotonic()
+                    if done or remaining <= 0:
+                        return done
+                    self._cond.wait(remaining)
+            finally:
+                for task_id in task_ids:
+                    count = self._watching[task_id] - 1
+                    if count:
+                        self._watching[task_id] = count
+                    else:
+                        del self._watching[task_id]
+                        self._completed.pop(task_id, None)
+
+
+class RedisTaskNotifier(TaskNotifier):
+    """基于 Redis 阻塞列表的任务完成通知"""
+
+    distributed = True
+
+    def __init__(self, redis_client, key_prefix: str = "task_done:", ttl_seconds: int = 3600):
+        """
+        Args:
+            redis_client: redis.Redis 实例
+            key_prefix: 通知列表的键前缀
+            ttl_seconds: 无人等待时通知的保留时间（秒）
+        """
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.key_prefix}{task_id}"
+
+    def publish(self, completion: TaskCompletion) -> None:
+        key = self._key(completion.task_id)
+        pipe = self.redis.pipeline()
+        pipe.lpush(key, json.dumps(asdict(completion), ensure_ascii=False))
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def wait_many(self, task_ids: Iterable[str], timeout: float) -> Dict[str, TaskCompletion]:
+        keys = [self._key(task_id) for task_id in task_ids]
+        if not keys:
+            return {}
+        # BLPOP 的超时以秒为单位且 0 表示永久阻塞，因此至少等待 1 秒
+        item = self.redis.blpop(keys, timeout=max(1, int(round(timeout))))
+        if item is None:
+            return {}
+        _, raw = item
+        completion = TaskCompletion(**json.loads(raw))
+        return {completion.task_id: completion}
+
+
+_notifier: Optional[TaskNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def _create_notifier() -> TaskNotifier:
+    redis_url = os.getenv("TASK_NOTIFY_REDIS_URL") or os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            logger.info("任务完成通知使用 Redis 阻塞列表")
+            return RedisTaskNotifier(client)
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            logger.warning(f"Redis 不可用，任务完成通知退化为进程内实现: {e}")
+    return InMemoryTaskNotifier()
+
+
+def get_task_notifier() -> TaskNotifier:
+    """
+    获取进程级任务完成通知单例
+
+    配置了 TASK_NOTIFY_REDIS_URL（或 REDIS_URL）且 Redis 可用时使用
+    RedisTaskNotifier，否则使用 InMemoryTaskNotifier。
+
+    Returns:
+        任务完成通知实例
+    """
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                _notifier = _create_notifier()
+    return _notifier
+
+
+def set_task_notifier(notifier: Optional[TaskNotifier]) -> None:
+    """
+    替换进程级单例（用于测试）
+
+    Args:
+        notifier: 新的通知实例，None 表示下次获取时重新创建
+    """
+    global _notifier
+    with _notifier_lock:
+        _notifier = notifier
+
+
+__all__ = [
+    "InMemoryTaskNotifier",
+    "RedisTaskNotifier",
+    "TaskCompletion",
+    "TaskNotifier",
+    "get_task_notifier",
+    "set_task_notifier",
+]
@@ -81,6 +81,30 @@ class ImageGenSettings(BaseConfig):
         default="online_task",
         description="优先处理的Kafka主题"
     )
+    MAX_RESIDENT_LORAS: int = Field(
+        default=4,
+        description="同一基础模型上最多驻留的LoRA适配器数量"
+    )
+    AFFINITY_MAX_BYPASS: int = Field(
+        default=8,
+        description="亲和调度中任务最多被同LoRA任务插队的次数（防饥饿）"
+    )
+    KAFKA_POLL_BATCH_SIZE: int = Field(
+        default=16,
+        description="单次从Kafka拉取的最大消息数"
+    )
+    TASK_BUFFER_CAPACITY: int = Field(
+        default=32,
+        description="消费者本地任务缓冲区容量，满时暂停拉取"
+    )
+    KAFKA_COMMIT_BATCH_SIZE: int = Field(
+        default=16,
+        description="累计完成多少条消息后批量提交offset"
+    )
+    KAFKA_COMMIT_INTERVAL_SECONDS: float = Field(
+        default=5.0,
+        description="批量提交offset的最长间隔（秒）"
+    )
     
     # Model management settings
     MODEL_CACHE_DIR: Optional[str] = Field(
@@ -0,0 +1,163 @@
+"""任务亲和调度
+
+消费者按到达顺序处理任务时，交替出现的不同 LoRA 会导致 GPU 反复切换适配器。
+AffinityTaskBuffer 在待处理缓冲区中优先取出与当前已激活模型/LoRA 相同的任务，
+同时限制每个任务被插队的次数，避免其他 LoRA 的任务饿死。
+
+由于任务不再严格按 offset 顺序完成，PartitionOffsetTracker 负责计算每个分区
+可以安全提交的 offset：只有某个 offset 之前的消息全部处理完才会提交。
+"""
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("ai_image_gen.affinity")
+
+
+def task_affinity_key(task_data: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    计算任务的亲和键：相同键的任务无需切换模型或 LoRA
+
+    Args:
+        task_data: Kafka 消息中的任务数据
+
+    Returns:
+        (模型名, 排序后的 LoRA 名称与权重)
+    """
+    loras = sorted(
+        (lora.get("name", ""), float(lora.get("weight", 1.0)))
+        for lora in task_data.get("loras") or []
+        if lora.get("name")
+    )
+    return task_data.get("model_name") or "", json.dumps(loras, ensure_ascii=False)
+
+
+@dataclass
+class _BufferedTask:
+    item: Any
+    key: Hashable
+    bypassed: int = 0
+
+
+class AffinityTaskBuffer:
+    """按亲和键重排的待处理任务缓冲区"""
+
+    def __init__(self, max_bypass: int = 8):
+        """
+        Args:
+            max_bypass: 队首任务最多被插队的次数，达到后必须先处理它
+        """
+        self.max_bypass = max(0, max_bypass)
+        self._tasks: Deque[_BufferedTask] = deque()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def push(self, item: Any, key: Hashable) -> None:
+        """加入一个任务"""
+        self._tasks.append(_BufferedTask(item, key))
+
+    def _select(self, current_key: Optional[Hashable]) -> int:
+        """选出下一个任务在缓冲区中的位置（缓冲区非空）"""
+        head = self._tasks[0]
+        if head.key == current_key or head.bypassed >= self.max_bypass:
+            return 0
+        for index, task in enumerate(self._tasks):
+            if task.key == current_key:
+                return index
+        return 0
+
+    def peek(self, current_key: Optional[Hashable]) -> Any:
+        """
+        查看 pop(current_key) 将返回的任务，不修改缓冲区
+
+        Args:
+            current_key: 当前已激活的亲和键
+
+        Returns:
+            任务；缓冲区为空时返回 None
+        """
+        if not self._tasks:
+            return None
+        return self._tasks[self._select(current_key)].item
+
+    def pop(self, current_key: Optional[Hashable]) -> Any:
+        """
+        取出下一个要处理的任务
+
+        Args:
+            current_key: 当前已激活的亲和键（如刚处理完的任务的键）
+
+        Returns:
+            任务；缓冲区为空时返回 None
+        """
+        if not self._tasks:
+            return None
+        index = self._select(current_key)
+        # 被插队的是排在它前面的所有任务
+        for skipped in list(self._tasks)[:index]:
+            skipped.bypassed += 1
+        task = self._tasks[index]
+        del self._tasks[index]
+        return task.item
+
+
+@dataclass
+class _PartitionState:
+    pending: Set[int] = field(default_factory=set)
+    done: Set[int] = field(default_factory=set)
+    committed: int = -1
+
+
+class PartitionOffsetTracker:
+    """跟踪乱序完成的消息，计算每个分区可安全提交的 offset"""
+
+    def __init__(self):
+        self._partitions: Dict[Hashable, _PartitionState] = {}
+
+    def track(self, partition: Hashable, offset: int) -> None:
+        """消息进入缓冲区时登记"""
+        self._partitions.setdefault(partition, _PartitionState()).pending.add(offset)
+
+    def complete(self, partition: Hashable, offset: int) -> Optional[int]:
+        """
+        标记消息处理完成
+
+        Args:
+            partition: 分区标识
+            offset: 消息 offset
+
+        Returns:
+            可提交的下一个 offset（Kafka 语义，即最后一条已完成消息 + 1）；
+            没有新的可提交位置时返回 None
+        """
+        state = self._partitions.setdefault(partition, _PartitionState())
+        state.pending.discard(offset)
+        state.done.add(offset)
+
+        low_water = min(state.pending) if state.pending else None
+        committable: List[int] = [
+            o for o in state.done if low_water is None or o < low_water
+        ]
+        if not committable:
+            return None
+        state.done.difference_update(committable)
+        new_committed = max(committable)
+        if new_committed <= state.committed:
+            return None
+        state.committed = new_committed
+        return new_committed + 1
+
+    def forget(self, partition: Hashable) -> None:
+        """丢弃分区的跟踪状态（分区被回收时调用）"""
+        self._partitions.pop(partition, None)
+
+
+__all__ = [
+    "AffinityTaskBuffer",
+    "PartitionOffsetTracker",
+    "task_affinity_key",
+]
@@ -27,13 +27,54 @@ class ImageGenerator:
         self.output_dir = os.path.abspath(output_dir) if output_dir else GENERATED_IMAGES_DIR
         os.makedirs(self.output_dir, exist_ok=True)
 
+    def prepare_inputs(self, image_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        加载和解码任务输入（如参考图），可在上一个任务推理期间提前执行
+
+        Args:
+            image_params: 任务的图像参数
+
+        Returns:
+            传给 generate(prepared_inputs=...) 的输入
+        """
+        prepared: Dict[str, Any] = {}
+        if image_params.get("subject_image"):
+            prepared["subject_image"] = self._load_subject_image(image_params["subject_image"])
+        return prepared
+
+    def _load_subject_image(self, image_path: str) -> Optional[Image.Image]:
+        """从 GENERATED_IMAGES_DIR 中加载参考图，路径非法或加载失败时返回 None"""
+        if not image_path:
+            return None
+        # 安全检查：防止路径遍历攻击
+        # 规范化路径并检查是否在允许的目录内
+        image_full_path = os.path.abspath(os.path.join(GENERATED_IMAGES_DIR, image_path))
+        allowed_dir = os.path.abspath(GENERATED_IMAGES_DIR)
+        if not (image_full_path.startswith(allowed_dir) and os.path.exists(image_full_path)):
+            logger.warning(f"Subject image path {image_path} is outside allowed directory or does not exist")
+            return None
+        try:
+            return Image.open(image_full_path).convert('RGB')
+        except (SystemExit, KeyboardInterrupt):
+            # 系统退出异常，不捕获，直接抛出
+            raise
+        except (OSError, IOError, ValueError) as e:
+            # 图像文件IO错误或格式错误
+            logger.warning(f"[_load_subject_image] Failed to load subject image from {image_full_path}: {e}")
+            return None
+        except Exception as e:
+            # 其他异常
+            logger.warning(f"[_load_subject_image] Failed to load subject image from {image_full_path}: {e}")
+            return None
+
     def generate(
         self,
         model_name: str,
         prompt: str,
         negative_prompt: Optional[str],
         image_params: Dict[str, Any],
-        loras: Optional[List[Dict[str, Any]]] = None
+        loras: Optional[List[Dict[str, Any]]] = None,
+        prepared_inputs: Optional[Dict[str, Any]] = None,
     ) -> str: # Returns image URL/path
         # Get model path from settings based on model_name
         settings = get_settings()
@@ -72,29 +113,10 @@ class ImageGenerator:
                 gen_args["generator"] = torch.Generator("cuda").manual_seed(image_params.get("seed"))
 
             if image_params.get("subject_image"):
-                image_path = image_params.get("subject_image", "")
-                subject_image = None
-                # 安全检查：防止路径遍历攻击
-                if image_path:
-                    # 规范化路径并检查是否在允许的目录内
-                    image_full_path = os.path.abspath(os.path.join(GENERATED_IMAGES_DIR, image_path))
-                    allowed_dir = os.path.abspath(GENERATED_IMAGES_DIR)
-                    if image_full_path.startswith(allowed_dir) and os.path.exists(image_full_path):
-                        try:
-                            subject_image = Image.open(image_full_path).convert('RGB')
-                        except (SystemExit, KeyboardInterrupt):
-                            # 系统退出异常，不捕获，直接抛出
-                            raise
-                        except (OSError, IOError, ValueError) as e:
-                            # 图像文件IO错误或格式错误
-                            logger.warning(f"[generate] Failed to load subject image from {image_full_path}: {e}")
-                            subject_image = None
-                        except Exception as e:
-                            # 其他异常
-                            logger.warning(f"[generate] Failed to load subject image from {image_full_path}: {e}")
-                            subject_image = None
-                    else:
-                        logger.warning(f"Subject image path {image_path} is outside allowed directory or does not exist")
+                if prepared_inputs is not None and "subject_image" in prepared_inputs:
+                    subject_image = prepared_inputs["subject_image"]
+                else:
+                    subject_image = self._load_subject_image(image_params.get("subject_image", ""))
                 subject_scale = image_params.get("subject_scale", 0.9)
                 gen_args["subject_image"] = subject_image
                 gen_args["subject_scale"] = subject_scale
@@ -0,0 +1,173 @@
+"""LoRA 适配器驻留缓存
+
+已加载到 pipeline 上的 LoRA 适配器保留在一个有界 LRU 中：切换任务时只需
+set_adapters 激活目标适配器，仅在目标不在驻留集合中时才从磁盘加载权重，
+超出容量时淘汰最久未使用的适配器。
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("ai_image_gen.lora_residency")
+
+
+@dataclass
+class LoRAResidencyStats:
+    """驻留缓存统计"""
+    resident: int
+    hits: int
+    loads: int
+    evictions: int
+    swap_seconds: float
+
+
+class LoRAResidencyCache:
+    """有界 LRU 的 LoRA 适配器驻留缓存"""
+
+    def __init__(
+        self,
+        pipeline: Any,
+        path_resolver: Callable[[str], str],
+        max_resident: int = 4,
+    ):
+        """
+        Args:
+            pipeline: 支持 load_lora_weights / set_adapters / delete_adapters 的 pipeline
+            path_resolver: 根据 LoRA 名称返回权重文件路径
+            max_resident: 最多同时驻留的适配器数量
+        """
+        self.pipeline = pipeline
+        self.path_resolver = path_resolver
+        self.max_resident = max(1, max_resident)
+
+        self._resident: "OrderedDict[str, str]" = OrderedDict()  # adapter_id -> lora_name
+        self._active: Dict[str, float] = {}
+        self._lora_enabled = True
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+        self._swap_seconds = 0.0
+
+    @staticmethod
+    def adapter_id(lora_name: str) -> str:
+        """LoRA 名称转换为适配器名（与 ModelManager.get_lora_id 一致）"""
+        return os.path.splitext(lora_name)[0] if lora_name else ""
+
+    @property
+    def active(self) -> Dict[str, float]:
+        """当前激活的适配器及权重"""
+        return dict(self._active)
+
+    def is_resident(self, lora_name: str) -> bool:
+        return self.adapter_id(lora_name) in self._resident
+
+    def activate(self, loras: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
+        """
+        激活指定的 LoRA 组合，必要时加载权重或淘汰旧适配器
+
+        Args:
+            loras: LoRA 列表，元素包含 name 和可选的 weight
+
+        Returns:
+            激活后的适配器及权重
+        """
+        targets: "OrderedDict[str, float]" = OrderedDict()
+        names: Dict[str, str] = {}
+        for lora_info in loras or []:
+            name = lora_info.get("name")
+            if not name:
+                logger.warning("Lora info missing 'name' field, skipping")
+                continue
+            adapter = self.adapter_id(name)
+            targets[adapter] = float(lora_info.get("weight", 1.0))
+            names[adapter] = name
+
+        with self._lock:
+            if targets == self._active and (targets or not self._lora_enabled):
+                self._hits += 1
+                return dict(self._active)
+
+            if len(targets) > self.max_resident:
+                raise ValueError(
+                    f"任务需要 {len(targets)} 个 LoRA，超过驻留上限 {self.max_resident}"
+                )
+
+            for adapter in targets:
+                if adapter in self._resident:
+                    self._resident.move_to_end(adapter)
+                    self._hits += 1
+                    continue
+                self._evict_for(targets)
+                self._load(adapter, names[adapter])
+
+            if targets:
+                if not self._lora_enabled and hasattr(self.pipeline, "enable_lora"):
+                    self.pipeline.enable_lora()
+                self.pipeline.set_adapters(list(targets), adapter_weights=list(targets.values()))
+                self._lora_enabled = True
+            elif self._resident and hasattr(self.pipeline, "disable_lora"):
+                # 不使用 LoRA 时保留驻留的权重，只是停用
+                self.pipeline.disable_lora()
+                self._lora_enabled = False
+
+            self._active = dict(targets)
+            return dict(self._active)
+
+    def _evict_for(self, targets: Dict[str, float]) -> None:
+        """为新适配器腾出位置，不淘汰本次需要的适配器"""
+        while len(self._resident) >= self.max_resident:
+            victim = next((a for a in self._resident if a not in targets), None)
+            if victim is None:
+                return
+            del self._resident[victim]
+            self._active.pop(victim, None)
+            if hasattr(self.pipeline, "delete_adapters"):
+                self.pipeline.delete_adapters(victim)
+            self._evictions += 1
+            logger.info(f"淘汰LoRA适配器: {victim} (驻留: {list(self._resident)})")
+            self._track("evict")
+
+    def _load(self, adapter: str, lora_name: str) -> None:
+        path = self.path_resolver(lora_name)
+        start = time.monotonic()
+        self.pipeline.load_lora_weights(path, adapter_name=adapter)
+        elapsed = time.monotonic() - start
+        self._resident[adapter] = lora_name
+        self._loads += 1
+        self._swap_seconds += elapsed
+        logger.info(f"加载LoRA适配器: {adapter} from {path} ({elapsed:.2f}s)")
+        self._track("load", elapsed)
+
+    def _track(self, action: str, duration: Optional[float] = None) -> None:
+        try:
+            from core.monitoring.metrics import track_lora_swap
+        except ImportError:
+            return
+        track_lora_swap(action, len(self._resident), duration)
+
+    def clear(self) -> None:
+        """基础模型切换后调用，清空驻留记录（不操作 pipeline）"""
+        with self._lock:
+            self._resident.clear()
+            self._active = {}
+            self._lora_enabled = True
+
+    def get_stats(self) -> LoRAResidencyStats:
+        """获取统计快照"""
+        with self._lock:
+            return LoRAResidencyStats(
+                resident=len(self._resident),
+                hits=self._hits,
+                loads=self._loads,
+                evictions=self._evictions,
+                swap_seconds=self._swap_seconds,
+            )
+
+
+__all__ = ["LoRAResidencyCache", "LoRAResidencyStats"]
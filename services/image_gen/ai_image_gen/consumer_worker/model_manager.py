@@ -10,6 +10,7 @@ from diffusers import AutoPipelineForText2Image, DiffusionPipeline, StableDiffus
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
 from config.settings import get_settings
+from consumer_worker.lora_residency import LoRAResidencyCache
 from core.logging_config import setup_logging
 
 logger = setup_logging("ai_image_gen.model_manager")
@@ -22,6 +23,8 @@ class ModelManager:
         self.loaded_model_name: Optional[str] = None
         self.loaded_loras: Dict[str, Any] = {} 
         self.settings = get_settings()
+        # 当前基础模型上驻留的 LoRA 适配器（基础模型切换时重建）
+        self.lora_cache: Optional[LoRAResidencyCache] = None
         
     def get_lora_id(self, lora_name: str) -> str:
         """
@@ -52,6 +55,7 @@ class ModelManager:
                 self.loaded_pipeline = None
                 self.loaded_model_name = None
                 self.loaded_loras = {}
+                self.lora_cache = None
                 torch.cuda.empty_cache() # Clear GPU memory
 
             # Load base model
@@ -96,6 +100,11 @@ class ModelManager:
                         ).to(device)
 
                     self.loaded_model_name = model_name
+                    self.lora_cache = LoRAResidencyCache(
+                        self.loaded_pipeline,
+                        path_resolver=self._resolve_lora_path,
+                        max_resident=self.settings.MAX_RESIDENT_LORAS,
+                    )
                     logger.info(f"Successfully loaded base model: {model_name} from {final_model_path}")
                 except (SystemExit, KeyboardInterrupt):
                     # 系统退出异常，不捕获，直接抛出
@@ -113,84 +122,8 @@ class ModelManager:
                     self.loaded_model_name = None
                     raise
 
-            logger.info(f"Model {self.loaded_model_name} loaded successfully. Preparing to load Lora(s): {loras}")
-            if loras:
-                for lora_info in loras:
-                    lora_name = lora_info.get("name")
-                    if not lora_name:
-                        logger.warning("Lora info missing 'name' field, skipping")
-                        continue
-                    lora_weight = lora_info.get("weight", 1.0)
-                    lora_id = self.get_lora_id(lora_name)
-                    
-                    lora_base_path = self.settings.MODEL_CONFIGS.get(self.loaded_model_name.upper(), {}).get("lora", None)
-                    if not lora_base_path:
-                        logger.warning(f"No Lora path configured for model '{self.loaded_model_name}'. Skipping Lora loading.")
-                        break
-                    # 使用安全的路径拼接
-                    lora_path = os.path.abspath(os.path.join(lora_base_path, f"{lora_name}.safetensors"))
-                    logger.info(f"Preparing to load Lora: {lora_id} with weight {lora_weight} from {lora_path}")
-                    if lora_id and lora_path and lora_id not in self.loaded_loras:
-                        final_lora_path = lora_path
-                        if not os.path.exists(lora_path):
-                            raise FileNotFoundError(f"Lora not found ")
-                        try:
-                            # Load Lora weights. This assumes the pipeline supports load_lora_weights.
-                            # The actual method might vary based on the diffusers version and pipeline.
-                            if hasattr(self.loaded_pipeline, 'load_lora_weights'):
-                                logger.info(f"Loading Lora weights for {lora_id} from {final_lora_path}")
-                                self.loaded_pipeline.load_lora_weights(final_lora_path, adapter_name=lora_id)
-                                self.loaded_pipeline.set_adapters([lora_id], adapter_weights=[lora_weight])
-                                logger.info(f"Successfully loaded Lora: {lora_id} from {final_lora_path} with weight {lora_weight}")
-                                self.loaded_loras[lora_id] = lora_weight
-                            else:
-                                logger.warning(f"Pipeline does not support direct Lora loading via 'load_lora_weights'. Simulating loading Lora: {lora_id} with weight {lora_weight}")
-                                self.loaded_loras[lora_id] = lora_weight # Still track it as loaded
-                        except (SystemExit, KeyboardInterrupt):
-                            # 系统退出异常，不捕获，直接抛出
-                            raise
-                        except (OSError, FileNotFoundError) as e:
-                            # 文件系统错误或Lora文件不存在
-                            logger.error(f"[load_model_and_loras] 文件系统错误，加载Lora失败 {lora_id} from {final_lora_path}: {e}", exc_info=True)
-                            raise
-                        except Exception as e:
-                            # 其他异常（Lora加载错误等）
-                            logger.error(f"[load_model_and_loras] Failed to load Lora {lora_id} from {final_lora_path}: {e}", exc_info=True)
-                            raise
-                    elif lora_id in self.loaded_loras and not self.loaded_loras[lora_id] == lora_weight:
-                        logger.warning(f"Lora {lora_id} already loaded with different weight {self.loaded_loras.get(lora_id, 'not set')}. Updating to {lora_weight}.")
-                        if hasattr(self.loaded_pipeline, 'set_adapters'):
-                            self.loaded_pipeline.set_adapters([lora_id], adapter_weights=[lora_weight])
-                            self.loaded_loras[lora_id] = lora_weight
-                            logger.info(f"Updated Lora {lora_id} weight to {lora_weight}.")
-                    else:
-                        logger.info(f"Lora {lora_id} already loaded with weight {self.loaded_loras.get(lora_id, 'not set')}. Skipping.")
-                    
-
-            # Unload any Lora that are no longer needed
-            target_lora_ids = {self.get_lora_id(l.get("name")) for l in (loras or []) if l.get("name")}
-            loras_to_unload = [
-                lora_id for lora_id in self.loaded_loras.keys()
-                if lora_id not in target_lora_ids
-            ]
-            if loras_to_unload:
-                logger.info(f"Unloading Lora(s): {loras_to_unload} that are no longer needed. Currently loaded: {list(self.loaded_loras.keys())}")
-                for lora_id in loras_to_unload:
-                    try:
-                        logger.info(f"Unloading Lora: {lora_id}")
-                        if self.loaded_pipeline and hasattr(self.loaded_pipeline, 'delete_adapters'):
-                            self.loaded_pipeline.delete_adapters(lora_id)
-                        else:
-                            logger.warning(f"Pipeline does not support direct Lora unloading. Simulating unloading Lora: {lora_id}")
-                        del self.loaded_loras[lora_id]
-                    except (SystemExit, KeyboardInterrupt):
-                        # 系统退出异常，不捕获，直接抛出
-                        raise
-                    except Exception as e:
-                        # 其他异常（Lora卸载错误等）
-                        logger.error(f"[load_model_and_loras] Failed to unload Lora {lora_id}: {e}", exc_info=True)
-                logger.info(f"Lora unloading completed. Currently loaded: {list(self.loaded_loras.keys())}")
-            torch.cuda.empty_cache()
+            logger.info(f"Model {self.loaded_model_name} loaded successfully. Preparing to activate Lora(s): {loras}")
+            self._activate_loras(loras)
 
             return self.loaded_pipeline
         except (SystemExit, KeyboardInterrupt):
@@ -204,6 +137,48 @@ class ModelManager:
             raise
                 
 
+    def _resolve_lora_path(self, lora_name: str) -> str:
+        """根据 LoRA 名称返回当前基础模型对应的权重文件路径"""
+        lora_base_path = self.settings.MODEL_CONFIGS.get(self.loaded_model_name.upper(), {}).get("lora", None)
+        # 使用安全的路径拼接
+        lora_path = os.path.abspath(os.path.join(lora_base_path, f"{lora_name}.safetensors"))
+        if not os.path.exists(lora_path):
+            raise FileNotFoundError(f"Lora not found: {lora_path}")
+        return lora_path
+
+    def _activate_loras(self, loras: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        激活任务所需的 LoRA 组合
+
+        已驻留的适配器只需 set_adapters 切换，未驻留的才从磁盘加载；
+        驻留数量超过 MAX_RESIDENT_LORAS 时淘汰最久未使用的适配器。
+        """
+        if loras and not self.settings.MODEL_CONFIGS.get(self.loaded_model_name.upper(), {}).get("lora"):
+            logger.warning(f"No Lora path configured for model '{self.loaded_model_name}'. Skipping Lora loading.")
+            loras = []
+
+        if not hasattr(self.loaded_pipeline, 'load_lora_weights'):
+            logger.warning(f"Pipeline does not support direct Lora loading via 'load_lora_weights'. Simulating Lora(s): {loras}")
+            self.loaded_loras = {
+                self.get_lora_id(l["name"]): l.get("weight", 1.0) for l in (loras or []) if l.get("name")
+            }
+            return
+
+        try:
+            self.loaded_loras = self.lora_cache.activate(loras)
+        except (SystemExit, KeyboardInterrupt):
+            # 系统退出异常，不捕获，直接抛出
+            raise
+        except (OSError, FileNotFoundError) as e:
+            # 文件系统错误或Lora文件不存在
+            logger.error(f"[_activate_loras] 文件系统错误，加载Lora失败 {loras}: {e}", exc_info=True)
+            raise
+        except Exception as e:
+            # 其他异常（Lora加载错误等）
+            logger.error(f"[_activate_loras] Failed to activate Lora(s) {loras}: {e}", exc_info=True)
+            raise
+        logger.info(f"Active Lora(s): {self.loaded_loras}, stats: {self.lora_cache.get_stats()}")
+
     def _are_loras_loaded(self, target_loras: Optional[List[Dict[str, Any]]]):
         if not target_loras and not self.loaded_loras:
             return True
@@ -241,6 +216,7 @@ class ModelManager:
             self.loaded_pipeline = None
             self.loaded_model_name = None
             self.loaded_loras = {}
+            self.lora_cache = None
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()  # Clear GPU memory
             logger.info("Model and Lora resources cleaned up successfully")
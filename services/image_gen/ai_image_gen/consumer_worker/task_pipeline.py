@@ -0,0 +1,410 @@
+"""Kafka 任务流水线
+
+将拉取、调度、预取和提交拆分到不同线程，GPU 不再等待 Kafka 往返：
+- 拉取线程（调用 run 的线程）按批拉取消息放入有界缓冲区，缓冲区满时暂停分区；
+  同时负责批量提交 offset（KafkaConsumer 不是线程安全的，只能在拉取线程中调用）
+- 调度线程阻塞等待缓冲区中的任务（条件变量，不再忙等待），优先级主题优先，
+  同类任务内按亲和键重排
+- 预取线程在当前任务执行期间为下一个任务准备输入（下载/解码参考图等）
+
+consumer 只需提供 poll / commit / pause / resume / assignment 接口，
+测试中可使用假实现替代 KafkaConsumer。拉取或提交出错时记录日志、等待后继续；
+分区被回收时通过 on_partitions_revoked 丢弃其待提交的 offset。
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from consumer_worker.affinity import AffinityTaskBuffer, PartitionOffsetTracker, task_affinity_key
+from core.config.constants import WorkerConfig
+from core.logging_config import setup_logging
+
+logger = setup_logging("ai_image_gen.task_pipeline")
+
+# (topic, partition) -> (下一个待消费的 offset, leader_epoch)
+CommitOffsets = Dict[Tuple[str, int], Tuple[int, Optional[int]]]
+
+
+def _message_id(message: Any) -> Tuple[str, int, int]:
+    return message.topic, message.partition, message.offset
+
+
+class PriorityTaskBuffer:
+    """有界、线程安全的任务缓冲区：优先级主题优先，同类任务按亲和键重排"""
+
+    def __init__(
+        self,
+        capacity: int,
+        priority_topics: Iterable[str],
+        max_bypass: int = 8,
+        key_fn: Callable[[Dict[str, Any]], Hashable] = task_affinity_key,
+    ):
+        """
+        Args:
+            capacity: 最多缓冲的任务数
+            priority_topics: 优先处理的主题
+            max_bypass: 任务最多被同 LoRA 任务插队的次数
+            key_fn: 根据任务数据计算亲和键
+        """
+        self.capacity = max(1, capacity)
+        self.priority_topics = set(priority_topics)
+        self.key_fn = key_fn
+        self._priority = AffinityTaskBuffer(max_bypass=max_bypass)
+        self._normal = AffinityTaskBuffer(max_bypass=max_bypass)
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._priority) + len(self._normal)
+
+    def free_slots(self) -> int:
+        """剩余容量"""
+        with self._cond:
+            return self.capacity - len(self._priority) - len(self._normal)
+
+    def put(self, message: Any) -> None:
+        """放入一条消息（调用方需先通过 free_slots 检查容量）"""
+        buffer = self._priority if message.topic in self.priority_topics else self._normal
+        with self._cond:
+            buffer.push(message, self.key_fn(message.value))
+            self._cond.notify_all()
+
+    def _select_buffer(self) -> AffinityTaskBuffer:
+        return self._priority if len(self._priority) else self._normal
+
+    def get(self, current_key: Optional[Hashable], timeout: float) -> Optional[Any]:
+        """
+        阻塞等待并取出下一个任务
+
+        Args:
+            current_key: 当前已激活的亲和键
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            消息；超时或缓冲区已关闭时返回 None
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._closed or len(self._priority) or len(self._normal), timeout
+            ):
+                return None
+            if self._closed:
+                return None
+            message = self._select_buffer().pop(current_key)
+            self._cond.notify_all()
+            return message
+
+    def peek(self, current_key: Optional[Hashable]) -> Optional[Any]:
+        """查看 get(current_key) 将返回的下一条消息，不取出"""
+        with self._cond:
+            return self._select_buffer().peek(current_key)
+
+    def wait_for_space(self, timeout: float) -> bool:
+        """等待缓冲区出现空位"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._closed or len(self._priority) + len(self._normal) < self.capacity,
+                timeout,
+            )
+
+    def close(self) -> None:
+        """关闭缓冲区，唤醒所有等待方"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class OffsetCommitter:
+    """收集已完成消息的 offset，按批量或时间间隔统一提交"""
+
+    def __init__(
+        self,
+        commit_fn: Callable[[CommitOffsets], None],
+        batch_size: int = 16,
+        interval_seconds: float = 5.0,
+    ):
+        """
+        Args:
+            commit_fn: 实际执行提交的函数（在拉取线程中调用）
+            batch_size: 累计多少条完成的消息后提交
+            interval_seconds: 距上次提交超过该时间且有待提交 offset 时提交
+        """
+        self.commit_fn = commit_fn
+        self.batch_size = max(1, batch_size)
+        self.interval_seconds = interval_seconds
+        self._tracker = PartitionOffsetTracker()
+        self._ready: CommitOffsets = {}
+        self._revoked: Set[Tuple[str, int]] = set()
+        self._completed_since_commit = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+    def track(self, message: Any) -> None:
+        """消息进入缓冲区时登记"""
+        tp = (message.topic, message.partition)
+        with self._lock:
+            self._revoked.discard(tp)
+            self._tracker.track(tp, message.offset)
+
+    def complete(self, message: Any) -> None:
+        """消息处理完成（可在任意线程调用）"""
+        tp = (message.topic, message.partition)
+        with self._lock:
+            if tp in self._revoked:
+                # 分区已被回收，offset 由新的消费者负责
+                return
+            commit_offset = self._tracker.complete(tp, message.offset)
+            self._completed_since_commit += 1
+            if commit_offset is not None:
+                self._ready[tp] = (commit_offset, getattr(message, "leader_epoch", None))
+
+    def flush(self, force: bool = False) -> None:
+        """满足批量或时间条件时提交待提交的 offset"""
+        with self._lock:
+            if not self._ready:
+                return
+            due = (
+                force
+                or self._completed_since_commit >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.interval_seconds
+            )
+            if not due:
+                return
+            offsets, self._ready = self._ready, {}
+            self._completed_since_commit = 0
+            self._last_commit = time.monotonic()
+
+        try:
+            self.commit_fn(offsets)
+            logger.debug(f"Committed offsets: {offsets}")
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            logger.error(f"[OffsetCommitter] Error committing Kafka offsets {offsets}: {e}", exc_info=True)
+            # 提交失败时保留，下次重试（已有更新的 offset 时以新的为准；已回收的分区不再重试）
+            with self._lock:
+                for tp, value in offsets.items():
+                    if tp not in self._revoked:
+                        self._ready.setdefault(tp, value)
+
+    def revoke(self, partitions: Iterable[Tuple[str, int]]) -> None:
+        """丢弃被回收分区的待提交 offset 和跟踪状态"""
+        with self._lock:
+            for tp in partitions:
+                self._revoked.add(tp)
+                self._ready.pop(tp, None)
+                self._tracker.forget(tp)
+
+
+class KafkaTaskPipeline:
+    """批量拉取 + 阻塞调度 + 输入预取 + 批量提交"""
+
+    def __init__(
+        self,
+        consumer: Any,
+        process_fn: Callable[[Any, Any], None],
+        commit_fn: Callable[[CommitOffsets], None],
+        priority_topics: Iterable[str] = (),
+        prepare_fn: Optional[Callable[[Any], Any]] = None,
+        poll_batch_size: int = 16,
+        buffer_capacity: int = 32,
+        max_bypass: int = 8,
+        commit_batch_size: int = 16,
+        commit_interval_seconds: float = 5.0,
+        poll_timeout_ms: int = 500,
+        error_sleep_seconds: float = WorkerConfig.DEFAULT_ERROR_SLEEP_SECONDS,
+    ):
+        """
+        Args:
+            consumer: KafkaConsumer 或实现相同接口的对象
+            process_fn: 处理任务 process_fn(message, prepared_inputs)
+            commit_fn: 提交 offset
+            priority_topics: 优先处理的主题
+            prepare_fn: 为任务准备输入 prepare_fn(message)，在预取线程中执行
+            poll_batch_size: 单次 poll 最多拉取的消息数
+            buffer_capacity: 缓冲区容量，满时暂停拉取
+            max_bypass: 任务最多被同 LoRA 任务插队的次数
+            commit_batch_size: 批量提交的消息数
+            commit_interval_seconds: 批量提交的最长间隔（秒）
+            poll_timeout_ms: 单次 poll 的超时时间（毫秒）
+            error_sleep_seconds: 拉取或提交出错后等待的时间（秒）
+        """
+        self.consumer = consumer
+        self.process_fn = process_fn
+        self.prepare_fn = prepare_fn
+        self.poll_batch_size = max(1, poll_batch_size)
+        self.poll_timeout_ms = poll_timeout_ms
+        self.error_sleep_seconds = error_sleep_seconds
+        self.buffer = PriorityTaskBuffer(buffer_capacity, priority_topics, max_bypass=max_bypass)
+        self.committer = OffsetCommitter(commit_fn, commit_batch_size, commit_interval_seconds)
+
+        self._stop = threading.Event()
+        self._paused = False
+        self._dispatcher: Optional[threading.Thread] = None
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-prefetch")
+        self._prefetched: Optional[Tuple[Tuple[str, int, int], Future]] = None
+
+    # ------------------------------------------------------------------
+    # 拉取线程
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """启动调度线程"""
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="task-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def run(self) -> None:
+        """在当前线程中持续拉取，直到 stop() 被调用"""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.poll_once()
+                except (SystemExit, KeyboardInterrupt):
+                    raise
+                except Exception as e:
+                    # Kafka 暂时性错误（网络、协调者切换等）：等待后继续，不退出主循环
+                    logger.error(f"[run] Error polling Kafka messages: {e}", exc_info=True)
+                    self._stop.wait(self.error_sleep_seconds)
+        finally:
+            self.shutdown()
+
+    def poll_once(self) -> int:
+        """
+        执行一轮拉取和提交
+
+        Returns:
+            本轮放入缓冲区的消息数
+        """
+        free = self.buffer.free_slots()
+        if free <= 0:
+            # 缓冲区已满：暂停分区但继续 poll，保持消费者组成员身份
+            self._set_paused(True)
+        elif self._paused:
+            self._set_paused(False)
+
+        records = self.consumer.poll(
+            timeout_ms=self.poll_timeout_ms, max_records=max(1, min(self.poll_batch_size, free))
+        )
+        count = 0
+        for messages in (records or {}).values():
+            for message in messages:
+                self.committer.track(message)
+                self.buffer.put(message)
+                count += 1
+        if count:
+            logger.debug(f"Polled {count} message(s), buffered: {len(self.buffer)}")
+        elif free <= 0:
+            self.buffer.wait_for_space(self.poll_timeout_ms / 1000.0)
+
+        self.committer.flush()
+        return count
+
+    def _set_paused(self, paused: bool) -> None:
+        partitions = list(self.consumer.assignment() or [])
+        if not partitions:
+            return
+        if paused and not self._paused:
+            self.consumer.pause(*partitions)
+            logger.info(f"Task buffer full ({self.buffer.capacity}), pausing {len(partitions)} partition(s)")
+        elif not paused and self._paused:
+            self.consumer.resume(*partitions)
+        self._paused = paused
+
+    def on_partitions_revoked(self, partitions: Iterable[Any]) -> None:
+        """
+        分区被回收（再均衡回调，在 poll 中于拉取线程调用）
+
+        先提交已完成的 offset，再丢弃这些分区剩余的待提交 offset，
+        避免对不再拥有的分区反复重试提交。
+
+        Args:
+            partitions: TopicPartition 或 (topic, partition) 列表
+        """
+        revoked = [(tp[0], tp[1]) for tp in partitions]
+        if not revoked:
+            return
+        self.committer.flush(force=True)
+        self.committer.revoke(revoked)
+        logger.info(f"Partitions revoked: {revoked}")
+
+    def on_partitions_assigned(self, partitions: Iterable[Any]) -> None:
+        """分区分配完成（再均衡回调）：下一轮 poll 按缓冲区状态重新暂停分区"""
+        self._paused = False
+
+    def stop(self) -> None:
+        """请求停止（run 会在当前轮结束后返回）"""
+        self._stop.set()
+        self.buffer.close()
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        """停止调度线程并提交所有已完成的 offset"""
+        self.stop()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=timeout)
+        self._prefetch_executor.shutdown(wait=False)
+        self.committer.flush(force=True)
+
+    # ------------------------------------------------------------------
+    # 调度线程
+    # ------------------------------------------------------------------
+
+    def _dispatch_loop(self) -> None:
+        current_key = None
+        while not self._stop.is_set():
+            message = self.buffer.get(current_key, timeout=1.0)
+            if message is None:
+                continue
+            current_key = self.buffer.key_fn(message.value)
+            prepared = self._take_prepared(message)
+
+            # 当前任务执行期间预取下一个任务的输入
+            next_message = self.buffer.peek(current_key)
+            if next_message is not None:
+                self._prefetch(next_message)
+
+            try:
+                self.process_fn(message, prepared)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except Exception as e:
+                logger.error(f"[_dispatch_loop] Unhandled error processing {_message_id(message)}: {e}", exc_info=True)
+            finally:
+                self.committer.complete(message)
+
+    def _prefetch(self, message: Any) -> None:
+        if self.prepare_fn is None:
+            return
+        message_id = _message_id(message)
+        if self._prefetched is not None and self._prefetched[0] == message_id:
+            return
+        self._prefetched = (message_id, self._prefetch_executor.submit(self.prepare_fn, message))
+
+    def _take_prepared(self, message: Any) -> Any:
+        if self.prepare_fn is None:
+            return None
+        future = None
+        if self._prefetched is not None and self._prefetched[0] == _message_id(message):
+            future = self._prefetched[1]
+        self._prefetched = None
+        try:
+            return future.result() if future is not None else self.prepare_fn(message)
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            # 预取失败不影响任务本身，由 process_fn 自行准备输入
+            logger.warning(f"[_take_prepared] Failed to prepare inputs for {_message_id(message)}: {e}")
+            return None
+
+
+__all__ = [
+    "CommitOffsets",
+    "KafkaTaskPipeline",
+    "OffsetCommitter",
+    "PriorityTaskBuffer",
+]
@@ -5,14 +5,14 @@ import logging
 import os
 import threading
 import time
-from multiprocessing import Process, Queue
 
 import httpx
+from consumer_worker.image_generator import ImageGenerator
+from consumer_worker.model_manager import ModelManager
+from consumer_worker.task_pipeline import CommitOffsets, KafkaTaskPipeline
 from data_management.models import Task
-from image_generator import ImageGenerator
-from kafka import TopicPartition
+from kafka import ConsumerRebalanceListener, TopicPartition
 from kafka.structs import OffsetAndMetadata
-from model_manager import ModelManager
 
 from config.kafka_config import create_kafka_consumer, get_kafka_config
 from config.settings import get_settings
@@ -20,9 +20,9 @@ from core.config.constants import (
     ImageGenConfig,
     RetryConfig,
     TimeoutConfig,
-    WorkerConfig,
 )
 from core.logging_config import setup_logging
+from core.utils.task_notifier import TaskCompletion, get_task_notifier
 
 logger = setup_logging("ai_image_gen.consumer_worker")
 
@@ -31,6 +31,20 @@ logging.getLogger('kafka').setLevel(logging.WARNING)
 logging.getLogger('kafka.coordinator.heartbeat').setLevel(logging.WARNING)
 logging.getLogger('kafka.sasl.plain').setLevel(logging.ERROR)
 
+
+class _PipelineRebalanceListener(ConsumerRebalanceListener):
+    """将 Kafka 再均衡事件转发给任务流水线"""
+
+    def __init__(self, pipeline: KafkaTaskPipeline):
+        self.pipeline = pipeline
+
+    def on_partitions_revoked(self, revoked):
+        self.pipeline.on_partitions_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        self.pipeline.on_partitions_assigned(assigned)
+
+
 class ConsumerWorker:
     def __init__(self):
         settings = get_settings()
@@ -39,8 +53,6 @@ class ConsumerWorker:
         self.consumer_group_id = settings.KAFKA_CONSUMER_GROUP_ID
         self.bootstrap_servers = get_kafka_config()['bootstrap_servers']
         self.consumer = None
-        self.que_dic = {k:Queue() for k in self.topics }
-        self.commit_que = Queue()
         self.priority_consumer = None
         self.model_manager = ModelManager()
         self.image_generator = ImageGenerator(self.model_manager)
@@ -58,59 +70,39 @@ class ConsumerWorker:
             auto_offset_reset='earliest', # Start consuming from the earliest available message
             enable_auto_commit=False # Manual commit for better control
         ) 
-        self.consumer.subscribe(self.topics)
+        # 订阅在 start() 中完成，以便注册任务流水线的再均衡回调
 
         logger.info(f"Consumer connected to Kafka at {self.bootstrap_servers}, topics: {self.topics}, group: {self.consumer_group_id}")
 
 
     def start(self):
         """
-        持续消费 Kafka 消息并将其添加到内部任务调度器。
+        持续消费 Kafka 消息并交给任务流水线处理。
+
+        主线程按批拉取消息并批量提交 offset；调度线程阻塞等待缓冲区中的任务并在
+        GPU 上执行，同时预取下一个任务的输入。
         """
         logger.info("Starting Kafka message consumption...")
-
-        # 启动任务处理进程
-        task_process = Process(
-            target=self._process_tasks_loop,
-            args=(self.que_dic, self.commit_que, self.model_manager, self.image_generator, self.priority_topics)
+        pipeline = KafkaTaskPipeline(
+            consumer=self.consumer,
+            process_fn=lambda message, prepared: self._process_single_task(
+                message, self.image_generator, prepared
+            ),
+            commit_fn=self._commit_offsets,
+            priority_topics=self.priority_topics,
+            prepare_fn=lambda message: self.image_generator.prepare_inputs(
+                message.value.get("image_params") or {}
+            ),
+            poll_batch_size=self.settings.KAFKA_POLL_BATCH_SIZE,
+            buffer_capacity=self.settings.TASK_BUFFER_CAPACITY,
+            max_bypass=self.settings.AFFINITY_MAX_BYPASS,
+            commit_batch_size=self.settings.KAFKA_COMMIT_BATCH_SIZE,
+            commit_interval_seconds=self.settings.KAFKA_COMMIT_INTERVAL_SECONDS,
         )
-        task_process.start()
-        logger.info("Task processing process started.")
+        self.consumer.subscribe(self.topics, listener=_PipelineRebalanceListener(pipeline))
 
         try:
-            while True:
-                # 主进程只负责 poll 消息
-                try:
-                    message = self.consumer.poll(timeout_ms=200, max_records=1)  # Poll one message at a time
-                    if message:
-                        self._handle_message(message)
-                    else:
-                        time.sleep(WorkerConfig.DEFAULT_POLL_SLEEP_SECONDS)  # 减少 CPU 占用
-                except (SystemExit, KeyboardInterrupt):
-                    # 系统退出异常，不捕获，直接抛出
-                    raise
-                except Exception as e:
-                    # 其他异常（Kafka轮询错误等）
-                    logger.error(f"[run] Error polling Kafka messages: {e}", exc_info=True)
-                    time.sleep(WorkerConfig.DEFAULT_ERROR_SLEEP_SECONDS)  # 出错后等待更长时间
-
-                # 主进程负责 commit 消息
-                try:
-                    while not self.commit_que.empty():
-                        commit_info = self.commit_que.get()
-                        topic_partition = commit_info['topic_partition']
-                        offset_and_metadata = commit_info['offset_and_metadata']
-                        self.consumer.commit({topic_partition: offset_and_metadata})
-                        logger.debug(
-                            f"Committed offset {offset_and_metadata.offset} "
-                            f"for {topic_partition.topic}-{topic_partition.partition}"
-                        )
-                except (SystemExit, KeyboardInterrupt):
-                    # 系统退出异常，不捕获，直接抛出
-                    raise
-                except Exception as e:
-                    # 其他异常（Kafka提交错误等）
-                    logger.error(f"[run] Error committing Kafka offset: {e}", exc_info=True)
+            pipeline.run()
         except (SystemExit, KeyboardInterrupt):
             logger.info("Received shutdown signal, stopping worker...")
             raise
@@ -119,14 +111,8 @@ class ConsumerWorker:
             logger.error(f"[run] Fatal error in worker main loop: {e}", exc_info=True)
             raise
         finally:
-            # 清理资源
+            # 清理资源（pipeline.run 退出时已提交所有已完成的 offset）
             logger.info("Cleaning up worker resources...")
-            if task_process.is_alive():
-                task_process.terminate()
-                task_process.join(timeout=WorkerConfig.DEFAULT_PROCESS_JOIN_TIMEOUT_SECONDS)
-                if task_process.is_alive():
-                    logger.warning("Task process did not terminate gracefully, forcing kill...")
-                    task_process.kill()
             if self.consumer:
                 try:
                     self.consumer.close()
@@ -138,82 +124,23 @@ class ConsumerWorker:
                     logger.error(f"[run] Error closing Kafka consumer: {e}", exc_info=True)
             logger.info("Worker shutdown complete.")
 
-    def _handle_message(self, message):
-        # import pdb
-        # pdb.set_trace()
-        for key, msgs in message.items():
-            for msg in msgs:
-                task_data = msg.value
-                task_id = task_data.get("task_id")
-                logger.info(f"Received task {task_id} from topic {msg.topic}, partition {msg.partition}, offset {msg.offset}")
-                # 将消息放入对应的队列
-                self.que_dic[msg.topic].put(msg)
-                #logger.info(f"Task {task_id} added to queue for topic {msg.topic}")
-
-        #
+    def _commit_offsets(self, offsets: CommitOffsets) -> None:
+        """批量提交 offset（在拉取线程中调用）"""
+        self.consumer.commit({
+            TopicPartition(topic, partition): OffsetAndMetadata(offset, None, leader_epoch)
+            for (topic, partition), (offset, leader_epoch) in offsets.items()
+        })
 
-
-    def _process_tasks_loop(self, que_dic, commit_que, model_manager, image_generator, priority_topics):
-        """
-        在新进程中持续从任务队列中获取任务并进行处理。
+    def _process_single_task(self, message, image_generator, prepared_inputs=None):
         """
-        # 在新进程中重新初始化数据库会话，因为SessionLocal不是线程安全的
-        # 重新初始化 image_generator，确保模型加载在新进程中进行
-        # 并且只加载一次
-        local_image_generator = ImageGenerator(model_manager)
-        logger.info("Task processing loop started in new process.")
-
-        # 用于轮询非优先级队列的索引
-        non_priority_topics = [t for t in que_dic.keys() if t not in priority_topics]
-        current_non_priority_topic_idx = 0
-
-        while True:
-            task_processed_in_this_loop = False
-
-            # 1. 优先处理优先级队列
-            for topic in priority_topics:
-                if not que_dic[topic].empty():
-                    msg = que_dic[topic].get()
-                    self._process_single_task(msg, commit_que, local_image_generator)
-                    task_processed_in_this_loop = True
-                    # 优先级队列有消息就一直处理，直到清空或没有更多优先级队列有消息
-                    # 这里不break，继续检查下一个优先级队列
-
-            # 2. 如果优先级队列没有消息，或者处理完所有优先级队列后，轮流处理非优先级队列
-            if non_priority_topics:
-                # 轮询非优先级队列
-                topic_to_process = non_priority_topics[current_non_priority_topic_idx]
-                
-                processed_count = 0
-                while not que_dic[topic_to_process].empty() and processed_count < 100:
-                    # 在处理非优先级任务前，再次检查优先级队列
-                    priority_task_found = False
-                    for p_topic in priority_topics:
-                        if not que_dic[p_topic].empty():
-                            msg = que_dic[p_topic].get()
-                            self._process_single_task(msg, commit_que, local_image_generator)
-                            task_processed_in_this_loop = True
-                            priority_task_found = True
-                            break # 优先处理完一个优先级任务后，重新开始循环检查优先级队列
-                    
-                    if priority_task_found:
-                        continue # 如果处理了优先级任务，跳过当前非优先级任务的处理，重新开始外层循环
-
-                    # 如果没有优先级任务，则处理非优先级任务
-                    msg = que_dic[topic_to_process].get()
-                    self._process_single_task(msg, commit_que, local_image_generator)
-                    processed_count += 1
-                    task_processed_in_this_loop = True
-                
-                # 移动到下一个非优先级队列
-                current_non_priority_topic_idx = (current_non_priority_topic_idx + 1) % len(non_priority_topics)
+        处理单个任务，支持重试机制。
 
-            if not task_processed_in_this_loop:
-                time.sleep(WorkerConfig.DEFAULT_BUSY_WAIT_SLEEP_SECONDS)  # 短暂休眠以避免忙等待
+        offset 由任务流水线在任务结束后批量提交。
 
-    def _process_single_task(self, message, commit_que, image_generator):
-        """
-        处理单个任务，支持重试机制。
+        Args:
+            message: Kafka 消息
+            image_generator: 图像生成器
+            prepared_inputs: 预取的输入（ImageGenerator.prepare_inputs 的结果）
         """
         if not message:
             return
@@ -240,7 +167,8 @@ class ConsumerWorker:
         while retries < max_retries:
             try:
                 image_path = image_generator.generate(
-                    model_name, prompt, negative_prompt, image_params, loras
+                    model_name, prompt, negative_prompt, image_params, loras,
+                    prepared_inputs=prepared_inputs,
                 )
                 logger.info(f"Task {task_id} completed. Image path: {image_path}")
                 status = "completed"
@@ -346,20 +274,21 @@ class ConsumerWorker:
             else:
                 logger.warning(f"Image file {image_path} not removed due to upload failure. Manual cleanup may be needed.")
         
-        # Always commit the Kafka offset, even if upload failed
-        # This ensures we don't reprocess the same message indefinitely
+        # 通知等待方任务已结束（结果已上报API服务，等待方可直接下载）
+        # 进程内通知无法到达其他进程中的等待方，只在分布式通知可用时发布
         try:
-            commit_que.put({
-                'topic_partition': TopicPartition(topic, partition),
-                'offset_and_metadata': OffsetAndMetadata(offset + 1, None, message.leader_epoch)
-            })
-            logger.debug(f"Kafka offset commit queued for task {task_id}")
+            notifier = get_task_notifier()
+            if notifier.distributed:
+                notifier.publish(
+                    TaskCompletion(task_id=task_id, status=status, error_message=error_message)
+                )
         except (SystemExit, KeyboardInterrupt):
             # 系统退出异常，不捕获，直接抛出
             raise
         except Exception as e:
-            # 其他异常（Kafka offset提交错误等）
-            logger.error(f"[_process_task] Failed to queue Kafka offset commit for task {task_id}: {e}", exc_info=True)
+            # 通知失败不影响任务结果，等待方会通过状态查询兜底
+            logger.error(f"[_process_task] Failed to publish completion for task {task_id}: {e}", exc_info=True)
+
 
 if __name__ == "__main__":
     # Example of how to run the worker
@@ -0,0 +1,229 @@
+"""Flux 请求微批处理
+
+并发到达的 /generate_image/ 请求先进入内部队列，参数兼容（相同 LoRA、尺寸和
+推理步数）的请求在短暂的等待窗口内合并为一次批量 pipeline 调用，输出按顺序
+拆分回各个请求。GPU 推理在单独的线程中串行执行，推理期间到达的请求自然积累
+成下一批。
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("image_gen.flux_server.batcher", log_to_file=False)
+
+
+@dataclass(frozen=True)
+class BatchKey:
+    """可合并到同一批次的请求参数"""
+    width: int
+    height: int
+    num_inference_steps: int
+    lora_name: Optional[str] = None
+
+
+@dataclass
+class _PendingRequest:
+    prompt: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class BatcherStats:
+    """队列指标"""
+    queue_depth: int
+    max_batch_size: int
+    max_wait_ms: int
+    requests_total: int
+    batches_total: int
+    failed_batches_total: int
+    last_batch_size: int
+    avg_batch_size: float
+    avg_queue_wait_ms: float
+    avg_inference_ms: float
+
+
+def make_pipeline_runner(pipe: Any) -> Callable[[BatchKey, List[str]], List[Any]]:
+    """
+    将 diffusers pipeline 包装为批量推理函数
+
+    Args:
+        pipe: FluxPipeline（或接口兼容的对象）
+
+    Returns:
+        runner(key, prompts) -> 与 prompts 一一对应的图片列表
+    """
+
+    def _run(key: BatchKey, prompts: List[str]) -> List[Any]:
+        images = pipe(
+            prompts,
+            num_inference_steps=key.num_inference_steps,
+            width=key.width,
+            height=key.height,
+        ).images
+        return images
+
+    return _run
+
+
+class MicroBatcher:
+    """按 BatchKey 分组的异步微批处理器"""
+
+    def __init__(
+        self,
+        runner: Callable[[Hashable, List[str]], Sequence[Any]],
+        max_batch_size: int = 4,
+        max_wait_ms: int = 50,
+    ):
+        """
+        Args:
+            runner: 批量推理函数，在后台线程中调用
+            max_batch_size: 单批最多合并的请求数
+            max_wait_ms: 批次中最早的请求最多等待多久（毫秒）
+        """
+        self.runner = runner
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0, max_wait_ms)
+
+        self._groups: "OrderedDict[Hashable, List[_PendingRequest]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flux-batch")
+
+        self._requests_total = 0
+        self._batches_total = 0
+        self._failed_batches_total = 0
+        self._batched_requests_total = 0
+        self._last_batch_size = 0
+        self._queue_wait_total = 0.0
+        self._inference_total = 0.0
+
+    def start(self) -> None:
+        """在当前事件循环中启动调度任务"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(
+                f"微批处理已启动 (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms})"
+            )
+
+    async def stop(self) -> None:
+        """停止调度任务，未处理的请求以异常结束"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for group in self._groups.values():
+            for request in group:
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError("Flux batcher stopped"))
+        self._groups.clear()
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, key: Hashable, prompt: str) -> Any:
+        """
+        提交一个请求并等待其结果
+
+        Args:
+            key: 批次分组键（如 BatchKey）
+            prompt: 提示词
+
+        Returns:
+            runner 为该提示词返回的结果
+        """
+        if self._task is None:
+            self.start()
+        request = _PendingRequest(prompt, asyncio.get_running_loop().create_future())
+        self._groups.setdefault(key, []).append(request)
+        self._requests_total += 1
+        self._wakeup.set()
+        return await request.future
+
+    def get_stats(self) -> BatcherStats:
+        """获取队列指标"""
+        batches = self._batches_total
+        batched = self._batched_requests_total
+        return BatcherStats(
+            queue_depth=sum(len(group) for group in self._groups.values()),
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+            requests_total=self._requests_total,
+            batches_total=batches,
+            failed_batches_total=self._failed_batches_total,
+            last_batch_size=self._last_batch_size,
+            avg_batch_size=batched / batches if batches else 0.0,
+            avg_queue_wait_ms=self._queue_wait_total * 1000 / batched if batched else 0.0,
+            avg_inference_ms=self._inference_total * 1000 / batches if batches else 0.0,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            if not self._groups:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # 优先处理最早到达的请求所在的分组
+            key = min(self._groups, key=lambda k: self._groups[k][0].enqueued_at)
+            group = self._groups[key]
+            deadline = group[0].enqueued_at + self.max_wait_ms / 1000.0
+            while len(group) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = group[: self.max_batch_size]
+            del group[: self.max_batch_size]
+            if not group:
+                del self._groups[key]
+            # 客户端已断开的请求不再占用 GPU
+            batch = [request for request in batch if not request.future.done()]
+            if batch:
+                await self._execute(key, batch)
+
+    async def _execute(self, key: Hashable, batch: List[_PendingRequest]) -> None:
+        started = time.monotonic()
+        self._batches_total += 1
+        self._batched_requests_total += len(batch)
+        self._last_batch_size = len(batch)
+        self._queue_wait_total += sum(started - request.enqueued_at for request in batch)
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self.runner, key, [request.prompt for request in batch]
+            )
+            if len(results) != len(batch):
+                raise RuntimeError(f"批量推理返回 {len(results)} 个结果，期望 {len(batch)} 个")
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            self._failed_batches_total += 1
+            logger.error(f"[MicroBatcher] 批量推理失败: key={key}, size={len(batch)}, error={e}", exc_info=True)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._inference_total += time.monotonic() - started
+
+        for request, result in zip(batch, results):
+            if not request.future.done():
+                request.future.set_result(result)
+        logger.debug(f"[MicroBatcher] 完成批次: key={key}, size={len(batch)}")
+
+
+__all__ = ["BatchKey", "BatcherStats", "MicroBatcher", "make_pipeline_runner"]
@@ -15,6 +15,8 @@ class FluxConfig(BaseConfig):
     FLUX_LORA_NAME: Optional[str] = None
     FLUX_LORA_STEP: int = 120
     FLUX_DEVICE_ID: str = "0"
+    FLUX_MAX_BATCH_SIZE: int = 4
+    FLUX_BATCH_MAX_WAIT_MS: int = 50
 
     def _resolve_path(self, value: Optional[str], fallback: Path) -> Path:
         return Path(value).expanduser().resolve() if value else fallback
@@ -2,6 +2,7 @@ import io
 import os
 import sys
 import traceback
+from dataclasses import asdict
 from pathlib import Path
 
 import torch
@@ -20,6 +21,8 @@ from core.logging_config import setup_logging
 # Assuming tools.flux is in the parent directory
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 import flux  # Import the flux module to access LORAS_BASE_PATH
+from batcher import BatchKey, MicroBatcher, make_pipeline_runner
+from config import flux_settings
 from flux import load_pipe  # Still need load_pipe specifically
 
 # 配置日志
@@ -29,6 +32,8 @@ app = FastAPI()
 
 # Global variable to hold the loaded pipeline
 pipe = None
+# 请求微批处理器（pipeline 加载成功后创建）
+batcher = None
 
 class PromptRequest(BaseModel):
     prompt: str
@@ -40,7 +45,7 @@ lora_path = None
 @app.on_event("startup")
 async def startup_event():
     """Load the Flux pipeline on application startup."""
-    global pipe
+    global pipe, batcher
     logger.info("Loading Flux pipeline")
     pipe = load_pipe()
     global lora_path
@@ -63,37 +68,56 @@ async def startup_event():
         else:
             # pipe.set_adapters(None) 
             logger.warning(f"LoRA base path not found: {flux.LORAS_BASE_PATH}")
+        batcher = MicroBatcher(
+            make_pipeline_runner(pipe),
+            max_batch_size=flux_settings.FLUX_MAX_BATCH_SIZE,
+            max_wait_ms=flux_settings.FLUX_BATCH_MAX_WAIT_MS,
+        )
+        batcher.start()
     else:
         logger.error("Failed to load Flux pipeline.")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the request batcher."""
+    if batcher is not None:
+        await batcher.stop()
+
+
+@app.get("/queue_stats/")
+async def queue_stats():
+    """Return micro-batching queue metrics."""
+    if batcher is None:
+        return {"error": "Flux pipeline not loaded. Check server startup logs."}
+    return asdict(batcher.get_stats())
+
+
 @app.post("/generate_image/")
 async def generate_image(request: PromptRequest):
     """Generate an image from a text prompt."""
-    if pipe is None:
+    if pipe is None or batcher is None:
         return {"error": "Flux pipeline not loaded. Check server startup logs."}
 
     try:
-        # Run inference in a separate thread to avoid blocking the event loop
-        # and use BytesIO to avoid disk I/O
-        def _inference():
-            image = pipe(
-                request.prompt,
-                num_inference_steps=request.num_inference_steps,
-                width=request.width,
-                height=request.height,
-                # generator=torch.Generator(f"cuda:{request.device_id}").manual_seed(random.randint(0, 1000000000)) # Add seed if needed
-            ).images[0]
-            
+        # 兼容的请求（相同 LoRA、尺寸、步数）在批处理器中合并为一次 pipeline 调用
+        key = BatchKey(
+            width=request.width,
+            height=request.height,
+            num_inference_steps=request.num_inference_steps,
+            lora_name=flux.LORA_NAME,
+        )
+        image = await batcher.submit(key, request.prompt)
+
+        # Encode in a worker thread (not on the GPU thread) and use BytesIO to avoid disk I/O
+        def _encode():
             img_byte_arr = io.BytesIO()
             image.save(img_byte_arr, format='PNG')
-            img_byte_arr.seek(0)
-            return img_byte_arr
+            return img_byte_arr.getvalue()
 
-        # Use starlette's run_in_threadpool to run blocking code in a separate thread
         from starlette.concurrency import run_in_threadpool
-        img_byte_arr = await run_in_threadpool(_inference)
-        
-        return Response(content=img_byte_arr.getvalue(), media_type="image/png")
+        content = await run_in_threadpool(_encode)
+        return Response(content=content, media_type="image/png")
 
     except (SystemExit, KeyboardInterrupt):
         # 系统退出异常，不捕获，直接抛出
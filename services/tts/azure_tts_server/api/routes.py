@@ -1,8 +1,10 @@
 """API 路由定义."""
 
+import asyncio
 import os
 import tempfile
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -14,12 +16,14 @@ from config import get_azure_tts_config
 from core.exceptions import (
     BatchShortException,
     ConfigurationException,
+    FileException,
     ServiceException,
     ValidationException,
 )
 from core.logging_config import setup_logging
 from services import ASRService, AzureTTSService, SubtitleService
 from services.asr_service import get_asr_service
+from services.tts_service import ChunkSynthesisResult, merge_chunk_sentences
 
 logger = setup_logging("api_routes", log_to_file=True)
 
@@ -30,6 +34,7 @@ _config = get_azure_tts_config()
 _tts_service: Optional[AzureTTSService] = None
 _subtitle_service: Optional[SubtitleService] = None
 _text_splitter: Optional[TextSplitter] = None
+_synthesis_executor: Optional[ThreadPoolExecutor] = None
 _service_lock = threading.Lock()
 
 
@@ -63,6 +68,128 @@ def get_text_splitter() -> TextSplitter:
     return _text_splitter
 
 
+def get_synthesis_executor() -> ThreadPoolExecutor:
+    """
+    获取文本块合成线程池（线程安全的单例模式）.
+
+    所有请求共享同一个线程池, 因此并发调用 Azure 的数量受
+    TTS_MAX_CONCURRENT_CHUNKS 全局限制.
+    """
+    global _synthesis_executor
+    if _synthesis_executor is None:
+        with _service_lock:
+            if _synthesis_executor is None:  # 双重检查锁定
+                _synthesis_executor = ThreadPoolExecutor(
+                    max_workers=_config.TTS_MAX_CONCURRENT_CHUNKS,
+                    thread_name_prefix="tts_chunk",
+                )
+    return _synthesis_executor
+
+
+def _synthesize_chunk_with_retry(
+    tts_service: AzureTTSService,
+    chunk_index: int,
+    chunk_count: int,
+    chunk_text: str,
+    output_file: str,
+    **synthesis_params,
+) -> ChunkSynthesisResult:
+    """
+    合成单个文本块 (在线程池中执行, 失败时重试).
+
+    Args:
+        tts_service: TTS 服务实例
+        chunk_index: 文本块序号 (从 0 开始)
+        chunk_count: 文本块总数
+        chunk_text: 文本块内容
+        output_file: 输出 WAV 文件路径
+        **synthesis_params: 传递给 synthesize_speech 的合成参数
+
+    Returns:
+        文本块合成结果 (含单词边界时间轴)
+
+    Raises:
+        ServiceException: 重试后仍然合成失败
+    """
+    max_attempts = _config.TTS_CHUNK_MAX_RETRIES
+    logger.debug(f"正在合成第 {chunk_index+1}/{chunk_count} 个文本块...")
+
+    for attempt in range(max_attempts):
+        try:
+            result = tts_service.synthesize_with_timings(
+                chunk_text, output_file, **synthesis_params
+            )
+            if result is not None:
+                return result
+            logger.warning(
+                f"文本块 {chunk_index+1} 第 {attempt+1} 次合成失败, 重试中..."
+            )
+        except (SystemExit, KeyboardInterrupt):
+            # 系统退出异常，不捕获，直接抛出
+            raise
+        except (ServiceException, RuntimeError) as e:
+            # TTS服务错误或运行时错误
+            logger.warning(
+                f"文本块 {chunk_index+1} 第 {attempt+1} 次合成异常: {e}, 重试中..."
+            )
+        except Exception as e:
+            # 其他未预期的异常
+            logger.warning(
+                f"文本块 {chunk_index+1} 第 {attempt+1} 次合成异常: {e}, 重试中..."
+            )
+
+    logger.error(f"文本块 {chunk_index+1} 合成失败, 已重试{max_attempts}次")
+    raise ServiceException(
+        f"文本块 {chunk_index+1} 合成失败",
+        service_name="azure_tts"
+    )
+
+
+async def _synthesize_chunks(
+    tts_service: AzureTTSService,
+    text_chunks: list[str],
+    output_files: list[str],
+    **synthesis_params,
+) -> list[ChunkSynthesisResult]:
+    """
+    在共享线程池中并发合成所有文本块.
+
+    任一文本块最终失败时, 取消尚未开始的文本块, 等待已在执行的文本块结束
+    (避免其在临时文件清理后继续写入), 然后抛出第一个错误.
+
+    Args:
+        tts_service: TTS 服务实例
+        text_chunks: 文本块列表
+        output_files: 与文本块一一对应的输出文件路径
+        **synthesis_params: 合成参数
+
+    Returns:
+        按文本块顺序排列的合成结果
+    """
+    executor = get_synthesis_executor()
+    futures = [
+        executor.submit(
+            _synthesize_chunk_with_retry,
+            tts_service,
+            i,
+            len(text_chunks),
+            chunk_text,
+            output_file,
+            **synthesis_params,
+        )
+        for i, (chunk_text, output_file) in enumerate(zip(text_chunks, output_files))
+    ]
+    wrapped = [asyncio.wrap_future(future) for future in futures]
+
+    try:
+        return list(await asyncio.gather(*wrapped))
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        await asyncio.gather(*wrapped, return_exceptions=True)
+        raise
+
+
 @router.post("/tts/synthesize", response_model=TTSResponse)
 async def synthesize_speech(
     audio_output_path: str = Form(..., description="音频输出路径"),
@@ -134,52 +261,21 @@ async def synthesize_speech(
         text_chunks = text_splitter.split_text(audio_text)
         logger.info(f"文本分割完成 - 分块数: {len(text_chunks)}")
 
-        # 生成每个文本块的音频
-        for i, chunk_text in enumerate(text_chunks):
-            logger.debug(f"正在合成第 {i+1}/{len(text_chunks)} 个文本块...")
-            temp_wav_chunk_file = tempfile.NamedTemporaryFile(
-                suffix=f"_{i}.wav", delete=False
-            ).name
-
-            # 重试机制 (最多3次)
-            success = False
-            for attempt in range(3):
-                try:
-                    success = tts_service.synthesize_speech(
-                        chunk_text,
-                        temp_wav_chunk_file,
-                        voice=voice,
-                        sample_rate=sample_rate,
-                        volume=volume,
-                        speech_rate=speech_rate,
-                    )
-                    if success:
-                        temp_wav_files.append(temp_wav_chunk_file)
-                        break
-                    else:
-                        logger.warning(
-                            f"第 {attempt+1} 次合成失败, 重试中..."
-                        )
-                except (SystemExit, KeyboardInterrupt):
-                    # 系统退出异常，不捕获，直接抛出
-                    raise
-                except (ServiceException, RuntimeError) as e:
-                    # TTS服务错误或运行时错误
-                    logger.warning(
-                        f"第 {attempt+1} 次合成异常: {e}, 重试中..."
-                    )
-                except Exception as e:
-                    # 其他未预期的异常
-                    logger.warning(
-                        f"第 {attempt+1} 次合成异常: {e}, 重试中..."
-                    )
+        # 并发生成每个文本块的音频 (输出文件按文本块顺序预先分配)
+        for i in range(len(text_chunks)):
+            temp_wav_files.append(
+                tempfile.NamedTemporaryFile(suffix=f"_{i}.wav", delete=False).name
+            )
 
-            if not success:
-                logger.error(f"文本块 {i+1} 合成失败, 已重试3次")
-                raise ServiceException(
-                    f"文本块 {i+1} 合成失败",
-                    service_name="azure_tts"
-                )
+        chunk_results = await _synthesize_chunks(
+            tts_service,
+            text_chunks,
+            temp_wav_files,
+            voice=voice,
+            sample_rate=sample_rate,
+            volume=volume,
+            speech_rate=speech_rate,
+        )
 
         # 合并所有 WAV 文件
         logger.info(f"开始合并 {len(temp_wav_files)} 个音频文件...")
@@ -187,7 +283,9 @@ async def synthesize_speech(
             suffix=".wav", delete=False
         ).name
 
-        audio_processor.merge_wav_files(temp_wav_files, final_wav_file)
+        await asyncio.to_thread(
+            audio_processor.merge_wav_files, temp_wav_files, final_wav_file
+        )
 
         # 转换为 MP3 (如果需要)
         output_path = Path(audio_output_path)
@@ -199,7 +297,9 @@ async def synthesize_speech(
                 suffix=".mp3", delete=False
             ).name
             try:
-                audio_processor.convert_wav_to_mp3(final_wav_file, temp_mp3_file)
+                await asyncio.to_thread(
+                    audio_processor.convert_wav_to_mp3, final_wav_file, temp_mp3_file
+                )
                 # 移动到最终位置（使用原子操作）
                 if os.path.exists(audio_output_path):
                     os.remove(audio_output_path)
@@ -243,15 +343,26 @@ async def synthesize_speech(
         if subtitle_output_path:
             try:
                 logger.info("开始生成字幕...")
-                asr_service = get_asr_service()
                 subtitle_service = get_subtitle_service()
 
-                # 转录音频
-                sentences = asr_service.transcribe_audio(audio_output_path)
+                # 优先使用合成时的单词边界时间轴, 不可用时回退到 ASR 转录
+                sentences = None
+                if _config.SUBTITLE_USE_WORD_BOUNDARY:
+                    sentences = merge_chunk_sentences(chunk_results)
+                    if sentences is None:
+                        logger.warning("单词边界时间轴不可用, 回退到 ASR 转录")
+                if sentences is None:
+                    asr_service = get_asr_service()
+                    sentences = await asyncio.to_thread(
+                        asr_service.transcribe_audio, audio_output_path
+                    )
 
                 # 生成字幕文件
-                subtitle_file = subtitle_service.save_srt(
-                    sentences, subtitle_output_path, audio_text
+                subtitle_file = await asyncio.to_thread(
+                    subtitle_service.save_srt,
+                    sentences,
+                    subtitle_output_path,
+                    audio_text,
                 )
 
                 logger.info(f"字幕文件生成成功: {subtitle_file}")
@@ -70,6 +70,21 @@ class AzureTTSConfig(BaseConfig):
         description="文本分块默认大小",
         gt=0,
     )
+    TTS_MAX_CONCURRENT_CHUNKS: int = Field(
+        default=8,
+        description="并发合成的文本块数量上限(全局共享)",
+        gt=0,
+    )
+    TTS_SYNTHESIZER_POOL_SIZE: int = Field(
+        default=8,
+        description="每个 (语音, 采样率) 保留的空闲合成器数量上限",
+        gt=0,
+    )
+    TTS_CHUNK_MAX_RETRIES: int = Field(
+        default=3,
+        description="单个文本块合成的最大尝试次数",
+        gt=0,
+    )
 
     # ASR 模型配置
     ASR_MODEL_PATH: Optional[str] = Field(
@@ -106,6 +121,18 @@ class AzureTTSConfig(BaseConfig):
         default=0.1,
         description="字幕间隔时间(秒)",
     )
+    SUBTITLE_ALIGN_WINDOW_CHARS: int = Field(
+        default=200,
+        description="字幕对齐时在上次匹配位置之后搜索的字符数",
+    )
+    SUBTITLE_ALIGN_MIN_CONFIDENCE: int = Field(
+        default=80,
+        description="字幕局部对齐的最低置信度, 低于此值时回退到全文搜索",
+    )
+    SUBTITLE_USE_WORD_BOUNDARY: bool = Field(
+        default=True,
+        description="使用 Azure 单词边界事件生成字幕, 不可用时回退到 ASR",
+    )
 
     @field_validator("AZURE_SPEECH_KEY")
     @classmethod
@@ -2,9 +2,10 @@
 
 import re
 import unicodedata
+from dataclasses import dataclass
 from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import pysrt
 from models import SentenceInfo
@@ -17,6 +18,152 @@ from core.logging_config import setup_logging
 
 logger = setup_logging("subtitle_service", log_to_file=True)
 
+_WORD_CHAR_RE = re.compile(r"\w")
+
+
+@dataclass
+class AlignmentMatch:
+    """对齐结果."""
+
+    text: str
+    score: float
+    clean_end: int  # 匹配结束位置 (清理后文本中的索引)
+
+
+class SubtitleTextAligner:
+    """
+    基于游标的字幕-原文对齐器.
+
+    原文只预处理一次 (数字转中文、大小写、清理标点并建立索引映射).
+    字幕按时间顺序单调推进: 每句只在上次匹配位置之后的有限窗口内搜索,
+    局部置信度不足时才回退到全文搜索, 避免对长文本逐句全量扫描.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        is_square: bool,
+        clean_and_map: Callable[[str], tuple[str, list[int]]],
+        window_chars: int = 200,
+        min_confidence: float = 80,
+        tolerance: int = 5,
+    ):
+        """
+        初始化对齐器.
+
+        Args:
+            text: 已完成数字转换的原始文本
+            is_square: 是否为方块字
+            clean_and_map: 清理文本并建立索引映射的函数
+            window_chars: 局部搜索窗口 (上次匹配位置之后的字符数)
+            min_confidence: 局部匹配的最低置信度, 低于此值回退全文搜索
+            tolerance: 窗口长度容差
+        """
+        self.long_text = text if is_square else text.lower()
+        self.clean_text, self.index_map = clean_and_map(self.long_text)
+        self.window_chars = window_chars
+        self.min_confidence = min_confidence
+        self.tolerance = tolerance
+        self.cursor = 0
+        self.global_searches = 0
+
+    def match(self, short_text: str, threshold: float = 60) -> Optional[AlignmentMatch]:
+        """
+        在原文中查找与字幕句子最匹配的片段 (不移动游标).
+
+        Args:
+            short_text: 字幕句子
+            threshold: 相似度阈值
+
+        Returns:
+            对齐结果, 未匹配时返回 None
+        """
+        if not short_text or not self.clean_text:
+            return None
+
+        # 局部搜索: 允许与上一句有少量重叠
+        lo = max(0, self.cursor - self.tolerance)
+        hi = self.cursor + self.window_chars
+        best = self.scan(short_text, lo, hi)
+
+        if best[0] < self.min_confidence:
+            # 先在游标之后的剩余文本中定位候选位置, 置信度仍不足时才搜索全文
+            self.global_searches += 1
+            for offset in (lo, 0) if lo else (0,):
+                alignment = fuzz.partial_ratio_alignment(short_text, self.clean_text[offset:])
+                if alignment is None:
+                    continue
+                dest_start = offset + alignment.dest_start
+                candidate = self.scan(
+                    short_text,
+                    dest_start - self.tolerance,
+                    dest_start + self.tolerance,
+                )
+                if candidate[0] > best[0]:
+                    best = candidate
+                if best[0] >= self.min_confidence:
+                    break
+
+        score, start, end = best
+        if score < threshold:
+            return None
+        return AlignmentMatch(
+            text=self._extract(short_text, score, start, end),
+            score=score,
+            clean_end=end,
+        )
+
+    def advance(self, match: Optional[AlignmentMatch]) -> None:
+        """将游标移动到已采用的匹配之后 (全文回退命中游标之前的位置时游标不后退)."""
+        if match is not None:
+            self.cursor = max(self.cursor, match.clean_end)
+
+    def scan(self, short_text: str, lo: int, hi: int) -> tuple[float, int, int]:
+        """
+        在清理后文本的 [lo, hi] 起点范围内滑动窗口搜索.
+
+        Args:
+            short_text: 字幕句子
+            lo: 起点下界
+            hi: 起点上界
+
+        Returns:
+            (最佳分数, 起点, 终点)
+        """
+        clean_text = self.clean_text
+        text_len = len(clean_text)
+        target_len = len(short_text)
+        lo = max(0, lo)
+        hi = min(hi, text_len - target_len)
+
+        best_score, best_start, best_end = 0.0, 0, 0
+        for i in range(lo, hi + 1):
+            for delta in range(-self.tolerance, self.tolerance + 1):
+                end = i + target_len + delta
+                if end > text_len or end <= i:
+                    continue
+                score = fuzz.ratio(clean_text[i:end], short_text, score_cutoff=best_score)
+                if score > best_score:
+                    best_score, best_start, best_end = score, i, end
+        return best_score, best_start, best_end
+
+    def _extract(self, short_text: str, best_score: float, start: int, end: int) -> str:
+        """将清理后文本中的匹配区间映射回原文, 并修正首尾错别字."""
+        long_text = self.long_text
+        orig_start = self.index_map[start]
+        orig_end = self.index_map[end - 1] + 1
+
+        # 检查首尾是否有错别字
+        start_score = fuzz.ratio(long_text[orig_start:orig_end], short_text[1:])
+        end_score = fuzz.ratio(long_text[orig_start:orig_end], short_text[:-1])
+
+        if end_score > start_score and end_score > best_score:
+            return long_text[orig_start : orig_end + 1].strip()
+        elif start_score > end_score and start_score > best_score:
+            return long_text[max(0, orig_start - 1) : orig_end + 1].strip()
+
+        return long_text[orig_start:orig_end].strip()
+
 
 class SubtitleService:
     """字幕处理服务."""
@@ -27,6 +174,8 @@ class SubtitleService:
         self.max_chars_square = config.SUBTITLE_MAX_CHARS_SQUARE
         self.max_chars_non_square = config.SUBTITLE_MAX_CHARS_NON_SQUARE
         self.gap_seconds = config.SUBTITLE_GAP_SECONDS
+        self.align_window_chars = config.SUBTITLE_ALIGN_WINDOW_CHARS
+        self.align_min_confidence = config.SUBTITLE_ALIGN_MIN_CONFIDENCE
 
         self._opencc_s2tw = OpenCC("s2tw")
 
@@ -55,6 +204,9 @@ class SubtitleService:
             # 判断是否为方块字
             is_square = self._is_square_text(original_text)
 
+            # 原文只预处理一次, 按字幕顺序单调对齐
+            aligner = self._create_aligner(original_text, is_square)
+
             for index, item in enumerate(sentences, start=1):
                 start_time = pysrt.SubRipTime(milliseconds=item.start)
                 end_time = pysrt.SubRipTime(milliseconds=item.end)
@@ -65,7 +217,7 @@ class SubtitleService:
 
                 # 从原始文本中匹配最佳文本
                 matched_text = self._match_text_from_original(
-                    original_text, text, traditional_text, is_square
+                    aligner, text, traditional_text
                 )
 
                 if matched_text:
@@ -90,7 +242,10 @@ class SubtitleService:
             output_path.parent.mkdir(parents=True, exist_ok=True)
             subs.save(str(output_path), encoding="utf-8")
 
-            logger.info(f"字幕文件保存成功: {srt_file_path}")
+            logger.info(
+                f"字幕文件保存成功: {srt_file_path} "
+                f"(句子数: {len(sentences)}, 全文回退搜索: {aligner.global_searches})"
+            )
             return srt_file_path
 
         except (SystemExit, KeyboardInterrupt):
@@ -148,53 +303,59 @@ class SubtitleService:
             return 2
         return 1  # Narrow, Halfwidth, Neutral
 
+    def _create_aligner(self, original_text: str, is_square: bool) -> SubtitleTextAligner:
+        """
+        为原始文本创建对齐器 (数字转换和文本清理只执行一次).
+
+        Args:
+            original_text: 原始文本
+            is_square: 是否为方块字
+
+        Returns:
+            对齐器
+        """
+        return SubtitleTextAligner(
+            self._convert_numbers_to_chinese(original_text),
+            is_square=is_square,
+            clean_and_map=self._clean_and_map,
+            window_chars=self.align_window_chars,
+            min_confidence=self.align_min_confidence,
+        )
+
     def _match_text_from_original(
         self,
-        original_text: str,
+        aligner: SubtitleTextAligner,
         simple_text: str,
         traditional_text: str,
-        is_square: bool,
     ) -> Optional[str]:
         """
         从原始文本中匹配最佳文本.
 
         Args:
-            original_text: 原始文本
+            aligner: 原始文本对齐器
             simple_text: 简体文本
             traditional_text: 繁体文本
-            is_square: 是否为方块字
 
         Returns:
             匹配的文本, 如果未匹配则返回 None
         """
-        # 将数字转换为中文
-        no_num_text = self._convert_numbers_to_chinese(original_text)
+        # 匹配简体 / 繁体
+        simple_match = aligner.match(simple_text, threshold=60)
+        traditional_match = aligner.match(traditional_text, threshold=60)
 
-        # 匹配简体
-        simple_result = self._find_similar_sentence(
-            no_num_text, simple_text, is_square=is_square, threshold=60
-        )
-
-        # 匹配繁体
-        traditional_result = self._find_similar_sentence(
-            no_num_text, traditional_text, is_square=is_square, threshold=60
-        )
-
-        # 选择最佳匹配
-        if not traditional_result:
-            traditional_result = traditional_text
-        if not simple_result:
-            simple_result = simple_text
+        # 选择最佳匹配 (未匹配时使用字幕原文)
+        simple_result = simple_match.text if simple_match else simple_text
+        traditional_result = traditional_match.text if traditional_match else traditional_text
 
         len_simple = len(simple_result) if simple_result else 0
         len_traditional = len(traditional_result) if traditional_result else 0
 
-        if len_simple > len_traditional:
-            return simple_result
-        elif len_traditional > len_simple:
+        if len_traditional > len_simple:
+            aligner.advance(traditional_match)
             return traditional_result
-        else:
-            return simple_result
+
+        aligner.advance(simple_match or traditional_match)
+        return simple_result
 
     def _find_similar_sentence(
         self,
@@ -205,7 +366,7 @@ class SubtitleService:
         is_square: bool = False,
     ) -> Optional[str]:
         """
-        从长文本中找到匹配的句子.
+        从长文本中找到匹配的句子 (全文搜索).
 
         Args:
             long_text: 长文本
@@ -217,48 +378,16 @@ class SubtitleService:
         Returns:
             匹配的文本, 如果未匹配则返回 None
         """
-        target_len = len(short_text)
-        if not is_square:
-            long_text = long_text.lower()
-
-        clean_text, index_map = self._clean_and_map(long_text)
-        best_score = 0
-        best_start = 0
-        best_end = 0
-
-        # 滑动窗口搜索
-        for i in range(0, len(clean_text) - target_len + 1):
-            for delta in range(-tolerance, tolerance + 1):
-                end = i + target_len + delta
-                if end > len(clean_text) or end <= i:
-                    continue
-                window = clean_text[i:end]
-                score = fuzz.ratio(window, short_text)
-                if score > best_score:
-                    best_score = score
-                    best_start = i
-                    best_end = end
-
-        if best_score >= threshold:
-            orig_start = index_map[best_start]
-            orig_end = index_map[best_end - 1] + 1
-
-            # 检查首尾是否有错别字
-            start_score = fuzz.ratio(
-                long_text[orig_start:orig_end], short_text[1:]
-            )
-            end_score = fuzz.ratio(
-                long_text[orig_start:orig_end], short_text[:-1]
-            )
-
-            if end_score > start_score and end_score > best_score:
-                return long_text[orig_start : orig_end + 1].strip()
-            elif start_score > end_score and start_score > best_score:
-                return long_text[orig_start - 1 : orig_end + 1].strip()
-
-            return long_text[orig_start:orig_end].strip()
-        else:
-            return None
+        aligner = SubtitleTextAligner(
+            long_text,
+            is_square=is_square,
+            clean_and_map=self._clean_and_map,
+            window_chars=len(long_text),
+            min_confidence=0,
+            tolerance=tolerance,
+        )
+        match = aligner.match(short_text, threshold=threshold)
+        return match.text if match else None
 
     def _clean_and_map(self, text: str) -> tuple[str, list[int]]:
         """
@@ -273,7 +402,7 @@ class SubtitleService:
         clean = []
         mapping = []
         for i, ch in enumerate(text):
-            if re.match(r"\w", ch) or "\u4e00" <= ch <= "\u9fff":
+            if _WORD_CHAR_RE.match(ch) or "\u4e00" <= ch <= "\u9fff":
                 clean.append(ch)
                 mapping.append(i)
         return "".join(clean), mapping
@@ -1,23 +1,104 @@
 """Azure TTS 服务."""
 
-import os
 import re
-import tempfile
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
 import azure.cognitiveservices.speech as speechsdk
-import librosa
 import numpy as np
 import soundfile as sf
 from opencc import OpenCC
-from scipy.signal import resample
+
+from models import SentenceInfo
+from utils.audio_postprocess import pcm16_to_float, postprocess_audio
 
 from config import get_azure_tts_config
 from core.logging_config import setup_logging
 
 logger = setup_logging("azure_tts_service", log_to_file=True)
 
+# 断句标点: 与 ASR 标点模型的分句粒度保持一致
+_SENTENCE_BREAK_PUNCTUATION = set("，。！？；：、,.!?;:…")
+
+# Azure 音频偏移量单位为 100 纳秒
+_TICKS_PER_MILLISECOND = 10_000
+
+# Azure 原始 16 位单声道 PCM 输出格式 (SpeechSynthesisOutputFormat 成员名), 按采样率索引
+_RAW_PCM_FORMATS = {
+    8000: "Raw8Khz16BitMonoPcm",
+    16000: "Raw16Khz16BitMonoPcm",
+    22050: "Raw22050Hz16BitMonoPcm",
+    24000: "Raw24Khz16BitMonoPcm",
+    44100: "Raw44100Hz16BitMonoPcm",
+    48000: "Raw48Khz16BitMonoPcm",
+}
+# 目标采样率没有对应输出格式时, 以神经语音的原生采样率合成后重采样
+_FALLBACK_SYNTHESIS_RATE = 24000
+
+
+def _is_ascii_alnum(ch: str) -> bool:
+    """判断字符是否为 ASCII 字母或数字."""
+    return ch.isascii() and ch.isalnum()
+
+
+@dataclass
+class WordBoundary:
+    """Azure 合成的单词边界 (时间单位: 毫秒, 相对于未修剪的音频)."""
+
+    text: str
+    offset_ms: float
+    duration_ms: float
+    is_punctuation: bool = False
+
+
+@dataclass
+class ChunkSynthesisResult:
+    """单个文本块的合成结果."""
+
+    audio_file: str
+    duration_ms: int  # 后处理后的音频时长
+    sentences: list[SentenceInfo] = field(default_factory=list)  # 相对于本块起点
+
+
+def merge_chunk_sentences(
+    chunk_results: list[ChunkSynthesisResult],
+) -> Optional[list[SentenceInfo]]:
+    """
+    将各文本块的句子时间轴按累计时长平移, 合并为整段音频的时间轴.
+
+    Args:
+        chunk_results: 按顺序排列的文本块合成结果
+
+    Returns:
+        合并后的句子列表; 任一文本块缺少单词边界时返回 None (需回退到 ASR)
+    """
+    sentences: list[SentenceInfo] = []
+    offset_ms = 0
+    for result in chunk_results:
+        if not result.sentences:
+            return None
+        for sentence in result.sentences:
+            sentences.append(
+                sentence.model_copy(
+                    update={
+                        "start": sentence.start + offset_ms,
+                        "end": sentence.end + offset_ms,
+                    }
+                )
+            )
+        offset_ms += result.duration_ms
+    return sentences
+
+
+@dataclass
+class _PooledSynthesizer:
+    """可复用的合成器及其本次合成收集到的单词边界."""
+
+    synthesizer: "speechsdk.SpeechSynthesizer"
+    boundaries: list[WordBoundary] = field(default_factory=list)
+
 
 class AzureTTSService:
     """Azure TTS 语音合成服务."""
@@ -42,16 +123,12 @@ class AzureTTSService:
         self.endpoint = endpoint or config.AZURE_SPEECH_ENDPOINT
 
         # 初始化 Speech Config
-        if self.endpoint:
-            self.speech_config = speechsdk.SpeechConfig(
-                subscription=self.speech_key,
-                endpoint=self.endpoint,
-            )
-        else:
-            self.speech_config = speechsdk.SpeechConfig(
-                subscription=self.speech_key,
-                region=self.service_region,
-            )
+        self.speech_config = self._create_speech_config()
+
+        # 按 (语音, 输出采样率) 复用合成器, 避免每次合成重新建立连接
+        self.max_idle_synthesizers = config.TTS_SYNTHESIZER_POOL_SIZE
+        self._idle_synthesizers: dict[tuple[str, int], list[_PooledSynthesizer]] = {}
+        self._pool_lock = threading.Lock()
 
         # 初始化繁体转简体转换器
         self._opencc_t2s = OpenCC("t2s")
@@ -61,6 +138,25 @@ class AzureTTSService:
             f"Endpoint: {self.endpoint or 'default'}"
         )
 
+    def _create_speech_config(self) -> "speechsdk.SpeechConfig":
+        """
+        创建 Speech Config.
+
+        每个合成器使用独立的配置对象, 避免不同语音和输出格式互相覆盖.
+
+        Returns:
+            Speech Config 实例
+        """
+        if self.endpoint:
+            return speechsdk.SpeechConfig(
+                subscription=self.speech_key,
+                endpoint=self.endpoint,
+            )
+        return speechsdk.SpeechConfig(
+            subscription=self.speech_key,
+            region=self.service_region,
+        )
+
     def synthesize_speech(
         self,
         text: str,
@@ -86,23 +182,54 @@ class AzureTTSService:
         Returns:
             成功返回 True, 失败返回 False
         """
+        return (
+            self.synthesize_with_timings(
+                text,
+                audio_save_file,
+                voice=voice,
+                format=format,
+                sample_rate=sample_rate,
+                volume=volume,
+                speech_rate=speech_rate,
+            )
+            is not None
+        )
+
+    def synthesize_with_timings(
+        self,
+        text: str,
+        audio_save_file: str,
+        voice: str = "zh-CN-XiaoxiaoNeural",
+        format: str = "wav",
+        sample_rate: int = 16000,
+        volume: int = 50,
+        speech_rate: float = 1.0,
+    ) -> Optional[ChunkSynthesisResult]:
+        """
+        合成语音并保存到文件, 同时记录 Azure 单词边界事件生成的句子时间轴.
+
+        Args:
+            text: 要合成的文本
+            audio_save_file: 音频保存路径
+            voice: 语音模型
+            format: 输出音频格式 (目前仅支持 wav)
+            sample_rate: 目标采样率
+            volume: 音量调整 (0-100)
+            speech_rate: 语速倍数
+
+        Returns:
+            合成结果 (句子时间已扣除修剪掉的首部静音), 失败返回 None
+
+        Note:
+            该方法线程安全, 可在线程池中并发调用.
+        """
         try:
             # 文本预处理
             processed_text = self._preprocess_text(text, voice)
 
-            # 配置语音和输出格式
-            self.speech_config.speech_synthesis_voice_name = voice
-
-            if format.lower() == "wav":
-                self.speech_config.set_speech_synthesis_output_format(
-                    speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
-                )
-            else:
+            if format.lower() != "wav":
                 logger.warning(
-                    f"格式 '{format}' 不支持后处理, 使用 Riff16Khz16BitMonoPcm"
-                )
-                self.speech_config.set_speech_synthesis_output_format(
-                    speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
+                    f"格式 '{format}' 不支持后处理, 输出 16 位 PCM WAV"
                 )
 
             # 构建 SSML 文本
@@ -110,32 +237,32 @@ class AzureTTSService:
                 processed_text, voice, volume, speech_rate
             )
 
-            # 创建临时文件
-            temp_audio_file = None
-            success = False
+            synthesis_rate = self._synthesis_sample_rate(sample_rate)
+            pool_key = (voice, synthesis_rate)
+            pooled = self._acquire_synthesizer(voice, synthesis_rate)
+            reusable = False
+            chunk_result = None
 
             try:
-                with tempfile.NamedTemporaryFile(
-                    suffix=".wav", delete=False
-                ) as tmp_file:
-                    temp_audio_file = tmp_file.name
-
-                # 执行语音合成
-                audio_config = speechsdk.AudioConfig(
-                    filename=temp_audio_file
-                )
-                speech_synthesizer = speechsdk.SpeechSynthesizer(
-                    speech_config=self.speech_config,
-                    audio_config=audio_config,
-                )
-
-                result = speech_synthesizer.speak_ssml_async(ssml_text).get()
+                # 合成结果直接保存在内存中 (audio_config=None), 不经过临时文件
+                result = pooled.synthesizer.speak_ssml_async(ssml_text).get()
 
                 if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+                    reusable = True
+                    samples = pcm16_to_float(result.audio_data)
                     # 后处理音频
-                    success = self._postprocess_audio(
-                        temp_audio_file, audio_save_file, sample_rate
+                    timing = self._postprocess_audio(
+                        samples, synthesis_rate, audio_save_file, sample_rate
                     )
+                    if timing is not None:
+                        trim_offset_ms, duration_ms = timing
+                        chunk_result = ChunkSynthesisResult(
+                            audio_file=audio_save_file,
+                            duration_ms=duration_ms,
+                            sentences=self._build_sentences(
+                                pooled.boundaries, trim_offset_ms, duration_ms
+                            ),
+                        )
                 elif result.reason == speechsdk.ResultReason.Canceled:
                     cancellation_details = result.cancellation_details
                     logger.error(
@@ -149,38 +276,25 @@ class AzureTTSService:
                         logger.error(
                             "请确保订阅密钥和区域配置正确"
                         )
-                    success = False
                 else:
                     error_msg = f"Azure TTS 合成失败: {result.reason}"
                     logger.error(error_msg)
-                    success = False
 
             except (SystemExit, KeyboardInterrupt):
                 # 系统退出异常，不捕获，直接抛出
                 raise
-            except (OSError, IOError) as e:
-                # 文件IO错误
-                logger.error(f"[synthesize] 文件IO错误: {e}", exc_info=True)
-                success = False
             except (RuntimeError, ValueError) as e:
                 # 运行时错误或参数错误
                 logger.error(f"[synthesize] 运行时错误: {e}", exc_info=True)
-                success = False
             except Exception as e:
                 # 其他异常（Azure TTS API错误等）
                 logger.exception(f"[synthesize] 语音合成过程中发生错误: {e}")
-                success = False
             finally:
-                # 清理临时文件
-                if temp_audio_file and os.path.exists(temp_audio_file):
-                    try:
-                        os.remove(temp_audio_file)
-                    except OSError as e:
-                        logger.warning(
-                            f"无法删除临时文件 {temp_audio_file}: {e}"
-                        )
+                # 合成失败的实例可能处于异常连接状态, 不放回池中
+                if reusable:
+                    self._release_synthesizer(pool_key, pooled)
 
-            return success
+            return chunk_result
 
         except (SystemExit, KeyboardInterrupt):
             # 系统退出异常，不捕获，直接抛出
@@ -188,7 +302,172 @@ class AzureTTSService:
         except Exception as e:
             # 其他未预期的异常
             logger.exception(f"[synthesize] 合成语音时发生未预期的错误: {e}")
-            return False
+            return None
+
+    @staticmethod
+    def _synthesis_sample_rate(target_sample_rate: int) -> int:
+        """
+        选择合成采样率: 优先直接请求目标采样率, 省去重采样.
+
+        Args:
+            target_sample_rate: 目标采样率
+
+        Returns:
+            Azure 输出格式的采样率
+        """
+        if target_sample_rate in _RAW_PCM_FORMATS:
+            return target_sample_rate
+        return _FALLBACK_SYNTHESIS_RATE
+
+    def _create_synthesizer(
+        self, voice: str, synthesis_rate: int
+    ) -> _PooledSynthesizer:
+        """
+        创建输出到内存的合成器, 单词边界事件写入池化条目自身的列表.
+
+        Args:
+            voice: 语音模型
+            synthesis_rate: 输出采样率 (须在 _RAW_PCM_FORMATS 中)
+
+        Returns:
+            池化的合成器
+        """
+        speech_config = self._create_speech_config()
+        speech_config.speech_synthesis_voice_name = voice
+        speech_config.set_speech_synthesis_output_format(
+            getattr(
+                speechsdk.SpeechSynthesisOutputFormat,
+                _RAW_PCM_FORMATS[synthesis_rate],
+            )
+        )
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config,
+            audio_config=None,
+        )
+        pooled = _PooledSynthesizer(synthesizer)
+        synthesizer.synthesis_word_boundary.connect(
+            lambda evt: pooled.boundaries.append(self._to_word_boundary(evt))
+        )
+        logger.debug(f"创建合成器: voice={voice}, sample_rate={synthesis_rate}")
+        return pooled
+
+    def _acquire_synthesizer(
+        self, voice: str, synthesis_rate: int
+    ) -> _PooledSynthesizer:
+        """
+        取出一个空闲合成器 (同一实例同一时间只被一个线程使用), 没有则新建.
+
+        Args:
+            voice: 语音模型
+            synthesis_rate: 输出采样率
+
+        Returns:
+            池化的合成器
+        """
+        with self._pool_lock:
+            idle = self._idle_synthesizers.get((voice, synthesis_rate))
+            pooled = idle.pop() if idle else None
+        if pooled is None:
+            pooled = self._create_synthesizer(voice, synthesis_rate)
+        pooled.boundaries.clear()
+        return pooled
+
+    def _release_synthesizer(
+        self, key: tuple[str, int], pooled: _PooledSynthesizer
+    ) -> None:
+        """
+        归还合成器, 每个 (语音, 采样率) 最多保留 max_idle_synthesizers 个空闲实例.
+
+        Args:
+            key: (语音模型, 输出采样率)
+            pooled: 池化的合成器
+        """
+        with self._pool_lock:
+            idle = self._idle_synthesizers.setdefault(key, [])
+            if len(idle) < self.max_idle_synthesizers:
+                idle.append(pooled)
+
+    @staticmethod
+    def _to_word_boundary(evt) -> WordBoundary:
+        """
+        将 Azure 单词边界事件转换为 WordBoundary.
+
+        Args:
+            evt: SpeechSynthesisWordBoundaryEventArgs
+
+        Returns:
+            单词边界
+        """
+        duration = getattr(evt, "duration", None)
+        duration_ms = duration.total_seconds() * 1000 if duration is not None else 0.0
+        # boundary_type 仅在较新的 SDK 版本中提供
+        boundary_type = getattr(evt, "boundary_type", None)
+        is_punctuation = (
+            boundary_type is not None
+            and boundary_type == speechsdk.SpeechSynthesisBoundaryType.Punctuation
+        )
+        return WordBoundary(
+            text=evt.text,
+            offset_ms=evt.audio_offset / _TICKS_PER_MILLISECOND,
+            duration_ms=duration_ms,
+            is_punctuation=is_punctuation,
+        )
+
+    @staticmethod
+    def _build_sentences(
+        boundaries: list[WordBoundary],
+        trim_offset_ms: float,
+        duration_ms: int,
+    ) -> list[SentenceInfo]:
+        """
+        按断句标点将单词边界合并为句子.
+
+        Args:
+            boundaries: 单词边界列表 (按时间顺序)
+            trim_offset_ms: 后处理时修剪掉的首部静音时长
+            duration_ms: 后处理后的音频时长
+
+        Returns:
+            句子信息列表 (时间相对于后处理后的音频起点)
+        """
+        sentences: list[SentenceInfo] = []
+        words: list[WordBoundary] = []
+
+        def clamp(value: float) -> int:
+            return int(min(max(value - trim_offset_ms, 0), duration_ms))
+
+        def flush() -> None:
+            if not words:
+                return
+            raw_text = ""
+            for word in words:
+                # 相邻的字母数字单词之间补空格 (如英文)
+                if _is_ascii_alnum(raw_text[-1:]) and _is_ascii_alnum(word.text[:1]):
+                    raw_text += " "
+                raw_text += word.text
+            sentences.append(
+                SentenceInfo(
+                    start=clamp(words[0].offset_ms),
+                    end=clamp(words[-1].offset_ms + words[-1].duration_ms),
+                    raw_text=raw_text,
+                )
+            )
+            words.clear()
+
+        for boundary in boundaries:
+            text = boundary.text.strip()
+            if not text:
+                continue
+            if boundary.is_punctuation or all(
+                ch in _SENTENCE_BREAK_PUNCTUATION for ch in text
+            ):
+                if any(ch in _SENTENCE_BREAK_PUNCTUATION for ch in text):
+                    flush()
+                continue
+            words.append(WordBoundary(text, boundary.offset_ms, boundary.duration_ms))
+        flush()
+
+        return sentences
 
     def _preprocess_text(self, text: str, voice: str) -> str:
         """
@@ -219,7 +498,6 @@ class AzureTTSService:
         text = text.strip()
 
         # 移除零宽字符和特殊控制字符（保留常用标点）
-        import re
         text = re.sub(r'[\u200b-\u200d\ufeff]', '', text)  # 移除零宽字符
 
         return text
@@ -268,59 +546,28 @@ class AzureTTSService:
 
     def _postprocess_audio(
         self,
-        input_file: str,
+        samples: np.ndarray,
+        sample_rate: int,
         output_file: str,
         target_sample_rate: int,
-    ) -> bool:
+    ) -> Optional[tuple[float, int]]:
         """
-        后处理音频: 修剪静音、重采样.
+        后处理音频: 修剪静音、重采样, 并写入输出文件.
 
         Args:
-            input_file: 输入音频文件
+            samples: 合成的 float32 单声道音频
+            sample_rate: 合成采样率
             output_file: 输出音频文件
             target_sample_rate: 目标采样率
 
         Returns:
-            成功返回 True, 失败返回 False
+            (修剪掉的首部静音毫秒数, 输出音频毫秒数), 失败返回 None
         """
         try:
-            # 确保输出目录存在
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # 读取音频
-            data, original_sample_rate = sf.read(input_file)
-
-            # 确保数据是 numpy 数组
-            if not isinstance(data, np.ndarray):
-                data = np.array(data)
-
-            # 处理立体声转单声道（如果需要）
-            if len(data.shape) > 1 and data.shape[1] > 1:
-                data = np.mean(data, axis=1)
-
-            # 修剪静音（设置合适的阈值）
-            trimmed_data, _ = librosa.effects.trim(
-                data, top_db=20, frame_length=2048, hop_length=512
+            processed_data, trim_offset_ms = postprocess_audio(
+                samples, sample_rate, target_sample_rate
             )
 
-            # 重采样
-            if original_sample_rate != target_sample_rate:
-                duration = len(trimmed_data) / original_sample_rate
-                new_num_frames = int(duration * target_sample_rate)
-                processed_data = resample(trimmed_data, new_num_frames)
-                # 归一化到 [-1, 1] 范围
-                max_val = np.abs(processed_data).max()
-                if max_val > 0:
-                    processed_data = processed_data / max_val
-                processed_data = processed_data.astype(np.float32)
-            else:
-                processed_data = trimmed_data.astype(np.float32)
-                # 归一化
-                max_val = np.abs(processed_data).max()
-                if max_val > 0:
-                    processed_data = processed_data / max_val
-
             # 保存音频（确保输出目录存在）
             output_path = Path(output_file)
             output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -329,24 +576,21 @@ class AzureTTSService:
                 f"音频后处理完成: {output_file}, "
                 f"采样率: {target_sample_rate}Hz"
             )
-            return True
+            duration_ms = int(len(processed_data) * 1000 / target_sample_rate)
+            return trim_offset_ms, duration_ms
 
-        except FileNotFoundError:
-            logger.error(f"临时音频文件未找到: {input_file}")
-            return False
         except (SystemExit, KeyboardInterrupt):
             # 系统退出异常，不捕获，直接抛出
             raise
         except (OSError, IOError, PermissionError) as e:
             # 文件系统错误
             logger.error(f"[post_process_audio] 文件系统错误: {e}", exc_info=True)
-            return False
+            return None
         except (ValueError, RuntimeError) as e:
             # 音频处理错误（格式错误、处理失败等）
             logger.error(f"[post_process_audio] 音频处理错误: {e}", exc_info=True)
-            return False
+            return None
         except Exception as e:
             # 其他未预期的异常
             logger.exception(f"[post_process_audio] 音频后处理时发生错误: {e}")
-            return False
-
+            return None
@@ -0,0 +1,160 @@
+"""合成音频后处理: 静音修剪、多相重采样与归一化.
+
+全部为纯函数, 输入输出都是 NumPy 数组, 不依赖文件与 Azure SDK,
+可以直接对录制好的 WAV 离线基准测试.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+from scipy.signal import resample_poly
+
+# 与原 librosa.effects.trim 调用参数保持一致
+DEFAULT_TOP_DB = 20.0
+DEFAULT_FRAME_LENGTH = 2048
+DEFAULT_HOP_LENGTH = 512
+
+_AMIN = 1e-10
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """
+    将 16 位小端单声道 PCM 字节转换为 [-1, 1) 的 float32 数组.
+
+    Args:
+        pcm: 原始 PCM 字节 (不含 RIFF 头)
+
+    Returns:
+        float32 采样数组
+    """
+    samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype="<i2")
+    return samples.astype(np.float32) / 32768.0
+
+
+def to_mono(data: np.ndarray) -> np.ndarray:
+    """
+    多声道音频 (形状 [采样数, 声道数]) 取均值转换为单声道.
+
+    Args:
+        data: 音频数组
+
+    Returns:
+        单声道音频数组
+    """
+    if data.ndim > 1 and data.shape[1] > 1:
+        return data.mean(axis=1)
+    return data.reshape(-1)
+
+
+def trim_silence(
+    data: np.ndarray,
+    top_db: float = DEFAULT_TOP_DB,
+    frame_length: int = DEFAULT_FRAME_LENGTH,
+    hop_length: int = DEFAULT_HOP_LENGTH,
+) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    修剪首尾静音, 结果与 librosa.effects.trim 一致.
+
+    以居中分帧的 RMS 能量相对于最大帧能量的分贝数判断, 低于 -top_db 的帧视为静音.
+    帧能量通过平方和的前缀和一次算出, 不构造分帧矩阵.
+
+    Args:
+        data: 单声道音频数组
+        top_db: 静音阈值 (相对最大帧能量的分贝数)
+        frame_length: 帧长
+        hop_length: 帧移
+
+    Returns:
+        (修剪后的音频, (起始采样, 结束采样))
+    """
+    if data.size == 0:
+        return data, (0, 0)
+
+    pad = frame_length // 2
+    squared = np.pad(np.square(data, dtype=np.float64), pad)
+    cumulative = np.concatenate(([0.0], np.cumsum(squared)))
+    n_frames = 1 + (squared.size - frame_length) // hop_length
+    starts = np.arange(n_frames) * hop_length
+    power = (cumulative[starts + frame_length] - cumulative[starts]) / frame_length
+
+    power_db = 10.0 * np.log10(np.maximum(power, _AMIN))
+    ref_db = 10.0 * np.log10(max(power.max(), _AMIN))
+    non_silent = np.flatnonzero(power_db - ref_db > -top_db)
+    if non_silent.size == 0:
+        return data[:0], (0, 0)
+
+    start = int(non_silent[0] * hop_length)
+    end = int(min(data.shape[0], (non_silent[-1] + 1) * hop_length))
+    return data[start:end], (start, end)
+
+
+def resample(data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    多相滤波重采样 (resample_poly), 采样率相同时原样返回.
+
+    Args:
+        data: 单声道音频数组
+        orig_sr: 原采样率
+        target_sr: 目标采样率
+
+    Returns:
+        重采样后的音频数组
+    """
+    if orig_sr == target_sr or data.size == 0:
+        return data
+    ratio = Fraction(target_sr, orig_sr)
+    return resample_poly(data, ratio.numerator, ratio.denominator)
+
+
+def normalize_peak(data: np.ndarray) -> np.ndarray:
+    """
+    峰值归一化到 [-1, 1] 并转换为 float32.
+
+    Args:
+        data: 音频数组
+
+    Returns:
+        归一化后的 float32 数组
+    """
+    data = data.astype(np.float32, copy=False)
+    if data.size == 0:
+        return data
+    max_val = float(np.abs(data).max())
+    if max_val > 0:
+        data = data / max_val
+    return data
+
+
+def postprocess_audio(
+    data: np.ndarray,
+    sample_rate: int,
+    target_sample_rate: int,
+    top_db: float = DEFAULT_TOP_DB,
+) -> tuple[np.ndarray, float]:
+    """
+    完整后处理流程: 转单声道、修剪静音、重采样、峰值归一化.
+
+    Args:
+        data: 音频数组 (单声道或 [采样数, 声道数])
+        sample_rate: 输入采样率
+        target_sample_rate: 目标采样率
+        top_db: 静音阈值
+
+    Returns:
+        (目标采样率下的 float32 音频, 修剪掉的首部静音毫秒数)
+    """
+    mono = to_mono(np.asarray(data))
+    trimmed, (start, _) = trim_silence(mono, top_db=top_db)
+    trim_offset_ms = start * 1000 / sample_rate
+    processed = resample(trimmed, sample_rate, target_sample_rate)
+    return normalize_peak(processed), trim_offset_ms
+
+
+__all__ = [
+    "normalize_peak",
+    "pcm16_to_float",
+    "postprocess_audio",
+    "resample",
+    "to_mono",
+    "trim_silence",
+]
@@ -5,18 +5,28 @@
 - AudioCombiner: 组合多个音频段
 - SRTGenerator: 生成SRT字幕文件
 - BatchSynthesisService: 编排整个批量合成流程
+- SegmentCache: 复用已合成的音频段
+- AdaptiveConcurrencyLimiter: 根据后端延迟自适应调整并发数
 """
 
-from .combiner import AudioCombiner
-from .service import BatchSynthesisService
+from .combiner import AudioCombiner, CombinedAudio, SegmentTiming
+from .concurrency import AdaptiveConcurrencyLimiter
+from .segment_cache import SegmentCache
+from .service import BatchSynthesisResult, BatchSynthesisService, SegmentResult
 from .srt_generator import SRTGenerator, format_time
 from .synthesizer import AudioSegmentSynthesizer
 
 __all__ = [
     "AudioSegmentSynthesizer",
     "AudioCombiner",
+    "CombinedAudio",
+    "SegmentTiming",
     "SRTGenerator",
     "format_time",
     "BatchSynthesisService",
+    "BatchSynthesisResult",
+    "SegmentResult",
+    "SegmentCache",
+    "AdaptiveConcurrencyLimiter",
 ]
 
@@ -1,10 +1,18 @@
 """音频组合器
 
 负责将多个音频段组合成完整的音频文件。
+
+所有音频段只解码一次为 NumPy 数组（统一采样率和声道数），预先计算每段的
+输出偏移量并写入一个预分配的缓冲区，静音和交叉淡化都在缓冲区内原地完成，
+总耗时与音频总长度成线性关系。
 """
 
-from typing import List, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
 
+import numpy as np
+import soundfile as sf
 from pydub import AudioSegment
 
 from core.logging_config import setup_logging
@@ -12,21 +20,142 @@ from core.logging_config import setup_logging
 logger = setup_logging("tts.seedvc_server.batch_synthesis.combiner")
 
 
+@dataclass
+class SegmentTiming:
+    """音频段在组合音频中的时间位置"""
+    index: int
+    text: str
+    start_ms: int
+    end_ms: int
+
+    @property
+    def duration_ms(self) -> int:
+        """音频段时长（毫秒）"""
+        return self.end_ms - self.start_ms
+
+
+@dataclass
+class CombinedAudio:
+    """组合后的音频
+
+    Attributes:
+        samples: 形状为 (帧数, 声道数) 的 float32 数组，取值范围 [-1, 1]
+        sample_rate: 采样率
+        timings: 每个音频段的时间位置，与输入顺序一致
+    """
+    samples: np.ndarray
+    sample_rate: int
+    timings: List[SegmentTiming]
+
+    @property
+    def duration_ms(self) -> int:
+        """总时长（毫秒）"""
+        return int(len(self.samples) * 1000 / self.sample_rate) if self.sample_rate else 0
+
+    def to_audio_segment(self) -> AudioSegment:
+        """转换为 16 位 pydub AudioSegment"""
+        pcm = (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16)
+        return AudioSegment(
+            data=pcm.tobytes(),
+            sample_width=2,
+            frame_rate=self.sample_rate,
+            channels=self.samples.shape[1],
+        )
+
+
 class AudioCombiner:
     """音频组合器
-    
+
     负责将多个音频段组合成完整音频，并插入静音间隔。
     """
-    
-    def __init__(self, silence_duration_ms: int = 300):
+
+    def __init__(
+        self,
+        silence_duration_ms: int = 300,
+        crossfade_ms: int = 0,
+        sample_rate: Optional[int] = None,
+    ):
         """
         初始化组合器
-        
+
         Args:
             silence_duration_ms: 段之间的静音时长（毫秒）
+            crossfade_ms: 相邻段之间的交叉淡化时长（毫秒），仅在不插入静音时生效
+            sample_rate: 输出采样率，None 表示使用第一个音频段的采样率
         """
         self.silence_duration_ms = silence_duration_ms
-    
+        self.crossfade_ms = crossfade_ms
+        self.sample_rate = sample_rate
+
+    def combine_to_array(
+        self,
+        segments: List[Tuple[AudioSegment, str]],
+        include_silence: bool = True,
+    ) -> CombinedAudio:
+        """
+        将多个音频段组合到一个预分配的 NumPy 缓冲区
+
+        Args:
+            segments: (音频段, 文本) 元组列表，按顺序排列
+            include_silence: 是否在段之间插入静音
+
+        Returns:
+            组合后的音频及每段的时间位置
+        """
+        if not segments:
+            logger.warning("没有音频段需要组合，返回空音频")
+            sample_rate = self.sample_rate or 0
+            return CombinedAudio(np.zeros((0, 1), dtype=np.float32), sample_rate, [])
+
+        sample_rate = self.sample_rate or segments[0][0].frame_rate
+        channels = max(segment.channels for segment, _ in segments)
+
+        # 每段只解码一次
+        decoded = [self._decode(segment, sample_rate, channels) for segment, _ in segments]
+
+        # 预先计算偏移量
+        gap = int(round(self.silence_duration_ms * sample_rate / 1000)) if include_silence else 0
+        crossfade = 0 if gap else int(round(self.crossfade_ms * sample_rate / 1000))
+
+        starts: List[int] = []
+        overlaps: List[int] = []
+        cursor = 0
+        for i, samples in enumerate(decoded):
+            overlap = 0
+            if i > 0:
+                overlap = min(crossfade, len(decoded[i - 1]), len(samples))
+                cursor += gap - overlap
+            starts.append(cursor)
+            overlaps.append(overlap)
+            cursor += len(samples)
+
+        # 预分配输出缓冲区（静音即为零值，无需单独写入）
+        buffer = np.zeros((cursor, channels), dtype=np.float32)
+        timings: List[SegmentTiming] = []
+
+        for i, (samples, start, overlap) in enumerate(zip(decoded, starts, overlaps)):
+            end = start + len(samples)
+            if overlap:
+                fade_in = np.linspace(0.0, 1.0, overlap, dtype=np.float32)[:, None]
+                head = buffer[start:start + overlap]
+                head *= 1.0 - fade_in
+                head += samples[:overlap] * fade_in
+                buffer[start + overlap:end] = samples[overlap:]
+            else:
+                buffer[start:end] = samples
+            timings.append(
+                SegmentTiming(
+                    index=i,
+                    text=segments[i][1],
+                    start_ms=int(round(start * 1000 / sample_rate)),
+                    end_ms=int(round(end * 1000 / sample_rate)),
+                )
+            )
+
+        combined = CombinedAudio(samples=buffer, sample_rate=sample_rate, timings=timings)
+        logger.info(f"成功组合 {len(segments)} 个音频段，总时长: {combined.duration_ms}ms")
+        return combined
+
     def combine_segments(
         self,
         segments: List[Tuple[AudioSegment, str]],
@@ -34,31 +163,48 @@ class AudioCombiner:
     ) -> AudioSegment:
         """
         组合多个音频段
-        
+
         Args:
             segments: (音频段, 文本) 元组列表，按顺序排列
             include_silence: 是否在段之间插入静音
-            
+
         Returns:
             组合后的音频段
         """
         if not segments:
             logger.warning("没有音频段需要组合，返回空音频")
             return AudioSegment.empty()
-        
-        combined_audio = AudioSegment.empty()
-        
-        for i, (segment_audio, _) in enumerate(segments):
-            combined_audio += segment_audio
-            
-            # 在最后一段之前插入静音
-            if include_silence and i < len(segments) - 1:
-                silence = AudioSegment.silent(duration=self.silence_duration_ms)
-                combined_audio += silence
-        
-        logger.info(f"成功组合 {len(segments)} 个音频段，总时长: {len(combined_audio)}ms")
-        return combined_audio
-    
+        return self.combine_to_array(segments, include_silence).to_audio_segment()
+
+    def combine_and_export(
+        self,
+        segments: List[Tuple[AudioSegment, str]],
+        output_path: str,
+        include_silence: bool = True,
+        format: str = "wav",
+    ) -> List[SegmentTiming]:
+        """
+        组合音频段并一次性写出文件
+
+        Args:
+            segments: (音频段, 文本) 元组列表，按顺序排列
+            output_path: 输出路径
+            include_silence: 是否在段之间插入静音
+            format: 音频格式
+
+        Returns:
+            每个音频段的时间位置（调用方无需再次探测时长）
+        """
+        combined = self.combine_to_array(segments, include_silence)
+        logger.info(f"导出音频文件: {output_path} (格式: {format})")
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        if format.lower() == "wav":
+            sf.write(output_path, combined.samples, combined.sample_rate, subtype="PCM_16")
+        else:
+            combined.to_audio_segment().export(output_path, format=format)
+        logger.debug(f"音频文件导出成功: {output_path}")
+        return combined.timings
+
     def export_audio(
         self,
         audio: AudioSegment,
@@ -67,7 +213,7 @@ class AudioCombiner:
     ) -> None:
         """
         导出音频文件
-        
+
         Args:
             audio: 要导出的音频段
             output_path: 输出路径
@@ -77,3 +223,14 @@ class AudioCombiner:
         audio.export(output_path, format=format)
         logger.debug(f"音频文件导出成功: {output_path}")
 
+    @staticmethod
+    def _decode(segment: AudioSegment, sample_rate: int, channels: int) -> np.ndarray:
+        """将音频段解码为 (帧数, 声道数) 的 float32 数组"""
+        if segment.frame_rate != sample_rate:
+            segment = segment.set_frame_rate(sample_rate)
+        if segment.channels != channels:
+            segment = segment.set_channels(channels)
+
+        scale = float(1 << (8 * segment.sample_width - 1))
+        samples = np.asarray(segment.get_array_of_samples(), dtype=np.float32)
+        return samples.reshape(-1, channels) / scale
@@ -0,0 +1,158 @@
+"""自适应并发限制
+
+根据上游 TTS 后端（EdgeTTS / SeedVC）观测到的请求延迟动态调整并发数：
+延迟接近历史基线时逐步增加并发，延迟明显升高（后端排队）或请求失败时降低并发。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("tts.seedvc_server.batch_synthesis.concurrency")
+
+
+class AdaptiveConcurrencyLimiter:
+    """基于延迟的自适应并发限制器（AIMD）
+
+    - 成功请求更新延迟的指数移动平均值（EWMA）
+    - EWMA 超过基线延迟的 tolerance 倍时并发数减 1
+    - 请求失败时并发数乘以 0.75
+    - 延迟正常且并发已用满时并发数加 1
+    每累计 limit 个样本才调整一次，避免单个慢请求造成抖动。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+    ):
+        """
+        初始化限制器
+
+        Args:
+            initial_limit: 初始并发数
+            min_limit: 最小并发数
+            max_limit: 最大并发数
+            tolerance: 延迟超过基线多少倍视为后端过载
+            smoothing: EWMA 平滑系数
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._samples = 0
+        self._failures = 0
+        self._ewma: Optional[float] = None
+        self._baseline: Optional[float] = None
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """占用一个并发名额（名额不足时阻塞等待）"""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def record(self, latency_seconds: float, success: bool) -> None:
+        """
+        记录一次请求结果
+
+        Args:
+            latency_seconds: 请求耗时（秒）
+            success: 是否成功
+        """
+        with self._cond:
+            if not success:
+                self._failures += 1
+            else:
+                if self._ewma is None:
+                    self._ewma = latency_seconds
+                else:
+                    self._ewma += self.smoothing * (latency_seconds - self._ewma)
+                self._samples += 1
+
+            if self._failures + self._samples < self.limit:
+                return
+
+            old_limit = self.limit
+            if self._failures:
+                self.limit = max(self.min_limit, int(self.limit * 0.75))
+            elif self._ewma is not None:
+                # 基线缓慢上浮，允许后端整体变慢后重新收敛
+                if self._baseline is None:
+                    self._baseline = self._ewma
+                else:
+                    self._baseline = min(self._ewma, self._baseline * 1.05)
+                if self._ewma > self._baseline * self.tolerance:
+                    self.limit = max(self.min_limit, self.limit - 1)
+                elif self._peak_in_flight >= self.limit:
+                    self.limit = min(self.max_limit, self.limit + 1)
+
+            self._samples = 0
+            self._failures = 0
+            self._peak_in_flight = self._in_flight
+            if self.limit != old_limit:
+                logger.info(
+                    f"调整并发数: {old_limit} -> {self.limit} "
+                    f"(延迟EWMA: {self._ewma or 0:.2f}s, 基线: {self._baseline or 0:.2f}s)"
+                )
+                self._cond.notify_all()
+
+    @contextmanager
+    def measure(self) -> Iterator[dict]:
+        """
+        占用名额并记录耗时，调用方在上下文中设置 outcome["success"]
+
+        Yields:
+            结果字典，默认 success=False
+        """
+        outcome = {"success": False}
+        with self.slot():
+            start = time.monotonic()
+            try:
+                yield outcome
+            finally:
+                self.record(time.monotonic() - start, outcome["success"])
+
+
+_limiters: Dict[Tuple[str, int], AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(backend: str, initial_limit: int, max_limit: int) -> AdaptiveConcurrencyLimiter:
+    """
+    获取指定后端的进程级限制器，学习到的并发数在多个批次之间保留
+
+    Args:
+        backend: 后端标识（如 TTS 类型）
+        initial_limit: 首次创建时的并发数
+        max_limit: 最大并发数
+
+    Returns:
+        自适应并发限制器
+    """
+    key = (backend, max_limit)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(initial_limit=initial_limit, max_limit=max_limit)
+            _limiters[key] = limiter
+        return limiter
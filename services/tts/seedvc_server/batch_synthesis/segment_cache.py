@@ -0,0 +1,153 @@
+"""已合成音频段缓存
+
+批量合成部分失败后调用方会重新提交整批文本，已经成功的音频段按
+（文本哈希 + 音色 + 语速等合成参数 + 参考音频内容哈希）复用，避免重复调用上游服务。
+缓存按音频段 PCM 数据的总字节数限制容量（环境变量 BATCH_SYNTHESIS_CACHE_MAX_BYTES）。
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from pydub import AudioSegment
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("tts.seedvc_server.batch_synthesis.segment_cache")
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 默认缓存容量（256MB PCM 数据）
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# (路径, mtime, 大小) -> 内容哈希，参考音频未变化时不重复读取文件
+_reference_hashes: Dict[Tuple[str, int, int], str] = {}
+_reference_hashes_lock = threading.Lock()
+
+
+def reference_audio_fingerprint(path: Optional[str]) -> Optional[str]:
+    """
+    计算参考音频的内容哈希（按路径、mtime、大小记忆）
+
+    同一路径的参考音频被替换后哈希随之变化，旧的音频段不会被误用。
+
+    Args:
+        path: 参考音频路径
+
+    Returns:
+        内容的 SHA-256 哈希；文件不可读时返回原路径
+    """
+    if not path:
+        return path
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return path
+
+    memo_key = (path, stat.st_mtime_ns, stat.st_size)
+    with _reference_hashes_lock:
+        cached = _reference_hashes.get(memo_key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(block)
+    except OSError:
+        return path
+
+    with _reference_hashes_lock:
+        _reference_hashes[memo_key] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+def make_segment_key(text: str, voice: str, **params: Any) -> str:
+    """
+    生成音频段缓存键
+
+    Args:
+        text: 合成文本
+        voice: 语音标识
+        **params: 其他影响合成结果的参数（语速、音量、参考音频内容哈希等）
+
+    Returns:
+        缓存键
+    """
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    payload = json.dumps({"text": text_hash, "voice": voice, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SegmentCache:
+    """进程内 LRU 音频段缓存（线程安全，按 PCM 数据总字节数限制容量）"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 缓存的音频段 PCM 数据总字节数上限
+        """
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, AudioSegment]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[AudioSegment]:
+        """查询缓存，未命中返回 None"""
+        with self._lock:
+            segment = self._entries.get(key)
+            if segment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return segment
+
+    def put(self, key: str, segment: AudioSegment) -> None:
+        """写入缓存（单个音频段超过容量上限时不缓存）"""
+        size = len(segment.raw_data)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= len(previous.raw_data)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = segment
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= len(evicted.raw_data)
+
+    @property
+    def size_bytes(self) -> int:
+        """当前缓存的 PCM 数据总字节数"""
+        with self._lock:
+            return self._size_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_segment_cache: Optional[SegmentCache] = None
+_segment_cache_lock = threading.Lock()
+
+
+def get_segment_cache() -> SegmentCache:
+    """获取进程级音频段缓存单例（环境变量 BATCH_SYNTHESIS_CACHE_MAX_BYTES 控制容量）"""
+    global _segment_cache
+    if _segment_cache is None:
+        with _segment_cache_lock:
+            if _segment_cache is None:
+                max_bytes_env = os.getenv("BATCH_SYNTHESIS_CACHE_MAX_BYTES", "")
+                _segment_cache = SegmentCache(
+                    max_bytes=int(max_bytes_env) if max_bytes_env.isdigit() else DEFAULT_MAX_BYTES
+                )
+    return _segment_cache
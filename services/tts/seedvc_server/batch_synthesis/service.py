@@ -5,17 +5,72 @@
 
 import concurrent.futures
 import os
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+from pydub import AudioSegment
 
 from core.logging_config import setup_logging
 
 from .combiner import AudioCombiner
+from .concurrency import get_concurrency_limiter
+from .segment_cache import (
+    SegmentCache,
+    get_segment_cache,
+    make_segment_key,
+    reference_audio_fingerprint,
+)
 from .srt_generator import SRTGenerator
 from .synthesizer import AudioSegmentSynthesizer
 
 logger = setup_logging("tts.seedvc_server.batch_synthesis.service")
 
+STATUS_SUCCESS = "success"
+STATUS_CACHED = "cached"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class SegmentResult:
+    """单个文本段的合成结果"""
+    index: int
+    text: str
+    status: str
+    audio: Optional[AudioSegment] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """是否得到可用的音频"""
+        return self.status in (STATUS_SUCCESS, STATUS_CACHED)
+
+
+@dataclass
+class BatchSynthesisResult:
+    """批量合成结果（与输入顺序一致）"""
+    items: List[SegmentResult] = field(default_factory=list)
+
+    @property
+    def all_succeeded(self) -> bool:
+        """是否全部成功"""
+        return all(item.ok for item in self.items)
+
+    @property
+    def failed_indices(self) -> List[int]:
+        """失败的文本段索引"""
+        return [item.index for item in self.items if not item.ok]
+
+    @property
+    def cached_count(self) -> int:
+        """复用缓存的文本段数量"""
+        return sum(1 for item in self.items if item.status == STATUS_CACHED)
+
+    def segments(self) -> List[Tuple[AudioSegment, str]]:
+        """按顺序返回成功的 (音频段, 文本) 元组"""
+        return [(item.audio, item.text) for item in self.items if item.ok]
+
 
 class BatchSynthesisService:
     """批量语音合成服务
@@ -33,24 +88,27 @@ class BatchSynthesisService:
         silence_duration_ms: int = 300,
         max_retries: int = 10,
         retry_delay: float = 0.3,
+        max_concurrency: Optional[int] = None,
+        segment_cache: Optional[SegmentCache] = None,
     ):
         """
         初始化服务
         
         Args:
             client: 语音合成客户端
-            max_workers: 最大并发工作线程数
+            max_workers: 初始并发数（之后根据后端延迟自适应调整）
             silence_duration_ms: 段之间的静音时长（毫秒）
-            max_retries: 最大重试次数
-            retry_delay: 重试延迟（秒）
+            max_retries: 每个文本段的最大尝试次数
+            retry_delay: 首次重试延迟（秒），之后指数退避
+            max_concurrency: 自适应并发的上限，默认为 max_workers 的两倍
+            segment_cache: 已合成音频段缓存，None 表示使用进程级单例
         """
         self.client = client
         self.max_workers = max_workers
-        self.synthesizer = AudioSegmentSynthesizer(
-            client=client,
-            max_retries=max_retries,
-            retry_delay=retry_delay,
-        )
+        self.max_concurrency = max_concurrency or max_workers * 2
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.segment_cache = segment_cache or get_segment_cache()
         self.combiner = AudioCombiner(silence_duration_ms=silence_duration_ms)
         self.srt_generator = SRTGenerator(silence_duration_ms=silence_duration_ms)
     
@@ -87,16 +145,103 @@ class BatchSynthesisService:
         Returns:
             (音频段, 文本, 索引) 元组列表，失败返回None
         """
+        result = self.synthesize_batch_detailed(
+            text_list=text_list,
+            reference_audio_path=reference_audio_path,
+            voice=voice,
+            volume=volume,
+            speech_rate=speech_rate,
+            pitch_rate=pitch_rate,
+            tts_type=tts_type,
+            diffusion_steps=diffusion_steps,
+            length_adjust=length_adjust,
+            inference_cfg_rate=inference_cfg_rate,
+            temp_file_prefix=temp_file_prefix,
+        )
+        
+        if not result.all_succeeded:
+            logger.error(
+                f"批量合成部分失败，失败的文本段: {result.failed_indices}"
+                f"（成功的文本段已缓存，重新提交时将直接复用）"
+            )
+            self._cleanup_temp_files(text_list, temp_file_prefix)
+            return None
+        
+        return result.segments()
+    
+    def synthesize_batch_detailed(
+        self,
+        text_list: List[str],
+        reference_audio_path: str,
+        voice: str,
+        volume: int,
+        speech_rate: int,
+        pitch_rate: int,
+        tts_type: Optional[str],
+        diffusion_steps: int,
+        length_adjust: float,
+        inference_cfg_rate: float,
+        temp_file_prefix: str = "temp_segment",
+    ) -> BatchSynthesisResult:
+        """
+        批量合成音频段，返回每个文本段的状态
+        
+        单个文本段失败不会中断其他文本段；成功的文本段写入缓存，
+        相同参数重新提交时直接复用。
+        
+        Args:
+            参数同 synthesize_batch
+            
+        Returns:
+            批量合成结果（与输入顺序一致）
+        """
         logger.info(f"开始批量合成 {len(text_list)} 个文本段")
         
-        results_map = {}
+        # 按参考音频内容而非路径区分，同一路径下替换了参考音频时不会复用旧结果
+        reference_audio = reference_audio_fingerprint(reference_audio_path)
+        keys = [
+            make_segment_key(
+                text,
+                voice,
+                reference_audio=reference_audio,
+                volume=volume,
+                speech_rate=speech_rate,
+                pitch_rate=pitch_rate,
+                tts_type=tts_type,
+                diffusion_steps=diffusion_steps,
+                length_adjust=length_adjust,
+                inference_cfg_rate=inference_cfg_rate,
+            )
+            for text in text_list
+        ]
+        items: List[Optional[SegmentResult]] = [None] * len(text_list)
+        pending: List[int] = []
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [
-                executor.submit(
-                    self.synthesizer.synthesize_segment,
-                    i,
-                    text,
+        for i, text in enumerate(text_list):
+            cached = self.segment_cache.get(keys[i])
+            if cached is not None:
+                items[i] = SegmentResult(index=i, text=text, status=STATUS_CACHED, audio=cached)
+            else:
+                pending.append(i)
+        
+        if pending:
+            limiter = get_concurrency_limiter(
+                tts_type or "default",
+                initial_limit=self.max_workers,
+                max_limit=self.max_concurrency,
+            )
+            synthesizer = AudioSegmentSynthesizer(
+                client=self.client,
+                max_retries=self.max_retries,
+                retry_delay=self.retry_delay,
+                limiter=limiter,
+            )
+            
+            def run(index: int) -> SegmentResult:
+                start_time = time.time()
+                segment_audio, text_content, _ = synthesizer.synthesize_segment(
+                    index,
+                    text_list[index],
                     reference_audio_path,
                     voice,
                     volume,
@@ -108,30 +253,31 @@ class BatchSynthesisService:
                     inference_cfg_rate,
                     temp_file_prefix,
                 )
-                for i, text in enumerate(text_list)
-            ]
+                return SegmentResult(
+                    index=index,
+                    text=text_content,
+                    status=STATUS_SUCCESS if segment_audio else STATUS_FAILED,
+                    audio=segment_audio,
+                    elapsed_seconds=time.time() - start_time,
+                )
             
-            for future in concurrent.futures.as_completed(futures):
-                segment_audio, text_content, original_index = future.result()
-                
-                if segment_audio:
-                    results_map[original_index] = (segment_audio, text_content)
-                else:
-                    logger.error(
-                        f"音频段 {original_index} 合成失败: '{text_content[:50]}...'"
-                    )
-                    # 清理临时文件
-                    self._cleanup_temp_files(text_list, temp_file_prefix)
-                    return None
-        
-        # 按原始顺序排列结果
-        sorted_results = [
-            results_map[i] for i in range(len(text_list))
-            if i in results_map
-        ]
+            # 线程数取并发上限，实际并发由自适应限制器控制
+            with concurrent.futures.ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+                for item in executor.map(run, pending):
+                    items[item.index] = item
+                    if item.ok:
+                        self.segment_cache.put(keys[item.index], item.audio)
+                    else:
+                        logger.error(
+                            f"音频段 {item.index} 合成失败: '{item.text[:50]}...'"
+                        )
         
-        logger.info(f"批量合成完成，成功合成 {len(sorted_results)}/{len(text_list)} 个音频段")
-        return sorted_results
+        result = BatchSynthesisResult(items=items)
+        logger.info(
+            f"批量合成完成，成功 {len(text_list) - len(result.failed_indices)}/{len(text_list)} 个音频段"
+            f"（复用缓存 {result.cached_count} 个）"
+        )
+        return result
     
     def _cleanup_temp_files(self, text_list: List[str], prefix: str) -> None:
         """清理临时文件"""
@@ -209,15 +355,12 @@ class BatchSynthesisService:
             logger.error("批量合成失败，无法生成音频和SRT")
             return None
         
-        # 组合音频
-        combined_audio = self.combiner.combine_segments(segments)
-        
-        # 导出音频文件
+        # 组合并导出音频（同时得到每段的时间位置）
         output_audio_path = f"{output_base_name}.wav"
-        self.combiner.export_audio(combined_audio, output_audio_path)
+        timings = self.combiner.combine_and_export(segments, output_audio_path)
         
         # 生成SRT文件
-        srt_entries = self.srt_generator.generate_srt_entries(segments)
+        srt_entries = self.srt_generator.generate_srt_entries_from_timings(timings)
         output_srt_path = f"{output_base_name}.srt"
         self.srt_generator.write_srt_file(srt_entries, output_srt_path)
         
@@ -3,12 +3,15 @@
 负责生成SRT格式的字幕文件。
 """
 
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Tuple
 
 from pydub import AudioSegment
 
 from core.logging_config import setup_logging
 
+if TYPE_CHECKING:
+    from .combiner import SegmentTiming
+
 logger = setup_logging("tts.seedvc_server.batch_synthesis.srt_generator")
 
 
@@ -84,6 +87,26 @@ class SRTGenerator:
         logger.info(f"生成 {len(srt_entries)} 个SRT条目")
         return srt_entries
     
+    def generate_srt_entries_from_timings(
+        self,
+        timings: List["SegmentTiming"],
+    ) -> List[str]:
+        """
+        根据组合器返回的时间位置生成SRT条目（无需重新计算音频时长）
+        
+        Args:
+            timings: AudioCombiner 返回的音频段时间位置列表
+            
+        Returns:
+            SRT条目字符串列表
+        """
+        srt_entries = [
+            f"{i + 1}\n{format_time(timing.start_ms)} --> {format_time(timing.end_ms)}\n{timing.text}\n"
+            for i, timing in enumerate(timings)
+        ]
+        logger.info(f"生成 {len(srt_entries)} 个SRT条目")
+        return srt_entries
+    
     def write_srt_file(
         self,
         srt_entries: List[str],
@@ -4,6 +4,7 @@
 """
 
 import os
+import random
 import time
 from typing import Optional, Tuple
 
@@ -11,6 +12,8 @@ from pydub import AudioSegment
 
 from core.logging_config import setup_logging
 
+from .concurrency import AdaptiveConcurrencyLimiter
+
 logger = setup_logging("tts.seedvc_server.batch_synthesis.synthesizer")
 
 
@@ -25,6 +28,8 @@ class AudioSegmentSynthesizer:
         client,
         max_retries: int = 10,
         retry_delay: float = 0.3,
+        max_retry_delay: float = 5.0,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
     ):
         """
         初始化合成器
@@ -32,11 +37,28 @@ class AudioSegmentSynthesizer:
         Args:
             client: 语音合成客户端实例
             max_retries: 最大重试次数
-            retry_delay: 重试延迟（秒）
+            retry_delay: 首次重试延迟（秒），之后按指数退避
+            max_retry_delay: 重试延迟上限（秒）
+            limiter: 自适应并发限制器（可选），每次请求上游前占用名额并上报延迟
         """
         self.client = client
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.limiter = limiter
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间（指数退避 + 抖动）"""
+        delay = min(self.retry_delay * (2 ** attempt), self.max_retry_delay)
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _call_client(self, **kwargs) -> bool:
+        """调用合成客户端，启用限制器时占用并发名额并记录延迟"""
+        if self.limiter is None:
+            return self.client.synthesize_voice(**kwargs)
+        with self.limiter.measure() as outcome:
+            outcome["success"] = bool(self.client.synthesize_voice(**kwargs))
+            return outcome["success"]
     
     def synthesize_segment(
         self,
@@ -81,7 +103,7 @@ class AudioSegmentSynthesizer:
                 f"(尝试 {attempt + 1}/{self.max_retries})"
             )
             
-            success = self.client.synthesize_voice(
+            success = self._call_client(
                 text=text,
                 audio_file_path=reference_audio_path,
                 voice=voice,
@@ -130,7 +152,7 @@ class AudioSegmentSynthesizer:
                 os.remove(temp_audio_file)
             
             if attempt < self.max_retries - 1:
-                time.sleep(self.retry_delay)
+                time.sleep(self._backoff_delay(attempt))
         
         logger.error(
             f"音频段 {index+1} 合成失败，已达最大重试次数: '{text[:50]}...'"
@@ -0,0 +1,274 @@
+"""
+SeedVC参考音色特征缓存模块
+缓存参考音频侧的特征张量（语义特征、说话人嵌入、Mel频谱、prompt条件），
+同一参考音色的重复转换请求无需再次运行特征提取模型
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("tts.seedvc_server.reference_cache")
+
+# 缓存格式版本，特征提取逻辑变化时递增以使旧的磁盘缓存失效
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 16
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ReferenceFeatures:
+    """参考音频侧的特征张量
+
+    Attributes:
+        S_ori: 参考音频语义特征
+        style2: 说话人风格嵌入（CAMPPlus）
+        mel2: 参考音频Mel频谱
+        prompt_condition: 参考音频经长度调节后的prompt条件
+        F0_ori: 参考音频F0（仅在启用F0条件时存在）
+    """
+    S_ori: torch.Tensor
+    style2: torch.Tensor
+    mel2: torch.Tensor
+    prompt_condition: torch.Tensor
+    F0_ori: Optional[torch.Tensor] = None
+
+    def to(self, device: torch.device) -> "ReferenceFeatures":
+        """将所有张量移动到指定设备"""
+        return ReferenceFeatures(
+            S_ori=self.S_ori.to(device),
+            style2=self.style2.to(device),
+            mel2=self.mel2.to(device),
+            prompt_condition=self.prompt_condition.to(device),
+            F0_ori=self.F0_ori.to(device) if self.F0_ori is not None else None,
+        )
+
+    def to_dict(self) -> Dict[str, Optional[torch.Tensor]]:
+        """转换为可被 torch.save 序列化的字典"""
+        return {
+            "S_ori": self.S_ori,
+            "style2": self.style2,
+            "mel2": self.mel2,
+            "prompt_condition": self.prompt_condition,
+            "F0_ori": self.F0_ori,
+        }
+
+
+@dataclass
+class ReferenceCacheStats:
+    """缓存统计信息"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    time_saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率"""
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+
+def hash_file(path: str) -> str:
+    """计算文件内容的 SHA-256 哈希
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        十六进制哈希字符串
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_reference_cache_key(ref_path: str, model_version: Optional[str] = None, **settings: Any) -> str:
+    """生成参考特征缓存键
+
+    Args:
+        ref_path: 参考音频文件路径（按内容哈希，与文件名无关）
+        model_version: 特征提取模型的版本标识（检查点路径 + mtime），
+                       更换模型后旧的特征不会被复用
+        **settings: 影响参考特征的设置（采样率、F0条件等）
+
+    Returns:
+        缓存键
+    """
+    payload = json.dumps(
+        {
+            "version": CACHE_FORMAT_VERSION,
+            "model": model_version,
+            "audio": hash_file(ref_path),
+            "settings": settings,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReferenceFeatureCache:
+    """参考音色特征缓存
+
+    内存层为 LRU（按条目数限制），可选磁盘层使用 torch.save 持久化，
+    进程重启后仍可命中。每个条目记录首次计算耗时，命中时累计节省的时间。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 内存中最多保留的参考音色数量
+            cache_dir: 磁盘缓存目录，None 表示仅使用内存缓存
+        """
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, Tuple[ReferenceFeatures, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = ReferenceCacheStats()
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str, device: torch.device) -> Optional[ReferenceFeatures]:
+        """查询缓存
+
+        Args:
+            key: 缓存键
+            device: 目标计算设备
+
+        Returns:
+            命中时返回特征，否则返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                features, compute_seconds = entry
+                self._stats.memory_hits += 1
+                self._stats.time_saved_seconds += compute_seconds
+                return features.to(device)
+
+        entry = self._load_from_disk(key, device)
+        with self._lock:
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            features, compute_seconds = entry
+            self._stats.disk_hits += 1
+            self._stats.time_saved_seconds += compute_seconds
+            self._remember(key, features, compute_seconds)
+        return features
+
+    def put(self, key: str, features: ReferenceFeatures, compute_seconds: float) -> None:
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            features: 参考特征
+            compute_seconds: 计算这些特征的耗时（用于统计节省的时间）
+        """
+        with self._lock:
+            self._remember(key, features, compute_seconds)
+        self._save_to_disk(key, features, compute_seconds)
+
+    def get_stats(self) -> ReferenceCacheStats:
+        """获取统计信息快照"""
+        with self._lock:
+            return ReferenceCacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        """清空内存缓存（磁盘缓存保留）"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, features: ReferenceFeatures, compute_seconds: float) -> None:
+        self._entries[key] = (features, compute_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pt"
+
+    def _load_from_disk(
+        self, key: str, device: torch.device
+    ) -> Optional[Tuple[ReferenceFeatures, float]]:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            payload = torch.load(path, map_location=device)
+            return ReferenceFeatures(**payload["features"]), float(payload["compute_seconds"])
+        except (SystemExit, KeyboardInterrupt):
+            # 系统退出异常，不捕获，直接抛出
+            raise
+        except Exception as e:
+            # 损坏的缓存文件视为未命中
+            logger.warning(f"读取参考特征磁盘缓存失败，忽略: {path}, 错误: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, features: ReferenceFeatures, compute_seconds: float) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            cpu_features = features.to(torch.device("cpu"))
+            torch.save(
+                {"features": cpu_features.to_dict(), "compute_seconds": compute_seconds},
+                tmp_path,
+            )
+            os.replace(tmp_path, path)
+        except (SystemExit, KeyboardInterrupt):
+            # 系统退出异常，不捕获，直接抛出
+            raise
+        except Exception as e:
+            # 磁盘缓存写入失败不影响转换流程
+            logger.warning(f"写入参考特征磁盘缓存失败: {path}, 错误: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+
+_reference_cache: Optional[ReferenceFeatureCache] = None
+_reference_cache_lock = threading.Lock()
+
+
+def is_reference_cache_enabled() -> bool:
+    """是否启用参考特征缓存（环境变量 SEEDVC_REF_CACHE_ENABLED，默认启用）"""
+    return os.getenv("SEEDVC_REF_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def get_reference_cache() -> ReferenceFeatureCache:
+    """获取进程级参考特征缓存单例
+
+    环境变量:
+        SEEDVC_REF_CACHE_SIZE: 内存缓存的参考音色数量
+        SEEDVC_REF_CACHE_DIR: 磁盘缓存目录（未设置时仅使用内存缓存）
+    """
+    global _reference_cache
+    if _reference_cache is None:
+        with _reference_cache_lock:
+            if _reference_cache is None:
+                _reference_cache = ReferenceFeatureCache(
+                    max_entries=int(os.getenv("SEEDVC_REF_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES))),
+                    cache_dir=os.getenv("SEEDVC_REF_CACHE_DIR") or None,
+                )
+    return _reference_cache
@@ -87,6 +87,7 @@ class SeedVCModelConfig:
         campplus_model: CAMPPlus说话人识别模型
         mel_fn: Mel频谱提取函数，接受torch.Tensor，返回torch.Tensor
         mel_fn_args: Mel频谱参数字典
+        model_version: 模型版本标识（检查点路径 + mtime，可选），参与参考特征缓存键
     """
     model: Any  # DiT模型，类型复杂，使用Any
     semantic_fn: Callable[[torch.Tensor], torch.Tensor]  # 语义特征提取函数
@@ -95,4 +96,5 @@ class SeedVCModelConfig:
     mel_fn: Callable[[torch.Tensor], torch.Tensor]  # Mel频谱提取函数
     mel_fn_args: Dict[str, Any]  # Mel频谱参数字典
     f0_fn: Optional[Callable[[Any, float], Any]] = None  # F0提取函数（可选）
+    model_version: Optional[str] = None  # 模型版本标识（可选）
 
@@ -3,6 +3,7 @@ SeedVC语音克隆处理器模块
 提供语音克隆的核心处理逻辑
 """
 import os
+import time
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -14,6 +15,13 @@ import torchaudio
 from core.exceptions import FileException, FileNotFoundException
 from core.logging_config import setup_logging
 
+from .reference_cache import (
+    ReferenceFeatureCache,
+    ReferenceFeatures,
+    get_reference_cache,
+    is_reference_cache_enabled,
+    make_reference_cache_key,
+)
 from .seedvc_config import (
     F0_EPSILON,
     F0_THRESHOLD,
@@ -81,7 +89,14 @@ class SeedVCProcessor:
     负责执行语音克隆的各个步骤，将原来的 seedvc_clone 函数拆分为多个方法。
     """
     
-    def __init__(self, config: SeedVCConfig, model_config: SeedVCModelConfig, device: torch.device, fp16: bool = False):
+    def __init__(
+        self,
+        config: SeedVCConfig,
+        model_config: SeedVCModelConfig,
+        device: torch.device,
+        fp16: bool = False,
+        reference_cache: Optional[ReferenceFeatureCache] = None,
+    ):
         """
         初始化处理器
         
@@ -90,11 +105,15 @@ class SeedVCProcessor:
             model_config: 模型配置
             device: 计算设备
             fp16: 是否使用半精度浮点数
+            reference_cache: 参考特征缓存，None 时按环境变量使用进程级单例
         """
         self.config = config
         self.model_config = model_config
         self.device = device
         self.fp16 = fp16
+        if reference_cache is None and is_reference_cache_enabled():
+            reference_cache = get_reference_cache()
+        self.reference_cache = reference_cache
     
     def validate_inputs(self) -> None:
         """验证输入文件
@@ -244,16 +263,83 @@ class SeedVCProcessor:
         
         return S_ori, style2
     
+    def prepare_reference(self, ref_audio: torch.Tensor, sr: int) -> ReferenceFeatures:
+        """获取参考音频侧的全部特征（优先从缓存读取）
+        
+        缓存键由参考音频文件内容哈希和影响参考特征的设置组成，
+        扩散步数、长度调整因子只作用于源音频侧，不参与缓存键。
+        
+        Args:
+            ref_audio: 参考音频张量
+            sr: 采样率
+            
+        Returns:
+            参考特征
+        """
+        key = None
+        if self.reference_cache is not None:
+            key = make_reference_cache_key(
+                self.config.target,
+                model_version=self.model_config.model_version,
+                sr=sr,
+                f0_condition=self.config.f0_condition and self.model_config.f0_fn is not None,
+                max_ref_duration=MAX_REF_AUDIO_DURATION,
+                mel_fn_args=self.model_config.mel_fn_args,
+            )
+            cached = self.reference_cache.get(key, self.device)
+            if cached is not None:
+                stats = self.reference_cache.get_stats()
+                logger.info(
+                    f"参考特征缓存命中: {self.config.target}, "
+                    f"命中率: {stats.hit_rate:.1%}, 累计节省: {stats.time_saved_seconds:.2f}s"
+                )
+                return cached
+        
+        start_time = time.time()
+        S_ori, style2 = self.extract_reference_features(ref_audio, sr)
+        
+        F0_ori = None
+        if self.config.f0_condition and self.model_config.f0_fn is not None:
+            ref_audio_16k = torchaudio.functional.resample(ref_audio, sr, SAMPLE_RATE_16K)
+            F0_ori = self.model_config.f0_fn(ref_audio_16k[0], thred=F0_THRESHOLD)
+            F0_ori = torch.from_numpy(F0_ori).to(self.device)[None]
+        
+        mel2 = self.model_config.mel_fn(ref_audio.to(self.device).float())
+        target2_lengths = torch.LongTensor([mel2.size(2)]).to(mel2.device)
+        prompt_condition, _, _, _, _ = self.model_config.model.length_regulator(
+            S_ori,
+            ylens=target2_lengths,
+            n_quantizers=3,
+            f0=F0_ori
+        )
+        features = ReferenceFeatures(
+            S_ori=S_ori,
+            style2=style2,
+            mel2=mel2,
+            prompt_condition=prompt_condition,
+            F0_ori=F0_ori,
+        )
+        compute_seconds = time.time() - start_time
+        
+        if self.reference_cache is not None:
+            self.reference_cache.put(key, features, compute_seconds)
+            logger.info(
+                f"参考特征缓存未命中: {self.config.target}, 提取耗时: {compute_seconds:.2f}s"
+            )
+        return features
+    
     def extract_f0_features(
         self,
         source_audio_16k: torch.Tensor,
-        ref_audio_16k: torch.Tensor
+        ref_audio_16k: Optional[torch.Tensor],
+        F0_ori: Optional[torch.Tensor] = None
     ) -> Tuple[Optional[torch.Tensor], Optional[torch.Tensor], Optional[torch.Tensor]]:
         """提取F0特征（如果启用）
         
         Args:
             source_audio_16k: 16kHz源音频
-            ref_audio_16k: 16kHz参考音频
+            ref_audio_16k: 16kHz参考音频（提供 F0_ori 时可为 None）
+            F0_ori: 已计算的参考F0（来自参考特征缓存）
             
         Returns:
             (F0_ori, F0_alt, shifted_f0_alt): F0特征
@@ -262,10 +348,10 @@ class SeedVCProcessor:
             return None, None, None
         
         logger.debug("处理 F0 特征")
-        F0_ori = self.model_config.f0_fn(ref_audio_16k[0], thred=F0_THRESHOLD)
+        if F0_ori is None:
+            F0_ori = self.model_config.f0_fn(ref_audio_16k[0], thred=F0_THRESHOLD)
+            F0_ori = torch.from_numpy(F0_ori).to(self.device)[None]
         F0_alt = self.model_config.f0_fn(source_audio_16k[0], thred=F0_THRESHOLD)
-        
-        F0_ori = torch.from_numpy(F0_ori).to(self.device)[None]
         F0_alt = torch.from_numpy(F0_alt).to(self.device)[None]
         
         shifted_f0_alt = self._adjust_f0(F0_alt, F0_ori)
@@ -321,7 +407,8 @@ class SeedVCProcessor:
         ref_audio: torch.Tensor,
         shifted_f0_alt: Optional[torch.Tensor],
         F0_ori: Optional[torch.Tensor],
-        sr: int
+        sr: int,
+        reference: Optional[ReferenceFeatures] = None
     ) -> torch.Tensor:
         """处理音频生成
         
@@ -334,6 +421,7 @@ class SeedVCProcessor:
             shifted_f0_alt: 调整后的F0（可选）
             F0_ori: 参考F0（可选）
             sr: 采样率
+            reference: 预先计算的参考特征（提供时跳过参考侧 Mel 和 prompt 条件计算）
             
         Returns:
             生成的音频波形
@@ -341,9 +429,7 @@ class SeedVCProcessor:
         # 计算Mel频谱
         logger.debug("计算 Mel 频谱")
         mel = self.model_config.mel_fn(source_audio.to(self.device).float())
-        mel2 = self.model_config.mel_fn(ref_audio.to(self.device).float())
         target_lengths = torch.LongTensor([int(mel.size(2) * self.config.length_adjust)]).to(mel.device)
-        target2_lengths = torch.LongTensor([mel2.size(2)]).to(mel2.device)
         
         # 长度调节
         logger.debug("执行长度调节")
@@ -353,12 +439,18 @@ class SeedVCProcessor:
             n_quantizers=3,
             f0=shifted_f0_alt
         )
-        prompt_condition, _, codes, commitment_loss, codebook_loss = self.model_config.model.length_regulator(
-            S_ori,
-            ylens=target2_lengths,
-            n_quantizers=3,
-            f0=F0_ori
-        )
+        if reference is not None:
+            mel2 = reference.mel2
+            prompt_condition = reference.prompt_condition
+        else:
+            mel2 = self.model_config.mel_fn(ref_audio.to(self.device).float())
+            target2_lengths = torch.LongTensor([mel2.size(2)]).to(mel2.device)
+            prompt_condition, _, codes, commitment_loss, codebook_loss = self.model_config.model.length_regulator(
+                S_ori,
+                ylens=target2_lengths,
+                n_quantizers=3,
+                f0=F0_ori
+            )
         
         # 分块生成
         hop_length = HOP_LENGTH_WITH_F0 if self.config.f0_condition else HOP_LENGTH_NO_F0
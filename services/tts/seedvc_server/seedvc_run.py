@@ -3,6 +3,7 @@
 SeedVC 语音克隆核心模块
 提供模型加载和语音克隆功能
 """
+import hashlib
 import os
 import sys
 import time
@@ -45,6 +46,10 @@ else:
 # 全局配置
 fp16 = False
 
+# 已加载模型的版本标识（各模型文件的路径 + mtime + 大小），参与参考特征缓存键，
+# 更换检查点后不会复用旧模型提取的参考特征
+loaded_model_version: Optional[str] = None
+
 # 默认模型路径配置
 DEFAULT_MODEL_PATHS = {
     'dit_checkpoint': 'models/DiT_seed_v2_uvit_whisper_small_wavenet_bigvgan_pruned.pth',
@@ -55,6 +60,23 @@ DEFAULT_MODEL_PATHS = {
 }
 
 
+def _model_files_version(paths) -> str:
+    """
+    根据模型文件的路径、mtime 和大小生成版本标识
+
+    Args:
+        paths: 模型文件或目录路径列表
+
+    Returns:
+        str: 版本标识（SHA-256 前 16 位）
+    """
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{Path(path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
 def load_models(
     checkpoint: Optional[str] = None,
     config: Optional[str] = None,
@@ -75,7 +97,7 @@ def load_models(
         FileNotFoundError: 如果模型文件不存在
         RuntimeError: 如果模型加载失败
     """
-    global fp16
+    global fp16, loaded_model_version
     fp16 = True
     
     try:
@@ -97,6 +119,11 @@ def load_models(
         ]:
             if not path.exists():
                 raise FileNotFoundError(f"{name} 文件不存在: {path}")
+
+        loaded_model_version = _model_files_version([
+            dit_checkpoint_path, dit_config_path, campplus_ckpt_path, bigvgan_model_path, whisper_model_path,
+        ])
+        logger.info(f"模型版本标识: {loaded_model_version}")
         
         logger.info(f"加载 DiT 配置文件: {dit_config_path}")
         with open(dit_config_path, "r", encoding='utf-8') as f:
@@ -368,6 +395,7 @@ def seedvc_clone(
         campplus_model=campplus_model,
         mel_fn=mel_fn,
         mel_fn_args=mel_fn_args,
+        model_version=loaded_model_version,
     )
     
     # 使用处理器执行
@@ -405,19 +433,20 @@ def seedvc_clone_with_config(config: "SeedVCConfig", model_config: "SeedVCModelC
         
         time_vc_start = time.time()
         
-        # 提取特征
+        # 提取特征（参考音频侧特征优先从缓存读取）
         S_alt = processor.extract_semantic_features(source_audio, sr)
-        S_ori, style2 = processor.extract_reference_features(ref_audio, sr)
+        reference = processor.prepare_reference(ref_audio, sr)
         
         # 提取F0特征（如果启用）
         source_audio_16k = torchaudio.functional.resample(source_audio, sr, 16000)
-        ref_audio_16k = torchaudio.functional.resample(ref_audio, sr, 16000)
-        F0_ori, F0_alt, shifted_f0_alt = processor.extract_f0_features(source_audio_16k, ref_audio_16k)
+        F0_ori, F0_alt, shifted_f0_alt = processor.extract_f0_features(
+            source_audio_16k, None, F0_ori=reference.F0_ori
+        )
         
         # 处理音频生成
         vc_wave = processor.process_audio(
-            S_alt, S_ori, style2, source_audio, ref_audio,
-            shifted_f0_alt, F0_ori, sr
+            S_alt, reference.S_ori, reference.style2, source_audio, ref_audio,
+            shifted_f0_alt, F0_ori, sr, reference=reference
         )
         
         time_vc_end = time.time()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline 基准测试脚本
+
+使用合成文案和桩服务（不依赖 TTS/图像生成/OSS），在真实 FFmpeg 上运行完整的
+标准 Pipeline（TTS → 分镜 → 图像 → 视频合成 → 后期处理 → 上传），开启步骤级
+性能分析，输出可比较的 JSON 报告：
+
+    python benchmark_pipeline.py --sentences 24 --repeat 3 --output report.json
+    python benchmark_pipeline.py --compare baseline.json --threshold 0.2
+
+桩服务用 FFmpeg lavfi 生成正弦波音频和纯色图片，结果可复现；TTS/图像缓存被关闭，
+每次运行都走完整热路径。--compare 发现回归时以退出码 1 结束，便于在部署前检查。
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.interfaces.service_interfaces import (  # noqa: E402
+    BatchUploadResult,
+    FileUploadResult,
+    IFileStorageService,
+    IImageGenerationService,
+    ImageGenerationResult,
+    ITTSService,
+    TTSResult,
+)
+from core.logging_config import setup_logging  # noqa: E402
+from core.utils.ffmpeg import run_ffmpeg  # noqa: E402
+from core.utils.time_formatter import format_time_ms_to_srt  # noqa: E402
+
+logger = setup_logging("worker.benchmark_pipeline", log_to_file=False)
+
+# 报告格式版本（结构变化时递增，不同版本的报告不做比较）
+REPORT_VERSION = 1
+
+# 桩 TTS 的语速（秒/字）
+SECONDS_PER_CHAR = 0.12
+
+_SENTENCE_TEMPLATES = [
+    "第{n}段，清晨的阳光洒在老街的青石板上",
+    "他推开木门，看见院子里的桂花开得正盛",
+    "邻居们聚在树下，谈论着今年的收成",
+    "远处传来火车的汽笛声，像是在催促远行的人",
+    "她把信折好放进口袋，心里默默数着日子",
+    "夜幕降临，小镇的灯光一盏接一盏亮了起来",
+]
+
+
+def build_synthetic_script(sentences: int) -> str:
+    """生成确定性的合成文案"""
+    return "。".join(
+        _SENTENCE_TEMPLATES[i % len(_SENTENCE_TEMPLATES)].format(n=i + 1)
+        for i in range(sentences)
+    ) + "。"
+
+
+class BenchmarkTTSService(ITTSService):
+    """桩 TTS：按句生成字幕，音频为时长与字数成正比的正弦波"""
+
+    def synthesize(
+        self,
+        text: str,
+        language: str,
+        output_path: str,
+        voice: Optional[str] = None,
+        volume: int = 50,
+        speech_rate: float = 1.0,
+        **kwargs
+    ) -> TTSResult:
+        sentences = [s for s in re.split(r"[。！？!?]", text) if s.strip()]
+        rate = speech_rate or 1.0
+        cues = []
+        cursor_ms = 0
+        for sentence in sentences:
+            length_ms = int(len(sentence) * SECONDS_PER_CHAR * 1000 / rate)
+            cues.append((cursor_ms, cursor_ms + length_ms, sentence))
+            cursor_ms += length_ms
+
+        run_ffmpeg([
+            "ffmpeg", "-y", "-f", "lavfi",
+            "-i", f"sine=frequency=440:sample_rate=24000:duration={cursor_ms / 1000:.3f}",
+            "-ac", "1", output_path,
+        ])
+
+        srt_path = kwargs.get("subtitle_output_path") or str(Path(output_path).with_suffix(".srt"))
+        with open(srt_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(
+                f"{i}\n{format_time_ms_to_srt(start)} --> {format_time_ms_to_srt(end)}\n{sentence}\n"
+                for i, (start, end, sentence) in enumerate(cues, start=1)
+            ))
+        return TTSResult(
+            success=True, audio_path=output_path, srt_path=srt_path, duration=cursor_ms / 1000
+        )
+
+    async def synthesize_async(self, *args, **kwargs) -> TTSResult:
+        return self.synthesize(*args, **kwargs)
+
+
+class BenchmarkImageService(IImageGenerationService):
+    """桩图像生成：按提示词哈希生成纯色图片"""
+
+    def generate_single_image(
+        self,
+        prompt: str,
+        output_path: str,
+        width: int,
+        height: int,
+        num_inference_steps: int = 30,
+        lora_name: Optional[str] = None,
+        lora_weight: float = 1.2,
+        **kwargs
+    ) -> ImageGenerationResult:
+        start = time.perf_counter()
+        color = hashlib.md5(prompt.encode("utf-8")).hexdigest()[:6]
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        run_ffmpeg([
+            "ffmpeg", "-y", "-f", "lavfi",
+            "-i", f"color=c=0x{color}:s={width}x{height}",
+            "-frames:v", "1", output_path,
+        ])
+        return ImageGenerationResult(
+            output_path=output_path,
+            status="success",
+            generation_time=time.perf_counter() - start,
+        )
+
+    def generate_batch(
+        self,
+        generation_params: List[Dict[str, Any]],
+        job_id: int
+    ) -> List[ImageGenerationResult]:
+        return [self.generate_single_image(**params) for params in generation_params]
+
+
+class BenchmarkStorageService(IFileStorageService):
+    """桩存储：只检查文件是否存在，不上传"""
+
+    def upload_file(
+        self,
+        file_path: str,
+        key: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> FileUploadResult:
+        return FileUploadResult(success=bool(file_path) and os.path.exists(file_path), file_key=key)
+
+    def upload_batch(
+        self,
+        files: Dict[str, str],
+        prefix: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> BatchUploadResult:
+        results = {}
+        total_size = 0
+        for file_type, local_path in files.items():
+            key = f"{prefix}/{os.path.basename(local_path)}"
+            results[file_type] = self.upload_file(local_path, key)
+            if results[file_type].success:
+                total_size += os.path.getsize(local_path)
+        success_count = sum(1 for result in results.values() if result.success)
+        return BatchUploadResult(
+            results=results,
+            total_size=total_size,
+            success_count=success_count,
+            failed_count=len(results) - success_count,
+        )
+
+    def get_download_url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        return None
+
+    def delete_file(self, key: str) -> bool:
+        return True
+
+
+def run_once(workspace_dir: Path, script: str, is_horizontal: bool) -> Dict[str, Any]:
+    """
+    运行一次完整 Pipeline
+
+    Args:
+        workspace_dir: 本次运行的工作目录
+        script: 文案
+        is_horizontal: 是否横屏
+
+    Returns:
+        {"wall_seconds": 总耗时, "steps": {步骤名称: StepProfile 字典}}
+    """
+    from pipeline import PipelineContext, VideoPipeline
+    from pipeline.steps import (
+        ImageGenerationStep,
+        PostProcessingStep,
+        TextSplitStep,
+        TTSGenerationStep,
+        UploadStep,
+        VideoCompositionStep,
+    )
+
+    context = PipelineContext(job_id=0, db=None, workspace_dir=workspace_dir)
+    context.title = "benchmark"
+    context.content = script
+    context.language_name = "中文"
+    context.language_platform = "edge"
+    context.speech_speed = 1.0
+    context.is_horizontal = is_horizontal
+
+    pipeline = VideoPipeline(context, functional_mode=True, enable_checkpoints=False, profile=True)
+    pipeline.add_step(TTSGenerationStep(BenchmarkTTSService()))
+    pipeline.add_step(TextSplitStep())
+    pipeline.add_step(ImageGenerationStep(BenchmarkImageService()))
+    pipeline.add_step(VideoCompositionStep())
+    pipeline.add_step(PostProcessingStep())
+    pipeline.add_step(UploadStep(BenchmarkStorageService()))
+
+    start = time.perf_counter()
+    pipeline.execute_functional()
+    wall_seconds = time.perf_counter() - start
+
+    profiles = pipeline.executor.step_profiles
+    return {
+        "wall_seconds": wall_seconds,
+        "steps": {name: profile.to_dict() for name, profile in profiles.items()},
+    }
+
+
+def build_report(runs: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    """生成基准报告（summary 为各指标的中位数）"""
+    from pipeline.profiling import summarize_runs
+
+    summary = summarize_runs([run["steps"] for run in runs])
+    summary["__total__"] = {"wall_seconds": statistics.median(run["wall_seconds"] for run in runs)}
+    return {
+        "version": REPORT_VERSION,
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "summary": summary,
+        "runs": runs,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pipeline 基准测试")
+    parser.add_argument("--sentences", type=int, default=24, help="合成文案句数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复运行次数（报告取中位数）")
+    parser.add_argument("--portrait", action="store_true", help="竖屏（默认横屏）")
+    parser.add_argument("--workdir", help="工作目录（默认临时目录，运行后删除）")
+    parser.add_argument("--output", help="报告输出路径（JSON）")
+    parser.add_argument("--compare", help="基准报告路径，与本次结果比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="允许的相对增长比例")
+    args = parser.parse_args()
+
+    # 缓存命中会跳过 TTS/图像热路径，基准测试中关闭
+    os.environ["TTS_CACHE_ENABLED"] = "false"
+    os.environ["IMAGE_CACHE_ENABLED"] = "false"
+
+    from pipeline.profiling import StepProfile, compare_reports, format_profile_summary
+
+    config = {
+        "sentences": args.sentences,
+        "repeat": args.repeat,
+        "is_horizontal": not args.portrait,
+        "max_parallel_steps": os.getenv("PIPELINE_MAX_PARALLEL_STEPS"),
+    }
+    script = build_synthetic_script(args.sentences)
+    root = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+
+    runs = []
+    try:
+        for i in range(args.repeat):
+            run = run_once(root / f"run{i}", script, is_horizontal=not args.portrait)
+            runs.append(run)
+            print(f"run {i + 1}/{args.repeat}: {run['wall_seconds']:.2f}s")
+            print(format_profile_summary({
+                name: StepProfile(**profile) for name, profile in run["steps"].items()
+            }))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = build_report(runs, config)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已写入: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != REPORT_VERSION or baseline.get("config") != config:
+            print("⚠️  基准报告的版本或配置不同，比较结果仅供参考")
+        regressions = compare_reports(baseline["summary"], report["summary"], args.threshold)
+        if regressions:
+            print("❌ 发现性能回归:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("✅ 未发现性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,7 +14,9 @@ _project_root = Path(__file__).parent.parent.parent.parent
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
+from core.config.constants import WorkerConfig
 from core.logging_config import setup_logging
+from utils.segment_assembler import OrderedSegmentAssembler
 
 # 配置日志
 logger = setup_logging("worker.clients.batch_synthesis", log_to_file=False)
@@ -97,6 +99,9 @@ def batch_synthesize_and_generate_srt(
     """
     Synthesizes a list of texts, combines them with silence, and generates an SRT file.
 
+    Finished segments are streamed to the output WAV/SRT in index order as soon as
+    they become contiguous, so only the out-of-order window is held in memory.
+
     Args:
         text_list: A list of strings to synthesize.
         reference_audio_path: Path to the reference audio file for voice cloning.
@@ -126,65 +131,50 @@ def batch_synthesize_and_generate_srt(
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # Use a dictionary to store results, keyed by original index to maintain order
-    results_map = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(
-            _synthesize_segment_task,
-            i, text, client, reference_audio_path, voice, volume, speech_rate,
-            pitch_rate, tts_type, diffusion_steps, length_adjust, inference_cfg_rate, job_id
-        ) for i, text in enumerate(text_list)]
-
-        for future in concurrent.futures.as_completed(futures):
-            segment_audio, text_content, original_index = future.result()
-            if segment_audio:
-                results_map[original_index] = (segment_audio, text_content)
-            else:
-                logger.error(f"Synthesis failed for segment at index {original_index}: '{text_content}'")
-                # Clean up any temporary files that might still exist from failed tasks
-                for j in range(len(text_list)):
-                    temp_file = f"{job_id}_temp_segment_{j}.wav"
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                return None # Exit if any segment fails
-
-    combined_audio = AudioSegment.empty()
-    srt_entries = []
-    current_time_ms = 0
-
-    # Process results in original order
-    for i in range(len(text_list)):
-        segment_audio, text = results_map[i]
-        
-        segment_duration_ms = len(segment_audio)
-
-        start_time_srt = format_time(current_time_ms)
-        end_time_srt = format_time(current_time_ms + segment_duration_ms)
-        srt_entries.append(
-            f"{i + 1}\n"
-            f"{start_time_srt} --> {end_time_srt}\n"
-            f"{text}\n"
-        )
-
-        combined_audio += segment_audio
-        current_time_ms += segment_duration_ms
+    if not text_list:
+        logger.error("Error: text_list is empty, nothing to synthesize.")
+        return None
 
-        # Add sleep/silence if not the last segment
-        if i < len(text_list) - 1:
-            silence = AudioSegment.silent(duration=sleep_ms)
-            combined_audio += silence
-            current_time_ms += sleep_ms
-        
     output_audio_path = f"{output_base_name}.wav"
     output_srt_path = f"{output_base_name}.srt"
 
-    logger.info(f"Exporting combined audio to {output_audio_path}")
-    combined_audio.export(output_audio_path, format="wav")
-
-    logger.info(f"Generating SRT file to {output_srt_path}")
-    with open(output_srt_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(srt_entries))
-
+    # 完成的段按序流式写入 WAV/SRT；限制在途任务数，乱序缓存不会超过这个窗口
+    window = max(1, (max_workers or WorkerConfig.DEFAULT_MAX_WORKERS) * 2)
+    assembler = OrderedSegmentAssembler(output_audio_path, output_srt_path, silence_ms=sleep_ms)
+    with assembler, concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        next_submit = 0
+        while assembler.next_index < len(text_list):
+            while next_submit < len(text_list) and next_submit < assembler.next_index + window:
+                in_flight.add(executor.submit(
+                    _synthesize_segment_task,
+                    next_submit, text_list[next_submit], client, reference_audio_path, voice, volume,
+                    speech_rate, pitch_rate, tts_type, diffusion_steps, length_adjust,
+                    inference_cfg_rate, job_id
+                ))
+                next_submit += 1
+
+            done, in_flight = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                segment_audio, text_content, original_index = future.result()
+                if segment_audio is None:
+                    logger.error(f"Synthesis failed for segment at index {original_index}: '{text_content}'")
+                    for pending in in_flight:
+                        pending.cancel()
+                    assembler.abort()
+                    # Clean up any temporary files that might still exist from failed tasks
+                    for j in range(len(text_list)):
+                        temp_file = f"{job_id}_temp_segment_{j}.wav"
+                        if os.path.exists(temp_file):
+                            os.remove(temp_file)
+                    return None # Exit if any segment fails
+                assembler.add(original_index, segment_audio, text_content)
+
+        assembler.close()
+
+    logger.info(f"Combined audio written to {output_audio_path}, SRT written to {output_srt_path}")
     logger.info("Batch synthesis and SRT generation complete.")
     return output_srt_path
 
@@ -0,0 +1,267 @@
+"""批量 OCR 文字检测客户端
+
+生成的图片需要经过 OCR 检查，含有渲染文字的图片会被丢弃重新生成。
+本客户端：
+- 使用共享 HTTP Session（连接池复用）
+- 合并多个线程短时间内提交的图片，按 batch_size 分批以 multipart 请求发送
+- 按图片内容哈希缓存检测结论，重复或复用的图片不再重复检测
+- OCR 服务不支持批量接口时自动退化为逐张请求
+
+批量接口约定：POST {base_url}/ocr/batch/，多个 files 字段，
+返回 {"results": [<与 /ocr/ 相同格式的单张结果>, ...]}，顺序与上传顺序一致。
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 添加项目根目录到Python路径
+_project_root = Path(__file__).parent.parent.parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+from core.logging_config import setup_logging
+
+# 配置日志
+logger = setup_logging("worker.clients.ocr_client", log_to_file=False)
+
+# 批量接口不存在时服务端可能返回的状态码
+_BATCH_UNSUPPORTED_STATUS = {404, 405}
+
+
+@dataclass
+class OCRVerdict:
+    """单张图片的文字检测结论"""
+    image_path: str
+    text: str = ""
+    has_text: bool = False
+    ok: bool = True  # OCR 请求是否成功；失败时 has_text 为 False 且结论不缓存
+
+
+def extract_ocr_text(result: Optional[Dict[str, Any]]) -> str:
+    """
+    从 OCR 服务返回结果中拼接识别到的文字
+
+    Args:
+        result: OCR 服务返回的 JSON（包含 ocr_result 字段）
+
+    Returns:
+        识别到的全部文字
+    """
+    ocr_result = (result or {}).get("ocr_result", [])
+    if not ocr_result or not ocr_result[0]:
+        return ""
+    return "".join(line[-1][0] for line in ocr_result[0] if line)
+
+
+class OCRClient:
+    """批量 OCR 文字检测客户端（线程安全）"""
+
+    def __init__(
+        self,
+        base_url: str,
+        batch_size: int = 8,
+        batch_window_ms: int = 50,
+        cache_size: int = 4096,
+        min_text_chars: int = 10,
+        timeout: float = 60.0,
+        session=None,
+    ):
+        """
+        初始化客户端
+
+        Args:
+            base_url: OCR 服务地址
+            batch_size: 单个请求最多包含的图片数
+            batch_window_ms: 等待更多图片凑批的最长时间（毫秒）
+            cache_size: 检测结论缓存的最大条目数
+            min_text_chars: 识别出的文字达到该长度时判定为含有文字
+            timeout: 单个请求超时时间（秒）
+            session: HTTP Session，None 表示使用共享 Session
+        """
+        if session is None:
+            from core.utils.http_session import get_http_session
+            session = get_http_session()
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = max(1, batch_size)
+        self.batch_window = max(0, batch_window_ms) / 1000.0
+        self.cache_size = cache_size
+        self.min_text_chars = min_text_chars
+        self.timeout = timeout
+        self.session = session
+
+        self._batch_supported = True
+        self._cache: "OrderedDict[str, Tuple[str, bool]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, str, Future]] = []
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def check_image(self, image_path: str) -> OCRVerdict:
+        """
+        检测单张图片是否含有文字（与其他线程的请求合并发送）
+
+        Args:
+            image_path: 图片路径
+
+        Returns:
+            检测结论
+        """
+        return self.check_images([image_path])[0]
+
+    def check_images(self, image_paths: Sequence[str]) -> List[OCRVerdict]:
+        """
+        批量检测图片是否含有文字
+
+        Args:
+            image_paths: 图片路径列表
+
+        Returns:
+            与输入顺序一致的检测结论列表
+        """
+        digests = [self._hash_file(image_path) for image_path in image_paths]
+        verdicts: List[Optional[OCRVerdict]] = [None] * len(image_paths)
+        futures: List[Tuple[int, Future]] = []
+        with self._cond:
+            for i, (image_path, digest) in enumerate(zip(image_paths, digests)):
+                cached = self._cache.get(digest)
+                if cached is not None:
+                    self._cache.move_to_end(digest)
+                    verdicts[i] = OCRVerdict(image_path, text=cached[0], has_text=cached[1])
+                    continue
+                future: Future = Future()
+                self._pending.append((image_path, digest, future))
+                futures.append((i, future))
+            if futures:
+                self._ensure_dispatcher()
+                self._cond.notify_all()
+
+        for i, future in futures:
+            verdicts[i] = future.result()
+        return verdicts
+
+    @staticmethod
+    def _hash_file(image_path: str) -> str:
+        h = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _ensure_dispatcher(self) -> None:
+        """启动后台凑批线程（调用方需持有锁）"""
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="ocr-batch-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # 首张图片到达后在时间窗口内继续收集，直到凑满一批
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.batch_size, timeout=self.batch_window
+                )
+                batch = self._pending[: self.batch_size]
+                del self._pending[: self.batch_size]
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[str, str, Future]]) -> None:
+        try:
+            results = self._request([image_path for image_path, _, _ in batch])
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            logger.error(f"[OCRClient] OCR请求失败: {e}", exc_info=True)
+            results = [None] * len(batch)
+
+        for (image_path, digest, future), result in zip(batch, results):
+            try:
+                text = None if result is None else extract_ocr_text(result)
+            except (TypeError, IndexError, KeyError, AttributeError) as e:
+                logger.error(f"[OCRClient] 无法解析OCR结果: {image_path}, error={e}")
+                text = None
+            if text is None:
+                future.set_result(OCRVerdict(image_path, ok=False))
+                continue
+            has_text = len(text) >= self.min_text_chars
+            with self._cond:
+                self._cache[digest] = (text, has_text)
+                self._cache.move_to_end(digest)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            future.set_result(OCRVerdict(image_path, text=text, has_text=has_text))
+
+    def _request(self, image_paths: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """发送 OCR 请求，返回与输入一一对应的结果（失败为 None）"""
+        if self._batch_supported and len(image_paths) > 1:
+            files = []
+            for image_path in image_paths:
+                with open(image_path, "rb") as f:
+                    files.append(("files", (os.path.basename(image_path), f.read(), "image/png")))
+            response = self.session.post(
+                f"{self.base_url}/ocr/batch/", files=files, timeout=self.timeout
+            )
+            if response.status_code == 200:
+                results = response.json().get("results", [])
+                if len(results) == len(image_paths):
+                    return results
+                logger.error(
+                    f"[OCRClient] 批量OCR结果数量不匹配: 期望 {len(image_paths)}，实际 {len(results)}"
+                )
+                return [None] * len(image_paths)
+            if response.status_code in _BATCH_UNSUPPORTED_STATUS:
+                logger.warning("[OCRClient] OCR服务不支持批量接口，改为逐张请求")
+                self._batch_supported = False
+            else:
+                logger.error(
+                    f"[OCRClient] 批量OCR失败. Status Code: {response.status_code}, Response: {response.text}"
+                )
+                return [None] * len(image_paths)
+
+        results = []
+        for image_path in image_paths:
+            with open(image_path, "rb") as f:
+                response = self.session.post(
+                    f"{self.base_url}/ocr/", files={"file": f}, timeout=self.timeout
+                )
+            if response.status_code == 200:
+                results.append(response.json())
+            else:
+                logger.error(
+                    f"Failed to get OCR result. Status Code: {response.status_code}, Response: {response.text}"
+                )
+                results.append(None)
+        return results
+
+
+_ocr_client: Optional[OCRClient] = None
+_ocr_client_lock = threading.Lock()
+
+
+def get_ocr_client() -> OCRClient:
+    """
+    获取进程级 OCR 客户端单例（参数来自 worker 配置）
+
+    Returns:
+        OCR 客户端
+    """
+    global _ocr_client
+    if _ocr_client is None:
+        with _ocr_client_lock:
+            if _ocr_client is None:
+                from worker.config import settings
+                _ocr_client = OCRClient(
+                    base_url=settings.OCR_SERVICE_URL,
+                    batch_size=settings.OCR_BATCH_SIZE,
+                    batch_window_ms=settings.OCR_BATCH_WINDOW_MS,
+                    cache_size=settings.OCR_VERDICT_CACHE_SIZE,
+                )
+    return _ocr_client
@@ -70,6 +70,18 @@ class WorkerConfig(BaseConfig):
         default="http://localhost:8222",
         description="OCR服务URL"
     )
+    OCR_BATCH_SIZE: int = Field(
+        default=8,
+        description="单个OCR请求最多包含的图片数"
+    )
+    OCR_BATCH_WINDOW_MS: int = Field(
+        default=50,
+        description="OCR请求等待凑批的最长时间（毫秒）"
+    )
+    OCR_VERDICT_CACHE_SIZE: int = Field(
+        default=4096,
+        description="OCR检测结论缓存的最大条目数（按图片内容哈希）"
+    )
     LLM_API_KEY: str = Field(
         default="",
         description="LLM API密钥"
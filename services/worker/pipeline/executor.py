@@ -6,14 +6,38 @@
 
 代码重构说明：
 - 使用 core.config.status.ExecutionStatus 枚举替换硬编码状态字符串
+
+DAG 调度（函数式模式）：
+- 步骤通过 inputs/outputs 声明数据依赖，执行器据此构建依赖图
+- 依赖已满足的步骤并发执行（如数字人与图像生成/视频合成并行）
+- 步骤本身在线程池中执行；结果合并、状态记录和数据库更新都在调度线程中完成
+
+检查点恢复（函数式模式）：
+- 每个步骤完成后，结果连同输入指纹通过 StepResultManager 持久化
+- 重试时从头开始，指纹一致且输出文件仍存在的步骤直接复用结果
+- 一旦某个步骤重新执行，依赖它的步骤全部重新执行
+- force_rerun_from 指定步骤名称时，该步骤及其所有下游步骤强制重新执行
+
+性能分析（可选）：
+- profile=True 或环境变量 PIPELINE_PROFILE=1 时，记录每个步骤的墙钟/CPU 时间、
+  子进程 CPU、FFmpeg 用量、磁盘 IO 和 RSS（见 profiling.py）
+- 函数式模式下写入 StepResult.metadata["profile"]；两种模式都保存在 step_profiles 中
 """
-from typing import Any, Dict, List, TYPE_CHECKING
+import contextvars
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Set, Union, TYPE_CHECKING
 
 from core.config.status import ExecutionStatus
 from core.exceptions import BatchShortException
 from core.logging_config import setup_logging
+from core.utils.ffmpeg.scheduler import ffmpeg_job_scope
 
 from .context import PipelineContext
+from .profiling import StepProfile, format_profile_summary, is_profiling_enabled, profile_step
 
 if TYPE_CHECKING:
     from .steps.base import BaseStep
@@ -23,6 +47,21 @@ if TYPE_CHECKING:
 
 logger = setup_logging("worker.pipeline.executor")
 
+# 参与指纹计算的任务级配置（来自 context）
+_FINGERPRINT_CONTEXT_FIELDS = (
+    "title",
+    "content",
+    "language_name",
+    "language_platform",
+    "speech_speed",
+    "is_horizontal",
+    "reference_audio_path",
+    "logopath",
+    "topic_prompts",
+    "loras",
+    "extra",
+)
+
 
 class PipelineException(BatchShortException):
     """Pipeline 执行异常"""
@@ -51,13 +90,23 @@ class PipelineExecutor:
         context: Pipeline 上下文
         input_resolver: 输入解析器（函数式模式）
         result_manager: 结果管理器（函数式模式）
+        force_rerun_from: 强制重新执行该步骤及其下游步骤（忽略检查点）
+        max_parallel_steps: 函数式模式下最大并行步骤数
+        profile: 是否记录步骤性能数据
+        step_profiles: 步骤名称 -> 性能数据（仅 profile 开启时填充）
     """
 
+    # 默认最大并行步骤数（环境变量 PIPELINE_MAX_PARALLEL_STEPS 可覆盖）
+    DEFAULT_MAX_PARALLEL_STEPS = 3
+
     def __init__(
         self,
         context: PipelineContext,
         input_resolver: "StepInputResolver" = None,
         result_manager: "StepResultManager" = None,
+        force_rerun_from: Optional[str] = None,
+        max_parallel_steps: Optional[int] = None,
+        profile: Optional[bool] = None,
     ):
         """初始化执行器
 
@@ -65,10 +114,21 @@ class PipelineExecutor:
             context: Pipeline 上下文
             input_resolver: 输入解析器（函数式模式使用）
             result_manager: 结果管理器（函数式模式使用）
+            force_rerun_from: 从该步骤起强制重新执行（可选）
+            max_parallel_steps: 最大并行步骤数，None 表示使用默认配置
+            profile: 是否记录步骤性能数据，None 表示由环境变量 PIPELINE_PROFILE 决定
         """
         self.context = context
         self.input_resolver = input_resolver
         self.result_manager = result_manager
+        self.force_rerun_from = force_rerun_from
+        env_parallel = os.getenv("PIPELINE_MAX_PARALLEL_STEPS", "")
+        self.max_parallel_steps = max(1, max_parallel_steps or (
+            int(env_parallel) if env_parallel.isdigit() else self.DEFAULT_MAX_PARALLEL_STEPS
+        ))
+        self.profile = is_profiling_enabled() if profile is None else profile
+        self.step_profiles: Dict[str, StepProfile] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
 
     def execute_traditional(self, steps: List["BaseStep"]) -> PipelineContext:
         """执行 Pipeline（传统模式）
@@ -119,12 +179,14 @@ class PipelineExecutor:
                 self.context.update_job_status(ExecutionStatus.PROCESSING, step_progress)
 
                 # 执行步骤（传统模式，不传递 kwargs）
-                self.context = step.run(self.context)
+                # FFmpeg 调用归属到当前任务，由调度器按任务公平分配并发
+                with ffmpeg_job_scope(job_id), self._profile_step(step.name):
+                    self.context = step.run(self.context)
 
                 # 检查是否在步骤中标记了失败
-                if self.context.failed_step:
+                if self.context.failed_step_name:
                     raise PipelineException(
-                        f"Pipeline 执行失败: 步骤 '{self.context.failed_step}' 失败"
+                        f"Pipeline 执行失败: 步骤 '{self.context.failed_step_name}' 失败"
                     )
 
             # 所有步骤成功完成
@@ -132,6 +194,7 @@ class PipelineExecutor:
                 f"[PipelineExecutor] Pipeline 执行成功 "
                 f"(job_id={job_id}, 耗时={self.context.get_duration():.2f}秒)"
             )
+            self._log_profiles()
 
             return self.context
 
@@ -143,7 +206,7 @@ class PipelineExecutor:
             # Pipeline 执行失败
             logger.exception(
                 f"[PipelineExecutor] Pipeline 执行失败 "
-                f"(job_id={job_id}, 失败步骤={self.context.failed_step})"
+                f"(job_id={job_id}, 失败步骤={self.context.failed_step_name})"
             )
 
             # 更新任务状态
@@ -163,9 +226,12 @@ class PipelineExecutor:
     ) -> Dict[str, "StepResult"]:
         """执行 Pipeline（函数式模式）
 
-        按顺序执行所有步骤，每个步骤返回 StepResult。
+        按依赖图调度步骤，相互独立的分支并发执行，每个步骤返回 StepResult。
         结果在步骤间显式传递，提供更好的类型安全和可测试性。
 
+        如果 result_manager 配置了检查点目录，会跳过输入未变化且输出仍存在的
+        前置步骤（见模块说明）。
+
         Args:
             steps: 要执行的步骤列表
 
@@ -185,9 +251,28 @@ class PipelineExecutor:
             logger.warning(f"[PipelineExecutor] 没有步骤需要执行 (job_id={job_id})")
             return {}
 
+        # 构建依赖图（按数据依赖声明）
+        dependencies = self.build_dependency_graph(steps)
+
+        # 强制重跑：删除指定步骤及所有下游步骤的检查点
+        if self.force_rerun_from:
+            if self.force_rerun_from not in dependencies:
+                raise PipelineException(
+                    f"未知的步骤名称: {self.force_rerun_from} "
+                    f"(可选: {list(dependencies)})",
+                    job_id,
+                )
+            rerun_steps = self._collect_downstream(dependencies, self.force_rerun_from)
+            self.result_manager.invalidate_checkpoints(rerun_steps)
+            logger.info(
+                f"[PipelineExecutor] 强制重新执行步骤: {rerun_steps} "
+                f"(job_id={job_id})"
+            )
+
         logger.info(
             f"[PipelineExecutor] 开始执行 Pipeline (函数式模式) "
-            f"(job_id={job_id}, 步骤数={total_steps})"
+            f"(job_id={job_id}, 步骤数={total_steps}, "
+            f"最大并行数={self.max_parallel_steps})"
         )
 
         # 更新任务状态为处理中
@@ -196,42 +281,81 @@ class PipelineExecutor:
             f"Pipeline 开始执行，共 {total_steps} 个步骤"
         )
 
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        # 从检查点恢复的步骤；依赖全部恢复的步骤才允许继续恢复
+        restored: Set[str] = set()
+        finished: Set[str] = set()
+        running: Dict[Future, "BaseStep"] = {}
+        step_fingerprints: Dict[str, str] = {}
+        failure: Optional[BaseException] = None
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_parallel_steps,
+            thread_name_prefix=f"pipeline-{job_id}",
+        )
+
         try:
-            # 依次执行每个步骤
-            for index, step in enumerate(steps, start=1):
-                logger.info(
-                    f"[PipelineExecutor] 执行步骤 {index}/{total_steps}: {step.name} "
-                    f"(job_id={job_id})"
+            while len(finished) < total_steps:
+                # 提交所有依赖已满足的步骤（按列表顺序）
+                if failure is None:
+                    ready = [
+                        step for step in steps
+                        if step.name not in finished
+                        and step not in running.values()
+                        and not remaining[step.name]
+                    ]
+                    for step in ready:
+                        outcome = self._start_step(step, dependencies, restored, step_fingerprints)
+                        if isinstance(outcome, Future):
+                            running[outcome] = step
+                        else:
+                            self._finish_step(step, outcome, finished, remaining)
+
+                if not running:
+                    if failure is not None or len(finished) >= total_steps:
+                        break
+                    if not any(
+                        not remaining[s.name] for s in steps if s.name not in finished
+                    ):
+                        raise PipelineException("步骤依赖无法满足", job_id)
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        result = future.result()
+                    except (SystemExit, KeyboardInterrupt):
+                        raise
+                    except Exception as exc:
+                        # 记录第一个失败，等待其他运行中的步骤结束后再抛出
+                        self.context.mark_step_failed(step.name, str(exc))
+                        if failure is None:
+                            failure = exc
+                        continue
+
+                    self.context.mark_step_completed(step.name)
+                    if step.checkpointable and result is not None:
+                        self.result_manager.save_checkpoint(
+                            step.name, result, step_fingerprints[step.name]
+                        )
+                    self._finish_step(step, result, finished, remaining)
+
+            if failure is not None:
+                raise failure
+
+            # 检查是否在步骤中标记了失败
+            if self.context.failed_step_name:
+                raise PipelineException(
+                    f"Pipeline 执行失败: 步骤 '{self.context.failed_step_name}' 失败"
                 )
 
-                # 更新状态详情
-                step_progress = f"正在执行: {step.name} ({index}/{total_steps})"
-                self.context.update_job_status(ExecutionStatus.PROCESSING, step_progress)
-
-                # 准备输入参数（从之前步骤的结果中提取）
-                step_kwargs = self.input_resolver.resolve_inputs(step, self.context)
-
-                # 执行步骤（函数式模式，传递 kwargs）
-                result = step._execute_functional(self.context, **step_kwargs)
-
-                # 缓存结果
-                self.result_manager.store(step.name, result)
-                self.input_resolver.update_results(step.name, result)
-
-                # 将结果合并到 context（向后兼容）
-                step._merge_result_to_context(self.context, result)
-
-                # 检查是否在步骤中标记了失败
-                if self.context.failed_step:
-                    raise PipelineException(
-                        f"Pipeline 执行失败: 步骤 '{self.context.failed_step}' 失败"
-                    )
-
             # 所有步骤成功完成
             logger.info(
                 f"[PipelineExecutor] Pipeline 执行成功 (函数式模式) "
                 f"(job_id={job_id}, 耗时={self.context.get_duration():.2f}秒)"
             )
+            self._log_profiles()
 
             return self.result_manager.get_all()
 
@@ -243,7 +367,7 @@ class PipelineExecutor:
             # Pipeline 执行失败
             logger.exception(
                 f"[PipelineExecutor] Pipeline 执行失败 "
-                f"(job_id={job_id}, 失败步骤={self.context.failed_step})"
+                f"(job_id={job_id}, 失败步骤={self.context.failed_step_name})"
             )
 
             # 更新任务状态
@@ -257,6 +381,215 @@ class PipelineExecutor:
                 f"Pipeline 执行失败 (job_id={job_id}): {str(exc)}"
             ) from exc
 
+        finally:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    # ========================================================================
+    # DAG 调度辅助方法
+    # ========================================================================
+
+    @staticmethod
+    def build_dependency_graph(steps: List["BaseStep"]) -> Dict[str, List[str]]:
+        """根据步骤的 inputs/outputs 声明构建依赖图
+
+        某个输入键由多个步骤产出时，依赖排在当前步骤之前的产出者；
+        如果产出者都排在之后，则依赖全部产出者。没有产出者的输入键视为
+        来自 context，不产生依赖。
+
+        Args:
+            steps: 步骤列表
+
+        Returns:
+            Dict[str, List[str]]: {步骤名称: 依赖的步骤名称列表}
+
+        Raises:
+            PipelineException: 步骤名称重复或存在循环依赖时抛出
+        """
+        names = [step.name for step in steps]
+        if len(set(names)) != len(names):
+            raise PipelineException(f"步骤名称重复: {names}")
+
+        providers: Dict[str, List[int]] = {}
+        for index, step in enumerate(steps):
+            for key in step.outputs:
+                providers.setdefault(key, []).append(index)
+
+        graph: Dict[str, List[str]] = {}
+        for index, step in enumerate(steps):
+            deps: List[str] = []
+            for key in step.inputs:
+                candidates = [i for i in providers.get(key, []) if i != index]
+                earlier = [i for i in candidates if i < index]
+                for i in (earlier or candidates):
+                    if names[i] not in deps:
+                        deps.append(names[i])
+            graph[step.name] = deps
+
+        # 循环依赖检测（Kahn 算法）
+        indegree = {name: len(deps) for name, deps in graph.items()}
+        queue = [name for name, degree in indegree.items() if degree == 0]
+        visited = 0
+        while queue:
+            current = queue.pop()
+            visited += 1
+            for name, deps in graph.items():
+                if current in deps:
+                    indegree[name] -= 1
+                    if indegree[name] == 0:
+                        queue.append(name)
+        if visited != len(graph):
+            cyclic = [name for name, degree in indegree.items() if degree > 0]
+            raise PipelineException(f"步骤存在循环依赖: {cyclic}")
+
+        return graph
+
+    @staticmethod
+    def _collect_downstream(dependencies: Dict[str, List[str]], step_name: str) -> List[str]:
+        """获取指定步骤及其所有下游步骤（按依赖图）"""
+        collected = [step_name]
+        for current in collected:
+            for name, deps in dependencies.items():
+                if current in deps and name not in collected:
+                    collected.append(name)
+        return collected
+
+    def _start_step(
+        self,
+        step: "BaseStep",
+        dependencies: Dict[str, List[str]],
+        restored: Set[str],
+        step_fingerprints: Dict[str, str],
+    ) -> Union[Future, Optional["StepResult"]]:
+        """启动单个步骤（在调度线程中调用）
+
+        条件不满足的步骤直接跳过，有效检查点直接恢复，否则提交到线程池执行。
+
+        Args:
+            step: 要启动的步骤
+            dependencies: 依赖图
+            restored: 已从检查点恢复的步骤集合
+            step_fingerprints: 步骤指纹（执行完成后保存检查点使用）
+
+        Returns:
+            Future: 已提交执行；StepResult: 从检查点恢复；None: 步骤被跳过
+        """
+        job_id = self.context.job_id
+
+        should_execute = getattr(step, "should_execute", None)
+        if should_execute is not None and not should_execute(self.context):
+            logger.info(f"[PipelineExecutor] 条件不满足，跳过步骤: {step.name} (job_id={job_id})")
+            self.context.mark_step_started(step.name)
+            self.context.mark_step_completed(step.name)
+            restored.add(step.name)
+            return None
+
+        # 准备输入参数（从之前步骤的结果中提取）
+        step_kwargs = self.input_resolver.resolve_inputs(step, self.context)
+        fingerprint = self._compute_fingerprint(step, step_kwargs)
+        step_fingerprints[step.name] = fingerprint
+
+        self.context.mark_step_started(step.name)
+        self.context.update_job_status(
+            ExecutionStatus.PROCESSING,
+            f"正在执行: {step.name}"
+        )
+
+        can_restore = step.checkpointable and all(
+            dep in restored for dep in dependencies[step.name]
+        )
+        if can_restore:
+            result = self.result_manager.load_checkpoint(step.name, fingerprint)
+            if result is not None:
+                logger.info(
+                    f"[PipelineExecutor] 从检查点恢复步骤: {step.name} "
+                    f"(job_id={job_id})"
+                )
+                self.context.mark_step_completed(step.name)
+                restored.add(step.name)
+                return result
+
+        logger.info(f"[PipelineExecutor] 执行步骤: {step.name} (job_id={job_id})")
+
+        def _run() -> "StepResult":
+            # FFmpeg 调用归属到当前任务，由调度器按任务公平分配并发
+            with ffmpeg_job_scope(job_id), self._profile_step(step.name) as profile:
+                result = step._execute_functional(self.context, **step_kwargs)
+            if profile is not None and result is not None:
+                result.metadata["profile"] = profile.to_dict()
+            return result
+
+        # 复制上下文变量（日志追踪等）到工作线程
+        return self._pool.submit(contextvars.copy_context().run, _run)
+
+    def _finish_step(
+        self,
+        step: "BaseStep",
+        result: Optional["StepResult"],
+        finished: Set[str],
+        remaining: Dict[str, Set[str]],
+    ) -> None:
+        """记录步骤结果并释放依赖它的步骤（在调度线程中调用）"""
+        if result is not None:
+            # 缓存结果
+            self.result_manager.store(step.name, result)
+            self.input_resolver.update_results(step.name, result)
+
+            # 将结果合并到 context（向后兼容）
+            step._merge_result_to_context(self.context, result)
+
+        finished.add(step.name)
+        for deps in remaining.values():
+            deps.discard(step.name)
+
+    # ========================================================================
+    # 性能分析辅助方法
+    # ========================================================================
+
+    def _profile_step(self, step_name: str):
+        """未开启性能分析时返回空上下文（yield None）"""
+        if not self.profile:
+            return nullcontext()
+        return self._recording_profile(step_name)
+
+    @contextmanager
+    def _recording_profile(self, step_name: str) -> Iterator[StepProfile]:
+        with profile_step(step_name) as profile:
+            yield profile
+        # 步骤失败时 yield 抛出异常，不记录
+        self.step_profiles[step_name] = profile
+
+    def _log_profiles(self) -> None:
+        if self.step_profiles:
+            logger.info(
+                f"[PipelineExecutor] 步骤性能数据 (job_id={self.context.job_id}):\n"
+                f"{format_profile_summary(self.step_profiles)}"
+            )
+
+    def _compute_fingerprint(self, step: "BaseStep", step_kwargs: Dict[str, Any]) -> str:
+        """计算步骤输入指纹
+
+        由步骤名称、步骤类型、解析出的输入参数和任务级配置共同决定。
+
+        Args:
+            step: 当前步骤
+            step_kwargs: 解析出的输入参数
+
+        Returns:
+            str: SHA-256 十六进制摘要
+        """
+        payload = {
+            "step": step.name,
+            "step_class": type(step).__name__,
+            "inputs": step_kwargs,
+            "job": {
+                field: getattr(self.context, field, None)
+                for field in _FINGERPRINT_CONTEXT_FIELDS
+            },
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
 
 __all__ = [
     "PipelineExecutor",
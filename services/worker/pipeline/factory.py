@@ -36,8 +36,8 @@ class DefaultStepFactory(IStepFactory):
 
     # 默认步骤执行顺序
     DEFAULT_STEP_ORDER = [
-        "content_split",
         "tts",
+        "content_split",
         "image_generation",
         "video_composition",
         "digital_human",
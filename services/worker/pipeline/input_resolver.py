@@ -23,8 +23,11 @@ class StepInputResolver:
     这个类实现了步骤间的数据依赖解析，支持：
     - TextSplitStep 需要 srt_path（来自 TTSGeneration）
     - ImageGenerationStep 需要 splits（来自 TextSplit）
-    - VideoCompositionStep 需要 image_paths（来自 ImageGeneration）和 audio_path（来自 context）
-    - PostProcessingStep 需要 combined_video（来自 VideoComposition）
+    - VideoCompositionStep 需要 image_paths（来自 ImageGeneration）、splits（来自 TextSplit）
+      和 audio_path（来自 context）
+    - DigitalHumanStep 需要 audio_path（来自 TTSGeneration）和 splits（来自 TextSplit），
+      不依赖图像和合成视频，可以与它们并行执行
+    - PostProcessingStep 需要 combined_video（来自 DigitalHuman，未生成时来自 VideoComposition）
     - UploadStep 需要 final_video_path（来自 PostProcessing）和 image_paths（来自 ImageGeneration）
 
     Attributes:
@@ -76,17 +79,37 @@ class StepInputResolver:
             if image_result:
                 kwargs["image_paths"] = image_result.data.get("image_paths")
 
+            # splits 提供每张图片的真实持续时间
+            split_result = self.step_results.get("TextSplit")
+            if split_result:
+                kwargs["splits"] = split_result.data.get("splits")
+
             # audio_path 通常来自 context
             audio_path = getattr(context, 'audio_path', None)
             if audio_path:
                 kwargs["audio_path"] = audio_path
 
+        # DigitalHumanStep 只需要音频和分镜时间轴
+        elif step.name == "DigitalHuman":
+            tts_result = self.step_results.get("TTSGeneration")
+            if tts_result:
+                kwargs["audio_path"] = tts_result.data.get("audio_path")
+
+            split_result = self.step_results.get("TextSplit")
+            if split_result:
+                kwargs["splits"] = split_result.data.get("splits")
+
         # PostProcessingStep 需要 combined_video, audio_path, srt_path, logopath
         elif step.name == "PostProcessing":
             video_result = self.step_results.get("VideoComposition")
             if video_result:
                 kwargs["combined_video"] = video_result.data.get("video_path")
 
+            # 数字人视频生成成功时替代合成视频
+            human_result = self.step_results.get("DigitalHuman")
+            if human_result and human_result.data.get("human_video_path"):
+                kwargs["combined_video"] = human_result.data.get("human_video_path")
+
         # UploadStep 需要 final_video_path, image_paths, audio_path, srt_path
         elif step.name == "Upload":
             postprocess_result = self.step_results.get("PostProcessing")
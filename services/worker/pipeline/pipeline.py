@@ -17,6 +17,7 @@
 - VideoPipeline 保留步骤管理功能，委托执行给专门组件
 - 从 615 行简化为约 200 行
 """
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Type, TYPE_CHECKING
 
 from core.interfaces.step_factory import IStepFactory
@@ -60,6 +61,9 @@ class VideoPipeline:
                 .add_step(TextSplitStep()) \
                 .add_step(ImageGenerationStep())
         results = pipeline.execute_functional()  # 函数式模式
+
+        # 任务重试时自动跳过已完成的步骤；也可以强制重跑指定步骤及其下游步骤
+        results = pipeline.execute_functional(force_rerun_from="ImageGeneration")
         ```
 
     代码重构说明：
@@ -76,28 +80,40 @@ class VideoPipeline:
         result_manager: 结果管理器（函数式模式）
     """
 
+    # 检查点目录名（位于任务工作目录下）
+    CHECKPOINT_DIR_NAME = "checkpoints"
+
     def __init__(
         self,
         context: PipelineContext,
-        functional_mode: bool = False
+        functional_mode: bool = False,
+        enable_checkpoints: bool = True,
+        profile: Optional[bool] = None,
     ):
         """初始化 Pipeline
 
         Args:
             context: Pipeline 上下文
             functional_mode: 是否启用函数式模式（默认 False 保持向后兼容）
+            enable_checkpoints: 是否在工作目录中持久化步骤检查点（仅函数式模式）
+            profile: 是否记录步骤性能数据，None 表示由环境变量 PIPELINE_PROFILE 决定
         """
         self.context = context
         self.steps: List[BaseStep] = []
         self.functional_mode = functional_mode
 
+        checkpoint_dir = None
+        if functional_mode and enable_checkpoints and context.workspace_dir:
+            checkpoint_dir = Path(context.workspace_dir) / self.CHECKPOINT_DIR_NAME
+
         # 初始化执行器和结果管理器
-        self.result_manager = StepResultManager() if functional_mode else None
+        self.result_manager = StepResultManager(checkpoint_dir) if functional_mode else None
         self.input_resolver = StepInputResolver({}) if functional_mode else None
         self.executor = PipelineExecutor(
             context,
             self.input_resolver,
-            self.result_manager
+            self.result_manager,
+            profile=profile,
         )
 
     def add_step(self, step: BaseStep) -> "VideoPipeline":
@@ -197,11 +213,18 @@ class VideoPipeline:
         """
         return self.executor.execute_traditional(self.steps)
 
-    def execute_functional(self) -> Dict[str, "StepResult"]:
+    def execute_functional(
+        self,
+        force_rerun_from: Optional[str] = None
+    ) -> Dict[str, "StepResult"]:
         """执行 Pipeline（函数式模式）
 
         按顺序执行所有步骤，每个步骤返回 StepResult。
         结果在步骤间显式传递，提供更好的类型安全和可测试性。
+        已有有效检查点的前置步骤会被跳过。
+
+        Args:
+            force_rerun_from: 强制重新执行该步骤及其下游步骤（忽略它们的检查点）
 
         Returns:
             Dict[str, StepResult]: 所有步骤的结果字典
@@ -212,6 +235,7 @@ class VideoPipeline:
         代码重构说明：
             委托给 PipelineExecutor.execute_functional()
         """
+        self.executor.force_rerun_from = force_rerun_from
         return self.executor.execute_functional(self.steps)
 
     def get_step_result(self, step_name: str) -> Optional["StepResult"]:
@@ -304,8 +328,8 @@ class PipelineBuilder:
             factory = DefaultStepFactory(services)
 
         pipeline = VideoPipeline(context, functional_mode=functional_mode)
-        pipeline.add_step(factory.create_content_split_step())
         pipeline.add_step(factory.create_tts_step(services.get("tts_service") if services else None))
+        pipeline.add_step(factory.create_content_split_step())
         pipeline.add_step(factory.create_image_generation_step(services.get("image_service") if services else None))
         pipeline.add_step(factory.create_video_composition_step())
         pipeline.add_step(factory.create_postprocess_step())
@@ -338,8 +362,8 @@ class PipelineBuilder:
             factory = DefaultStepFactory(services)
 
         pipeline = VideoPipeline(context, functional_mode=functional_mode)
-        pipeline.add_step(factory.create_content_split_step())
         pipeline.add_step(factory.create_tts_step(services.get("tts_service") if services else None))
+        pipeline.add_step(factory.create_content_split_step())
         pipeline.add_step(factory.create_image_generation_step(services.get("image_service") if services else None))
         pipeline.add_step(factory.create_video_composition_step())
         pipeline.add_step(factory.create_digital_human_step())
@@ -0,0 +1,253 @@
+"""步骤级性能分析
+
+开启后（VideoPipeline/PipelineExecutor 的 profile 参数，或环境变量 PIPELINE_PROFILE=1），
+执行器在每个步骤外层记录：
+
+- 墙钟时间、步骤线程 CPU 时间、进程 CPU 时间
+- 子进程 CPU 时间（ffmpeg 等外部进程，按已回收的子进程统计）
+- 经过 FFmpegScheduler 的 FFmpeg 调用次数、执行时间和排队等待时间
+- 进程磁盘读写字节数（/proc/self/io）
+- 进程 RSS（开始、结束和采样得到的峰值）
+
+结果写入 StepResult.metadata["profile"]，同时保存在 PipelineExecutor.step_profiles 中。
+
+注意：除线程 CPU 时间和 FFmpeg 统计外，其余指标都是进程级的；函数式模式下
+并行执行的步骤会互相计入对方的 IO、子进程 CPU 和 RSS。需要精确归因时，
+将 PIPELINE_MAX_PARALLEL_STEPS 设为 1 串行执行。
+"""
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.utils.ffmpeg.scheduler import ffmpeg_usage_scope
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - 非 Unix 平台
+    resource = None
+
+# RSS 峰值采样间隔（秒）
+RSS_SAMPLE_INTERVAL = 0.05
+
+# 基准报告中参与回归比较的指标及其噪声下限（差值低于下限不视为回归）
+REGRESSION_METRICS: Dict[str, float] = {
+    "wall_seconds": 0.05,
+    "cpu_seconds": 0.05,
+    "children_cpu_seconds": 0.05,
+    "ffmpeg_wall_seconds": 0.05,
+    "write_bytes": 1024 * 1024,
+    "rss_peak_bytes": 16 * 1024 * 1024,
+}
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def is_profiling_enabled() -> bool:
+    """环境变量 PIPELINE_PROFILE 是否开启了步骤性能分析"""
+    return os.getenv("PIPELINE_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+
+def _read_rss_bytes() -> int:
+    """当前进程常驻内存（字节），不可用时返回 0"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _read_io_bytes() -> Tuple[int, int]:
+    """进程累计磁盘读写字节数 (read_bytes, write_bytes)，不可用时返回 (0, 0)"""
+    counters = {}
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                counters[key.strip()] = int(value)
+    except (OSError, ValueError):
+        return 0, 0
+    return counters.get("read_bytes", 0), counters.get("write_bytes", 0)
+
+
+def _children_cpu_seconds() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@dataclass
+class StepProfile:
+    """单个步骤的性能数据"""
+    step_name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0  # 执行步骤的线程
+    process_cpu_seconds: float = 0.0
+    children_cpu_seconds: float = 0.0
+    ffmpeg_calls: int = 0
+    ffmpeg_wall_seconds: float = 0.0
+    ffmpeg_wait_seconds: float = 0.0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    rss_start_bytes: int = 0
+    rss_end_bytes: int = 0
+    rss_peak_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return asdict(self)
+
+
+class _RssSampler(threading.Thread):
+    """后台线程周期采样 RSS，记录峰值"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="step-profile-rss", daemon=True)
+        self.interval = interval
+        self.peak = _read_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, _read_rss_bytes())
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, _read_rss_bytes())
+        return self.peak
+
+
+@contextmanager
+def profile_step(step_name: str, sample_interval: Optional[float] = None) -> Iterator[StepProfile]:
+    """
+    记录一个步骤的性能数据
+
+    退出上下文后 yield 出的 StepProfile 被填充（步骤抛出异常时同样填充）。
+
+    Args:
+        step_name: 步骤名称
+        sample_interval: RSS 采样间隔（秒），默认 RSS_SAMPLE_INTERVAL
+
+    Yields:
+        StepProfile: 性能数据
+    """
+    profile = StepProfile(step_name=step_name)
+    sampler = _RssSampler(sample_interval or RSS_SAMPLE_INTERVAL)
+    profile.rss_start_bytes = sampler.peak
+    read_start, write_start = _read_io_bytes()
+    children_start = _children_cpu_seconds()
+    process_start = time.process_time()
+    thread_start = time.thread_time()
+    wall_start = time.perf_counter()
+    sampler.start()
+    try:
+        with ffmpeg_usage_scope() as usage:
+            yield profile
+    finally:
+        profile.wall_seconds = time.perf_counter() - wall_start
+        profile.cpu_seconds = time.thread_time() - thread_start
+        profile.process_cpu_seconds = time.process_time() - process_start
+        profile.children_cpu_seconds = _children_cpu_seconds() - children_start
+        read_end, write_end = _read_io_bytes()
+        profile.read_bytes = read_end - read_start
+        profile.write_bytes = write_end - write_start
+        profile.rss_peak_bytes = sampler.stop()
+        profile.rss_end_bytes = _read_rss_bytes()
+        stats = usage.to_dict()
+        profile.ffmpeg_calls = stats["ffmpeg_calls"]
+        profile.ffmpeg_wall_seconds = stats["ffmpeg_wall_seconds"]
+        profile.ffmpeg_wait_seconds = stats["ffmpeg_wait_seconds"]
+
+
+def format_profile_summary(profiles: Dict[str, StepProfile]) -> str:
+    """
+    生成步骤性能汇总表（用于日志）
+
+    Args:
+        profiles: 步骤名称 -> 性能数据
+
+    Returns:
+        多行文本
+    """
+    lines = [
+        f"{'step':<24}{'wall(s)':>9}{'cpu(s)':>9}{'child(s)':>10}"
+        f"{'ffmpeg':>8}{'write(MB)':>11}{'peak(MB)':>10}"
+    ]
+    for profile in profiles.values():
+        lines.append(
+            f"{profile.step_name:<24}{profile.wall_seconds:>9.2f}{profile.cpu_seconds:>9.2f}"
+            f"{profile.children_cpu_seconds:>10.2f}{profile.ffmpeg_calls:>8}"
+            f"{profile.write_bytes / 1e6:>11.1f}{profile.rss_peak_bytes / 1e6:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def summarize_runs(runs: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, float]]:
+    """
+    汇总多次运行的步骤性能数据（各指标取中位数，降低偶发抖动的影响）
+
+    Args:
+        runs: 每次运行的 {步骤名称: StepProfile.to_dict()}
+
+    Returns:
+        {步骤名称: {指标: 中位数}}
+    """
+    summary: Dict[str, Dict[str, float]] = {}
+    step_names = [name for run in runs for name in run]
+    for name in dict.fromkeys(step_names):
+        samples = [run[name] for run in runs if name in run]
+        summary[name] = {
+            metric: statistics.median(sample[metric] for sample in samples)
+            for metric in REGRESSION_METRICS
+        }
+    return summary
+
+
+def compare_reports(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    threshold: float = 0.2,
+) -> List[str]:
+    """
+    比较两份 summarize_runs 汇总结果，找出超过阈值的性能回归
+
+    Args:
+        baseline: 基准汇总
+        current: 当前汇总
+        threshold: 允许的相对增长比例（0.2 表示 20%）
+
+    Returns:
+        回归描述列表，为空表示没有回归
+    """
+    regressions = []
+    for name, metrics in current.items():
+        base_metrics = baseline.get(name)
+        if base_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            base_value = base_metrics.get(metric)
+            if base_value is None:
+                continue
+            noise_floor = REGRESSION_METRICS.get(metric, 0.05)
+            if value - base_value > max(noise_floor, base_value * threshold):
+                ratio = value / base_value if base_value else float("inf")
+                regressions.append(
+                    f"{name}.{metric}: {base_value:.3f} -> {value:.3f} (x{ratio:.2f})"
+                )
+    return regressions
+
+
+__all__ = [
+    "REGRESSION_METRICS",
+    "StepProfile",
+    "compare_reports",
+    "format_profile_summary",
+    "is_profiling_enabled",
+    "profile_step",
+    "summarize_runs",
+]
@@ -3,8 +3,17 @@
 负责管理 Pipeline 执行过程中各步骤的结果。
 
 这是从 VideoPipeline 类中提取出来的专门模块，用于存储和查询步骤结果。
+
+检查点：
+- 配置 checkpoint_dir 后，可将步骤结果连同输入指纹持久化为 JSON
+- 任务重试时由 PipelineExecutor 加载，指纹一致且输出文件仍存在时跳过该步骤
 """
-from typing import TYPE_CHECKING, Optional
+import dataclasses
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 
 from core.logging_config import setup_logging
 
@@ -13,6 +22,12 @@ if TYPE_CHECKING:
 
 logger = setup_logging("worker.pipeline.result_manager")
 
+# 检查点文件格式版本（结构变化时递增，使旧检查点失效）
+CHECKPOINT_VERSION = 1
+
+# result.data 中以这些后缀结尾的键视为输出文件路径
+_OUTPUT_PATH_SUFFIXES = ("_path", "_paths", "_video")
+
 
 class StepResultManager:
     """步骤结果管理器
@@ -24,13 +39,21 @@ class StepResultManager:
     - 结果查询（按步骤名称）
     - 批量结果获取
 
+    - 检查点持久化（可选）
+
     Attributes:
         step_results: 步骤结果字典 {step_name: StepResult}
+        checkpoint_dir: 检查点目录，None 表示不持久化
     """
 
-    def __init__(self):
-        """初始化结果管理器"""
+    def __init__(self, checkpoint_dir: Optional[Union[str, Path]] = None):
+        """初始化结果管理器
+
+        Args:
+            checkpoint_dir: 检查点目录（可选）
+        """
         self.step_results: dict = {}
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
 
     def store(self, step_name: str, result: "StepResult") -> None:
         """存储步骤结果
@@ -77,6 +100,152 @@ class StepResultManager:
         """
         return step_name in self.step_results
 
+    # ========================================================================
+    # 检查点
+    # ========================================================================
+
+    def _checkpoint_path(self, step_name: str) -> Path:
+        return self.checkpoint_dir / f"{step_name}.json"
+
+    def save_checkpoint(
+        self,
+        step_name: str,
+        result: "StepResult",
+        fingerprint: str
+    ) -> None:
+        """持久化步骤结果及其输入指纹
+
+        写入失败只记录警告，不影响 Pipeline 执行。
+
+        Args:
+            step_name: 步骤名称
+            result: 步骤执行结果
+            fingerprint: 步骤输入指纹
+        """
+        if self.checkpoint_dir is None:
+            return
+
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "step_name": step_name,
+            "fingerprint": fingerprint,
+            "result_type": type(result).__name__,
+            "fields": {
+                f.name: getattr(result, f.name)
+                for f in dataclasses.fields(result)
+                if f.init and not f.name.startswith("_")
+            },
+            "saved_at": time.time(),
+        }
+
+        path = self._checkpoint_path(step_name)
+        tmp_path = path.with_suffix(".json.tmp")
+        try:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+            logger.debug(f"[StepResultManager] 保存检查点: {step_name}")
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"[StepResultManager] 保存检查点失败: {step_name}, 错误: {e}")
+
+    def load_checkpoint(
+        self,
+        step_name: str,
+        fingerprint: str
+    ) -> Optional["StepResult"]:
+        """加载仍然有效的检查点
+
+        有效条件：文件存在、版本与指纹一致、结果中引用的输出文件都存在。
+
+        Args:
+            step_name: 步骤名称
+            fingerprint: 当前步骤输入指纹
+
+        Returns:
+            Optional[StepResult]: 恢复的步骤结果，无有效检查点时返回 None
+        """
+        if self.checkpoint_dir is None:
+            return None
+
+        path = self._checkpoint_path(step_name)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[StepResultManager] 检查点损坏，忽略: {step_name}, 错误: {e}")
+            return None
+
+        if payload.get("version") != CHECKPOINT_VERSION:
+            return None
+        if payload.get("fingerprint") != fingerprint:
+            logger.info(f"[StepResultManager] 检查点输入已变化: {step_name}")
+            return None
+
+        result = self._restore_result(payload)
+        if result is None:
+            return None
+
+        missing = [p for p in self._output_paths(result.data) if not os.path.exists(p)]
+        if missing:
+            logger.info(
+                f"[StepResultManager] 检查点输出文件缺失: {step_name}, "
+                f"缺失={missing[:3]}"
+            )
+            return None
+
+        return result
+
+    def invalidate_checkpoints(self, step_names: Iterable[str]) -> None:
+        """删除指定步骤的检查点
+
+        Args:
+            step_names: 步骤名称列表
+        """
+        if self.checkpoint_dir is None:
+            return
+
+        for step_name in step_names:
+            try:
+                self._checkpoint_path(step_name).unlink()
+                logger.debug(f"[StepResultManager] 删除检查点: {step_name}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"[StepResultManager] 删除检查点失败: {step_name}, 错误: {e}")
+
+    @staticmethod
+    def _restore_result(payload: Dict[str, Any]) -> Optional["StepResult"]:
+        """根据检查点内容重建 StepResult（子类按类型名查找）"""
+        from . import results
+
+        result_cls = getattr(results, payload.get("result_type", ""), None)
+        if result_cls is None:
+            return None
+        try:
+            return result_cls(**payload.get("fields", {}))
+        except (TypeError, ValueError) as e:
+            logger.warning(
+                f"[StepResultManager] 无法恢复检查点: {payload.get('step_name')}, 错误: {e}"
+            )
+            return None
+
+    @staticmethod
+    def _output_paths(data: Dict[str, Any]) -> List[str]:
+        """提取结果数据中引用的输出文件路径"""
+        paths: List[str] = []
+        for key, value in data.items():
+            if not key.endswith(_OUTPUT_PATH_SUFFIXES):
+                continue
+            if isinstance(value, (str, Path)) and value:
+                paths.append(str(value))
+            elif isinstance(value, (list, tuple)):
+                paths.extend(str(v) for v in value if isinstance(v, (str, Path)) and v)
+        return paths
+
     def __len__(self) -> int:
         """获取结果数量"""
         return len(self.step_results)
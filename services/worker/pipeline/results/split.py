@@ -3,7 +3,7 @@
 Result types for text splitting steps.
 """
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from .base import StepResult
 
@@ -3,6 +3,7 @@
 Result types for subtitle generation steps.
 """
 from dataclasses import dataclass
+from typing import Optional
 
 from .base import StepResult
 
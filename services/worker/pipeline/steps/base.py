@@ -10,7 +10,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, TypeVar, Union, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, TypeVar, Union, TYPE_CHECKING
 
 from core.exceptions import BatchShortException
 from core.logging_config import setup_logging
@@ -117,6 +117,15 @@ class BaseStep(ABC):
     # 是否启用函数式模式（子类可以覆盖）
     _functional_mode: bool = False
 
+    # 是否允许从检查点恢复（函数式模式，子类可以覆盖）
+    checkpointable: bool = True
+
+    # 数据依赖声明（函数式模式下用于构建 DAG，子类可以覆盖）
+    # inputs: 步骤需要的数据键；outputs: 步骤结果中产出的数据键
+    # 没有任何步骤产出的输入键视为来自 context 的任务级配置
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
     def validate(self, context: "PipelineContext") -> None:
         """验证输入数据
 
@@ -33,8 +33,8 @@ class DigitalHumanStep(ConditionalStep):
     3. 可选步骤，根据配置决定是否执行
 
     输入 (context/kwargs):
-    - combined_video: 原始视频
     - audio_path: 音频文件
+    - splits: 分镜时间轴（不依赖图像和合成视频，可与其并行执行）
     - extra.enable_digital_human: 是否启用数字人
     - account: 账户配置
 
@@ -56,6 +56,10 @@ class DigitalHumanStep(ConditionalStep):
     name = "DigitalHuman"
     description = "数字人视频合成"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("audio_path", "splits")
+    outputs = ("human_video_path",)
+
     # 启用函数式模式
     _functional_mode = True
 
@@ -86,10 +90,6 @@ class DigitalHumanStep(ConditionalStep):
 
     def validate(self, context: PipelineContext) -> None:
         """验证输入"""
-        combined_video = getattr(context, 'combined_video', None)
-        if not combined_video:
-            raise ValueError("没有可用的视频文件")
-
         audio_path = getattr(context, 'audio_path', None)
         if not audio_path:
             raise ValueError("没有可用的音频文件")
@@ -144,6 +144,7 @@ class DigitalHumanStep(ConditionalStep):
             human_duration = self._call_digital_human_service(
                 context,
                 human_video_path,
+                audio_path=kwargs.get("audio_path"),
             )
 
             logger.info(
@@ -180,12 +181,14 @@ class DigitalHumanStep(ConditionalStep):
         self,
         context: PipelineContext,
         output_path: str,
+        audio_path: Optional[str] = None,
     ) -> float:
         """调用数字人服务
 
         Args:
             context: Pipeline 上下文
             output_path: 输出视频路径
+            audio_path: 音频文件路径（None 时从 context 读取）
 
         Returns:
             float: 生成的数字人视频时长
@@ -202,7 +205,7 @@ class DigitalHumanStep(ConditionalStep):
         # 上传音频文件或提供 URL
         # 实际实现中需要上传音频到数字人服务
         data = {
-            "audio_url": context.audio_path,  # 实际应该是 OSS URL
+            "audio_url": audio_path or context.audio_path,  # 实际应该是 OSS URL
             "config": human_config,
         }
 
@@ -19,7 +19,7 @@
 """
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import time
 
 from config import settings
@@ -131,6 +131,8 @@ class ImageGenerationStep(BaseStep):
     依赖注入:
     - 通过 __init__ 接收 IImageGenerationService 实例
     - 如果未提供，使用默认的 CeleryImageService
+    - enable_cache 为 True 时使用 CachedImageGenerationService 包装，
+      生成前先查询内容寻址缓存（重跑/重试不再重复占用 GPU）
 
     注意:
     - 此步骤不包含应用层重试逻辑
@@ -141,9 +143,16 @@ class ImageGenerationStep(BaseStep):
     name = "ImageGeneration"
     description = "AI 图像生成（使用服务层并行）"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("splits",)
+    outputs = ("image_paths", "selected_images")
+
     # 启用函数式模式
     _functional_mode = True
 
+    # 是否启用图像生成缓存（同时受环境变量 IMAGE_CACHE_ENABLED 控制）
+    enable_cache = True
+
     def __init__(self, image_service: Optional[IImageGenerationService] = None):
         """初始化图像生成步骤
 
@@ -155,8 +164,25 @@ class ImageGenerationStep(BaseStep):
             from core.clients.celery_image_service import CeleryImageService
             image_service = CeleryImageService()
 
+        if self.enable_cache:
+            image_service = self._wrap_with_cache(image_service)
+
         self.image_service = image_service
 
+    @staticmethod
+    def _wrap_with_cache(image_service: IImageGenerationService) -> IImageGenerationService:
+        """使用缓存服务包装图像生成服务（缓存不可用时原样返回）"""
+        from core.cache.image_cache import is_image_cache_enabled
+        from core.clients.cached_image_service import CachedImageGenerationService
+
+        if not is_image_cache_enabled() or isinstance(image_service, CachedImageGenerationService):
+            return image_service
+        try:
+            return CachedImageGenerationService(image_service)
+        except OSError as e:
+            logger.warning(f"图像缓存初始化失败，直接生成: {e}")
+            return image_service
+
     def validate(self, context: PipelineContext) -> None:
         """验证输入"""
         splits = getattr(context, 'splits', None)
@@ -204,6 +230,7 @@ class ImageGenerationStep(BaseStep):
         generation_params = self._prepare_generation_params(
             splits, images_dir, config
         )
+        start_time = time.time()
 
         # 执行并行生成（通过依赖注入的服务）
         service_results = self.image_service.generate_batch(
@@ -213,7 +240,7 @@ class ImageGenerationStep(BaseStep):
 
         # 收集结果
         result_summary = self._collect_service_results(service_results, len(splits))
-        generation_time = time.time() - result_summary.start_time
+        generation_time = time.time() - start_time
 
         self._log_generation_completion(
             context.job_id, result_summary, generation_time
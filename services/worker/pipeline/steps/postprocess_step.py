@@ -5,12 +5,18 @@
 支持两种执行模式：
 1. 传统模式（向后兼容）：execute() 返回 PipelineContext
 2. 函数式模式（推荐）：_execute_functional() 返回 PostProcessResult
+
+性能优化说明：
+- 默认使用融合模式（enable_fused=True）：音频合成、字幕烧录、Logo 叠加
+  在同一个 filter_complex 中完成，只需一次解码和一次编码
+- 关闭融合模式时回退到逐步处理（每步一次 FFmpeg 调用）
 """
 import os
 from pathlib import Path
 from typing import List, Optional, TYPE_CHECKING
 
 from core.config.api import SubtitleStyleConfig
+from core.config.video_config import FFmpegConfig, get_video_config
 from core.logging_config import setup_logging
 from core.utils.ffmpeg import run_ffmpeg
 from core.utils.ffmpeg.builder import FFmpegCommandBuilder
@@ -48,9 +54,18 @@ class PostProcessingStep(BaseStep):
     name = "PostProcessing"
     description = "后期处理和合成"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("video_path", "human_video_path", "audio_path", "srt_path")
+    outputs = ("final_video_path",)
+
     # 启用函数式模式
     _functional_mode = True
 
+    # 融合模式配置
+    # 设置为 True 时，音频、字幕、Logo 在单次 FFmpeg 调用中完成（性能优化）
+    # 设置为 False 时，使用逐步处理（每步一次 FFmpeg 调用，便于排查问题）
+    enable_fused = True
+
     def validate(self, context: PipelineContext) -> None:
         """验证输入"""
         combined_video = getattr(context, 'combined_video', None)
@@ -86,6 +101,11 @@ class PostProcessingStep(BaseStep):
         """
         from ..results import PostProcessResult
 
+        # 函数式模式下视频来自上游步骤结果
+        combined_video = kwargs.get("combined_video")
+        if combined_video:
+            context.combined_video = combined_video
+
         logger.info(
             f"[{self.name}] 开始后期处理 "
             f"(job_id={context.job_id})"
@@ -98,7 +118,200 @@ class PostProcessingStep(BaseStep):
 
         final_video_path = str(output_dir / "final.mp4")
 
-        # 记录处理步骤
+        srt_path = getattr(context, 'srt_path', None)
+        has_subtitle = bool(srt_path and os.path.exists(srt_path))
+        logopath = getattr(context, 'logopath', None)
+        has_logo = bool(logopath and os.path.exists(logopath))
+
+        if self.enable_fused:
+            processing_steps = self._fused_post_process(
+                context,
+                final_video_path,
+                has_subtitle=has_subtitle,
+                has_logo=has_logo,
+            )
+        else:
+            processing_steps = self._sequential_post_process(
+                context,
+                output_dir,
+                final_video_path,
+                has_subtitle=has_subtitle,
+                has_logo=has_logo,
+            )
+
+        logger.info(
+            f"[{self.name}] 后期处理完成 "
+            f"(job_id={context.job_id}, output={final_video_path})"
+        )
+
+        # 返回函数式结果
+        return PostProcessResult(
+            step_name=self.name,
+            final_video_path=final_video_path,
+            processing_steps=processing_steps
+        )
+
+    def _fused_post_process(
+        self,
+        context: PipelineContext,
+        output_path: str,
+        has_subtitle: bool,
+        has_logo: bool,
+    ) -> List[str]:
+        """融合模式：单次 FFmpeg 调用完成全部后期处理
+
+        构建一个 filter_complex 同时完成字幕烧录和 Logo 叠加，并在同一命令中
+        合成音频。视频只解码、编码一次；如果既无字幕也无 Logo，则视频流直接 copy。
+
+        Args:
+            context: Pipeline 上下文
+            output_path: 最终视频输出路径
+            has_subtitle: 是否烧录字幕
+            has_logo: 是否叠加 Logo
+
+        Returns:
+            List[str]: 应用的处理步骤列表
+        """
+        from core.utils.ffmpeg import FFmpegError
+
+        command = self._build_fused_command(context, output_path, has_subtitle, has_logo)
+
+        processing_steps = ["add_audio"]
+        if has_subtitle:
+            processing_steps.append("add_subtitle")
+        if has_logo:
+            processing_steps.append("add_logo")
+
+        logger.info(
+            f"[{self.name}] 融合模式后期处理 "
+            f"(job_id={context.job_id}, steps={processing_steps})"
+        )
+
+        try:
+            run_ffmpeg(command, timeout=get_video_config(context.is_horizontal).ffmpeg_timeout)
+        except FFmpegError as exc:
+            logger.error(f"[{self.name}] 融合后期处理失败: {exc}")
+            raise
+
+        return processing_steps
+
+    def _build_fused_command(
+        self,
+        context: PipelineContext,
+        output_path: str,
+        has_subtitle: bool,
+        has_logo: bool,
+    ) -> List[str]:
+        """构建融合模式的 FFmpeg 命令
+
+        输入顺序：0 = 合成视频，1 = 音频，2 = Logo（可选）。
+
+        Args:
+            context: Pipeline 上下文
+            output_path: 输出路径
+            has_subtitle: 是否烧录字幕
+            has_logo: 是否叠加 Logo
+
+        Returns:
+            List[str]: FFmpeg 命令参数列表
+        """
+        builder = (FFmpegCommandBuilder()
+                   .add_input(context.combined_video, index=0)
+                   .add_input(context.audio_path, index=1))
+
+        if not has_subtitle and not has_logo:
+            # 无需滤镜：视频流直接复制，只合成音频
+            return (builder
+                    .map_stream("0:v")
+                    .map_stream("1:a")
+                    .set_video_codec("copy")
+                    .set_audio_codec("aac")
+                    .add_option("shortest", "")
+                    .set_output(output_path)
+                    .build())
+
+        video_label = "[0:v]"
+        if has_subtitle:
+            builder.add_filter(
+                self._subtitle_filter(context.srt_path),
+                input_label=video_label,
+                output_label="[subtitled]",
+            )
+            video_label = "[subtitled]"
+
+        if has_logo:
+            builder.add_input(context.logopath, index=2)
+            builder.add_filter(
+                f"scale={SubtitleStyleConfig.LOGO_SCALE_WIDTH}:-1",
+                input_label="[2:v]",
+                output_label="[logo]",
+            )
+            builder.add_filter(
+                f"overlay={FFmpegConfig.LOGO_POSITION_TOP_RIGHT}",
+                input_label=f"{video_label}[logo]",
+                output_label="[final]",
+            )
+            video_label = "[final]"
+
+        config = get_video_config(context.is_horizontal)
+
+        return (builder
+                .map_stream(video_label)
+                .map_stream("1:a")
+                .set_video_codec(config.video_codec)
+                .set_quality(crf=config.crf_quality, preset=config.preset)
+                .set_pixel_format(config.pix_fmt)
+                .set_audio_codec(config.audio_codec)
+                .add_option("shortest", "")
+                .set_output(output_path)
+                .build())
+
+    @classmethod
+    def _subtitle_filter(cls, srt_path: str) -> str:
+        """构建字幕烧录滤镜（融合模式与逐步模式共用）
+
+        Args:
+            srt_path: 字幕文件路径
+
+        Returns:
+            str: subtitles 滤镜字符串
+        """
+        return f"subtitles='{srt_path}':force_style='{cls._subtitle_force_style()}'"
+
+    @staticmethod
+    def _subtitle_force_style() -> str:
+        """构建字幕 force_style 字符串
+
+        Returns:
+            str: ASS 样式字符串
+        """
+        primary_color = SubtitleStyleConfig.color_to_hex(SubtitleStyleConfig.DEFAULT_FONT_COLOR)
+        outline_color = SubtitleStyleConfig.color_to_hex(SubtitleStyleConfig.DEFAULT_OUTLINE_COLOR)
+        return (f"FontName={SubtitleStyleConfig.DEFAULT_FONT},"
+                f"FontSize={SubtitleStyleConfig.DEFAULT_FONT_SIZE},"
+                f"PrimaryColour=&H{primary_color},"
+                f"OutlineColour=&H{outline_color}")
+
+    def _sequential_post_process(
+        self,
+        context: PipelineContext,
+        output_dir: Path,
+        final_video_path: str,
+        has_subtitle: bool,
+        has_logo: bool,
+    ) -> List[str]:
+        """逐步模式：每个处理步骤单独调用一次 FFmpeg
+
+        Args:
+            context: Pipeline 上下文
+            output_dir: 中间文件输出目录
+            final_video_path: 最终视频输出路径
+            has_subtitle: 是否烧录字幕
+            has_logo: 是否叠加 Logo
+
+        Returns:
+            List[str]: 应用的处理步骤列表
+        """
         processing_steps = []
 
         # 合成音频
@@ -109,8 +322,7 @@ class PostProcessingStep(BaseStep):
         processing_steps.append("add_audio")
 
         # 添加字幕
-        srt_path = getattr(context, 'srt_path', None)
-        if srt_path and os.path.exists(srt_path):
+        if has_subtitle:
             video_with_subtitle = self._add_subtitle_to_video(
                 context,
                 video_with_audio,
@@ -121,9 +333,8 @@ class PostProcessingStep(BaseStep):
             video_with_subtitle = video_with_audio
 
         # 添加 Logo
-        logopath = getattr(context, 'logopath', None)
-        if logopath and os.path.exists(logopath):
-            final_video = self._add_logo_to_video(
+        if has_logo:
+            self._add_logo_to_video(
                 context,
                 video_with_subtitle,
                 final_video_path,
@@ -132,19 +343,8 @@ class PostProcessingStep(BaseStep):
         else:
             import shutil
             shutil.copy(video_with_subtitle, final_video_path)
-            final_video = final_video_path
-
-        logger.info(
-            f"[{self.name}] 后期处理完成 "
-            f"(job_id={context.job_id}, output={final_video_path})"
-        )
 
-        # 返回函数式结果
-        return PostProcessResult(
-            step_name=self.name,
-            final_video_path=final_video_path,
-            processing_steps=processing_steps
-        )
+        return processing_steps
 
     def _add_audio_to_video(
         self,
@@ -166,6 +366,8 @@ class PostProcessingStep(BaseStep):
         command = (FFmpegCommandBuilder()
                    .add_input(context.combined_video, index=0)
                    .add_input(context.audio_path, index=1)
+                   .map_stream("0:v")
+                   .map_stream("1:a")
                    .set_video_codec("copy")
                    .set_audio_codec("aac")
                    .add_option("shortest", "")
@@ -198,22 +400,10 @@ class PostProcessingStep(BaseStep):
         """
         from core.utils.ffmpeg import FFmpegError
 
-        # 使用 SubtitleStyleConfig 获取字幕样式
-        font = SubtitleStyleConfig.DEFAULT_FONT
-        font_size = SubtitleStyleConfig.DEFAULT_FONT_SIZE
-        primary_color = SubtitleStyleConfig.color_to_hex(SubtitleStyleConfig.DEFAULT_FONT_COLOR)
-        outline_color = SubtitleStyleConfig.color_to_hex(SubtitleStyleConfig.DEFAULT_OUTLINE_COLOR)
-
-        # 使用 subtitles 滤镜添加字幕
-        vf_filter = (f"subtitles='{context.srt_path}':force_style="
-                     f"FontName={font},FontSize={font_size},"
-                     f"PrimaryColour=&H{primary_color},"
-                     f"OutlineColour=&H{outline_color}'")
-
         # 使用 FFmpegCommandBuilder 构建命令
         command = (FFmpegCommandBuilder()
                    .add_input(input_video)
-                   .add_option("vf", vf_filter)
+                   .add_option("vf", self._subtitle_filter(context.srt_path))
                    .set_audio_codec("copy")
                    .set_output(str(output_path))
                    .build())
@@ -254,8 +444,10 @@ class PostProcessingStep(BaseStep):
                    .add_input(input_video, index=0)
                    .add_input(context.logopath, index=1)
                    .add_option("filter_complex",
-                               f"[1:v]scale={logo_scale_width}:-1[logo];[0:v][logo]=W-w-10:10{output_label}")
+                               f"[1:v]scale={logo_scale_width}:-1[logo];"
+                               f"[0:v][logo]overlay={FFmpegConfig.LOGO_POSITION_TOP_RIGHT}{output_label}")
                    .map_stream(output_label)
+                   .map_stream("0:a?")
                    .set_audio_codec("copy")
                    .set_output(output_path)
                    .build())
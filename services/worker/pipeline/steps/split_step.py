@@ -44,6 +44,10 @@ class TextSplitStep(BaseStep):
     name = "TextSplit"
     description = "文本分镜切分"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("srt_path",)
+    outputs = ("splits",)
+
     # 分镜时长范围（秒）
     MIN_SPLIT_DURATION = 5
     MAX_SPLIT_DURATION = 15
@@ -42,6 +42,10 @@ class SubtitleGenerationStep(BaseStep):
     name = "SubtitleGeneration"
     description = "字幕文件处理和格式化"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("srt_path",)
+    outputs = ()
+
     # 启用函数式模式
     _functional_mode = True
 
@@ -51,6 +51,8 @@ class TTSGenerationStep(BaseStep):
     依赖注入:
     - 通过 __init__ 接收 ITTSService 实例
     - 如果未提供，使用默认的 TTSClient
+    - enable_cache 为 True 时使用 CachedTTSService 包装，
+      相同文案重跑时跳过语音合成和时长探测
 
     注意:
     - 此步骤不包含应用层重试逻辑
@@ -66,9 +68,16 @@ class TTSGenerationStep(BaseStep):
     name = "TTSGeneration"
     description = "文本转语音和字幕生成"
 
+    # 数据依赖（DAG 调度）
+    inputs = ()
+    outputs = ("audio_path", "srt_path")
+
     # 启用函数式模式
     _functional_mode = True
 
+    # 启用 TTS 结果缓存
+    enable_cache = True
+
     def __init__(self, tts_service: Optional[ITTSService] = None):
         """初始化 TTS 步骤
 
@@ -80,8 +89,25 @@ class TTSGenerationStep(BaseStep):
             from core.clients.tts_client import TTSClient
             tts_service = TTSClient(base_url=settings.TTS_SERVER_URL)
 
+        if self.enable_cache:
+            tts_service = self._wrap_with_cache(tts_service)
+
         self.tts_service = tts_service
 
+    @staticmethod
+    def _wrap_with_cache(tts_service: ITTSService) -> ITTSService:
+        """使用缓存服务包装 TTS 服务（缓存不可用时原样返回）"""
+        from core.cache.tts_cache import is_tts_cache_enabled
+        from core.clients.cached_tts_service import CachedTTSService
+
+        if not is_tts_cache_enabled() or isinstance(tts_service, CachedTTSService):
+            return tts_service
+        try:
+            return CachedTTSService(tts_service)
+        except OSError as e:
+            logger.warning(f"TTS 缓存初始化失败，直接合成: {e}")
+            return tts_service
+
     def validate(self, context: PipelineContext) -> None:
         """验证输入数据"""
         if not context.content:
@@ -274,6 +300,10 @@ class EdgeTTSSubtitleStep(BaseStep):
     name = "EdgeTTSSubtitle"
     description = "使用 EdgeTTS 生成语音和字幕"
 
+    # 数据依赖（DAG 调度）
+    inputs = ()
+    outputs = ("audio_path", "srt_path")
+
     # 启用函数式模式
     _functional_mode = True
 
@@ -14,7 +14,6 @@ import os
 from pathlib import Path
 from typing import Dict, Optional, TYPE_CHECKING
 
-from config import settings
 from core.config.api import OSSStoragePaths
 from core.interfaces.service_interfaces import IFileStorageService
 from core.logging_config import setup_logging
@@ -60,6 +59,13 @@ class UploadStep(BaseStep):
     name = "Upload"
     description = "文件上传到 OSS"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("final_video_path", "image_paths", "audio_path", "srt_path")
+    outputs = ("upload_urls",)
+
+    # 上传有外部副作用（OSS 对象可能已被清理或需要重新签名），恢复时总是重新执行
+    checkpointable = False
+
     # 启用函数式模式
     _functional_mode = True
 
@@ -71,6 +77,7 @@ class UploadStep(BaseStep):
                              如果不提供，将创建默认的 StorageClient
         """
         if storage_service is None:
+            from config import settings
             from core.clients.storage_client import StorageClient
             storage_service = StorageClient(settings)
 
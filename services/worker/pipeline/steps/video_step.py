@@ -12,12 +12,15 @@
 - 使用 FFmpegCommandBuilder 构建命令
 - 替换硬编码的 1360:768 分辨率
 - 支持并行 FFmpeg 执行（性能优化）
+- 并行片段生成通过进程级 FFmpegScheduler 限流，多个任务并发时不会超额占用 CPU
+- 新增单图渲染引擎（composition_engine="single_graph"）：所有图片作为循环输入
+  送入同一个滤镜图（concat 或 xfade），一次编码直接输出，不产生中间片段文件
 """
+import contextvars
 import os
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from concurrent.futures.process import _threads_wakeups
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional, TYPE_CHECKING, Tuple
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Tuple
 
 from core.logging_config import setup_logging
 # 使用统一的视频配置
@@ -28,7 +31,7 @@ from core.config.video_config import (
     DEFAULT_LANDSCAPE_CONFIG,
 )
 # 使用 FFmpeg 命令构建器和执行器
-from core.utils.ffmpeg import FFmpegError, run_ffmpeg
+from core.utils.ffmpeg import FFmpegError, get_ffmpeg_scheduler, get_video_duration, run_ffmpeg
 from core.utils.ffmpeg.builder import FFmpegCommandBuilder, build_concat_command
 
 from .base import BaseStep
@@ -69,14 +72,37 @@ class VideoCompositionStep(BaseStep):
     name = "VideoComposition"
     description = "视频合成和转场效果"
 
+    # 数据依赖（DAG 调度）
+    inputs = ("image_paths", "splits", "audio_path")
+    outputs = ("video_path",)
+
     # 使用统一配置（默认横屏）
     _config: VideoProcessingConfig = DEFAULT_LANDSCAPE_CONFIG
 
     # 并行处理配置
     # 设置为 True 启用并行 FFmpeg 执行（性能优化）
-    # 注意：需要根据 CPU 核心数调整 max_workers
+    # 实际并发度受进程级 FFmpegScheduler 的全局预算和任务公平份额限制
     enable_parallel = True  # 默认启用并行处理
-    max_workers = 4  # 最大并行进程数（建议设置为 CPU 核心数）
+    max_workers = 4  # 单个任务提交的最大并行 FFmpeg 调用数
+
+    # 合成引擎
+    # "single_graph": 所有图片在一个 FFmpeg 滤镜图中渲染（默认，无中间文件）
+    # "segments": 每张图片先编码为片段，再 concat 合并（原有逻辑）
+    composition_engine = "single_graph"
+
+    # 单图引擎是否使用 xfade 转场（False 时使用 concat 直接拼接）
+    enable_transitions = False
+
+    # 单个分镜的最短持续时间（秒），避免字幕时间轴异常导致 0 长度输入
+    MIN_SPLIT_DURATION = 0.1
+
+    # 配置中的转场名称 → FFmpeg xfade 转场名称
+    XFADE_TRANSITIONS = {
+        "fade": "fade",
+        "slide": "slideleft",
+        "zoom": "zoomin",
+        "dissolve": "dissolve",
+    }
 
     # 转场类型（从配置获取）
     @property
@@ -105,10 +131,10 @@ class VideoCompositionStep(BaseStep):
         ffmpeg_timeout: int,
         transition: str = "fade",
     ) -> None:
-        """静态方法：将图片转换为视频（可被序列化到子进程）
+        """静态方法：将图片转换为视频
 
-        此方法必须是静态的且只接受简单参数，以便能够被
-        ProcessPoolExecutor 正确序列化到子进程中执行。
+        只接受简单参数，可在线程池中并行调用；
+        FFmpeg 调用经由 run_ffmpeg 进入进程级调度器排队。
 
         Args:
             image_path: 图片路径
@@ -126,7 +152,7 @@ class VideoCompositionStep(BaseStep):
         """
         # 使用 FFmpegCommandBuilder 构建命令
         command = (FFmpegCommandBuilder()
-                   .add_input(image_path, options={"loop": "1", "t": str(duration)})
+                   .add_input(image_path, loop="1", t=str(duration))
                    .add_scale_filter(width, height, force_original=True)
                    .map_stream("[scaled]")
                    .set_video_codec(video_codec)
@@ -140,9 +166,7 @@ class VideoCompositionStep(BaseStep):
         try:
             run_ffmpeg(command, timeout=ffmpeg_timeout)
         except FFmpegError as exc:
-            # 在子进程中记录错误
-            import logging
-            logging.error(f"[_image_to_video_static] FFmpeg 失败: {exc}")
+            logger.error(f"[_image_to_video_static] FFmpeg 失败: {exc}")
             raise
 
     def validate(self, context: PipelineContext) -> None:
@@ -204,22 +228,37 @@ class VideoCompositionStep(BaseStep):
 
         combined_video_path = str(output_dir / "combined.mp4")
 
-        # 为每张图片生成视频片段
-        video_segments = self._create_video_segments(
-            context,
-            image_paths,
-            output_dir,
-        )
+        if self.composition_engine == "single_graph":
+            splits = kwargs.get("splits") or getattr(context, 'splits', None)
+            audio_path = kwargs.get("audio_path") or getattr(context, 'audio_path', None)
+            durations = self._compute_split_durations(
+                splits, len(image_paths), self._probe_audio_duration(audio_path)
+            )
+            duration = self._render_single_graph(
+                context,
+                image_paths,
+                durations,
+                combined_video_path,
+            )
+            segment_count = len(image_paths)
+        else:
+            # 为每张图片生成视频片段
+            video_segments = self._create_video_segments(
+                context,
+                image_paths,
+                output_dir,
+            )
 
-        # 合并视频片段
-        self._merge_video_segments(
-            context,
-            video_segments,
-            combined_video_path,
-        )
+            # 合并视频片段
+            self._merge_video_segments(
+                context,
+                video_segments,
+                combined_video_path,
+            )
 
-        # 计算时长（使用配置中的持续时间）
-        duration = len(video_segments) * self._config.duration_per_image
+            # 计算时长（使用配置中的持续时间）
+            duration = len(video_segments) * self._config.duration_per_image
+            segment_count = len(video_segments)
 
         logger.info(
             f"[{self.name}] 视频合成完成 "
@@ -231,9 +270,197 @@ class VideoCompositionStep(BaseStep):
             step_name=self.name,
             video_path=combined_video_path,
             duration=duration,
-            segment_count=len(video_segments)
+            segment_count=segment_count
+        )
+
+    # ========================================================================
+    # 单图渲染引擎
+    # ========================================================================
+
+    def _compute_split_durations(
+        self,
+        splits: Optional[List[Dict[str, Any]]],
+        image_count: int,
+        audio_duration: Optional[float] = None,
+    ) -> List[float]:
+        """根据分镜时间轴计算每张图片的持续时间
+
+        每张图片从本分镜开始显示到下一分镜开始（第一张从 0 开始，最后一张到
+        本分镜结束与音频结束中的较晚者），保证画面与音频时间轴对齐，后处理的
+        -shortest 不会截掉最后一句之后的音频。分镜数据缺失或数量与图片不一致时，
+        回退到配置中的固定 duration_per_image。
+
+        Args:
+            splits: 分镜数据列表（start/end 为毫秒）
+            image_count: 图片数量
+            audio_duration: 实测音频时长（秒），None 表示未知
+
+        Returns:
+            List[float]: 每张图片的持续时间（秒）
+        """
+        fallback = [self._config.duration_per_image] * image_count
+
+        if not splits or len(splits) != image_count:
+            if splits:
+                logger.warning(
+                    f"[{self.name}] 分镜数量({len(splits)})与图片数量({image_count})不一致，"
+                    f"使用固定时长 {self._config.duration_per_image}秒"
+                )
+            return fallback
+
+        try:
+            ordered = sorted(splits, key=lambda item: item.get("index", 0))
+            durations = []
+            for i, split in enumerate(ordered):
+                start_ms = 0 if i == 0 else split["start"]
+                if i + 1 < len(ordered):
+                    end_ms = ordered[i + 1]["start"]
+                else:
+                    end_ms = max(split["end"], (audio_duration or 0) * 1000)
+                durations.append(max(self.MIN_SPLIT_DURATION, (end_ms - start_ms) / 1000))
+            return durations
+        except (KeyError, TypeError) as exc:
+            logger.warning(f"[{self.name}] 分镜时间轴无效，使用固定时长: {exc}")
+            return fallback
+
+    def _probe_audio_duration(self, audio_path: Optional[str]) -> Optional[float]:
+        """探测音频时长，失败时返回 None（仅按分镜时间轴计算）"""
+        if not audio_path or not os.path.exists(audio_path):
+            return None
+        try:
+            return get_video_duration(audio_path) or None
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as exc:
+            logger.warning(f"[{self.name}] 无法获取音频时长，最后一张图片按分镜结束时间显示: {exc}")
+            return None
+
+    def _render_single_graph(
+        self,
+        context: PipelineContext,
+        image_paths: List[str],
+        durations: List[float],
+        output_path: str,
+    ) -> float:
+        """在单个 FFmpeg 滤镜图中渲染全部图片
+
+        Args:
+            context: Pipeline 上下文
+            image_paths: 图像路径列表
+            durations: 每张图片的持续时间（秒）
+            output_path: 输出视频路径
+
+        Returns:
+            float: 视频总时长（秒）
+        """
+        config = get_video_config(context.is_horizontal)
+        total_duration = sum(durations)
+
+        command = self._build_single_graph_command(
+            image_paths, durations, output_path, config
         )
 
+        logger.info(
+            f"[{self.name}] 单图渲染 "
+            f"(job_id={context.job_id}, 图像数={len(image_paths)}, "
+            f"总时长={total_duration:.2f}秒, 转场={self.enable_transitions})"
+        )
+
+        # 所有图片在一次编码中完成，超时至少覆盖视频总时长
+        timeout = max(config.ffmpeg_timeout, int(total_duration))
+
+        try:
+            run_ffmpeg(command, timeout=timeout)
+        except FFmpegError as exc:
+            logger.error(f"[{self.name}] 单图渲染失败: {exc}")
+            raise
+
+        return total_duration
+
+    def _build_single_graph_command(
+        self,
+        image_paths: List[str],
+        durations: List[float],
+        output_path: str,
+        config: VideoProcessingConfig,
+    ) -> List[str]:
+        """构建单图渲染的 FFmpeg 命令
+
+        每张图片作为 -loop 1 输入，经缩放/补边/统一帧率后：
+        - 无转场：concat 滤镜顺序拼接
+        - 有转场：xfade 链式拼接。除最后一张外，每个输入延长一个转场时长，
+          第 k 次转场的 offset 为前 k+1 个分镜时长之和，总时长保持不变
+
+        Args:
+            image_paths: 图像路径列表
+            durations: 每张图片的持续时间（秒）
+            output_path: 输出视频路径
+            config: 视频处理配置
+
+        Returns:
+            List[str]: FFmpeg 命令参数列表
+        """
+        use_xfade = self.enable_transitions and len(image_paths) > 1
+        transition_duration = config.transition_duration if use_xfade else 0.0
+        last_index = len(image_paths) - 1
+
+        builder = FFmpegCommandBuilder()
+        labels = []
+        for i, (image_path, duration) in enumerate(zip(image_paths, durations)):
+            input_duration = duration + (transition_duration if i < last_index else 0.0)
+            builder.add_input(
+                image_path,
+                index=i,
+                loop="1",
+                framerate=str(config.fps),
+                t=f"{input_duration:.3f}",
+            )
+            builder.add_filter(
+                f"scale={config.width}:{config.height}:force_original_aspect_ratio=decrease,"
+                f"pad={config.width}:{config.height}:(ow-iw)/2:(oh-ih)/2,"
+                f"setsar=1,fps={config.fps},format={config.pix_fmt}",
+                input_label=f"[{i}:v]",
+                output_label=f"[v{i}]",
+            )
+            labels.append(f"[v{i}]")
+
+        if use_xfade:
+            transition_types = config.transition_types
+            current = labels[0]
+            offset = 0.0
+            for i in range(1, len(labels)):
+                offset += durations[i - 1]
+                transition = self.XFADE_TRANSITIONS.get(
+                    transition_types[(i - 1) % len(transition_types)], "fade"
+                )
+                output_label = "[outv]" if i == last_index else f"[x{i}]"
+                builder.add_filter(
+                    f"xfade=transition={transition}:duration={transition_duration}:offset={offset:.3f}",
+                    input_label=f"{current}{labels[i]}",
+                    output_label=output_label,
+                )
+                current = output_label
+        else:
+            builder.add_filter(
+                f"concat=n={len(labels)}:v=1:a=0",
+                input_label="".join(labels),
+                output_label="[outv]",
+            )
+
+        return (builder
+                .map_stream("[outv]")
+                .set_video_codec(config.video_codec)
+                .set_quality(crf=config.crf_quality, preset=config.preset)
+                .set_pixel_format(config.pix_fmt)
+                .set_fps(config.fps)
+                .add_option("tune", "stillimage")
+                .set_output(output_path)
+                .build())
+
+    # ========================================================================
+    # 片段引擎（原有逻辑）
+    # ========================================================================
+
     def _create_video_segments(
         self,
         context: PipelineContext,
@@ -331,8 +558,9 @@ class VideoCompositionStep(BaseStep):
     ) -> List[str]:
         """并行创建视频片段（性能优化）
 
-        使用 ProcessPoolExecutor 并行执行 FFmpeg 进程，
-        在多核 CPU 上可获得显著的性能提升。
+        使用线程池并行提交 FFmpeg 调用。FFmpeg 本身运行在子进程中，
+        并发度由进程级 FFmpegScheduler 控制：全局预算按 CPU 核心数推导，
+        多个任务同时运行时按公平份额分配，避免 N_jobs × max_workers 的进程爆炸。
 
         Args:
             image_paths: 图像路径列表
@@ -357,7 +585,7 @@ class VideoCompositionStep(BaseStep):
                 config.width,
                 config.height,
                 config.video_codec,
-                config.crf,
+                config.crf_quality,
                 config.preset,
                 config.pix_fmt,
                 config.fps,
@@ -367,11 +595,16 @@ class VideoCompositionStep(BaseStep):
             for i in range(len(image_paths))
         ]
 
-        # 使用进程池并行执行
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+        # 线程数不超过调度器给当前任务的公平份额，多余的调用只会在调度器中排队
+        worker_count = max(1, min(self.max_workers, get_ffmpeg_scheduler().fair_share()))
+
+        # 使用线程池并行提交（复制上下文，使 FFmpeg 调用归属到当前任务）
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
             # 提交所有任务
             futures = {
-                executor.submit(self._image_to_video_static, *task): i
+                executor.submit(
+                    contextvars.copy_context().run, self._image_to_video_static, *task
+                ): i
                 for i, task in enumerate(tasks)
             }
 
@@ -383,18 +616,18 @@ class VideoCompositionStep(BaseStep):
                     future.result()  # 获取结果或异常
                     completed += 1
                     logger.debug(
-                        f"[{_create_segments_parallel.__name__}] "
+                        f"[{self.name}] "
                         f"片段 {idx+1}/{len(image_paths)} 完成"
                     )
                 except Exception as exc:
                     logger.error(
-                        f"[{_create_segments_parallel.__name__}] "
+                        f"[{self.name}] "
                         f"片段 {idx+1} 失败: {exc}"
                     )
                     raise
 
         logger.info(
-            f"[{_create_segments_parallel.__name__}] "
+            f"[{self.name}] "
             f"并行创建完成: {completed}/{len(image_paths)} 个片段"
         )
 
@@ -422,11 +655,11 @@ class VideoCompositionStep(BaseStep):
         """
         # 使用 FFmpegCommandBuilder 构建命令
         command = (FFmpegCommandBuilder()
-                   .add_input(image_path, options={"loop": "1", "t": str(duration)})
+                   .add_input(image_path, loop="1", t=str(duration))
                    .add_scale_filter(config.width, config.height, force_original=True)
                    .map_stream("[scaled]")
                    .set_video_codec(config.video_codec)
-                   .set_quality(crf=config.crf, preset=config.preset)
+                   .set_quality(crf=config.crf_quality, preset=config.preset)
                    .set_pixel_format(config.pix_fmt)
                    .set_fps(config.fps)
                    .add_option("tune", "stillimage")
@@ -1,19 +1,28 @@
+"""封面文字绘制
+
+字体解析（大体积 CJK 字体尤其明显）是封面绘制的主要耗时，按 (字体路径, 字号)
+在进程内 LRU 缓存 FreeTypeFont；OpenCC 转换器按配置名缓存为单例。
+draw_text_for_api 全程在内存中完成解码、绘制和编码，不写临时文件。
+"""
 import base64
 import os
-import tempfile
+from functools import lru_cache
+from io import BytesIO
 from typing import Any, List, Optional, Tuple
 
 import cv2
 import numpy as np
 from opencc import OpenCC
 from PIL import Image, ImageDraw, ImageFont
-from worker.config import settings
 
 from core.logging_config import setup_logging
 
 # 初始化日志记录器
 logger = setup_logging("worker.utils.cover_draw_text", log_to_file=False)
 
+# 字体缓存容量（不同字号分别占用一项，环境变量 COVER_FONT_CACHE_SIZE 可覆盖）
+FONT_CACHE_SIZE = int(os.getenv("COVER_FONT_CACHE_SIZE", "64"))
+
 # 字体映射表
 FONT_MAP = {
     "en-AU-NatashaNeural": "arialbd.ttf",
@@ -98,6 +107,52 @@ FONT_MAP = {
 }
 
 
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    获取字体（进程内 LRU 缓存）
+
+    Args:
+        font_path: 字体文件路径
+        size: 字号
+
+    Returns:
+        FreeTypeFont: 字体对象
+    """
+    logger.debug(f"加载字体: {font_path} ({size}pt)")
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=None)
+def get_opencc_converter(config: str) -> OpenCC:
+    """
+    获取 OpenCC 转换器（每种配置一个实例）
+
+    Args:
+        config: OpenCC 配置名，如 "s2tw"
+
+    Returns:
+        OpenCC: 转换器
+    """
+    return OpenCC(config)
+
+
+def _font_dir() -> str:
+    """API 绘制使用的字体目录（worker 配置在首次绘制时才加载）"""
+    from worker.config import settings
+    return str(settings.font_dir)
+
+
+def _bgr_to_rgb(color: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    颜色参数按 OpenCV 的 BGR 顺序给出（历史上图片经 cv2 读写），
+    在 RGB 图像上绘制时需要交换通道以保持输出一致
+    """
+    if len(color) >= 3:
+        return (color[2], color[1], color[0]) + tuple(color[3:])
+    return color
+
+
 def draw_text(
     texts: List[str], 
     input_image: str, 
@@ -111,8 +166,8 @@ def draw_text(
     width, height = img_pil.size  # 获取图片的实际尺寸
 
     # 字体设置
-    font_large = ImageFont.truetype(font_path, 95)
-    font_small = ImageFont.truetype(font_path, 80)
+    font_large = get_font(font_path, 95)
+    font_small = get_font(font_path, 80)
 
     # 颜色定义
     WHITE = (255, 255, 255)
@@ -175,83 +230,60 @@ def draw_text(
     cv2.imwrite(output_image, img)
 
 
-import base64
-import tempfile
+def draw_text_for_api(params: Any) -> str:
+    """
+    在 base64 编码的图片上逐行绘制文字，返回 base64 编码的 PNG
 
+    Args:
+        params: DrawTextRequest，包含 input_image、texts、language、usetraditional
 
-def draw_text_for_api(params: Any) -> str:
+    Returns:
+        str: 绘制后图片的 base64 编码
+    """
+    BLACK = (0, 0, 0)
+    img_pil = Image.open(BytesIO(base64.b64decode(params.input_image))).convert("RGB")
+
+    texts = []
+    for text in params.texts:
+        font = FONT_MAP.get(params.language, "USMCCyuanjiantecu.otf")
+        logger.debug(f"使用字体: {font}")
+        if params.usetraditional:
+            font = "思源黑体-Bold.otf"
+            text.text = get_opencc_converter("s2tw").convert(text.text)  # 转换为繁体中文
+        font_path = os.path.join(_font_dir(), font)
+        font_config = get_font(font_path, text.size)
+        color = text.color
+        if isinstance(color, list) and len(color) == 3:
+            # 如果颜色是RGB列表，转换为元组
+            color = tuple(color)
+        elif isinstance(color, str):
+            color = tuple(eval(color))
+            # 如果颜色是字符串，直接使用
+        texts.append((text.text, _bgr_to_rgb(color), font_config))
 
-    input_base64 = params.input_image
-    # 解码 base64 图片
-    img_pil = None
-    input_image_data = base64.b64decode(input_base64)
-    input_image = None
-    output_image = None
-    try:
-        input_image = tempfile.NamedTemporaryFile(suffix=".png", delete=False).name
-        texts = []
-        BLACK = (0, 0, 0)
-        with open(input_image, "wb") as f:
-            f.write(input_image_data)
-            img = cv2.imread(f.name)
-            img_pil = Image.fromarray(img)
-            for text in params.texts:
-                font = FONT_MAP.get(params.language, "USMCCyuanjiantecu.otf")
-                logger.debug(f"使用字体: {font}")
-                if params.usetraditional:
-                    font = "思源黑体-Bold.otf"
-                    t2s = OpenCC("s2tw")
-                    text.text = t2s.convert(text.text)  # 转换为简体中文
-                font_path = os.path.join(str(settings.font_dir), font)
-                font_config = ImageFont.truetype(font_path, text.size)
-                color = text.color
-                if isinstance(color, list) and len(color) == 3:
-                    # 如果颜色是RGB列表，转换为元组
-                    color = tuple(color)
-                elif isinstance(color, str):
-                    color = tuple(eval(color))
-                    # 如果颜色是字符串，直接使用
-                texts.append((text.text, color, font_config))
-            width, height = img_pil.size  # 获取图片的实际尺寸
-            if len(texts) > 0:
-                line_height = height // len(texts)
-            else:
-                line_height = 0  # 如果没有文本行，则行高为0
-            draw = ImageDraw.Draw(img_pil)
-            for i, (text, fill_color, font_to_use) in enumerate(texts):
-                y = i * line_height + 10
-                x = 10
-                # 描边：先画黑色边框
-                stroke_width = 3
-                draw.text(
-                    (x, y),
-                    text,
-                    font=font_to_use,
-                    fill=fill_color,
-                    stroke_width=stroke_width,
-                    stroke_fill=BLACK,
-                )
-
-            # 转回 OpenCV 并保存
-            img = np.array(img_pil)
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
-                output_image = temp_file.name
-                # 保存处理后的图片
-                logger.debug(f"保存处理后的图片到: {output_image}")
-                cv2.imwrite(output_image, img)
-                # 获取base64编码
-                with open(output_image, "rb") as f:
-                    base64_image = base64.b64encode(f.read()).decode("utf-8")
-        return base64_image
-    finally:
-        # 清理临时文件
-        for temp_file_path in [input_image, output_image]:
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    logger.debug(f"已清理临时文件: {temp_file_path}")
-                except OSError as e:
-                    logger.warning(f"无法删除临时文件 {temp_file_path}: {e}")
+    width, height = img_pil.size  # 获取图片的实际尺寸
+    if len(texts) > 0:
+        line_height = height // len(texts)
+    else:
+        line_height = 0  # 如果没有文本行，则行高为0
+    draw = ImageDraw.Draw(img_pil)
+    for i, (text, fill_color, font_to_use) in enumerate(texts):
+        y = i * line_height + 10
+        x = 10
+        # 描边：先画黑色边框
+        stroke_width = 3
+        draw.text(
+            (x, y),
+            text,
+            font=font_to_use,
+            fill=fill_color,
+            stroke_width=stroke_width,
+            stroke_fill=BLACK,
+        )
+
+    output = BytesIO()
+    img_pil.save(output, format="PNG")
+    return base64.b64encode(output.getvalue()).decode("utf-8")
 
 
 def get_first_frame_from_video(video_path: str, output_image_path: str) -> bool:
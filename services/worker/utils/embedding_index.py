@@ -0,0 +1,281 @@
+"""图片 embedding 向量索引
+
+所有向量归一化为 float32 后按行存放在内存映射的 .npy 矩阵中，图片路径和描述
+写入追加式 JSONL 元数据日志：
+- 插入只写入一行向量并追加一条日志，不再重写整个文件
+- 查询为一次矩阵-向量乘法加 argpartition，支持批量查询
+- 同一图片路径重复插入时原地覆盖对应行，日志回放时以最后一条记录为准
+- 多个进程可共享同一索引目录：写入在 <name>.lock 文件锁内进行，写入前先同步
+  其他进程追加的行（矩阵被扩容替换时重新映射），保证行号不会冲突
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，只支持单个写入进程
+    fcntl = None
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("worker.utils.embedding_index", log_to_file=False)
+
+# 矩阵初始容量（行数），写满后按 2 倍扩容
+_INITIAL_CAPACITY = 1024
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    按行 L2 归一化为 float32
+
+    Args:
+        vectors: 形状为 (n, dim) 或 (dim,) 的向量
+
+    Returns:
+        归一化后的 float32 矩阵，形状为 (n, dim)
+    """
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingIndex:
+    """基于内存映射矩阵的余弦相似度索引（线程安全）"""
+
+    def __init__(self, index_dir: Union[str, Path], name: str = "image_embeddings"):
+        """
+        初始化索引，已有数据通过内存映射打开，不会整体读入内存
+
+        Args:
+            index_dir: 索引文件所在目录
+            name: 文件名前缀，生成 <name>.npy 和 <name>.meta.jsonl
+        """
+        self.index_dir = Path(index_dir)
+        self.matrix_path = self.index_dir / f"{name}.npy"
+        self.meta_path = self.index_dir / f"{name}.meta.jsonl"
+        self.lock_path = self.index_dir / f"{name}.lock"
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        # 当前映射的矩阵文件标识 (设备, inode, 大小)，其他进程扩容替换文件后会变化
+        self._matrix_identity: Optional[Tuple[int, int, int]] = None
+        self._items: List[Dict[str, Any]] = []
+        self._rows_by_path: Dict[str, int] = {}
+        # 元数据日志已回放到的字节偏移和行数
+        self._meta_offset = 0
+        self._meta_lines = 0
+        with self._lock:
+            self._refresh()
+        if self._items:
+            logger.info(f"已加载图片向量索引: {len(self._items)} 条 ({self.matrix_path})")
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def dim(self) -> Optional[int]:
+        """向量维度，索引为空且尚未创建矩阵时为 None"""
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def _refresh(self) -> None:
+        """同步磁盘上的数据（包括其他进程的写入）：矩阵文件被替换时重新映射，并回放新增的元数据日志"""
+        capacity = self._remap_matrix()
+        try:
+            f = open(self.meta_path, "rb")
+        except FileNotFoundError:
+            return
+
+        with f:
+            f.seek(self._meta_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # 其他进程尚未写完的行（或崩溃遗留的不完整行），留待下次回放
+                    break
+                self._meta_offset += len(raw)
+                self._meta_lines += 1
+                try:
+                    record = json.loads(raw.decode("utf-8"))
+                    row = int(record["row"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"跳过损坏的元数据记录: {self.meta_path}:{self._meta_lines}")
+                    continue
+                if row >= capacity:
+                    # 写入方先扩容再追加日志，矩阵可能刚被替换
+                    capacity = self._remap_matrix()
+                if row >= capacity or row > len(self._items):
+                    logger.warning(f"元数据记录行号越界，已跳过: {self.meta_path}:{self._meta_lines}")
+                    continue
+                item = {"image_path": record["image_path"], "description": record.get("description", "")}
+                if row == len(self._items):
+                    self._items.append(item)
+                else:
+                    self._items[row] = item
+                self._rows_by_path[item["image_path"]] = row
+
+    def _remap_matrix(self) -> int:
+        """矩阵文件被替换（扩容）后重新映射，返回当前容量（行数）"""
+        try:
+            stat = os.stat(self.matrix_path)
+            identity = (stat.st_dev, stat.st_ino, stat.st_size)
+        except FileNotFoundError:
+            identity = None
+        if identity != self._matrix_identity:
+            self._matrix = None if identity is None else np.load(self.matrix_path, mmap_mode="r+")
+            self._matrix_identity = identity
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """写入锁：进程内线程锁 + 跨进程文件锁"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_capacity(self, dim: int, rows_needed: int) -> np.ndarray:
+        """确保矩阵至少有 rows_needed 行，不足时扩容为新的内存映射文件"""
+        matrix = self._matrix
+        if matrix is not None:
+            if matrix.shape[1] != dim:
+                raise ValueError(f"向量维度不匹配: 索引为 {matrix.shape[1]}，传入为 {dim}")
+            if matrix.shape[0] >= rows_needed:
+                return matrix
+
+        capacity = _INITIAL_CAPACITY if matrix is None else matrix.shape[0]
+        while capacity < rows_needed:
+            capacity *= 2
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.matrix_path.with_suffix(".npy.tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if matrix is not None:
+            grown[: len(self._items)] = matrix[: len(self._items)]
+        grown.flush()
+        del grown
+        self._matrix = None
+        del matrix
+        os.replace(tmp_path, self.matrix_path)
+        self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+        stat = os.stat(self.matrix_path)
+        self._matrix_identity = (stat.st_dev, stat.st_ino, stat.st_size)
+        logger.info(f"图片向量索引扩容至 {capacity} 行")
+        return self._matrix
+
+    def add(self, entries: Sequence[Tuple[str, str]], vectors: np.ndarray) -> None:
+        """
+        批量插入或更新向量
+
+        Args:
+            entries: (image_path, description) 列表
+            vectors: 与 entries 对应的向量，形状为 (n, dim)
+        """
+        if not entries:
+            return
+        vectors = normalize_rows(vectors)
+        if len(vectors) != len(entries):
+            raise ValueError(f"向量数量({len(vectors)})与条目数量({len(entries)})不一致")
+
+        with self._write_lock():
+            # 先同步其他进程的写入，新行号接在所有进程已写入的行之后
+            self._refresh()
+            new_paths = {path for path, _ in entries if path not in self._rows_by_path}
+            matrix = self._ensure_capacity(vectors.shape[1], len(self._items) + len(new_paths))
+
+            records = []
+            for (image_path, description), vector in zip(entries, vectors):
+                row = self._rows_by_path.get(image_path)
+                item = {"image_path": image_path, "description": description}
+                if row is None:
+                    row = len(self._items)
+                    self._items.append(item)
+                    self._rows_by_path[image_path] = row
+                else:
+                    self._items[row] = item
+                matrix[row] = vector
+                records.append({"row": row, **item})
+
+            # 先落盘向量再追加日志，日志中出现的行号一定有对应的向量
+            matrix.flush()
+            with open(self.meta_path, "ab") as f:
+                # 持有写入锁时仍未回放的尾部只能是崩溃遗留的不完整行，先补换行使其独立成行
+                payload = b"\n" if f.tell() > self._meta_offset else b""
+                payload += b"".join(
+                    (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8") for record in records
+                )
+                f.write(payload)
+                self._meta_offset = f.tell()
+            self._meta_lines += payload.count(b"\n")
+
+    def search(self, queries: np.ndarray, top_k: int = 1) -> List[List[Dict[str, Any]]]:
+        """
+        批量查询最相似的条目
+
+        Args:
+            queries: 查询向量，形状为 (m, dim) 或 (dim,)
+            top_k: 每个查询返回的条目数
+
+        Returns:
+            每个查询对应一个结果列表，元素包含 image_path、description 和 similarity，
+            按相似度降序排列
+        """
+        queries = normalize_rows(queries)
+        with self._lock:
+            self._refresh()
+            count = len(self._items)
+            if count == 0 or top_k <= 0:
+                return [[] for _ in range(len(queries))]
+            scores = queries @ self._matrix[:count].T
+            items = list(self._items)
+
+        k = min(top_k, count)
+        if k < count:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(count), (len(queries), count))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+
+        results = []
+        for rows, row_scores, row_order in zip(top, top_scores, order):
+            results.append([
+                {**items[rows[i]], "similarity": float(row_scores[i])}
+                for i in row_order
+            ])
+        return results
+
+    def import_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        导入旧版 JSON 格式的数据（每个元素包含 image_path、description、embedding）
+
+        Args:
+            items: 旧版数据
+
+        Returns:
+            导入的条目数
+        """
+        entries, vectors = [], []
+        for item in items:
+            if item.get("embedding") is None:
+                continue
+            entries.append((item["image_path"], item.get("description", "")))
+            vectors.append(item["embedding"])
+        if entries:
+            self.add(entries, np.asarray(vectors, dtype=np.float32))
+        return len(entries)
+
+
+__all__ = ["EmbeddingIndex", "normalize_rows"]
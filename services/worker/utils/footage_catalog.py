@@ -0,0 +1,309 @@
+"""背景素材目录
+
+compare_video 需要为没有数字人的任务挑选一段时长足够的背景视频。FootageCatalog
+在进程内只解析一次 duration_map.json（文件 mtime 变化时自动重新加载），按时长排序后
+用二分查找定位候选区间，随机选取是 O(1) 的。
+
+每个素材的关键帧位置（ffprobe 只读包头，不解码）和首帧缩略图在首次使用时计算并
+持久化到缓存目录，之后的任务直接复用：缩略图只需复制文件，从关键帧开始的裁剪
+使用流复制，不再解码源视频。
+"""
+import bisect
+import hashlib
+import json
+import os
+import random
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.logging_config import setup_logging
+
+logger = setup_logging("worker.utils.footage_catalog")
+
+# 起点与关键帧的允许误差（秒）
+_KEYFRAME_TOLERANCE = 1e-3
+
+
+@dataclass(frozen=True)
+class FootageClip:
+    """背景素材"""
+    path: str
+    duration: int  # duration_map.json 中的时长键（秒）
+
+
+def _default_runner(command: List[str]):
+    from core.utils.ffmpeg import run_ffmpeg
+    return run_ffmpeg(command)
+
+
+class FootageCatalog:
+    """按时长索引的背景素材目录（线程安全）"""
+
+    def __init__(
+        self,
+        duration_map_path: str = "duration_map.json",
+        cache_dir: Optional[str] = None,
+        runner: Optional[Callable[[List[str]], object]] = None,
+    ):
+        """
+        Args:
+            duration_map_path: 时长映射文件，格式为 {"时长秒数": [视频路径, ...]}
+            cache_dir: 关键帧索引与缩略图缓存目录，默认为映射文件旁的 .footage_cache
+            runner: 执行 ffmpeg/ffprobe 命令并返回 CompletedProcess 的函数，默认使用 run_ffmpeg
+        """
+        self.duration_map_path = duration_map_path
+        self.cache_dir = Path(
+            cache_dir or Path(duration_map_path).resolve().parent / ".footage_cache"
+        )
+        self._run = runner or _default_runner
+
+        self._lock = threading.Lock()
+        self._mtime_ns: Optional[int] = None
+        # (升序时长, 对应素材)，整体替换以保证读取时两者一致
+        self._index: Tuple[List[int], List[FootageClip]] = ([], [])
+
+        self._keyframes: Dict[str, Dict] = {}  # path -> {"mtime_ns": int, "keyframes": [float]}
+        self._keyframes_loaded = False
+
+    # ------------------------------------------------------------------
+    # 时长索引
+    # ------------------------------------------------------------------
+    def _refresh(self) -> None:
+        """映射文件 mtime 变化时重新加载"""
+        try:
+            mtime_ns = os.stat(self.duration_map_path).st_mtime_ns
+        except FileNotFoundError:
+            logger.error(f"duration_map.json 不存在: {self.duration_map_path}")
+            raise FileNotFoundError(f"duration_map.json not found: {self.duration_map_path}")
+
+        if mtime_ns == self._mtime_ns:
+            return
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            with open(self.duration_map_path, "r", encoding="utf-8") as f:
+                duration_map = json.load(f)
+            entries: List[Tuple[int, str]] = sorted(
+                (int(k), path) for k, paths in duration_map.items() for path in paths
+            )
+            self._index = ([d for d, _ in entries], [FootageClip(path, d) for d, path in entries])
+            self._mtime_ns = mtime_ns
+            logger.info(f"加载背景素材目录: {len(entries)} 个视频 ({self.duration_map_path})")
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._index[1])
+
+    def select(self, min_duration: float, rng: Optional[random.Random] = None) -> FootageClip:
+        """
+        从时长超过 min_duration 的素材中随机选择一个
+
+        Args:
+            min_duration: 需要的最短时长（秒）
+            rng: 随机数生成器，默认使用全局 random
+
+        Returns:
+            选中的素材
+
+        Raises:
+            FileNotFoundError: 映射文件不存在
+            ValueError: 没有时长足够的素材
+        """
+        self._refresh()
+        durations, clips = self._index
+        lo = bisect.bisect_right(durations, min_duration)
+        if lo == len(clips):
+            logger.error(f"没有找到时长超过 {min_duration} 秒的视频")
+            raise ValueError(f"No videos found with duration > {min_duration}")
+        return clips[(rng or random).randrange(lo, len(clips))]
+
+    # ------------------------------------------------------------------
+    # 关键帧索引
+    # ------------------------------------------------------------------
+    @property
+    def _keyframe_index_path(self) -> Path:
+        return self.cache_dir / "keyframes.json"
+
+    def _load_keyframe_index(self) -> None:
+        if self._keyframes_loaded:
+            return
+        try:
+            with open(self._keyframe_index_path, "r", encoding="utf-8") as f:
+                self._keyframes = json.load(f)
+        except FileNotFoundError:
+            self._keyframes = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"关键帧索引损坏，将重新生成: {e}")
+            self._keyframes = {}
+        self._keyframes_loaded = True
+
+    def _save_keyframe_index(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._keyframe_index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._keyframes, f)
+        os.replace(tmp_path, self._keyframe_index_path)
+
+    def _probe_keyframes(self, path: str) -> List[float]:
+        """读取视频流的关键帧时间戳（只解析包，不解码）"""
+        result = self._run([
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            path,
+        ])
+        keyframes = []
+        for line in (result.stdout or "").splitlines():
+            pts_time, _, flags = line.strip().partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+        return sorted(keyframes)
+
+    def keyframes(self, clip: FootageClip) -> List[float]:
+        """
+        获取素材的关键帧时间戳（秒），结果按文件 mtime 缓存并持久化
+
+        Args:
+            clip: 素材
+
+        Returns:
+            升序排列的关键帧时间戳
+        """
+        mtime_ns = os.stat(clip.path).st_mtime_ns
+        with self._lock:
+            self._load_keyframe_index()
+            cached = self._keyframes.get(clip.path)
+            if cached and cached.get("mtime_ns") == mtime_ns:
+                return cached["keyframes"]
+
+        keyframes = self._probe_keyframes(clip.path)
+        with self._lock:
+            self._keyframes[clip.path] = {"mtime_ns": mtime_ns, "keyframes": keyframes}
+            try:
+                self._save_keyframe_index()
+            except OSError as e:
+                logger.warning(f"保存关键帧索引失败: {e}")
+        return keyframes
+
+    # ------------------------------------------------------------------
+    # 缩略图与裁剪
+    # ------------------------------------------------------------------
+    def thumbnail_path(self, clip: FootageClip, suffix: str = ".png") -> Path:
+        """素材首帧缩略图的缓存路径（随源文件 mtime 变化）"""
+        mtime_ns = os.stat(clip.path).st_mtime_ns
+        digest = hashlib.sha1(f"{clip.path}:{mtime_ns}".encode("utf-8")).hexdigest()
+        return self.cache_dir / "thumbnails" / f"{digest}{suffix}"
+
+    def _ensure_thumbnail(self, clip: FootageClip, suffix: str) -> Path:
+        """缩略图不存在时解码首帧生成（先写临时文件再原子替换）"""
+        cached = self.thumbnail_path(clip, suffix)
+        if not cached.exists():
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cached.with_name(f"{cached.stem}.{threading.get_ident()}{cached.suffix}")
+            self._run(["ffmpeg", "-y", "-i", clip.path, "-frames:v", "1", str(tmp_path)])
+            os.replace(tmp_path, cached)
+        return cached
+
+    def copy_first_frame(self, clip: FootageClip, output_image_path: str) -> str:
+        """
+        将素材首帧写入 output_image_path，缩略图已缓存时直接复制
+
+        Args:
+            clip: 素材
+            output_image_path: 输出图像路径（扩展名决定图像格式）
+
+        Returns:
+            输出图像路径
+        """
+        cached = self._ensure_thumbnail(clip, Path(output_image_path).suffix or ".png")
+        Path(output_image_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, output_image_path)
+        return output_image_path
+
+    def cut(self, clip: FootageClip, output_path: str, duration: float, start: float = 0.0) -> str:
+        """
+        裁剪素材；起点位于关键帧（或关键帧未知）时使用流复制，否则重新编码
+
+        Args:
+            clip: 素材
+            output_path: 输出视频路径
+            duration: 裁剪时长（秒）
+            start: 起点（秒）
+
+        Returns:
+            输出视频路径
+        """
+        try:
+            keyframes = self.keyframes(clip)
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            logger.warning(f"读取关键帧失败，按流复制裁剪: {clip.path}, {e}")
+            keyframes = []
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        command = ["ffmpeg", "-y", "-ss", str(start), "-i", clip.path, "-t", str(duration)]
+        if not keyframes or self._is_keyframe(keyframes, start):
+            command += ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+        else:
+            logger.debug(f"起点 {start}s 不在关键帧上，重新编码: {clip.path}")
+            command += ["-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac"]
+        self._run(command + [output_path])
+        return output_path
+
+    @staticmethod
+    def _is_keyframe(keyframes: List[float], timestamp: float) -> bool:
+        index = bisect.bisect_left(keyframes, timestamp - _KEYFRAME_TOLERANCE)
+        return index < len(keyframes) and keyframes[index] <= timestamp + _KEYFRAME_TOLERANCE
+
+    def warm(self, suffix: str = ".png") -> int:
+        """
+        预先为所有素材计算关键帧和首帧缩略图（可在部署后离线执行）
+
+        Args:
+            suffix: 缩略图格式
+
+        Returns:
+            处理的素材数量
+        """
+        self._refresh()
+        count = 0
+        for clip in self._index[1]:
+            try:
+                self.keyframes(clip)
+                self._ensure_thumbnail(clip, suffix)
+                count += 1
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except Exception as e:
+                logger.warning(f"预计算素材失败: {clip.path}, {e}")
+        return count
+
+
+_footage_catalog: Optional[FootageCatalog] = None
+_footage_catalog_lock = threading.Lock()
+
+
+def get_footage_catalog() -> FootageCatalog:
+    """
+    获取进程级素材目录单例
+
+    映射文件路径默认为当前目录下的 duration_map.json，可通过环境变量
+    FOOTAGE_DURATION_MAP 覆盖；缓存目录可通过 FOOTAGE_CACHE_DIR 覆盖。
+    """
+    global _footage_catalog
+    if _footage_catalog is None:
+        with _footage_catalog_lock:
+            if _footage_catalog is None:
+                _footage_catalog = FootageCatalog(
+                    duration_map_path=os.getenv("FOOTAGE_DURATION_MAP", "duration_map.json"),
+                    cache_dir=os.getenv("FOOTAGE_CACHE_DIR") or None,
+                )
+    return _footage_catalog
+
+
+__all__ = ["FootageCatalog", "FootageClip", "get_footage_catalog"]
@@ -1,11 +1,12 @@
 import json
 import os
 import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 from worker.config import settings
 
 # 添加项目根目录到Python路径
@@ -14,6 +15,7 @@ if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
 from core.logging_config import setup_logging
+from utils.embedding_index import EmbeddingIndex
 
 # 配置日志
 logger = setup_logging("worker.utils.image_embedding_tool", log_to_file=False)
@@ -23,46 +25,42 @@ class ImageEmbeddingTool:
     def __init__(
         self, 
         data_file: str = "image_embeddings.json", 
-        model_name: str = EMBEDDING_MODEL
+        model_name: str = EMBEDDING_MODEL,
+        index_dir: Optional[str] = None,
     ) -> None:
         """
         初始化图片embedding工具
-        
+
+        向量存放在 index_dir 下的内存映射矩阵中；首次启动时若存在旧版 JSON
+        数据文件，会自动导入到新索引。
+
         Args:
-            data_file: 数据文件路径
+            data_file: 旧版 JSON 数据文件路径（仅用于迁移）
             model_name: 模型名称或路径
+            index_dir: 向量索引目录，默认与本文件同目录
+                       （可通过环境变量 IMAGE_EMBEDDING_INDEX_DIR 覆盖）
         """
         self.data_file = os.path.join(os.path.dirname(__file__), data_file)
         self.model = SentenceTransformer(model_name)
-        self.image_data = self._load_data()
-
-    def _load_data(self) -> List[Dict[str, Any]]:
-        """加载现有的图片embedding数据
-        
-        Returns:
-            List[Dict[str, Any]]: 图片数据列表，每个元素包含image_path、description和embedding
-        """
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # 将embedding列表转换为numpy数组
-                for item in data:
-                    if 'embedding' in item and isinstance(item['embedding'], list):
-                        item['embedding'] = np.array(item['embedding'], dtype=np.float32)
-                return data
-        return []
-
-    def _save_data(self) -> None:
-        """保存图片embedding数据到文件"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            # 将numpy数组转换为列表以便json序列化
-            serializable_data = []
-            for item in self.image_data:
-                temp_item = item.copy()
-                if 'embedding' in temp_item and isinstance(temp_item['embedding'], np.ndarray):
-                    temp_item['embedding'] = temp_item['embedding'].tolist()
-                serializable_data.append(temp_item)
-            json.dump(serializable_data, f, ensure_ascii=False, indent=4)
+        index_dir = index_dir or os.getenv("IMAGE_EMBEDDING_INDEX_DIR") or os.path.dirname(__file__)
+        self.index = EmbeddingIndex(index_dir, name=Path(data_file).stem)
+        if len(self.index) == 0:
+            self._migrate_legacy_data()
+
+    def _migrate_legacy_data(self) -> None:
+        """将旧版 JSON 数据文件导入向量索引"""
+        if not os.path.exists(self.data_file):
+            return
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        count = self.index.import_items(data)
+        logger.info(f"已从 {self.data_file} 导入 {count} 条图片embedding数据")
+
+    def _encode(self, texts: Sequence[str]) -> np.ndarray:
+        """批量编码文本为归一化向量"""
+        return self.model.encode(
+            list(texts), convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32, copy=False)
 
     def insert_image_embedding(self, image_path: str, description: str) -> None:
         """
@@ -73,27 +71,20 @@ class ImageEmbeddingTool:
             image_path: 图片路径
             description: 图片描述
         """
-        embedding = self.model.encode(description, convert_to_numpy=True)
-
-        # 检查是否已存在该图片路径
-        found = False
-        for item in self.image_data:
-            if item['image_path'] == image_path:
-                item['description'] = description
-                item['embedding'] = embedding
-                found = True
-                break
-        
-        if not found:
-            self.image_data.append({
-                "image_path": image_path,
-                "description": description,
-                "embedding": embedding
-            })
-        
-        self._save_data()
+        self.insert_image_embeddings([(image_path, description)])
         logger.info(f"图片 '{image_path}' 及其描述已插入/更新。")
 
+    def insert_image_embeddings(self, items: Sequence[Tuple[str, str]]) -> None:
+        """
+        批量插入图片和图片描述
+
+        Args:
+            items: (image_path, description) 列表
+        """
+        if not items:
+            return
+        self.index.add(items, self._encode([description for _, description in items]))
+
     def find_similar_image(
         self, 
         query_description: str, 
@@ -110,34 +101,48 @@ class ImageEmbeddingTool:
         Returns:
             List[Dict[str, Any]]: 相似图片列表，每个元素包含image_path、description和similarity
         """
-        if not self.image_data:
-            logger.warning("没有可用的图片数据进行匹配。")
+        return self.find_similar_images([query_description], top_k=top_k)[0]
+
+    def find_similar_images(
+        self,
+        query_descriptions: Sequence[str],
+        top_k: int = 1,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        批量匹配相似图片，所有查询一次编码、一次矩阵乘法完成
+
+        Args:
+            query_descriptions: 查询描述列表
+            top_k: 每个查询返回前k个最相似的图片
+
+        Returns:
+            List[List[Dict[str, Any]]]: 与查询一一对应的相似图片列表
+        """
+        if not query_descriptions:
             return []
+        if len(self.index) == 0:
+            logger.warning("没有可用的图片数据进行匹配。")
+            return [[] for _ in query_descriptions]
+        return self.index.search(self._encode(query_descriptions), top_k=top_k)
 
-        query_embedding = self.model.encode(query_description, convert_to_numpy=True)
-        
-        # 提取所有存储的embedding
-        corpus_embeddings = [item['embedding'] for item in self.image_data]
-        
-        # 计算余弦相似度
-        # util.cos_sim 期望的是张量，这里我们使用numpy手动计算或转换为张量
-        # 为了简化，我们假设embedding已经是numpy数组
-        similarities = []
-        for i, emb in enumerate(corpus_embeddings):
-            sim = util.cos_sim(query_embedding, emb).item()
-            similarities.append((sim, i))
-        
-        # 按相似度降序排序
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        
-        results = []
-        for sim, idx in similarities[:top_k]:
-            results.append({
-                "image_path": self.image_data[idx]['image_path'],
-                "description": self.image_data[idx]['description'],
-                "similarity": sim
-            })
-        return results
+
+_tool: Optional[ImageEmbeddingTool] = None
+_tool_lock = threading.Lock()
+
+
+def get_image_embedding_tool() -> ImageEmbeddingTool:
+    """
+    获取进程级单例，模型和向量索引只加载一次
+
+    Returns:
+        图片embedding工具
+    """
+    global _tool
+    if _tool is None:
+        with _tool_lock:
+            if _tool is None:
+                _tool = ImageEmbeddingTool()
+    return _tool
 
 # 示例用法 (可选，用于测试)
 if __name__ == "__main__":
@@ -171,9 +176,9 @@ if __name__ == "__main__":
     for img in similar_images:
         logger.info(f"  - 图片: {img['image_path']}, 描述: '{img['description']}', 相似度: {img['similarity']:.4f}")
 
-    # 检查数据文件是否生成
-    logger.info(f"\n数据文件路径: {tool.data_file}")
-    if os.path.exists(tool.data_file):
-        logger.info("数据文件已成功创建/更新。")
+    # 检查索引文件是否生成
+    logger.info(f"\n索引文件路径: {tool.index.matrix_path}")
+    if tool.index.matrix_path.exists():
+        logger.info("索引文件已成功创建/更新。")
     else:
-        logger.warning("数据文件未找到。")
\ No newline at end of file
+        logger.warning("索引文件未找到。")
\ No newline at end of file
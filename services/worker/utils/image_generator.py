@@ -8,16 +8,77 @@ import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from clients import ai_image_client
-from utils.image_embedding_tool import ImageEmbeddingTool
-from utils.util import ocr_image
+from clients.ocr_client import get_ocr_client
+from utils.image_embedding_tool import get_image_embedding_tool
 from worker.config import settings
 
 from core.logging_config import setup_logging
+from core.utils.task_notifier import TaskCompletion, get_task_notifier
 
 logger = setup_logging("worker.utils.image_generator")
 
 HUMAN_CONFIG_PATH = settings.human_config_path
 
+# 等待单个图像任务完成的最长时间（秒）
+IMAGE_TASK_TIMEOUT_SECONDS = 300
+# 通知丢失时的兜底状态查询间隔（秒）：跨进程通知可用时放宽，否则退化为轮询
+_STATUS_CHECK_INTERVAL_SECONDS = 30
+_LOCAL_STATUS_CHECK_INTERVAL_SECONDS = 5
+
+
+def _wait_for_image_task(task_id: str, timeout: float) -> Optional[TaskCompletion]:
+    """
+    阻塞等待图像任务完成
+
+    优先等待消费者发布的完成通知；每隔一段时间查询一次任务状态作为兜底，
+    避免通知丢失（如消费者未配置 Redis）时一直等到超时。
+
+    Args:
+        task_id: 任务ID
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        任务完成信息，超时返回 None
+    """
+    notifier = get_task_notifier()
+    interval = (
+        _STATUS_CHECK_INTERVAL_SECONDS if notifier.distributed
+        else _LOCAL_STATUS_CHECK_INTERVAL_SECONDS
+    )
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        completion = notifier.wait(task_id, min(interval, remaining))
+        if completion is not None:
+            return completion
+
+        status = ai_image_client.check_task_status_sync(task_id)
+        if status and status.get("status") in ("completed", "failed"):
+            return TaskCompletion(
+                task_id=task_id,
+                status=status["status"],
+                error_message=status.get("error_message"),
+            )
+
+
+def _load_actor_task_id(basepath: str) -> Optional[str]:
+    """
+    从 data.json 读取 Actor 图像任务ID
+
+    Args:
+        basepath: 基础路径
+
+    Returns:
+        Actor 图像任务ID，不存在时返回 None
+    """
+    datajsonpath = os.path.join(basepath, "data.json")
+    if not os.path.exists(datajsonpath):
+        return None
+    with open(datajsonpath, "r", encoding="utf-8") as f:
+        return json.load(f).get("actor_task")
+
 
 def _generate_single_image(
     index: str,
@@ -27,6 +88,7 @@ def _generate_single_image(
     basepath: str,
     is_actor: str,
     loras: List[Dict[str, Any]],
+    actor_task_id: Optional[str] = None,
 ) -> Tuple[str, str]:
     """
     生成单张图像
@@ -39,16 +101,12 @@ def _generate_single_image(
         basepath: 基础路径
         is_actor: 是否为actor图像
         loras: LoRA配置列表
+        actor_task_id: Actor 图像任务ID（由调用方从 data.json 读取一次后传入）
         
     Returns:
         (index, task_id) 元组
     """
-    datajsonpath = os.path.join(basepath, "data.json")
-    datajson = {}
-    if os.path.exists(datajsonpath):
-        with open(datajsonpath, "r", encoding="utf-8") as f:
-            datajson = json.load(f)
-    task_id = datajson.get("actor_task")
+    task_id = actor_task_id
 
     filename = os.path.join(basepath, f"{index}.png")
     model_name = "flux"
@@ -95,37 +153,25 @@ def _generate_single_image(
                 continue
             
             # 等待任务完成
-            for i in range(60):
-                time.sleep(5)
-                status = ai_image_client.check_task_status_sync(task_id)
-                if status and status.get("status") == "completed":
-                    ai_image_client.get_image_and_save_sync(
-                        task_id, topic, model_name, filename
-                    )
-                    break
-                if status and status.get("status") == "failed":
-                    raise Exception(
-                        f"Image generation failed. Error Message: {status.get('error_message', '')}"
-                    )
+            completion = _wait_for_image_task(task_id, IMAGE_TASK_TIMEOUT_SECONDS)
+            if completion is None:
+                logger.warning(f"图像生成任务等待超时: index={index}, task_id={task_id}")
+            elif completion.status == "completed":
+                ai_image_client.get_image_and_save_sync(
+                    task_id, topic, model_name, filename
+                )
+            else:
+                raise Exception(
+                    f"Image generation failed. Error Message: {completion.error_message or ''}"
+                )
             
             # 检查OCR结果，如果包含文字则重试
-            result = ocr_image(filename)
-            ocr_result = result.get("ocr_result", [])
-            if not ocr_result or not ocr_result[0]:
-                logger.info(f"图像生成成功（无OCR结果）: index={index}")
-                return index, task_id
-            
-            text = ""
-            results = [] if not ocr_result[0] else ocr_result[0]
-            for x in results:
-                if x:
-                    text += x[-1][0]
-            
-            if len(text) < 10:
+            verdict = get_ocr_client().check_image(filename)
+            if not verdict.has_text:
                 logger.info(f"图像生成成功: index={index}")
                 return index, task_id
             else:
-                logger.warning(f"图像包含文字，重试: index={index}, text_length={len(text)}, attempt={attempt + 1}")
+                logger.warning(f"图像包含文字，重试: index={index}, text_length={len(verdict.text)}, attempt={attempt + 1}")
                 
     except (SystemExit, KeyboardInterrupt):
         # 系统退出异常，不捕获，直接抛出
@@ -144,6 +190,7 @@ def _match_similar_image(
     srtdata: Dict[str, Dict[str, Any]],
     topics_config: Dict[str, Any],
     topic_name: str,
+    candidates: Optional[List[Dict[str, Any]]] = None,
 ) -> None:
     """
     匹配相似图像或视频
@@ -155,6 +202,7 @@ def _match_similar_image(
         srtdata: 字幕数据
         topics_config: 主题配置
         topic_name: 主题名称
+        candidates: 预先批量检索得到的相似图片，None 时单独检索
     """
     imagepath = os.path.join(basepath, f"{imageindex}.png")
     if os.path.exists(imagepath):
@@ -181,12 +229,12 @@ def _match_similar_image(
 
     # 使用图像嵌入工具查找相似图片
     logger.info(f"匹配相似图像: index={imageindex}, prompt={prompt_data['prompt'][:50]}...")
-    image_embedding_tool = ImageEmbeddingTool()
-    results = image_embedding_tool.find_similar_image(
-        prompt_data["prompt"], top_k=3
-    )
+    if candidates is None:
+        candidates = get_image_embedding_tool().find_similar_image(
+            prompt_data["prompt"], top_k=3
+        )
     
-    for result in results:
+    for result in candidates:
         image_path = result["image_path"]
         if not os.path.exists(image_path):
             continue
@@ -255,6 +303,7 @@ def generate_images_from_srtdata(
     # 并行生成图像
     max_workers = min(len(images_to_generate), 8)
     if max_workers > 0:
+        actor_task_id = _load_actor_task_id(basepath)
         logger.info(f"开始生成 {len(images_to_generate)} 张图像，使用 {max_workers} 个工作线程")
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = []
@@ -273,6 +322,7 @@ def generate_images_from_srtdata(
                     basepath,
                     is_actor,
                     loras,
+                    actor_task_id,
                 )
                 futures.append(future)
 
@@ -288,10 +338,27 @@ def generate_images_from_srtdata(
 
     # 匹配相似图像
     logger.info(f"开始匹配 {len(images_to_match)} 张图像")
+    candidates_by_index: Dict[str, List[Dict[str, Any]]] = {}
+    if topics_config.get(topic_name, {}).get("generate", True):
+        # 所有待匹配图像的提示词一次性批量检索
+        pending = [
+            (imageindex, prompt_data["prompt"])
+            for imageindex, prompt_data, _ in images_to_match
+            if not os.path.exists(os.path.join(basepath, f"{imageindex}.png"))
+        ]
+        if pending:
+            batch_results = get_image_embedding_tool().find_similar_images(
+                [prompt for _, prompt in pending], top_k=3
+            )
+            candidates_by_index = {
+                imageindex: results for (imageindex, _), results in zip(pending, batch_results)
+            }
+
     for _value in images_to_match:
         imageindex, prompt_data, is_actor = _value
         _match_similar_image(
-            imageindex, prompt_data, basepath, srtdata, topics_config, topic_name
+            imageindex, prompt_data, basepath, srtdata, topics_config, topic_name,
+            candidates=candidates_by_index.get(imageindex),
         )
 
     return srtdata
@@ -372,37 +439,25 @@ def generate_actor_image(
                 continue
             
             # 等待任务完成
-            for i in range(90):
-                time.sleep(5)
-                status = ai_image_client.check_task_status_sync(task_id)
-                if status and status.get("status") == "completed":
-                    ai_image_client.get_image_and_save_sync(
-                        task_id, topic, model_name, actorpath
-                    )
-                    break
-                if status and status.get("status") == "failed":
-                    raise Exception(
-                        f"Image generation failed. Error Message: {status.get('error_message', '')}"
-                    )
+            completion = _wait_for_image_task(task_id, 90 * 5)
+            if completion is None:
+                logger.warning(f"Actor图像生成任务等待超时: task_id={task_id}")
+            elif completion.status == "completed":
+                ai_image_client.get_image_and_save_sync(
+                    task_id, topic, model_name, actorpath
+                )
+            else:
+                raise Exception(
+                    f"Image generation failed. Error Message: {completion.error_message or ''}"
+                )
             
             # 检查OCR结果
-            result = ocr_image(actorpath)
-            ocr_result = result.get("ocr_result", [])
-            if not ocr_result or not ocr_result[0]:
-                logger.info("Actor图像生成成功（无OCR结果）")
-                break
-            
-            text = ""
-            results = [] if not ocr_result[0] else ocr_result[0]
-            for x in results:
-                if x:
-                    text += x[-1][0]
-            
-            if len(text) < 10:
+            verdict = get_ocr_client().check_image(actorpath)
+            if not verdict.has_text:
                 logger.info("Actor图像生成成功")
                 break
             else:
-                logger.warning(f"Actor图像包含文字，重试: text_length={len(text)}, attempt={attempt + 1}")
+                logger.warning(f"Actor图像包含文字，重试: text_length={len(verdict.text)}, attempt={attempt + 1}")
                 
     except (SystemExit, KeyboardInterrupt):
         # 系统退出异常，不捕获，直接抛出
@@ -0,0 +1,191 @@
+"""按序增量拼接合成音频段
+
+并发合成的音频段乱序完成。OrderedSegmentAssembler 只缓存尚未轮到的段，
+一旦下一个连续序号的段就绪就立即把 PCM 帧写入输出 WAV、追加对应的 SRT 条目
+并释放该段，内存占用只与乱序窗口有关，而不是整部稿件的音频总长度。
+"""
+import os
+import wave
+from typing import Any, Dict, Optional, Tuple
+
+from core.logging_config import setup_logging
+from core.utils.time_formatter import format_time_ms_to_srt
+
+logger = setup_logging("worker.utils.segment_assembler")
+
+
+class OrderedSegmentAssembler:
+    """
+    将乱序到达的音频段按序号流式写入 WAV 与 SRT
+
+    输出的采样率、声道数和位宽取自第 0 段，后续格式不同的段会先转换。
+    两个文件先写入 ``.part`` 临时文件，close() 成功后才原子替换为最终路径。
+    """
+
+    def __init__(self, audio_path: str, srt_path: str, silence_ms: int = 300):
+        """
+        Args:
+            audio_path: 输出 WAV 路径
+            srt_path: 输出 SRT 路径
+            silence_ms: 相邻段之间插入的静音时长（毫秒）
+        """
+        self.audio_path = audio_path
+        self.srt_path = srt_path
+        self.silence_ms = silence_ms
+
+        self._pending: Dict[int, Tuple[Any, str]] = {}
+        self._next_index = 0
+        self._frames_written = 0
+        self._peak_pending = 0
+        self._wav: Optional[wave.Wave_write] = None
+        self._srt = None
+        self._format: Optional[Tuple[int, int, int]] = None  # (frame_rate, channels, sample_width)
+        self._closed = False
+
+    @property
+    def next_index(self) -> int:
+        """下一个等待写入的段序号"""
+        return self._next_index
+
+    @property
+    def pending_count(self) -> int:
+        """已完成但尚未轮到写入的段数"""
+        return len(self._pending)
+
+    @property
+    def peak_pending(self) -> int:
+        """乱序缓存达到过的最大段数"""
+        return self._peak_pending
+
+    @property
+    def duration_ms(self) -> int:
+        """已写入音频的时长（毫秒）"""
+        return self._frames_to_ms(self._frames_written)
+
+    def add(self, index: int, audio: Any, text: str) -> int:
+        """
+        加入一个已完成的音频段，并写出所有已连续就绪的段
+
+        Args:
+            index: 段序号（从 0 开始）
+            audio: pydub AudioSegment
+            text: 字幕文本
+
+        Returns:
+            本次写出的段数
+        """
+        if self._closed:
+            raise RuntimeError("assembler 已关闭")
+        if index < self._next_index or index in self._pending:
+            raise ValueError(f"音频段 {index} 重复提交")
+
+        self._pending[index] = (audio, text)
+        self._peak_pending = max(self._peak_pending, len(self._pending))
+
+        written = 0
+        while self._next_index in self._pending:
+            audio, text = self._pending.pop(self._next_index)
+            self._write_segment(self._next_index, audio, text)
+            self._next_index += 1
+            written += 1
+        return written
+
+    def _open(self, audio: Any) -> None:
+        self._format = (audio.frame_rate, audio.channels, audio.sample_width)
+        self._wav = wave.open(self.audio_path + ".part", "wb")
+        self._wav.setframerate(audio.frame_rate)
+        self._wav.setnchannels(audio.channels)
+        self._wav.setsampwidth(audio.sample_width)
+        self._srt = open(self.srt_path + ".part", "w", encoding="utf-8")
+
+    def _conform(self, audio: Any) -> Any:
+        """转换为输出文件的格式"""
+        frame_rate, channels, sample_width = self._format
+        if audio.frame_rate != frame_rate:
+            audio = audio.set_frame_rate(frame_rate)
+        if audio.channels != channels:
+            audio = audio.set_channels(channels)
+        if audio.sample_width != sample_width:
+            audio = audio.set_sample_width(sample_width)
+        return audio
+
+    def _frames_to_ms(self, frames: int) -> int:
+        if not self._format:
+            return 0
+        return int(round(frames * 1000 / self._format[0]))
+
+    def _write_segment(self, index: int, audio: Any, text: str) -> None:
+        if self._wav is None:
+            self._open(audio)
+        else:
+            audio = self._conform(audio)
+            # 在上一段之后插入静音
+            silence_frames = int(round(self.silence_ms * self._format[0] / 1000))
+            if silence_frames:
+                frame_size = self._format[1] * self._format[2]
+                self._wav.writeframesraw(b"\x00" * (silence_frames * frame_size))
+                self._frames_written += silence_frames
+            self._srt.write("\n")
+
+        start_ms = self._frames_to_ms(self._frames_written)
+        self._wav.writeframesraw(audio.raw_data)
+        self._frames_written += int(audio.frame_count())
+        end_ms = self._frames_to_ms(self._frames_written)
+
+        self._srt.write(
+            f"{index + 1}\n"
+            f"{format_time_ms_to_srt(start_ms)} --> {format_time_ms_to_srt(end_ms)}\n"
+            f"{text}\n"
+        )
+        self._srt.flush()
+
+    def close(self) -> None:
+        """
+        完成写入并把临时文件替换为最终输出
+
+        Raises:
+            RuntimeError: 仍有段缺失（存在未写出的乱序段）或没有任何段
+        """
+        if self._closed:
+            return
+        if self._pending or self._wav is None:
+            missing = self._next_index
+            self.abort()
+            raise RuntimeError(f"音频段不连续，缺少第 {missing} 段")
+
+        self._wav.close()  # 回写 WAV 头中的帧数
+        self._srt.close()
+        os.replace(self.audio_path + ".part", self.audio_path)
+        os.replace(self.srt_path + ".part", self.srt_path)
+        self._closed = True
+        logger.info(
+            f"已按序写出 {self._next_index} 个音频段，总时长 {self.duration_ms}ms，"
+            f"乱序缓存峰值 {self._peak_pending} 段"
+        )
+
+    def abort(self) -> None:
+        """放弃输出，删除临时文件"""
+        self._closed = True
+        self._pending.clear()
+        for handle in (self._wav, self._srt):
+            if handle is not None:
+                try:
+                    handle.close()
+                except (OSError, wave.Error) as e:
+                    logger.warning(f"关闭临时输出失败: {e}")
+        for path in (self.audio_path + ".part", self.srt_path + ".part"):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"无法删除临时文件 {path}: {e}")
+
+    def __enter__(self) -> "OrderedSegmentAssembler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+
+
+__all__ = ["OrderedSegmentAssembler"]
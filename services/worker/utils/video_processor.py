@@ -1,17 +1,15 @@
 """视频处理模块"""
-import json
 import os
-import random
 from typing import Any, Dict, List, Optional
 
 import cv2
 import pysrt
+from utils.footage_catalog import get_footage_catalog
 from worker.config import settings
 
 from core.logging_config import setup_logging
 from core.utils.ffmpeg import (
     FFmpegError,
-    ffmpeg_utils,
     run_ffmpeg,
     validate_path,
 )
@@ -26,35 +24,21 @@ def compare_video(duration: float, output_image_path: str, output_path: str) ->
     """
     从合适的时长超过 duration 的视频中随机抽取一个，然后ffmpeg裁剪时长 duration 输出到 output_path
     截取首帧到 output_image_path
-    
+
+    素材目录、关键帧和首帧缩略图由进程级 FootageCatalog 缓存，见 utils.footage_catalog。
+
     Args:
         duration: 视频时长（秒）
         output_image_path: 输出图像路径
         output_path: 输出视频路径
     """
-    duration_map_path = "duration_map.json"
-    if not os.path.exists(duration_map_path):
-        logger.error(f"duration_map.json 不存在: {duration_map_path}")
-        raise FileNotFoundError(f"duration_map.json not found: {duration_map_path}")
-    
-    with open(duration_map_path, "r", encoding="utf-8") as f:
-        duration_map = json.load(f)
+    catalog = get_footage_catalog()
+    clip = catalog.select(duration)
 
-    video_list = []
-    for k, v in duration_map.items():
-        if int(k) > duration:
-            video_list.extend(v)
-    
-    if not video_list:
-        logger.error(f"没有找到时长超过 {duration} 秒的视频")
-        raise ValueError(f"No videos found with duration > {duration}")
-    
-    video = random.choice(video_list)
-    
     try:
-        ffmpeg_utils.cut_video(video, output_path, start_time=0, duration=duration)
-        # 提取首帧
-        ffmpeg_utils.extract_frame(video, output_image_path, frame_number=0)
+        catalog.cut(clip, output_path, duration=duration, start=0)
+        # 首帧（已缓存时直接复制）
+        catalog.copy_first_frame(clip, output_image_path)
     except (SystemExit, KeyboardInterrupt):
         # 系统退出异常，不捕获，直接抛出
         raise
@@ -0,0 +1,42 @@
+"""Unit tests for the preallocated NumPy AudioCombiner."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pydub = pytest.importorskip("pydub")
+sf = pytest.importorskip("soundfile")
+
+from services.tts.seedvc_server.batch_synthesis.combiner import AudioCombiner  # noqa: E402
+
+
+def _tone(ms, frame_rate=16000, value=0.5):
+    samples = np.full(int(frame_rate * ms / 1000), int(value * 32767), dtype=np.int16)
+    return pydub.AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=frame_rate, channels=1)
+
+
+def test_silence_offsets_and_timestamp_map(tmp_path):
+    segments = [(_tone(500), "a"), (_tone(250, frame_rate=8000), "b"), (_tone(1000), "c")]
+    output = tmp_path / "out.wav"
+
+    timings = AudioCombiner(silence_duration_ms=300).combine_and_export(segments, str(output))
+
+    assert [(t.text, t.start_ms, t.end_ms) for t in timings] == [
+        ("a", 0, 500),
+        ("b", 800, 1050),
+        ("c", 1350, 2350),
+    ]
+    data, rate = sf.read(str(output))
+    assert rate == 16000
+    assert abs(len(data) - 16000 * 2350 // 1000) <= 2
+    assert abs(data[10000]) < 1e-4  # 静音区间 (500ms-800ms)
+
+
+def test_crossfade_overlaps_adjacent_segments():
+    segments = [(_tone(500), "a"), (_tone(500), "b")]
+
+    combined = AudioCombiner(silence_duration_ms=0, crossfade_ms=100).combine_to_array(
+        segments, include_silence=False
+    )
+
+    assert combined.duration_ms == 900
+    assert combined.timings[1].start_ms == 400
+    assert combined.samples[8000, 0] == pytest.approx(0.5, abs=1e-3)
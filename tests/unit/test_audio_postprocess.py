@@ -0,0 +1,60 @@
+"""Unit tests for the pure NumPy Azure TTS audio post-processing."""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+# utils/__init__ pulls in the server config, so load the standalone module directly
+_MODULE_PATH = (
+    Path(__file__).resolve().parents[2]
+    / "services" / "tts" / "azure_tts_server" / "utils" / "audio_postprocess.py"
+)
+_spec = importlib.util.spec_from_file_location("azure_tts_audio_postprocess", _MODULE_PATH)
+audio_postprocess = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(audio_postprocess)
+
+
+def _tone(sample_rate, seconds, freq=440.0, amplitude=0.5):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def _padded_tone(sample_rate, lead=0.5, tone=1.0, tail=0.3):
+    silence = lambda seconds: np.zeros(int(sample_rate * seconds), dtype=np.float32)
+    return np.concatenate([silence(lead), _tone(sample_rate, tone), silence(tail)])
+
+
+def test_trim_matches_librosa():
+    librosa = pytest.importorskip("librosa")
+    rng = np.random.default_rng(0)
+    data = _padded_tone(16000) + rng.normal(0, 1e-4, 28800).astype(np.float32)
+
+    trimmed, index = audio_postprocess.trim_silence(data)
+    expected, expected_index = librosa.effects.trim(data, top_db=20, frame_length=2048, hop_length=512)
+
+    assert tuple(index) == tuple(expected_index)
+    np.testing.assert_array_equal(trimmed, expected)
+
+
+def test_postprocess_trims_resamples_and_normalizes():
+    data = _padded_tone(24000)
+
+    processed, trim_offset_ms = audio_postprocess.postprocess_audio(data, 24000, 16000)
+
+    assert processed.dtype == np.float32
+    assert np.abs(processed).max() == pytest.approx(1.0)
+    # leading silence trimmed to frame resolution (512 samples ≈ 21ms at 24kHz)
+    assert 500 - 2 * 21.4 < trim_offset_ms <= 500
+    assert abs(len(processed) - 16000) < 2 * 2048 * 16000 / 24000
+
+
+def test_pcm16_round_trip_and_same_rate_skips_resampling():
+    pcm = (np.array([0, 16384, -32768, 32767], dtype="<i2")).tobytes()
+    samples = audio_postprocess.pcm16_to_float(pcm + b"\x00")
+
+    np.testing.assert_allclose(samples, [0.0, 0.5, -1.0, 32767 / 32768])
+    assert audio_postprocess.resample(samples, 16000, 16000) is samples
+    assert audio_postprocess.trim_silence(np.zeros(0, dtype=np.float32))[1] == (0, 0)
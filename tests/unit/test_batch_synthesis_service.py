@@ -0,0 +1,102 @@
+"""Unit tests for partial-failure tolerant BatchSynthesisService."""
+import threading
+
+import pytest
+
+pydub = pytest.importorskip("pydub")
+pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+from services.tts.seedvc_server.batch_synthesis.segment_cache import (  # noqa: E402
+    SegmentCache,
+    reference_audio_fingerprint,
+)
+from services.tts.seedvc_server.batch_synthesis.service import BatchSynthesisService  # noqa: E402
+
+
+class _FlakyClient:
+    """Fails every text in `failing` until it is allowed to succeed."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def synthesize_voice(self, text, output_file, **kwargs):
+        with self.lock:
+            self.calls.append(text)
+        if text in self.failing:
+            return False
+        pydub.AudioSegment.silent(duration=100).export(output_file, format="wav")
+        return True
+
+
+def _submit(service, texts, prefix, reference_audio_path="ref.wav"):
+    return service.synthesize_batch_detailed(
+        text_list=texts,
+        reference_audio_path=reference_audio_path,
+        voice="zh-CN-XiaoxiaoNeural",
+        volume=50,
+        speech_rate=0,
+        pitch_rate=0,
+        tts_type="edge",
+        diffusion_steps=50,
+        length_adjust=1.0,
+        inference_cfg_rate=0.7,
+        temp_file_prefix=prefix,
+    )
+
+
+def test_failed_item_does_not_abort_batch_and_successes_are_reused(tmp_path):
+    client = _FlakyClient(failing={"b"})
+    service = BatchSynthesisService(
+        client, max_retries=2, retry_delay=0.0, segment_cache=SegmentCache()
+    )
+    texts = ["a", "b", "c"]
+
+    first = _submit(service, texts, str(tmp_path / "seg"))
+
+    assert [item.status for item in first.items] == ["success", "failed", "success"]
+    assert first.failed_indices == [1]
+    assert sorted(client.calls) == ["a", "b", "b", "c"]
+
+    client.failing.clear()
+    client.calls.clear()
+    second = _submit(service, texts, str(tmp_path / "seg"))
+
+    assert second.all_succeeded
+    assert client.calls == ["b"]
+    assert [item.status for item in second.items] == ["cached", "success", "cached"]
+    assert [text for _, text in second.segments()] == texts
+
+
+def test_cache_is_bounded_by_pcm_bytes():
+    segment = pydub.AudioSegment.silent(duration=100)
+    size = len(segment.raw_data)
+    cache = SegmentCache(max_bytes=size * 2)
+
+    for key in ("a", "b", "c"):
+        cache.put(key, segment)
+
+    assert len(cache) == 2 and cache.size_bytes == size * 2
+    assert cache.get("a") is None and cache.get("c") is not None
+    # a segment larger than the whole cache is not stored
+    cache.put("long", pydub.AudioSegment.silent(duration=1000))
+    assert cache.get("long") is None and cache.size_bytes == size * 2
+
+
+def test_replaced_reference_audio_is_not_reused(tmp_path):
+    reference = tmp_path / "ref.wav"
+    reference.write_bytes(b"speaker one")
+    client = _FlakyClient()
+    service = BatchSynthesisService(client, retry_delay=0.0, segment_cache=SegmentCache())
+
+    _submit(service, ["a"], str(tmp_path / "seg"), str(reference))
+    _submit(service, ["a"], str(tmp_path / "seg"), str(reference))
+    first_fingerprint = reference_audio_fingerprint(str(reference))
+    reference.write_bytes(b"speaker two!")
+    replaced = _submit(service, ["a"], str(tmp_path / "seg"), str(reference))
+
+    assert reference_audio_fingerprint(str(reference)) != first_fingerprint
+    assert client.calls == ["a", "a"]
+    assert [item.status for item in replaced.items] == ["success"]
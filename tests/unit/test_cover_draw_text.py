@@ -0,0 +1,98 @@
+"""Unit tests for cached fonts/converters and in-memory cover text rendering."""
+import base64
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+opencc = pytest.importorskip("opencc")
+ImageFont = pytest.importorskip("PIL.ImageFont")
+from PIL import Image, ImageDraw  # noqa: E402
+
+from services.worker.utils import cover_draw_text  # noqa: E402
+
+_FONT = Path(cover_draw_text.__file__).resolve().parent / "ttfs" / "FZHTJW.TTF"
+
+
+@pytest.fixture
+def font_dir(tmp_path, monkeypatch):
+    """Serves a bundled CJK font under the names draw_text_for_api looks up."""
+    for name in ("USMCCyuanjiantecu.otf", "思源黑体-Bold.otf"):
+        (tmp_path / name).symlink_to(_FONT)
+    monkeypatch.setattr(cover_draw_text, "_font_dir", lambda: str(tmp_path))
+    return tmp_path
+
+
+def _params(usetraditional):
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    image[:, :160] = (40, 120, 200)
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return SimpleNamespace(
+        input_image=base64.b64encode(encoded.tobytes()).decode("utf-8"),
+        language="zh-CN-XiaoxiaoNeural",
+        usetraditional=usetraditional,
+        texts=[
+            SimpleNamespace(text="简体标题", size=40, color=[255, 255, 255]),
+            SimpleNamespace(text="黄色副标题", size=32, color="(0, 255, 255)"),
+            SimpleNamespace(text="红色结尾", size=28, color=[0, 0, 255]),
+        ],
+    )
+
+
+def _legacy_draw_text_for_api(params, font_dir):
+    """The previous implementation: cv2 decode, fresh font/OpenCC per line, cv2 encode."""
+    img = cv2.imdecode(np.frombuffer(base64.b64decode(params.input_image), np.uint8), cv2.IMREAD_COLOR)
+    img_pil = Image.fromarray(img)
+    texts = []
+    for text in params.texts:
+        font = cover_draw_text.FONT_MAP.get(params.language, "USMCCyuanjiantecu.otf")
+        if params.usetraditional:
+            font = "思源黑体-Bold.otf"
+            text.text = opencc.OpenCC("s2tw").convert(text.text)
+        color = text.color
+        color = tuple(color) if isinstance(color, list) else tuple(eval(color))
+        texts.append((text.text, color, ImageFont.truetype(str(font_dir / font), text.size)))
+
+    line_height = img_pil.size[1] // len(texts)
+    draw = ImageDraw.Draw(img_pil)
+    for i, (text, fill_color, font) in enumerate(texts):
+        draw.text((10, i * line_height + 10), text, font=font, fill=fill_color,
+                  stroke_width=3, stroke_fill=(0, 0, 0))
+    ok, encoded = cv2.imencode(".png", np.array(img_pil))
+    assert ok
+    return base64.b64encode(encoded.tobytes()).decode("utf-8")
+
+
+def _pixels(encoded):
+    return cv2.imdecode(np.frombuffer(base64.b64decode(encoded), np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def test_fonts_and_converters_are_loaded_once():
+    cover_draw_text.get_font.cache_clear()
+
+    font = cover_draw_text.get_font(str(_FONT), 40)
+
+    assert cover_draw_text.get_font(str(_FONT), 40) is font
+    assert cover_draw_text.get_font(str(_FONT), 41) is not font
+    assert cover_draw_text.get_font.cache_info().hits == 1
+    converter = cover_draw_text.get_opencc_converter("s2tw")
+    assert cover_draw_text.get_opencc_converter("s2tw") is converter
+    assert converter.convert("汉字") == "漢字"
+
+
+@pytest.mark.parametrize("usetraditional", [False, True])
+def test_draw_text_for_api_matches_legacy_rendering(font_dir, usetraditional):
+    params = _params(usetraditional)
+
+    rendered = cover_draw_text.draw_text_for_api(params)
+    # rendering again reuses the cached fonts and converter
+    again = cover_draw_text.draw_text_for_api(_params(usetraditional))
+    expected = _legacy_draw_text_for_api(_params(usetraditional), font_dir)
+
+    assert np.array_equal(_pixels(rendered), _pixels(expected))
+    assert np.array_equal(_pixels(again), _pixels(expected))
+    if usetraditional:
+        assert params.texts[0].text == "簡體標題"
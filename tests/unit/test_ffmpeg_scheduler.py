@@ -0,0 +1,150 @@
+"""Unit tests for the process-wide FFmpeg scheduler."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.utils.ffmpeg.scheduler import FFmpegScheduler, ffmpeg_job_scope
+
+
+def _run_concurrently(scheduler, jobs, hold_seconds=0.05):
+    """Run one slot per job entry in parallel and record peak concurrency."""
+    lock = threading.Lock()
+    current = {}
+    peak = {"total": 0}
+
+    def work(job):
+        with ffmpeg_job_scope(job):
+            with scheduler.slot():
+                with lock:
+                    current[job] = current.get(job, 0) + 1
+                    total = sum(current.values())
+                    peak[job] = max(peak.get(job, 0), current[job])
+                    peak["total"] = max(peak["total"], total)
+                time.sleep(hold_seconds)
+                with lock:
+                    current[job] -= 1
+
+    threads = [threading.Thread(target=work, args=(job,)) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return peak
+
+
+def test_global_budget_is_never_exceeded():
+    """Total running slots stay within max_concurrency."""
+    scheduler = FFmpegScheduler(max_concurrency=3)
+    peak = _run_concurrently(scheduler, ["job"] * 10)
+    assert peak["total"] <= 3
+    assert scheduler.get_stats().running == 0
+
+
+def test_jobs_get_fair_share():
+    """Two active jobs split the budget instead of one job taking it all."""
+    scheduler = FFmpegScheduler(max_concurrency=4)
+    # both jobs hold a slot for the whole run, so each one's share is 2 from the start
+    scheduler.acquire("a")
+    scheduler.acquire("b")
+    try:
+        assert scheduler.fair_share() == 2
+        peak = _run_concurrently(scheduler, ["a", "b"] * 6)
+    finally:
+        scheduler.release("a")
+        scheduler.release("b")
+
+    assert peak["a"] == 1
+    assert peak["b"] == 1
+    assert scheduler.get_stats().running == 0
+
+
+def test_job_at_its_share_waits_while_budget_is_free():
+    """A job already at its fair share cannot take the remaining global slots."""
+    scheduler = FFmpegScheduler(max_concurrency=4)
+    scheduler.acquire("a")
+    scheduler.acquire("b")
+    scheduler.acquire("a")
+    try:
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("a", timeout=0.05)
+        scheduler.acquire("b", timeout=0.05)
+        scheduler.release("b")
+    finally:
+        for job in ("a", "a", "b"):
+            scheduler.release(job)
+
+
+def test_stats_track_acquisitions():
+    """Every acquisition is counted and no slot leaks."""
+    scheduler = FFmpegScheduler(max_concurrency=2)
+    _run_concurrently(scheduler, ["job"] * 5, hold_seconds=0.01)
+    stats = scheduler.get_stats()
+    assert stats.total_acquired == 5
+    assert stats.queue_depth == 0
+    assert stats.max_wait_seconds >= 0.0
+
+
+def test_acquire_timeout():
+    """acquire raises TimeoutError when no slot frees up in time."""
+    scheduler = FFmpegScheduler(max_concurrency=1)
+    scheduler.acquire("holder")
+    try:
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("other", timeout=0.05)
+    finally:
+        scheduler.release("holder")
+
+
+class _NoThreadsExecutor(ThreadPoolExecutor):
+    def submit(self, *args, **kwargs):
+        raise AssertionError("slot_async must not park waiters on executor threads")
+
+
+def test_slot_async_waits_on_the_event_loop():
+    """Async waiters suspend on the loop, respect the budget and wake on cross-thread release."""
+    scheduler = FFmpegScheduler(max_concurrency=2)
+    running = {"now": 0, "peak": 0}
+
+    async def work():
+        async with scheduler.slot_async("job"):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(_NoThreadsExecutor())
+        scheduler.acquire("sync-holder")
+        releaser = threading.Timer(0.05, scheduler.release, args=("sync-holder",))
+        releaser.start()
+        await asyncio.gather(*(work() for _ in range(8)))
+        releaser.join()
+
+    asyncio.run(main())
+
+    stats = scheduler.get_stats()
+    assert running["peak"] == 2
+    assert stats.total_acquired == 9
+    assert (stats.running, stats.queue_depth) == (0, 0)
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    scheduler = FFmpegScheduler(max_concurrency=1)
+    scheduler.acquire("holder")
+
+    async def main():
+        waiter = asyncio.ensure_future(scheduler.acquire_async("other"))
+        await asyncio.sleep(0.01)
+        assert scheduler.get_stats().queue_depth == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(main())
+    scheduler.release("holder")
+
+    stats = scheduler.get_stats()
+    assert (stats.running, stats.queue_depth, stats.active_jobs) == (0, 0, 0)
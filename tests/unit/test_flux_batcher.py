@@ -0,0 +1,68 @@
+"""Unit tests for the Flux server request micro-batcher (fake CPU pipeline)."""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from services.image_gen.flux_server.batcher import BatchKey, MicroBatcher, make_pipeline_runner
+
+
+class _FakePipeline:
+    """Returns one "image" per prompt and records every call's batch."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def __call__(self, prompts, num_inference_steps, width, height):
+        with self.lock:
+            self.calls.append((list(prompts), num_inference_steps, width, height))
+        if self.fail_on in prompts:
+            raise RuntimeError("CUDA out of memory")
+        return SimpleNamespace(images=[f"{p}@{width}x{height}" for p in prompts])
+
+
+async def _submit_all(batcher, requests):
+    try:
+        return await asyncio.gather(
+            *(batcher.submit(key, prompt) for key, prompt in requests), return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+
+def test_compatible_requests_are_grouped_and_split_back():
+    pipe = _FakePipeline()
+    batcher = MicroBatcher(make_pipeline_runner(pipe), max_batch_size=3, max_wait_ms=50)
+    small, large = BatchKey(512, 512, 20), BatchKey(1360, 768, 30)
+    requests = [(small, "a"), (large, "b"), (small, "c"), (small, "d"), (small, "e")]
+
+    results = asyncio.run(_submit_all(batcher, requests))
+
+    assert results == ["a@512x512", "b@1360x768", "c@512x512", "d@512x512", "e@512x512"]
+    assert sorted(len(prompts) for prompts, *_ in pipe.calls) == [1, 1, 3]
+    assert (["a", "c", "d"], 20, 512, 512) in pipe.calls
+    stats = batcher.get_stats()
+    assert stats.requests_total == 5 and stats.batches_total == 3 and stats.queue_depth == 0
+
+
+def test_failed_batch_propagates_error_to_its_requests_only():
+    pipe = _FakePipeline(fail_on="bad")
+    batcher = MicroBatcher(make_pipeline_runner(pipe), max_batch_size=2, max_wait_ms=20)
+    key, other = BatchKey(512, 512, 20), BatchKey(512, 512, 4)
+
+    results = asyncio.run(_submit_all(batcher, [(key, "bad"), (key, "x"), (other, "ok")]))
+
+    assert isinstance(results[0], RuntimeError) and isinstance(results[1], RuntimeError)
+    assert results[2] == "ok@512x512"
+    assert batcher.get_stats().failed_batches_total == 1
+
+
+def test_batch_size_one_keeps_requests_separate():
+    pipe = _FakePipeline()
+    batcher = MicroBatcher(make_pipeline_runner(pipe), max_batch_size=1, max_wait_ms=50)
+    key = BatchKey(512, 512, 20)
+
+    asyncio.run(_submit_all(batcher, [(key, "a"), (key, "b")]))
+
+    assert [prompts for prompts, *_ in pipe.calls] == [["a"], ["b"]]
@@ -0,0 +1,75 @@
+"""Unit tests for the indexed background footage catalog (fake ffmpeg runner)."""
+import json
+import os
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+from services.worker.utils.footage_catalog import FootageCatalog
+
+
+class _FakeRunner:
+    """Records commands, reports keyframes every 2s and writes the requested output file."""
+
+    def __init__(self):
+        self.commands = []
+
+    def __call__(self, command):
+        self.commands.append(command)
+        if command[0] == "ffprobe":
+            packets = [f"{t / 2:.6f},{'K_' if t % 4 == 0 else '__'}" for t in range(20)]
+            return SimpleNamespace(stdout="\n".join(packets))
+        Path(command[-1]).write_bytes(b"frame")
+        return SimpleNamespace(stdout="")
+
+
+def _write_map(path, mapping, mtime=None):
+    path.write_text(json.dumps(mapping), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def _catalog(tmp_path, runner):
+    clips = {}
+    for name in ("a", "b", "c"):
+        clips[name] = tmp_path / f"{name}.mp4"
+        clips[name].write_bytes(b"video")
+    duration_map = tmp_path / "duration_map.json"
+    _write_map(duration_map, {"5": [str(clips["a"])], "12": [str(clips["b"]), str(clips["c"])]}, mtime=1000)
+    return FootageCatalog(str(duration_map), runner=runner), duration_map, clips
+
+
+def test_select_uses_duration_index_and_reloads_on_mtime_change(tmp_path):
+    catalog, duration_map, clips = _catalog(tmp_path, _FakeRunner())
+    rng = random.Random(0)
+
+    picks = {catalog.select(4.5, rng).path for _ in range(50)}
+    assert picks == {str(clips["a"]), str(clips["b"]), str(clips["c"])}
+    assert {catalog.select(5, rng).path for _ in range(20)} == {str(clips["b"]), str(clips["c"])}
+
+    _write_map(duration_map, {"30": [str(clips["a"])]}, mtime=2000)
+    assert catalog.select(12, rng).path == str(clips["a"])
+    assert len(catalog) == 1
+
+
+def test_keyframes_and_thumbnails_are_computed_once(tmp_path):
+    runner = _FakeRunner()
+    catalog, _, clips = _catalog(tmp_path, runner)
+    clip = catalog.select(5, random.Random(1))
+
+    for i in range(3):
+        catalog.cut(clip, str(tmp_path / f"out{i}.mp4"), duration=6.5)
+        catalog.copy_first_frame(clip, str(tmp_path / f"first{i}.png"))
+    catalog.cut(clip, str(tmp_path / "mid.mp4"), duration=2, start=1.0)
+
+    probes = [c for c in runner.commands if c[0] == "ffprobe"]
+    thumbnails = [c for c in runner.commands if "-frames:v" in c]
+    cuts = [c for c in runner.commands if "-t" in c]
+    assert len(probes) == 1 and len(thumbnails) == 1
+    assert all("copy" in c for c in cuts[:3]) and "libx264" in cuts[3]
+    assert (tmp_path / "first2.png").read_bytes() == b"frame"
+
+    # a new process reuses the persisted keyframe index
+    reloaded = FootageCatalog(catalog.duration_map_path, runner=runner)
+    assert reloaded.keyframes(clip) == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert len([c for c in runner.commands if c[0] == "ffprobe"]) == 1
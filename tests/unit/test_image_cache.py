@@ -0,0 +1,82 @@
+"""Unit tests for the content-addressed image generation cache."""
+from pathlib import Path
+
+from core.cache.image_cache import ImageCache, make_image_cache_key
+from core.clients.cached_image_service import CachedImageGenerationService
+from core.interfaces.service_interfaces import IImageGenerationService, ImageGenerationResult
+
+
+class _FakeImageService(IImageGenerationService):
+    """Writes the prompt as image bytes and records every generated prompt."""
+
+    def __init__(self):
+        self.generated = []
+
+    def generate_single_image(self, prompt, output_path, width, height, **kwargs):
+        self.generated.append(prompt)
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(prompt.encode())
+        return ImageGenerationResult(output_path=output_path, status="success")
+
+    def generate_batch(self, generation_params, job_id):
+        return [
+            self.generate_single_image(p["prompt"], p["output_path"], p["width"], p["height"])
+            for p in generation_params
+        ]
+
+
+def _params(tmp_path, prompts, run):
+    return [
+        {
+            "prompt": prompt,
+            "output_path": str(tmp_path / run / f"split_{i:03d}.png"),
+            "width": 768,
+            "height": 1360,
+            "num_inference_steps": 30,
+            "lora_name": None,
+            "lora_weight": 1.2,
+            "topic_prefix": "topic",
+        }
+        for i, prompt in enumerate(prompts)
+    ]
+
+
+def test_key_depends_on_every_generation_parameter():
+    base = make_image_cache_key("p", "t", "lora", 1.2, 768, 1360, 30)
+    assert base == make_image_cache_key("p", "t", "lora", 1.2, 768, 1360, 30)
+    assert base != make_image_cache_key("p", "t2", "lora", 1.2, 768, 1360, 30)
+    assert base != make_image_cache_key("p", "t", "lora", 1.0, 768, 1360, 30)
+    assert base != make_image_cache_key("p", "t", "lora", 1.2, 1360, 768, 30)
+    assert base != make_image_cache_key("p", "t", "lora", 1.2, 768, 1360, 20)
+
+
+def test_rerun_only_generates_misses(tmp_path):
+    inner = _FakeImageService()
+    service = CachedImageGenerationService(inner, cache=ImageCache(tmp_path / "cache"))
+
+    service.generate_batch(_params(tmp_path, ["a", "b"], "run1"), job_id=1)
+    results = service.generate_batch(_params(tmp_path, ["a", "b", "c"], "run2"), job_id=1)
+
+    assert inner.generated == ["a", "b", "c"]
+    assert [r.status for r in results] == ["success"] * 3
+    assert (tmp_path / "run2" / "split_001.png").read_bytes() == b"b"
+    stats = service.cache.get_stats()
+    assert (stats.local_hits, stats.misses) == (2, 3)
+
+
+def test_lru_eviction_and_shared_tier(tmp_path):
+    src = tmp_path / "img.png"
+    src.write_bytes(b"x" * 10)
+    cache = ImageCache(tmp_path / "local", max_bytes=25, shared_dir=tmp_path / "shared")
+    keys = [make_image_cache_key(f"p{i}") for i in range(3)]
+    for key in keys:
+        cache.put(key, src)
+
+    assert cache.get_stats().size_bytes <= 25
+    assert not cache.contains(keys[0])
+
+    # 另一台机器的本地层为空，但可以从共享层命中并回填
+    other = ImageCache(tmp_path / "other", shared_dir=tmp_path / "shared")
+    assert other.get(keys[0], tmp_path / "out.png") == "shared"
+    assert other.get(keys[0], tmp_path / "out2.png") == "local"
@@ -0,0 +1,99 @@
+"""Unit tests for bounded concurrent batch generation in ImageClient (stub HTTP client)."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from core.clients import image_client  # noqa: E402
+from core.clients.image_client import ImageClient  # noqa: E402
+from core.config.constants import ImageGenConfig  # noqa: E402
+
+
+class _FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {"content-type": "image/png"}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _FakeHTTPClient:
+    """Tracks concurrent requests; later prompts finish first, `failing` prompts return 500."""
+
+    def __init__(self, count, failing=()):
+        self.count = count
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+
+    async def request(self, method, endpoint, json=None):
+        prompt = json["prompt"]
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01 * (self.count - int(prompt[1:])))
+        finally:
+            self.in_flight -= 1
+        if prompt in self.failing:
+            return _FakeResponse(b"", status_code=500)
+        return _FakeResponse(prompt.encode())
+
+
+def _client(http_client, max_in_flight):
+    client = ImageClient(base_url="http://image-gen", max_in_flight=max_in_flight)
+    client.client = http_client
+    return client
+
+
+def test_default_max_in_flight_reads_env(monkeypatch):
+    default = ImageGenConfig.DEFAULT_MAX_IN_FLIGHT_REQUESTS
+
+    monkeypatch.delenv("IMAGE_GEN_MAX_IN_FLIGHT", raising=False)
+    assert image_client._default_max_in_flight() == default
+    assert ImageClient(base_url="http://image-gen").max_in_flight == default
+
+    monkeypatch.setenv("IMAGE_GEN_MAX_IN_FLIGHT", "7")
+    assert image_client._default_max_in_flight() == 7
+    assert ImageClient(base_url="http://image-gen").max_in_flight == 7
+    assert ImageClient(base_url="http://image-gen", max_in_flight=2).max_in_flight == 2
+
+    for invalid in ("0", "-3", "many", ""):
+        monkeypatch.setenv("IMAGE_GEN_MAX_IN_FLIGHT", invalid)
+        assert image_client._default_max_in_flight() == default
+
+
+@pytest.mark.parametrize("limit", [1, 3])
+def test_batch_respects_limit_and_keeps_input_order(tmp_path, limit):
+    count = 8
+    http_client = _FakeHTTPClient(count, failing={"p3"})
+    client = _client(http_client, max_in_flight=limit)
+    params = [
+        {"prompt": f"p{i}", "output_path": str(tmp_path / f"{i}.png")} for i in range(count)
+    ]
+
+    results = asyncio.run(client.generate_batch_async(params, job_id=1))
+
+    assert http_client.requests == count
+    assert http_client.max_in_flight == limit
+    assert [r.output_path for r in results] == [p["output_path"] for p in params]
+    assert [r.status for r in results] == ["failed" if i == 3 else "success" for i in range(count)]
+    assert "500" in results[3].error_message
+    assert (tmp_path / "5.png").read_bytes() == b"p5"
+    assert not (tmp_path / "3.png").exists()
+
+
+def test_batch_call_override_limit(tmp_path):
+    http_client = _FakeHTTPClient(6)
+    client = _client(http_client, max_in_flight=4)
+    params = [{"prompt": f"p{i}", "output_path": str(tmp_path / f"{i}.png")} for i in range(6)]
+
+    results = asyncio.run(client.generate_batch_async(params, job_id=1, max_in_flight=2))
+
+    assert http_client.max_in_flight == 2
+    assert all(r.status == "success" for r in results)
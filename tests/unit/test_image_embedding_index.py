@@ -0,0 +1,84 @@
+"""Unit tests for the memory-mapped image embedding index."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.worker.utils import embedding_index  # noqa: E402
+from services.worker.utils.embedding_index import EmbeddingIndex  # noqa: E402
+
+
+def test_batch_search_matches_brute_force_and_survives_growth(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_index, "_INITIAL_CAPACITY", 4)
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(10, 8)).astype(np.float32)
+    index = EmbeddingIndex(tmp_path)
+    index.add([(f"img{i}.png", f"desc {i}") for i in range(6)], vectors[:6])
+    index.add([(f"img{i}.png", f"desc {i}") for i in range(6, 10)], vectors[6:])
+
+    queries = rng.normal(size=(3, 8)).astype(np.float32)
+    results = index.search(queries, top_k=3)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(queries @ normalized.T), axis=1)[:, :3]
+    assert [[r["image_path"] for r in row] for row in results] == [
+        [f"img{i}.png" for i in row] for row in expected
+    ]
+    assert results[0][0]["similarity"] >= results[0][1]["similarity"]
+
+
+def test_update_overwrites_row_and_log_replays_on_reload(tmp_path):
+    index = EmbeddingIndex(tmp_path)
+    index.add([("a.png", "cat"), ("b.png", "dog")], np.eye(2, dtype=np.float32))
+    index.add([("a.png", "bird")], np.array([[0.6, 0.8]], dtype=np.float32))
+
+    reloaded = EmbeddingIndex(tmp_path)
+
+    assert len(reloaded) == 2
+    top = reloaded.search(np.array([[0.0, 2.0], [1.0, 0.0]]), top_k=5)
+    assert [(r["image_path"], r["description"]) for r in top[0]] == [("b.png", "dog"), ("a.png", "bird")]
+    assert [r["similarity"] for r in top[1]] == pytest.approx([0.6, 0.0])
+
+
+def _add_one_by_one(index_dir, worker, count):
+    index = EmbeddingIndex(index_dir)
+    for i in range(count):
+        vector = np.zeros((1, 4), dtype=np.float32)
+        vector[0, worker] = i + 1
+        index.add([(f"w{worker}-{i}.png", f"worker {worker}")], vector)
+
+
+def test_writers_sharing_a_directory_never_reuse_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_index, "_INITIAL_CAPACITY", 2)
+    first, second = EmbeddingIndex(tmp_path), EmbeddingIndex(tmp_path)
+
+    first.add([("a.png", "a")], np.array([[1.0, 0.0, 0.0]]))
+    second.add([("b.png", "b"), ("c.png", "c")], np.array([[0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]))
+    first.add([("d.png", "d")], np.array([[1.0, 1.0, 0.0]]))
+
+    for index in (first, second, EmbeddingIndex(tmp_path)):
+        top = index.search(np.eye(3), top_k=1)
+        assert [row[0]["image_path"] for row in top] == ["a.png", "b.png", "c.png"]
+        assert len(index) == 4
+
+
+@pytest.mark.skipif(embedding_index.fcntl is None, reason="cross-process lock needs fcntl")
+def test_concurrent_processes_append_without_losing_rows(tmp_path, monkeypatch):
+    multiprocessing = pytest.importorskip("multiprocessing")
+    monkeypatch.setattr(embedding_index, "_INITIAL_CAPACITY", 2)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_add_one_by_one, args=(tmp_path, w, 25)) for w in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    index = EmbeddingIndex(tmp_path)
+
+    assert len(index) == 75
+    for w in range(3):
+        axis = np.zeros(4, dtype=np.float32)
+        axis[w] = 1.0
+        hits = index.search(axis, top_k=25)[0]
+        assert {hit["image_path"] for hit in hits} == {f"w{w}-{i}.png" for i in range(25)}
+        assert all(hit["similarity"] == pytest.approx(1.0) for hit in hits)
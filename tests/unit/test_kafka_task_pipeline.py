@@ -0,0 +1,192 @@
+"""Unit tests for the ai_image_gen Kafka task pipeline (fake consumer, no broker)."""
+import sys
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+_AI_IMAGE_GEN_DIR = Path(__file__).resolve().parents[2] / "services" / "image_gen" / "ai_image_gen"
+if str(_AI_IMAGE_GEN_DIR) not in sys.path:
+    sys.path.insert(0, str(_AI_IMAGE_GEN_DIR))
+
+from consumer_worker.task_pipeline import KafkaTaskPipeline  # noqa: E402
+
+Message = namedtuple("Message", "topic partition offset value leader_epoch")
+
+
+class _FakeConsumer:
+    """Serves pre-loaded messages per partition and records polls, pauses and commits."""
+
+    def __init__(self, messages):
+        self.pending = list(messages)
+        self.max_records_seen = []
+        self.commits = []
+        self.paused = set()
+        self.lock = threading.Lock()
+
+    def assignment(self):
+        return {("normal", 0), ("online_task", 0)}
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused.difference_update(partitions)
+
+    def poll(self, timeout_ms, max_records):
+        with self.lock:
+            self.max_records_seen.append(max_records)
+            ready = [m for m in self.pending if (m.topic, m.partition) not in self.paused][:max_records]
+            for m in ready:
+                self.pending.remove(m)
+        records = {}
+        for m in ready:
+            records.setdefault((m.topic, m.partition), []).append(m)
+        return records
+
+    def commit(self, offsets):
+        with self.lock:
+            self.commits.append(dict(offsets))
+
+
+def _message(topic, offset, lora, subject=None):
+    value = {"task_id": f"{topic}-{offset}", "model_name": "flux", "loras": [{"name": lora}]}
+    if subject:
+        value["image_params"] = {"subject_image": subject}
+    return Message(topic, 0, offset, value, None)
+
+
+def _run_until(pipeline, consumer, done, total):
+    pipeline.start()
+    while True:
+        pipeline.poll_once()
+        if len(done) == total and not consumer.pending:
+            break
+    pipeline.shutdown()
+
+
+def test_batches_polls_prefers_priority_and_same_lora_and_commits_in_batches():
+    gate = threading.Event()
+    done, prepared_seen = [], {}
+    messages = [
+        _message("normal", 0, "a"),
+        _message("normal", 1, "b"),
+        _message("normal", 2, "a", subject="ref.png"),
+        _message("online_task", 0, "b"),
+    ]
+    consumer = _FakeConsumer(messages)
+
+    def process(message, prepared):
+        gate.wait(5)
+        done.append(message.value["task_id"])
+        prepared_seen[message.value["task_id"]] = prepared
+
+    pipeline = KafkaTaskPipeline(
+        consumer,
+        process_fn=process,
+        commit_fn=consumer.commit,
+        priority_topics=["online_task"],
+        prepare_fn=lambda message: (message.value.get("image_params") or {}).get("subject_image"),
+        poll_batch_size=8,
+        buffer_capacity=8,
+        commit_batch_size=4,
+        commit_interval_seconds=60,
+        poll_timeout_ms=10,
+    )
+    pipeline.poll_once()
+    gate.set()
+    _run_until(pipeline, consumer, done, len(messages))
+
+    assert consumer.max_records_seen[0] == 8
+    assert done == ["online_task-0", "normal-1", "normal-0", "normal-2"]
+    assert prepared_seen["normal-2"] == "ref.png"
+    assert consumer.commits == [{("normal", 0): (3, None), ("online_task", 0): (1, None)}]
+
+
+def test_full_buffer_pauses_partitions_until_space_frees():
+    release = threading.Event()
+    done = []
+    consumer = _FakeConsumer([_message("normal", i, "a") for i in range(4)])
+
+    def process(message, prepared):
+        release.wait(5)
+        done.append(message.offset)
+
+    pipeline = KafkaTaskPipeline(
+        consumer, process_fn=process, commit_fn=consumer.commit,
+        buffer_capacity=2, poll_batch_size=8, poll_timeout_ms=10,
+    )
+    pipeline.start()
+    for _ in range(5):
+        pipeline.poll_once()
+
+    assert consumer.paused and len(pipeline.buffer) == 2
+    release.set()
+    _run_until(pipeline, consumer, done, 4)
+    assert done == [0, 1, 2, 3]
+    assert not consumer.paused
+    assert consumer.commits[-1] == {("normal", 0): (4, None)}
+
+
+class _FlakyConsumer(_FakeConsumer):
+    """Raises on the first `failures` polls, like a transient broker/coordinator error."""
+
+    def __init__(self, messages, failures):
+        super().__init__(messages)
+        self.failures = failures
+
+    def poll(self, timeout_ms, max_records):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("broker unavailable")
+        return super().poll(timeout_ms, max_records)
+
+
+def test_run_survives_transient_poll_errors():
+    processed = threading.Event()
+    consumer = _FlakyConsumer([_message("normal", 0, "a")], failures=2)
+    pipeline = KafkaTaskPipeline(
+        consumer, process_fn=lambda message, prepared: processed.set(), commit_fn=consumer.commit,
+        poll_timeout_ms=10, error_sleep_seconds=0.01,
+    )
+    errors = []
+
+    def run():
+        try:
+            pipeline.run()
+        except Exception as e:  # pragma: no cover - the regression being tested
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert processed.wait(5)
+    pipeline.stop()
+    thread.join(5)
+
+    assert not thread.is_alive() and errors == []
+    assert consumer.failures == 0
+    assert consumer.commits[-1] == {("normal", 0): (1, None)}
+
+
+def test_revoked_partition_offsets_are_not_retried():
+    attempts = []
+
+    def failing_commit(offsets):
+        attempts.append(dict(offsets))
+        raise RuntimeError("CommitFailedError: group rebalanced")
+
+    consumer = _FakeConsumer([])
+    pipeline = KafkaTaskPipeline(consumer, process_fn=lambda m, p: None, commit_fn=failing_commit)
+    committer = pipeline.committer
+    first, second = _message("normal", 0, "a"), _message("normal", 1, "a")
+    committer.track(first)
+    committer.track(second)
+    committer.complete(first)
+
+    pipeline.on_partitions_revoked([("normal", 0)])
+    # a buffered task of the revoked partition finishing later is not committed either
+    committer.complete(second)
+    committer.flush(force=True)
+
+    assert attempts == [{("normal", 0): (1, None)}]
+    assert committer._ready == {}
+    pipeline.shutdown()
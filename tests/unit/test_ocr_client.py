@@ -0,0 +1,78 @@
+"""Unit tests for the batched OCR client (stub OCR server)."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.worker.clients.ocr_client import OCRClient
+
+
+class _Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class _StubOCRServer:
+    """Reports the image bytes as recognized text; optionally lacks /ocr/batch/."""
+
+    def __init__(self, batch_supported=True):
+        self.batch_supported = batch_supported
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _result(data):
+        return {"ocr_result": [[[[0, 0], (data.decode(), 0.99)]]]}
+
+    def post(self, url, files, timeout=None):
+        with self.lock:
+            self.requests.append(url)
+        if url.endswith("/ocr/batch/"):
+            if not self.batch_supported:
+                return _Response(404)
+            return _Response(200, {"results": [self._result(content) for _, (_, content, _) in files]})
+        return _Response(200, self._result(files["file"].read()))
+
+
+def _write_images(tmp_path, contents):
+    paths = []
+    for i, content in enumerate(contents):
+        path = tmp_path / f"{i}.png"
+        path.write_bytes(content.encode())
+        paths.append(str(path))
+    return paths
+
+
+def test_concurrent_checks_are_batched_and_verdicts_cached(tmp_path):
+    server = _StubOCRServer()
+    client = OCRClient("http://ocr", batch_size=4, batch_window_ms=200, session=server)
+    paths = _write_images(tmp_path, ["ok", "A LONG CAPTION TEXT", "fine", "tiny"])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        verdicts = list(pool.map(client.check_image, paths))
+
+    assert [v.has_text for v in verdicts] == [False, True, False, False]
+    assert server.requests == ["http://ocr/ocr/batch/"]
+
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(b"A LONG CAPTION TEXT")
+    assert client.check_image(str(copy)).has_text
+    assert len(server.requests) == 1
+
+
+def test_falls_back_to_single_requests_without_batch_endpoint(tmp_path):
+    server = _StubOCRServer(batch_supported=False)
+    client = OCRClient("http://ocr", batch_size=8, batch_window_ms=0, session=server)
+    paths = _write_images(tmp_path, ["a", "b", "c"])
+
+    verdicts = client.check_images(paths)
+    more = tmp_path / "more"
+    more.mkdir()
+    client.check_images(_write_images(more, ["d", "e"]))
+
+    assert [v.text for v in verdicts] == ["a", "b", "c"]
+    assert server.requests.count("http://ocr/ocr/batch/") == 1
+    assert server.requests.count("http://ocr/ocr/") == 5
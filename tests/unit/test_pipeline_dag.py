@@ -0,0 +1,138 @@
+"""Unit tests for DAG scheduling in PipelineExecutor."""
+import threading
+import time
+
+import pytest
+
+from services.worker.pipeline.executor import PipelineException, PipelineExecutor
+from services.worker.pipeline.input_resolver import StepInputResolver
+from services.worker.pipeline.result_manager import StepResultManager
+from services.worker.pipeline.results import StepResult
+
+
+class _FakeContext:
+    """Minimal stand-in for PipelineContext that records step lifecycle calls."""
+
+    def __init__(self):
+        self.job_id = 1
+        self.failed_step_name = None
+        self.events = []
+
+    def update_job_status(self, status, detail):
+        pass
+
+    def mark_step_started(self, step_name):
+        self.events.append(("started", step_name))
+
+    def mark_step_completed(self, step_name):
+        self.events.append(("completed", step_name))
+
+    def mark_step_failed(self, step_name, error):
+        self.events.append(("failed", step_name))
+        self.failed_step_name = step_name
+
+    def get_duration(self):
+        return 0.0
+
+
+class _FakeStep:
+    checkpointable = False
+
+    def __init__(self, name, inputs=(), outputs=(), delay=0.0, tracker=None, error=None):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.delay = delay
+        self.tracker = tracker
+        self.error = error
+
+    def _execute_functional(self, context, **kwargs):
+        if self.tracker is not None:
+            self.tracker.enter(self.name)
+        time.sleep(self.delay)
+        if self.tracker is not None:
+            self.tracker.leave(self.name)
+        if self.error:
+            raise self.error
+        return StepResult(step_name=self.name, data={key: self.name for key in self.outputs})
+
+    def _merge_result_to_context(self, context, result):
+        for key, value in result.data.items():
+            setattr(context, key, value)
+
+
+class _Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = set()
+        self.overlaps = set()
+
+    def enter(self, name):
+        with self.lock:
+            for other in self.running:
+                self.overlaps.add(frozenset((name, other)))
+            self.running.add(name)
+
+    def leave(self, name):
+        with self.lock:
+            self.running.discard(name)
+
+
+def _pipeline_steps(tracker=None):
+    return [
+        _FakeStep("TextSplit", inputs=("srt_path",), outputs=("splits",)),
+        _FakeStep("TTSGeneration", outputs=("audio_path", "srt_path")),
+        _FakeStep("ImageGeneration", ("splits",), ("image_paths",), 0.1, tracker),
+        _FakeStep("VideoComposition", ("image_paths", "splits", "audio_path"), ("video_path",), 0.1, tracker),
+        _FakeStep("DigitalHuman", ("audio_path", "splits"), ("human_video_path",), 0.15, tracker),
+        _FakeStep("PostProcessing", ("video_path", "human_video_path"), ("final_video_path",)),
+    ]
+
+
+def _executor(context, max_parallel_steps=3):
+    return PipelineExecutor(
+        context,
+        StepInputResolver({}),
+        StepResultManager(),
+        max_parallel_steps=max_parallel_steps,
+    )
+
+
+def test_dependency_graph_follows_declared_inputs():
+    graph = PipelineExecutor.build_dependency_graph(_pipeline_steps())
+
+    assert graph["TextSplit"] == ["TTSGeneration"]
+    assert graph["DigitalHuman"] == ["TTSGeneration", "TextSplit"]
+    assert set(graph["PostProcessing"]) == {"VideoComposition", "DigitalHuman"}
+
+
+def test_cycle_is_rejected():
+    steps = [_FakeStep("A", ("b",), ("a",)), _FakeStep("B", ("a",), ("b",))]
+    with pytest.raises(PipelineException):
+        PipelineExecutor.build_dependency_graph(steps)
+
+
+def test_digital_human_runs_alongside_images():
+    tracker = _Tracker()
+    context = _FakeContext()
+
+    results = _executor(context).execute_functional(_pipeline_steps(tracker))
+
+    assert set(results) == {s.name for s in _pipeline_steps()}
+    assert frozenset(("DigitalHuman", "ImageGeneration")) in tracker.overlaps
+    completed = [name for event, name in context.events if event == "completed"]
+    assert completed.index("TTSGeneration") < completed.index("TextSplit")
+    assert completed[-1] == "PostProcessing"
+
+
+def test_failure_stops_downstream_steps():
+    steps = _pipeline_steps()
+    steps[2].error = RuntimeError("gpu down")
+    context = _FakeContext()
+
+    with pytest.raises(PipelineException):
+        _executor(context).execute_functional(steps)
+
+    started = {name for event, name in context.events if event == "started"}
+    assert "VideoComposition" not in started
+    assert "PostProcessing" not in started
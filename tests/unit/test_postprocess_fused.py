@@ -0,0 +1,118 @@
+"""Unit tests for the fused (single ffmpeg call) post-processing command."""
+from pathlib import Path
+
+import pytest
+
+from core.config.api import SubtitleStyleConfig
+from services.worker.pipeline.steps import postprocess_step
+from services.worker.pipeline.steps.postprocess_step import PostProcessingStep
+
+
+class _FakeContext:
+    job_id = 1
+    is_horizontal = True
+
+    def __init__(self, tmp_path):
+        self.combined_video = str(tmp_path / "combined.mp4")
+        self.audio_path = str(tmp_path / "audio.wav")
+        self.srt_path = str(tmp_path / "subs.srt")
+        self.logopath = str(tmp_path / "logo.png")
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Records ffmpeg commands instead of running them, touching each output file."""
+    recorded = []
+
+    def fake_run_ffmpeg(command, timeout=None):
+        recorded.append(command)
+        Path(command[-1]).touch()
+
+    monkeypatch.setattr(postprocess_step, "run_ffmpeg", fake_run_ffmpeg)
+    return recorded
+
+
+def _values(command, flag):
+    return [command[i + 1] for i, arg in enumerate(command) if arg == flag]
+
+
+def _filters(command):
+    graph = _values(command, "-filter_complex")
+    return graph[0].split(";") if graph else []
+
+
+def test_fused_without_filters_copies_video_and_maps_tts_audio(tmp_path):
+    context = _FakeContext(tmp_path)
+
+    command = PostProcessingStep()._build_fused_command(context, "out.mp4", False, False)
+
+    assert command == [
+        "ffmpeg", "-y", "-i", context.combined_video, "-i", context.audio_path,
+        "-map", "0:v", "-map", "1:a", "-c:v", "copy", "-c:a", "aac", "-shortest", "out.mp4",
+    ]
+
+
+def test_fused_subtitle_without_logo(tmp_path):
+    context = _FakeContext(tmp_path)
+
+    command = PostProcessingStep()._build_fused_command(context, "out.mp4", True, False)
+
+    assert _values(command, "-i") == [context.combined_video, context.audio_path]
+    assert _filters(command) == [
+        f"[0:v]subtitles='{context.srt_path}':force_style="
+        f"'{PostProcessingStep._subtitle_force_style()}'[subtitled]",
+    ]
+    assert _values(command, "-map") == ["[subtitled]", "1:a"]
+    assert _values(command, "-c:a") == ["aac"]
+    assert "-shortest" in command
+
+
+def test_fused_subtitle_and_logo(tmp_path):
+    context = _FakeContext(tmp_path)
+
+    command = PostProcessingStep()._build_fused_command(context, "out.mp4", True, True)
+
+    assert _values(command, "-i") == [context.combined_video, context.audio_path, context.logopath]
+    filters = _filters(command)
+    assert filters[0].startswith("[0:v]subtitles=") and filters[0].endswith("[subtitled]")
+    assert filters[1:] == [
+        f"[2:v]scale={SubtitleStyleConfig.LOGO_SCALE_WIDTH}:-1[logo]",
+        "[subtitled][logo]overlay=W-w-10:10[final]",
+    ]
+    assert _values(command, "-map") == ["[final]", "1:a"]
+
+
+def test_fused_logo_without_subtitle(tmp_path):
+    context = _FakeContext(tmp_path)
+
+    command = PostProcessingStep()._build_fused_command(context, "out.mp4", False, True)
+
+    assert _filters(command)[1] == "[0:v][logo]overlay=W-w-10:10[final]"
+    assert _values(command, "-map") == ["[final]", "1:a"]
+
+
+@pytest.mark.parametrize("has_logo", [False, True])
+def test_fused_matches_sequential_style_and_audio(tmp_path, commands, has_logo):
+    context = _FakeContext(tmp_path)
+    step = PostProcessingStep()
+
+    sequential_steps = step._sequential_post_process(
+        context, tmp_path, str(tmp_path / "sequential.mp4"), has_subtitle=True, has_logo=has_logo
+    )
+    fused_steps = step._fused_post_process(
+        context, str(tmp_path / "fused.mp4"), has_subtitle=True, has_logo=has_logo
+    )
+
+    assert fused_steps == sequential_steps
+    audio_command, subtitle_command = commands[:2]
+    fused_command = commands[-1]
+
+    # same subtitle filter (path and force_style) in both modes
+    assert f"[0:v]{_values(subtitle_command, '-vf')[0]}[subtitled]" == _filters(fused_command)[0]
+    # both mux the TTS audio track as AAC next to the video
+    assert _values(audio_command, "-i")[1] == _values(fused_command, "-i")[1] == context.audio_path
+    assert _values(audio_command, "-map")[1] == _values(fused_command, "-map")[1] == "1:a"
+    assert _values(audio_command, "-c:a") == _values(fused_command, "-c:a") == ["aac"]
+    if has_logo:
+        logo_graph = _values(commands[2], "-filter_complex")[0].split(";")
+        assert logo_graph[0].replace("[1:v]", "[2:v]") == _filters(fused_command)[1]
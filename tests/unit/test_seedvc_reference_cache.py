@@ -0,0 +1,96 @@
+"""Unit tests for the SeedVC reference-speaker feature cache (CPU, stub models)."""
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchaudio")
+pytest.importorskip("librosa")
+
+from services.tts.seedvc_server.reference_cache import (  # noqa: E402
+    ReferenceFeatureCache,
+    make_reference_cache_key,
+)
+from services.tts.seedvc_server.seedvc_config import SeedVCConfig, SeedVCModelConfig  # noqa: E402
+from services.tts.seedvc_server.seedvc_processor import SeedVCProcessor  # noqa: E402
+
+
+class _StubLengthRegulator:
+    def __call__(self, S, ylens, n_quantizers, f0=None):
+        return S[:, : int(ylens[0])], None, None, None, None
+
+
+class _StubModel:
+    length_regulator = _StubLengthRegulator()
+
+
+def _model_config(calls, model_version=None):
+    def semantic_fn(waves_16k):
+        calls.append("semantic")
+        return waves_16k[:, :200].unsqueeze(-1).repeat(1, 1, 4)
+
+    return SeedVCModelConfig(
+        model=_StubModel(),
+        semantic_fn=semantic_fn,
+        vocoder_fn=lambda mel: mel,
+        campplus_model=lambda feat: feat.mean(dim=1),
+        mel_fn=lambda wave: torch.zeros(1, 80, wave.size(-1) // 256),
+        mel_fn_args={"sampling_rate": 22050},
+        model_version=model_version,
+    )
+
+
+def _processor(tmp_path, ref_name, cache, calls, model_version=None):
+    config = SeedVCConfig(source=str(tmp_path / "src.wav"), target=str(tmp_path / ref_name))
+    return SeedVCProcessor(
+        config, _model_config(calls, model_version), torch.device("cpu"), reference_cache=cache
+    )
+
+
+def test_reference_features_are_computed_once_per_voice(tmp_path):
+    (tmp_path / "voice_a.wav").write_bytes(b"voice-a")
+    (tmp_path / "voice_b.wav").write_bytes(b"voice-b")
+    ref_audio = torch.randn(1, 22050)
+    cache = ReferenceFeatureCache(max_entries=4)
+    calls = []
+
+    first = _processor(tmp_path, "voice_a.wav", cache, calls).prepare_reference(ref_audio, 22050)
+    second = _processor(tmp_path, "voice_a.wav", cache, calls).prepare_reference(ref_audio, 22050)
+    _processor(tmp_path, "voice_b.wav", cache, calls).prepare_reference(ref_audio, 22050)
+
+    assert calls == ["semantic", "semantic"]
+    assert torch.equal(first.prompt_condition, second.prompt_condition)
+    stats = cache.get_stats()
+    assert (stats.memory_hits, stats.misses) == (1, 2)
+    assert stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_disk_tier_survives_a_new_cache_instance(tmp_path):
+    (tmp_path / "voice_a.wav").write_bytes(b"voice-a")
+    ref_audio = torch.randn(1, 22050)
+    calls = []
+
+    warm = ReferenceFeatureCache(cache_dir=str(tmp_path / "cache"))
+    expected = _processor(tmp_path, "voice_a.wav", warm, calls).prepare_reference(ref_audio, 22050)
+
+    cold = ReferenceFeatureCache(cache_dir=str(tmp_path / "cache"))
+    restored = _processor(tmp_path, "voice_a.wav", cold, calls).prepare_reference(ref_audio, 22050)
+
+    assert calls == ["semantic"]
+    assert cold.get_stats().disk_hits == 1
+    assert torch.equal(restored.mel2, expected.mel2)
+    assert torch.equal(restored.style2, expected.style2)
+
+
+def test_new_model_checkpoint_does_not_reuse_features(tmp_path):
+    (tmp_path / "voice_a.wav").write_bytes(b"voice-a")
+    ref_audio = torch.randn(1, 22050)
+    cache = ReferenceFeatureCache(cache_dir=str(tmp_path / "cache"))
+    calls = []
+
+    for version in ("ckpt-v1", "ckpt-v1", "ckpt-v2"):
+        _processor(tmp_path, "voice_a.wav", cache, calls, version).prepare_reference(ref_audio, 22050)
+
+    assert calls == ["semantic", "semantic"]
+    ref_path = str(tmp_path / "voice_a.wav")
+    assert make_reference_cache_key(ref_path, model_version="a", sr=1) != make_reference_cache_key(
+        ref_path, model_version="b", sr=1
+    )
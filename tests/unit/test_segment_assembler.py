@@ -0,0 +1,64 @@
+"""Unit tests for the ordered incremental WAV/SRT segment assembler."""
+import wave
+
+import pytest
+
+from services.worker.utils.segment_assembler import OrderedSegmentAssembler
+
+
+class _Segment:
+    """Minimal stand-in for a 16-bit mono pydub AudioSegment."""
+
+    def __init__(self, ms, value, frame_rate=16000):
+        self.frame_rate = frame_rate
+        self.channels = 1
+        self.sample_width = 2
+        self.raw_data = int(value).to_bytes(2, "little", signed=True) * (frame_rate * ms // 1000)
+
+    def frame_count(self):
+        return len(self.raw_data) // 2
+
+
+def test_out_of_order_segments_are_written_in_index_order(tmp_path):
+    audio_path, srt_path = str(tmp_path / "out.wav"), str(tmp_path / "out.srt")
+    assembler = OrderedSegmentAssembler(audio_path, srt_path, silence_ms=300)
+
+    assert assembler.add(2, _Segment(100, 3), "c") == 0
+    assert assembler.add(1, _Segment(250, 2), "b") == 0
+    assert assembler.pending_count == 2
+    assert assembler.add(0, _Segment(500, 1), "a") == 3
+    assembler.close()
+
+    assert assembler.peak_pending == 3
+    with open(srt_path, encoding="utf-8") as f:
+        assert f.read() == (
+            "1\n00:00:00,000 --> 00:00:00,500\na\n\n"
+            "2\n00:00:00,800 --> 00:00:01,050\nb\n\n"
+            "3\n00:00:01,350 --> 00:00:01,450\nc\n"
+        )
+    with wave.open(audio_path, "rb") as wav:
+        assert wav.getframerate() == 16000
+        assert wav.getnframes() == 16000 * 1450 // 1000
+        frames = wav.readframes(wav.getnframes())
+    # 500ms of "a", then 300ms of silence, then "b"
+    assert frames[2 * 7999:2 * 8000] == (1).to_bytes(2, "little")
+    assert frames[2 * 8000:2 * 12800] == b"\x00" * (2 * 4800)
+    assert frames[2 * 12800:2 * 12801] == (2).to_bytes(2, "little")
+
+
+def test_missing_segment_aborts_without_leaving_outputs(tmp_path):
+    audio_path, srt_path = str(tmp_path / "out.wav"), str(tmp_path / "out.srt")
+    assembler = OrderedSegmentAssembler(audio_path, srt_path)
+    assembler.add(0, _Segment(100, 1), "a")
+    assembler.add(2, _Segment(100, 1), "c")
+
+    with pytest.raises(RuntimeError):
+        assembler.close()
+    assert list(tmp_path.iterdir()) == []
+
+    duplicate = OrderedSegmentAssembler(audio_path, srt_path)
+    duplicate.add(0, _Segment(10, 1), "a")
+    with pytest.raises(ValueError):
+        duplicate.add(0, _Segment(10, 1), "a")
+    duplicate.abort()
+    assert list(tmp_path.iterdir()) == []
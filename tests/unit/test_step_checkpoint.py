@@ -0,0 +1,42 @@
+"""Unit tests for StepResultManager checkpoint persistence."""
+from services.worker.pipeline.result_manager import StepResultManager
+from services.worker.pipeline.results import ImageResult, TTSResult
+
+
+def test_checkpoint_round_trip(tmp_path):
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF")
+    manager = StepResultManager(tmp_path / "checkpoints")
+
+    manager.save_checkpoint(
+        "TTSGeneration",
+        TTSResult(step_name="TTSGeneration", audio_path=str(audio), duration=3.5),
+        fingerprint="abc",
+    )
+    restored = manager.load_checkpoint("TTSGeneration", "abc")
+
+    assert isinstance(restored, TTSResult)
+    assert restored.data == {"audio_path": str(audio), "duration": 3.5}
+
+
+def test_checkpoint_rejected_on_fingerprint_change_or_missing_output(tmp_path):
+    manager = StepResultManager(tmp_path / "checkpoints")
+    image = tmp_path / "split_000.png"
+    image.write_bytes(b"png")
+    result = ImageResult(step_name="ImageGeneration", image_paths=[str(image)])
+    manager.save_checkpoint("ImageGeneration", result, fingerprint="abc")
+
+    assert manager.load_checkpoint("ImageGeneration", "changed") is None
+    assert manager.load_checkpoint("ImageGeneration", "abc") is not None
+
+    image.unlink()
+    assert manager.load_checkpoint("ImageGeneration", "abc") is None
+
+
+def test_invalidate_checkpoints(tmp_path):
+    manager = StepResultManager(tmp_path / "checkpoints")
+    manager.save_checkpoint("Upload", TTSResult(step_name="Upload"), fingerprint="abc")
+
+    manager.invalidate_checkpoints(["Upload", "NeverSaved"])
+
+    assert manager.load_checkpoint("Upload", "abc") is None
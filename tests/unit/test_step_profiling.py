@@ -0,0 +1,101 @@
+"""Unit tests for opt-in per-step profiling and benchmark report comparison."""
+import time
+
+from core.utils.ffmpeg.scheduler import FFmpegScheduler
+from services.worker.pipeline.executor import PipelineExecutor
+from services.worker.pipeline.input_resolver import StepInputResolver
+from services.worker.pipeline.profiling import compare_reports, summarize_runs
+from services.worker.pipeline.result_manager import StepResultManager
+from services.worker.pipeline.results import StepResult
+
+
+class _FakeContext:
+    job_id = 1
+    failed_step_name = None
+
+    def update_job_status(self, status, detail):
+        pass
+
+    def mark_step_started(self, step_name):
+        pass
+
+    def mark_step_completed(self, step_name):
+        pass
+
+    def mark_step_failed(self, step_name, error):
+        self.failed_step_name = step_name
+
+    def get_duration(self):
+        return 0.0
+
+
+class _FfmpegStep:
+    """Holds a scheduler slot (standing in for an ffmpeg call) and burns some CPU."""
+    checkpointable = False
+    inputs = ()
+
+    def __init__(self, name, scheduler, calls):
+        self.name = name
+        self.outputs = (name.lower(),)
+        self.scheduler = scheduler
+        self.calls = calls
+
+    def _execute_functional(self, context, **kwargs):
+        for _ in range(self.calls):
+            with self.scheduler.slot():
+                time.sleep(0.02)
+        sum(i * i for i in range(200000))
+        return StepResult(step_name=self.name, data={self.outputs[0]: True})
+
+    def _merge_result_to_context(self, context, result):
+        pass
+
+
+def _executor(profile):
+    return PipelineExecutor(
+        _FakeContext(), StepInputResolver({}), StepResultManager(), profile=profile
+    )
+
+
+def test_profiles_are_attached_to_step_results():
+    scheduler = FFmpegScheduler(max_concurrency=4)
+    steps = [_FfmpegStep("Render", scheduler, calls=3), _FfmpegStep("Mux", scheduler, calls=1)]
+    executor = _executor(profile=True)
+
+    results = executor.execute_functional(steps)
+
+    render = results["Render"].metadata["profile"]
+    assert render["ffmpeg_calls"] == 3
+    assert render["ffmpeg_wall_seconds"] >= 0.06
+    assert render["wall_seconds"] >= render["ffmpeg_wall_seconds"]
+    assert render["cpu_seconds"] > 0
+    assert render["rss_peak_bytes"] >= render["rss_start_bytes"]
+    assert results["Mux"].metadata["profile"]["ffmpeg_calls"] == 1
+    assert set(executor.step_profiles) == {"Render", "Mux"}
+
+
+def test_profiling_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("PIPELINE_PROFILE", raising=False)
+    executor = _executor(profile=None)
+
+    results = executor.execute_functional([_FfmpegStep("Render", FFmpegScheduler(), calls=1)])
+
+    assert "profile" not in results["Render"].metadata
+    assert executor.step_profiles == {}
+
+
+def test_compare_reports_flags_only_regressions_above_noise():
+    def run(wall, write):
+        return {"Render": {
+            "wall_seconds": wall, "cpu_seconds": 0.2, "children_cpu_seconds": 1.0,
+            "ffmpeg_wall_seconds": 1.0, "write_bytes": write, "rss_peak_bytes": 100 << 20,
+        }}
+
+    baseline = summarize_runs([run(1.0, 10 << 20), run(1.1, 10 << 20), run(5.0, 10 << 20)])
+    assert baseline["Render"]["wall_seconds"] == 1.1
+
+    assert compare_reports(baseline, summarize_runs([run(1.2, 10 << 20)])) == []
+    regressions = compare_reports(baseline, summarize_runs([run(1.6, 30 << 20)]))
+    assert [line.split(":")[0] for line in regressions] == [
+        "Render.wall_seconds", "Render.write_bytes",
+    ]
@@ -0,0 +1,114 @@
+"""Unit tests for the cursor-based Azure TTS subtitle-to-source alignment."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pysrt")
+pytest.importorskip("opencc")
+fuzz = pytest.importorskip("rapidfuzz.fuzz")
+
+_SERVER_DIR = Path(__file__).resolve().parents[2] / "services" / "tts" / "azure_tts_server"
+if str(_SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(_SERVER_DIR))
+
+# the server's `services` package clashes with the repo root one, so load the module directly
+_spec = importlib.util.spec_from_file_location(
+    "azure_tts_subtitle_service", _SERVER_DIR / "services" / "subtitle_service.py"
+)
+subtitle_service = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(subtitle_service)
+
+ORIGINAL = (
+    "今天早上我们去公园散步。公园里有很多老人在打太极拳。湖边的柳树已经发芽了。"
+    "孩子们在草地上放风筝。中午我们在附近的小饭馆吃了面条。下午3点我们坐公交车回家。"
+)
+
+# ASR-style subtitles: no punctuation, digits spoken out, one misrecognised character
+SUBTITLES = [
+    "今天早上我们去公园散步",
+    "公园里有很多老人在打太极拳",
+    "湖边的柳树已经发芽了",
+    "孩子们在草地上放风争",
+    "中午我们在附近的小饭馆吃了面条",
+    "下午三点我们坐公交车回家",
+]
+
+
+def _service():
+    # only the stateless text helpers are used, so skip reading the server config
+    return subtitle_service.SubtitleService.__new__(subtitle_service.SubtitleService)
+
+
+def _full_scan(service, long_text, short_text, threshold=60, tolerance=5):
+    """The original per-sentence full-text sliding-window search (square text)."""
+    clean_text, index_map = service._clean_and_map(long_text)
+    target_len = len(short_text)
+    best_score, best_start, best_end = 0, 0, 0
+    for i in range(0, len(clean_text) - target_len + 1):
+        for delta in range(-tolerance, tolerance + 1):
+            end = i + target_len + delta
+            if end > len(clean_text) or end <= i:
+                continue
+            score = fuzz.ratio(clean_text[i:end], short_text)
+            if score > best_score:
+                best_score, best_start, best_end = score, i, end
+    if best_score < threshold:
+        return None
+    orig_start = index_map[best_start]
+    orig_end = index_map[best_end - 1] + 1
+    start_score = fuzz.ratio(long_text[orig_start:orig_end], short_text[1:])
+    end_score = fuzz.ratio(long_text[orig_start:orig_end], short_text[:-1])
+    if end_score > start_score and end_score > best_score:
+        return long_text[orig_start:orig_end + 1].strip()
+    elif start_score > end_score and start_score > best_score:
+        return long_text[orig_start - 1:orig_end + 1].strip()
+    return long_text[orig_start:orig_end].strip()
+
+
+def _align(subtitles, **kwargs):
+    service = _service()
+    text = service._convert_numbers_to_chinese(ORIGINAL)
+    aligner = subtitle_service.SubtitleTextAligner(
+        text, is_square=True, clean_and_map=service._clean_and_map, **kwargs
+    )
+    results, cursors = [], []
+    for subtitle in subtitles:
+        match = aligner.match(subtitle)
+        aligner.advance(match)
+        results.append((match.text if match else None, _full_scan(service, text, subtitle)))
+        cursors.append(aligner.cursor)
+    return aligner, results, cursors
+
+
+def test_cursor_alignment_matches_full_scan():
+    aligner, results, cursors = _align(SUBTITLES)
+
+    assert [aligned for aligned, _ in results] == [expected for _, expected in results]
+    assert results[3][0] == "孩子们在草地上放风筝"
+    assert results[5][0] == "下午三点我们坐公交车回家"
+    assert aligner.global_searches == 0
+    assert cursors == sorted(cursors)
+
+
+def test_find_similar_sentence_is_a_full_scan():
+    service = _service()
+    text = service._convert_numbers_to_chinese(ORIGINAL)
+
+    for subtitle in SUBTITLES:
+        assert service._find_similar_sentence(text, subtitle, is_square=True) == _full_scan(
+            service, text, subtitle
+        )
+
+
+def test_global_fallback_matches_full_scan_without_moving_cursor_back():
+    # a skipped sentence pushes the next one out of the small local window, and a
+    # repeated earlier sentence can only be found by the full-text fallback
+    subtitles = [SUBTITLES[0], SUBTITLES[1], SUBTITLES[3], SUBTITLES[4], SUBTITLES[1], SUBTITLES[5]]
+    aligner, results, cursors = _align(subtitles, window_chars=5)
+
+    assert [aligned for aligned, _ in results] == [expected for _, expected in results]
+    assert aligner.global_searches == 2
+    assert cursors == sorted(cursors)
+    assert cursors[4] == cursors[3]
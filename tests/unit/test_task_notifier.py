@@ -0,0 +1,43 @@
+"""Unit tests for the in-memory task completion notifier."""
+import threading
+import time
+
+from core.utils.task_notifier import InMemoryTaskNotifier, TaskCompletion
+
+
+def test_waiter_wakes_on_publish_from_another_thread():
+    notifier = InMemoryTaskNotifier()
+    timer = threading.Timer(0.05, notifier.publish, args=(TaskCompletion("t2", "completed"),))
+    timer.start()
+
+    start = time.monotonic()
+    done = notifier.wait_many(["t1", "t2", "t3"], timeout=5)
+
+    assert list(done) == ["t2"]
+    assert time.monotonic() - start < 1
+
+
+def test_notification_consumed_once_by_waiter():
+    notifier = InMemoryTaskNotifier()
+    timer = threading.Timer(0.05, notifier.publish, args=(TaskCompletion("t1", "failed", "boom"),))
+    timer.start()
+
+    assert notifier.wait("t1", timeout=5).error_message == "boom"
+    assert notifier.wait("t1", timeout=0.05) is None
+
+
+def test_publish_without_waiter_keeps_nothing():
+    notifier = InMemoryTaskNotifier(max_completed=2)
+    for i in range(100):
+        notifier.publish(TaskCompletion(f"t{i}", "completed"))
+    assert len(notifier) == 0
+    assert notifier.wait("t1", timeout=0.01) is None
+
+    # a waiter that times out while other waiters keep watching leaves no residue
+    waiter = threading.Thread(target=notifier.wait_many, args=(["a", "b", "c"], 0.2))
+    waiter.start()
+    time.sleep(0.05)
+    for task_id in ("a", "b", "c", "zzz"):
+        notifier.publish(TaskCompletion(task_id, "completed"))
+    waiter.join()
+    assert len(notifier) == 0
@@ -0,0 +1,97 @@
+"""Unit tests for the content-addressed TTS result cache."""
+from core.cache.tts_cache import TTSCache, make_tts_cache_key
+from core.clients.cached_tts_service import CachedTTSService
+from core.interfaces.service_interfaces import ITTSService, TTSResult
+
+
+class _FakeTTSService(ITTSService):
+    """Writes the text as audio bytes and records every synthesized text."""
+
+    def __init__(self):
+        self.synthesized = []
+
+    def synthesize(self, text, language, output_path, voice=None, volume=50, speech_rate=1.0, **kwargs):
+        self.synthesized.append(text)
+        with open(output_path, "wb") as f:
+            f.write(text.encode() * 10)
+        srt_path = kwargs.get("subtitle_output_path")
+        if srt_path:
+            with open(srt_path, "w", encoding="utf-8") as f:
+                f.write(f"1\n00:00:00,000 --> 00:00:01,000\n{text}\n")
+        return TTSResult(success=True, audio_path=output_path, srt_path=srt_path, duration=1.5)
+
+    async def synthesize_async(self, *args, **kwargs):
+        return self.synthesize(*args, **kwargs)
+
+
+def _synthesize(service, tmp_path, run, text="你好 世界", speech_rate=1.0):
+    out = tmp_path / run
+    out.mkdir(exist_ok=True)
+    return service.synthesize(
+        text=text,
+        language="中文",
+        output_path=str(out / "speech.wav"),
+        subtitle_output_path=str(out / "subtitle.srt"),
+        speech_rate=speech_rate,
+    )
+
+
+def test_key_normalizes_text_and_tracks_parameters():
+    base = make_tts_cache_key("你好  世界\n", "中文", "v", 1.0, None, 50, "azure")
+    assert base == make_tts_cache_key(" 你好 世界", "中文", "v", 1.0, None, 50, "azure")
+    assert base != make_tts_cache_key("你好 世界", "中文", "v", 1.2, None, 50, "azure")
+    assert base != make_tts_cache_key("你好 世界", "中文", "v", 1.0, 2, 50, "azure")
+    assert base != make_tts_cache_key("你好 世界", "中文", "v", 1.0, None, 50, "seedvc")
+
+
+def test_rerun_skips_synthesis_and_restores_srt_and_duration(tmp_path):
+    inner = _FakeTTSService()
+    service = CachedTTSService(inner, cache=TTSCache(tmp_path / "cache"), server_type="fake")
+
+    _synthesize(service, tmp_path, "run1")
+    result = _synthesize(service, tmp_path, "run2")
+    _synthesize(service, tmp_path, "run3", speech_rate=1.2)
+
+    assert inner.synthesized == ["你好 世界", "你好 世界"]
+    assert result.success and result.duration == 1.5
+    assert (tmp_path / "run2" / "subtitle.srt").read_text(encoding="utf-8").endswith("你好 世界\n")
+    assert (tmp_path / "run2" / "speech.wav").read_bytes() == "你好 世界".encode() * 10
+
+
+def test_size_based_eviction_and_index_reload(tmp_path):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"x" * 100)
+    cache = TTSCache(tmp_path / "cache", max_bytes=300)
+    keys = [make_tts_cache_key(f"text {i}") for i in range(4)]
+    for key in keys:
+        assert cache.put(key, audio, None, duration=1.0)
+
+    stats = cache.get_stats()
+    assert stats.size_bytes <= 300 and stats.evictions >= 1
+    assert not cache.contains(keys[0])
+    assert cache.contains(keys[-1])
+
+    reloaded = TTSCache(tmp_path / "cache", max_bytes=300)
+    assert reloaded.get(keys[-1], tmp_path / "out.wav").duration == 1.0
+    assert reloaded.get(keys[-1], tmp_path / "out.wav", tmp_path / "out.srt") is None
+
+
+def test_shared_tier_backfills_local_cache(tmp_path):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"x" * 100)
+    key = make_tts_cache_key("shared text")
+    writer = TTSCache(tmp_path / "node1", shared_dir=tmp_path / "shared")
+    assert writer.put(key, audio, None, duration=2.0)
+
+    reader = TTSCache(tmp_path / "node2", shared_dir=tmp_path / "shared")
+    assert reader.get(key, tmp_path / "first.wav").duration == 2.0
+    assert reader.contains(key)
+    assert reader.get(key, tmp_path / "second.wav").duration == 2.0
+
+    stats = reader.get_stats()
+    assert (stats.shared_hits, stats.local_hits, stats.misses) == (1, 1, 0)
+    # unfinished temporary entries are ignored on reload
+    leftover = tmp_path / "node2" / key[:2] / f".{key}.tmp"
+    leftover.mkdir()
+    (leftover / "meta.json").write_text("{}", encoding="utf-8")
+    assert TTSCache(tmp_path / "node2").get_stats().entries == 1
@@ -0,0 +1,81 @@
+"""Unit tests for resuming a pipeline whose last step uploads to OSS."""
+from services.worker.pipeline.executor import PipelineExecutor
+from services.worker.pipeline.input_resolver import StepInputResolver
+from services.worker.pipeline.result_manager import StepResultManager
+from services.worker.pipeline.results import StepResult
+from services.worker.pipeline.steps.upload_step import UploadStep
+
+
+class _FakeContext:
+    job_id = 1
+    failed_step_name = None
+
+    def update_job_status(self, status, detail):
+        pass
+
+    def mark_step_started(self, step_name):
+        pass
+
+    def mark_step_completed(self, step_name):
+        pass
+
+    def mark_step_failed(self, step_name, error):
+        pass
+
+    def get_duration(self):
+        return 0.0
+
+
+class _Step:
+    """Checkpointable producer of the final video path."""
+
+    name = "PostProcessing"
+    inputs = ()
+    outputs = ("final_video_path",)
+    checkpointable = True
+
+    def __init__(self, calls, video_path):
+        self.calls = calls
+        self.video_path = video_path
+
+    def _execute_functional(self, context, **kwargs):
+        self.calls.append(self.name)
+        self.video_path.write_bytes(b"mp4")
+        return StepResult(step_name=self.name, data={"final_video_path": str(self.video_path)})
+
+    def _merge_result_to_context(self, context, result):
+        pass
+
+
+class _RecordingUpload(UploadStep):
+    """UploadStep with the real class flags that records runs instead of uploading."""
+
+    def __init__(self, calls):
+        super().__init__(storage_service=object())
+        self.calls = calls
+
+    def _execute_functional(self, context, **kwargs):
+        self.calls.append(self.name)
+        return StepResult(step_name=self.name, data={"upload_urls": {"video": "oss://final.mp4"}})
+
+    def _merge_result_to_context(self, context, result):
+        pass
+
+
+def _run(tmp_path):
+    calls = []
+    executor = PipelineExecutor(
+        _FakeContext(), StepInputResolver({}), StepResultManager(tmp_path / "checkpoints")
+    )
+    steps = [_Step(calls, tmp_path / "final.mp4"), _RecordingUpload(calls)]
+    results = executor.execute_functional(steps)
+    return calls, results
+
+
+def test_resume_restores_steps_but_reruns_upload(tmp_path):
+    first_calls, _ = _run(tmp_path)
+    resumed_calls, results = _run(tmp_path)
+
+    assert first_calls == ["PostProcessing", "Upload"]
+    assert resumed_calls == ["Upload"]
+    assert results["Upload"].data["upload_urls"] == {"video": "oss://final.mp4"}
@@ -0,0 +1,113 @@
+"""Unit tests for the single-filtergraph video composition command (no ffmpeg run)."""
+import pytest
+
+from core.config.video_config import VideoProcessingConfig, VideoResolution
+from services.worker.pipeline.steps.video_step import VideoCompositionStep
+
+_CONFIG = VideoProcessingConfig(
+    resolution=VideoResolution.SD_480P, fps=25, transition_duration=0.5
+)
+_SCALE = (
+    "scale=854:480:force_original_aspect_ratio=decrease,"
+    "pad=854:480:(ow-iw)/2:(oh-ih)/2,setsar=1,fps=25,format=yuv420p"
+)
+
+# TTS storyboard: speech starts after a short lead-in and has gaps between sentences
+SPLITS = [
+    {"index": 1, "start": 1600, "end": 3000},
+    {"index": 0, "start": 200, "end": 1500},
+    {"index": 2, "start": 3100, "end": 4250},
+]
+AUDIO_DURATION = 4.25
+
+
+def _input_args(command):
+    return [command[i + 1] for i, arg in enumerate(command) if arg == "-i"], [
+        command[i + 1] for i, arg in enumerate(command) if arg == "-t"
+    ]
+
+
+def _filtergraph(command):
+    return command[command.index("-filter_complex") + 1].split(";")
+
+
+def test_split_durations_cover_the_whole_audio():
+    durations = VideoCompositionStep()._compute_split_durations(SPLITS, 3)
+
+    assert durations == pytest.approx([1.6, 1.5, 1.15])
+    assert sum(durations) == pytest.approx(AUDIO_DURATION)
+
+
+def test_last_image_lasts_until_the_audio_ends():
+    step = VideoCompositionStep()
+
+    # 1.5s of trailing audio (music or a tail the cues do not cover) after the last cue
+    durations = step._compute_split_durations(SPLITS, 3, audio_duration=5.75)
+
+    assert durations == pytest.approx([1.6, 1.5, 2.65])
+    assert sum(durations) == pytest.approx(5.75)
+    # a shorter or unknown measurement never cuts the last cue
+    assert step._compute_split_durations(SPLITS, 3, audio_duration=4.0) == pytest.approx([1.6, 1.5, 1.15])
+
+
+def test_split_durations_fall_back_to_fixed_duration():
+    step = VideoCompositionStep()
+    fixed = step._config.duration_per_image
+
+    assert step._compute_split_durations(None, 2) == [fixed, fixed]
+    assert step._compute_split_durations(SPLITS[:2], 3) == [fixed] * 3
+    assert step._compute_split_durations([{"index": 0}, {"index": 1}], 2) == [fixed, fixed]
+    # a zero-length split still yields a usable input duration
+    degenerate = [{"index": 0, "start": 0, "end": 500}, {"index": 1, "start": 0, "end": 0}]
+    assert step._compute_split_durations(degenerate, 2) == [step.MIN_SPLIT_DURATION] * 2
+
+
+def test_concat_command_for_small_storyboard():
+    step = VideoCompositionStep()
+    images = ["a.png", "b.png", "c.png"]
+    durations = step._compute_split_durations(SPLITS, 3)
+
+    command = step._build_single_graph_command(images, durations, "out.mp4", _CONFIG)
+
+    paths, lengths = _input_args(command)
+    assert paths == images
+    assert lengths == ["1.600", "1.500", "1.150"]
+    assert command.count("-loop") == 3
+    assert _filtergraph(command) == [
+        f"[0:v]{_SCALE}[v0]",
+        f"[1:v]{_SCALE}[v1]",
+        f"[2:v]{_SCALE}[v2]",
+        "[v0][v1][v2]concat=n=3:v=1:a=0[outv]",
+    ]
+    assert command[command.index("-map") + 1] == "[outv]"
+    assert command[command.index("-r") + 1] == "25"
+    assert command[-1] == "out.mp4"
+
+
+def test_xfade_command_keeps_total_duration():
+    step = VideoCompositionStep()
+    step.enable_transitions = True
+    durations = step._compute_split_durations(SPLITS, 3)
+
+    command = step._build_single_graph_command(
+        ["a.png", "b.png", "c.png"], durations, "out.mp4", _CONFIG
+    )
+
+    _, lengths = _input_args(command)
+    # every input but the last is extended by one transition
+    assert lengths == ["2.100", "2.000", "1.150"]
+    assert sum(float(length) for length in lengths) - 2 * 0.5 == pytest.approx(AUDIO_DURATION)
+    assert _filtergraph(command)[3:] == [
+        "[v0][v1]xfade=transition=fade:duration=0.5:offset=1.600[x1]",
+        "[x1][v2]xfade=transition=slideleft:duration=0.5:offset=3.100[outv]",
+    ]
+
+
+def test_single_image_never_uses_xfade():
+    step = VideoCompositionStep()
+    step.enable_transitions = True
+
+    command = step._build_single_graph_command(["a.png"], [2.0], "out.mp4", _CONFIG)
+
+    assert _input_args(command)[1] == ["2.000"]
+    assert _filtergraph(command)[-1] == "[v0]concat=n=1:v=1:a=0[outv]"
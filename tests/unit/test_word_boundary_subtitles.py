@@ -0,0 +1,102 @@
+"""Unit tests for building subtitle timelines from Azure TTS word boundaries."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("azure.cognitiveservices.speech")
+pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+pytest.importorskip("opencc")
+
+_SERVER_DIR = Path(__file__).resolve().parents[2] / "services" / "tts" / "azure_tts_server"
+if str(_SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(_SERVER_DIR))
+
+# the server's `services` package clashes with the repo root one, so load the module directly
+_spec = importlib.util.spec_from_file_location(
+    "azure_tts_tts_service", _SERVER_DIR / "services" / "tts_service.py"
+)
+tts_service = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(tts_service)
+
+WordBoundary = tts_service.WordBoundary
+build_sentences = tts_service.AzureTTSService._build_sentences
+
+
+def _timeline(sentences):
+    return [(s.raw_text, s.start, s.end) for s in sentences]
+
+
+def _chunk(duration_ms, *sentences):
+    return tts_service.ChunkSynthesisResult(
+        audio_file="chunk.wav",
+        duration_ms=duration_ms,
+        sentences=[
+            tts_service.SentenceInfo(raw_text=text, start=start, end=end)
+            for text, start, end in sentences
+        ],
+    )
+
+
+def test_build_sentences_splits_on_punctuation_and_joins_latin_words():
+    boundaries = [
+        WordBoundary("今天", 100, 200),
+        WordBoundary("天气", 300, 200),
+        WordBoundary("，", 500, 0),
+        WordBoundary("很好", 550, 250),
+        WordBoundary("“", 800, 0, is_punctuation=True),
+        WordBoundary("。", 820, 0, is_punctuation=True),
+        WordBoundary("Hello", 900, 300),
+        WordBoundary("world", 1250, 300),
+        WordBoundary(" ", 1550, 0),
+    ]
+
+    assert _timeline(build_sentences(boundaries, 0, 5000)) == [
+        ("今天天气", 100, 500),
+        ("很好", 550, 800),
+        ("Hello world", 900, 1550),
+    ]
+
+
+def test_build_sentences_subtracts_leading_trim_and_clamps_to_duration():
+    boundaries = [
+        WordBoundary("开始", 50, 200),
+        WordBoundary("。", 250, 0),
+        WordBoundary("结束", 900, 400),
+    ]
+
+    # 120ms of leading silence was trimmed and the processed audio is 1000ms long
+    assert _timeline(build_sentences(boundaries, 120, 1000)) == [
+        ("开始", 0, 130),
+        ("结束", 780, 1000),
+    ]
+
+
+def test_build_sentences_without_words_is_empty():
+    assert build_sentences([], 0, 1000) == []
+    assert build_sentences([WordBoundary("。", 0, 0)], 0, 1000) == []
+
+
+def test_merge_chunk_sentences_adds_cumulative_offsets():
+    chunks = [
+        _chunk(1000, ("一", 0, 400), ("二", 450, 980)),
+        _chunk(800, ("三", 20, 700)),
+        _chunk(500, ("四", 0, 500)),
+    ]
+
+    assert _timeline(tts_service.merge_chunk_sentences(chunks)) == [
+        ("一", 0, 400),
+        ("二", 450, 980),
+        ("三", 1020, 1700),
+        ("四", 1800, 2300),
+    ]
+    # the per-chunk results are left untouched
+    assert _timeline(chunks[1].sentences) == [("三", 20, 700)]
+
+
+def test_merge_chunk_sentences_falls_back_when_a_chunk_has_no_boundaries():
+    chunks = [_chunk(1000, ("一", 0, 400)), _chunk(800)]
+
+    assert tts_service.merge_chunk_sentences(chunks) is None